@@ -118,6 +118,11 @@ class Config(BaseSettings):
 
     # Embedding
     embedding_max_chunks_in_batch: int = Field(10, alias="EMBEDDING_MAX_CHUNKS_IN_BATCH")
+    embedding_max_tokens_in_batch: int = Field(16384, alias="EMBEDDING_MAX_TOKENS_IN_BATCH")
+    embedding_max_concurrency_per_provider: int = Field(8, alias="EMBEDDING_MAX_CONCURRENCY_PER_PROVIDER")
+    embedding_micro_batch_enabled: bool = Field(True, alias="EMBEDDING_MICRO_BATCH_ENABLED")
+    embedding_micro_batch_max_size: int = Field(64, alias="EMBEDDING_MICRO_BATCH_MAX_SIZE")
+    embedding_micro_batch_max_wait_ms: int = Field(50, alias="EMBEDDING_MICRO_BATCH_MAX_WAIT_MS")
 
     # Memory backend
     memory_redis_url: Optional[str] = Field(None, alias="MEMORY_REDIS_URL")
@@ -144,10 +149,19 @@ class Config(BaseSettings):
     chunk_size: int = Field(400, alias="CHUNK_SIZE")
     chunk_overlap_size: int = Field(20, alias="CHUNK_OVERLAP_SIZE")
 
+    # PDF page rendering for vision assets
+    pdf_render_dpi: int = Field(72, alias="PDF_RENDER_DPI")
+    pdf_render_format: str = Field("png", alias="PDF_RENDER_FORMAT")  # png, jpeg or webp
+    pdf_render_quality: int = Field(85, alias="PDF_RENDER_QUALITY")  # Encoder quality for jpeg and webp
+    pdf_render_workers: int = Field(4, alias="PDF_RENDER_WORKERS")  # Render processes, 1 renders in-process
+    pdf_render_max_in_flight: int = Field(8, alias="PDF_RENDER_MAX_IN_FLIGHT")  # Pages rendered ahead of upload
+
     # Fulltext search
     es_host: Optional[str] = Field(None, alias="ES_HOST")
     es_timeout: int = Field(30, alias="ES_TIMEOUT")  # ES request timeout in seconds
     es_max_retries: int = Field(3, alias="ES_MAX_RETRIES")  # Max retries for ES requests
+    es_bulk_chunk_size: int = Field(500, alias="ES_BULK_CHUNK_SIZE")  # Actions per _bulk request
+    es_bulk_refresh: str = Field("false", alias="ES_BULK_REFRESH")  # Refresh policy: false, true or wait_for
 
     # LLM keyword extraction
     llm_keyword_extraction_provider: str = Field("", alias="LLM_KEYWORD_EXTRACTION_PROVIDER")
@@ -168,6 +182,16 @@ class Config(BaseSettings):
     # Cache
     cache_enabled: bool = Field(True, alias="CACHE_ENABLED")
     cache_ttl: int = Field(86400, alias="CACHE_TTL")
+    embedding_cache_enabled: bool = Field(True, alias="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_local_size: int = Field(10000, alias="EMBEDDING_CACHE_LOCAL_SIZE")
+    embedding_cache_redis_enabled: bool = Field(True, alias="EMBEDDING_CACHE_REDIS_ENABLED")
+    query_embedding_cache_enabled: bool = Field(True, alias="QUERY_EMBEDDING_CACHE_ENABLED")
+    query_embedding_cache_ttl: int = Field(300, alias="QUERY_EMBEDDING_CACHE_TTL")
+    query_embedding_cache_local_size: int = Field(1000, alias="QUERY_EMBEDDING_CACHE_LOCAL_SIZE")
+    graph_context_cache_enabled: bool = Field(True, alias="GRAPH_CONTEXT_CACHE_ENABLED")
+    graph_context_cache_local_size: int = Field(1000, alias="GRAPH_CONTEXT_CACHE_LOCAL_SIZE")
+    lightrag_llm_cache_ttl: int = Field(30 * 86400, alias="LIGHTRAG_LLM_CACHE_TTL")
+    lightrag_keywords_cache_ttl: int = Field(86400, alias="LIGHTRAG_KEYWORDS_CACHE_TTL")
 
     # Opik
     opik_api_key: str = Field("", alias="OPIK_API_KEY")
@@ -26,7 +26,9 @@ class ContextManager(ABC):
         self.vectordb_type = vectordb_type
         self.adaptor = VectorStoreConnectorAdaptor(vectordb_type, vectordb_ctx)
 
-    def query(self, query, score_threshold=0.5, topk=3, vector=None, index_types=None, chat_id=None):
+    def query(
+        self, query, score_threshold=0.5, topk=3, vector=None, index_types=None, chat_id=None, with_vectors=False
+    ):
         """
         Query vectors with optional filtering by index types and chat_id
 
@@ -38,6 +40,7 @@ class ContextManager(ABC):
             index_types: List of index types to include (e.g., ["vector", "vision", "summary"])
                         If None, no filtering is applied
             chat_id: Chat ID to filter chat documents (optional)
+            with_vectors: Whether to return the stored vectors in DocumentWithScore.embedding
 
         Returns:
             List of DocumentWithScore objects
@@ -45,22 +48,77 @@ class ContextManager(ABC):
         if vector is None:
             vector = self.embedding_model.embed_query(query)
 
-        # Create filter based on index_types and chat_id if provided
-        filter_condition = self._create_combined_filter(index_types, chat_id)
-
         query_embedding = QueryWithEmbedding(query=query, top_k=topk, embedding=vector)
         results = self.adaptor.connector.search(
             query_embedding,
+            **self._search_kwargs(query_embedding, score_threshold, index_types, chat_id, with_vectors),
+        )
+        return results.results
+
+    async def aquery(
+        self, query, score_threshold=0.5, topk=3, vector=None, index_types=None, chat_id=None, with_vectors=False
+    ):
+        """
+        Async version of query, searching through the connector's async client without blocking the event loop
+
+        Returns:
+            List of DocumentWithScore objects
+        """
+        if vector is None:
+            vector = await self.embedding_model.aembed_query(query)
+
+        query_embedding = QueryWithEmbedding(query=query, top_k=topk, embedding=vector)
+        results = await self.adaptor.connector.asearch(
+            query_embedding,
+            **self._search_kwargs(query_embedding, score_threshold, index_types, chat_id, with_vectors),
+        )
+        return results.results
+
+    async def aquery_batch(self, query, searches, vector=None, with_vectors=False):
+        """
+        Run several filtered searches for the same query with a single vector store request
+
+        Args:
+            query: Query string
+            searches: List of dicts with the topk, score_threshold, index_types and chat_id of each search
+            vector: Pre-computed query vector (optional), otherwise the query is embedded once for all searches
+            with_vectors: Whether to return the stored vectors in DocumentWithScore.embedding
+
+        Returns:
+            List of DocumentWithScore lists, one per search
+        """
+        if vector is None:
+            vector = await self.embedding_model.aembed_query(query)
+
+        batch = []
+        for search in searches:
+            query_embedding = QueryWithEmbedding(query=query, top_k=search.get("topk", 3), embedding=vector)
+            search_kwargs = self._search_kwargs(
+                query_embedding,
+                search.get("score_threshold", 0.5),
+                search.get("index_types"),
+                search.get("chat_id"),
+                with_vectors,
+            )
+            batch.append((query_embedding, search_kwargs))
+
+        results = await self.adaptor.connector.asearch_batch(batch)
+        return [result.results for result in results]
+
+    def _search_kwargs(self, query_embedding, score_threshold, index_types, chat_id, with_vectors) -> dict:
+        # Create filter based on index_types and chat_id if provided
+        filter_condition = self._create_combined_filter(index_types, chat_id)
+
+        return dict(
             collection_name=self.collection_name,
             query_vector=query_embedding.embedding,
-            with_vectors=True,
+            with_vectors=with_vectors,
             limit=query_embedding.top_k,
             consistency="majority",
             search_params={"hnsw_ef": 128, "exact": False},
             score_threshold=score_threshold,
             filter=filter_condition,
         )
-        return results.results
 
     def _create_index_types_filter(self, index_types: List[str]) -> Optional[Any]:
         """
@@ -752,6 +752,49 @@ class LightRAGVDBRelationModel(Base):
     file_path = Column(Text, nullable=True)
 
 
+class LightRAGDocGraphRefModel(Base):
+    """LightRAG reverse index from documents to the chunks, entities and relations built from them"""
+
+    __tablename__ = "lightrag_doc_graph_refs"
+    __table_args__ = (
+        UniqueConstraint(
+            "workspace",
+            "doc_id",
+            "chunk_id",
+            "ref_type",
+            "entity_id",
+            "target_entity_id",
+            name="uq_lightrag_doc_graph_refs",
+        ),
+        Index("idx_lightrag_doc_graph_refs_workspace_doc", "workspace", "doc_id"),
+        Index("idx_lightrag_doc_graph_refs_workspace_chunk", "workspace", "chunk_id"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    workspace = Column(String(255), nullable=False)
+    doc_id = Column(String(256), nullable=False)
+    chunk_id = Column(String(255), nullable=False)
+    ref_type = Column(String(16), nullable=False)  # chunk, entity or relation
+    entity_id = Column(String(256), nullable=False, default="")  # Entity, or relation source
+    target_entity_id = Column(String(256), nullable=False, default="")  # Relation target
+    create_time = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
+class LightRAGLLMCacheModel(Base):
+    """LightRAG LLM response cache, deleted with its workspace and evicted after LIGHTRAG_LLM_CACHE_TTL"""
+
+    __tablename__ = "lightrag_llm_cache"
+    __table_args__ = (Index("idx_lightrag_llm_cache_update_time", "update_time"),)
+
+    id = Column(String(255), primary_key=True)
+    workspace = Column(String(255), primary_key=True)
+    cache_type = Column(String(32), nullable=False)
+    model = Column(String(255), nullable=True)
+    return_value = Column(Text, nullable=True)
+    create_time = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    update_time = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
 class DocumentIndex(Base):
     """Document index - single status model"""
 
@@ -514,6 +514,114 @@ class GraphRepositoryMixin:
 
         return self._execute_query(_get_nodes_edges_batch)
 
+    def get_graph_ego_network(
+        self, workspace: str, node_ids: List[str], include_degrees: bool = True
+    ) -> Dict[str, Any]:
+        """Get seed nodes, their incident edges, their one-hop neighbours and all degrees in a single query
+
+        Returns:
+            Dict with "nodes" (entity_id -> node dict, seeds and neighbours), "edges" (list of
+            incident edge dicts with source/target) and "node_degrees" (entity_id -> degree,
+            empty unless include_degrees is set)
+        """
+        if not node_ids:
+            return {"nodes": {}, "edges": [], "node_degrees": {}}
+
+        def _get_ego_network(session):
+            # Incident edges are fetched with two index-friendly selects, their endpoints
+            # form the ego network members, and nodes, edges and degrees are aggregated
+            # into JSON columns of a single row.
+            degrees_cte = """,
+                member_ends AS (
+                    SELECT d.source_entity_id AS entity_id
+                    FROM lightrag_graph_edges d
+                    WHERE d.workspace = :workspace
+                      AND d.source_entity_id IN (SELECT entity_id FROM members)
+                    UNION ALL
+                    SELECT d.target_entity_id AS entity_id
+                    FROM lightrag_graph_edges d
+                    WHERE d.workspace = :workspace
+                      AND d.target_entity_id IN (SELECT entity_id FROM members)
+                ),
+                degrees AS (
+                    SELECT entity_id, COUNT(*) AS degree
+                    FROM member_ends
+                    GROUP BY entity_id
+                )"""
+            degrees_column = "(SELECT json_object_agg(entity_id, degree) FROM degrees)"
+            query = text(f"""
+                WITH incident AS (
+                    SELECT e.source_entity_id, e.target_entity_id, e.weight, e.keywords,
+                           e.description, e.source_id, e.file_path
+                    FROM lightrag_graph_edges e
+                    WHERE e.workspace = :workspace
+                      AND e.source_entity_id = ANY(:node_ids)
+                    UNION
+                    SELECT e.source_entity_id, e.target_entity_id, e.weight, e.keywords,
+                           e.description, e.source_id, e.file_path
+                    FROM lightrag_graph_edges e
+                    WHERE e.workspace = :workspace
+                      AND e.target_entity_id = ANY(:node_ids)
+                ),
+                members AS (
+                    SELECT unnest(:node_ids) AS entity_id
+                    UNION
+                    SELECT source_entity_id FROM incident
+                    UNION
+                    SELECT target_entity_id FROM incident
+                ){degrees_cte if include_degrees else ""}
+                SELECT
+                    (
+                        SELECT json_agg(json_build_object(
+                            'entity_id', n.entity_id,
+                            'entity_name', n.entity_name,
+                            'entity_type', n.entity_type,
+                            'description', n.description,
+                            'source_id', n.source_id,
+                            'file_path', n.file_path,
+                            'created_at', EXTRACT(EPOCH FROM n.createtime)::BIGINT
+                        ))
+                        FROM lightrag_graph_nodes n
+                        WHERE n.workspace = :workspace
+                          AND n.entity_id IN (SELECT entity_id FROM members)
+                    ) AS nodes,
+                    (
+                        SELECT json_agg(json_build_object(
+                            'source', i.source_entity_id,
+                            'target', i.target_entity_id,
+                            'weight', i.weight,
+                            'keywords', i.keywords,
+                            'description', i.description,
+                            'source_id', i.source_id,
+                            'file_path', i.file_path
+                        ))
+                        FROM incident i
+                    ) AS edges,
+                    {degrees_column if include_degrees else "NULL"} AS node_degrees
+            """)
+
+            row = session.execute(query, {"workspace": workspace, "node_ids": node_ids}).one()
+            node_rows, edge_rows, degree_rows = row
+
+            nodes = {}
+            for node in node_rows or []:
+                # Match the format of get_graph_nodes_batch
+                if not node["entity_name"] or node["entity_name"] == node["entity_id"]:
+                    node.pop("entity_name")
+                nodes[node["entity_id"]] = {k: v for k, v in node.items() if v is not None}
+
+            edges = []
+            for edge in edge_rows or []:
+                edge["weight"] = float(edge["weight"]) if edge["weight"] is not None else 0.0
+                # Keep required fields even if None, as get_graph_edges_batch does
+                required_fields = {"source", "target", "weight", "keywords", "description", "source_id"}
+                edges.append({k: v for k, v in edge.items() if k in required_fields or v is not None})
+
+            node_degrees = {entity_id: int(degree) for entity_id, degree in (degree_rows or {}).items()}
+            return {"nodes": nodes, "edges": edges, "node_degrees": node_degrees}
+
+        return self._execute_query(_get_ego_network)
+
     def delete_graph_nodes_batch(self, workspace: str, node_ids: List[str]) -> None:
         """Delete multiple nodes and their edges in batch using efficient SQL"""
         if not node_ids:
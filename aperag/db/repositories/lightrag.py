@@ -12,16 +12,113 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from sqlalchemy import select
+import json
+
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
 
 from aperag.db.models import (
     LightRAGDocChunksModel,
+    LightRAGDocGraphRefModel,
+    LightRAGLLMCacheModel,
     LightRAGVDBEntityModel,
     LightRAGVDBRelationModel,
 )
 from aperag.db.repositories.base import SyncRepositoryProtocol
 from aperag.utils.utils import utc_now
 
+# Rows per INSERT statement, keeps the bind parameter count well below the PostgreSQL limit
+_DOC_GRAPH_REFS_INSERT_BATCH_SIZE = 1000
+# Rows per VDB UPSERT statement, bounds statement size since every row carries an embedding
+_VDB_UPSERT_BATCH_SIZE = 500
+# HNSW indexes the vector type up to 2000 dimensions, larger embeddings are indexed as halfvec
+_HNSW_MAX_VECTOR_DIMS = 2000
+# Upper bound of tuples an iterative HNSW scan visits before giving up on filling top_k
+_HNSW_MAX_SCAN_TUPLES = 20000
+
+
+# Restricts entity/relation rows to those extracted from chunks of the given documents
+_DOC_CHUNKS_FILTER = """EXISTS (
+    SELECT 1 FROM lightrag_doc_chunks c
+    WHERE c.workspace = :workspace AND c.full_doc_id = ANY(:doc_ids) AND c.id = ANY(t.chunk_ids)
+)"""
+
+
+def _similarity_search(
+    session,
+    table: str,
+    columns: str,
+    doc_filter: str,
+    workspace: str,
+    embedding: list,
+    top_k: int,
+    doc_ids: list | None,
+    threshold: float,
+    ef_search: int | None,
+) -> list[dict]:
+    """
+    Nearest-neighbour search ordered by cosine distance so the HNSW index can serve it.
+
+    content_vector has no fixed dimension, so it is cast to vector(N) (halfvec(N) above the
+    HNSW vector limit) and filtered on vector_dims to match the per-dimension partial HNSW
+    indexes. The similarity threshold is applied to the top_k candidates afterwards, as
+    filtering on it would force a scan.
+
+    The workspace and document filters are applied after the index scan, so the scan is
+    iterative to keep finding candidates until top_k rows pass them. If it still returns
+    fewer than top_k rows, the search is repeated as an exact scan.
+    """
+    dim = len(embedding)
+    vector_type = "halfvec" if dim > _HNSW_MAX_VECTOR_DIMS else "vector"
+    # Transaction-local, the candidate list must be at least top_k to return top_k rows
+    hnsw_settings = {
+        "hnsw.iterative_scan": "relaxed_order",
+        "hnsw.max_scan_tuples": str(_HNSW_MAX_SCAN_TUPLES),
+    }
+    if ef_search:
+        hnsw_settings["hnsw.ef_search"] = str(max(ef_search, top_k))
+    for name, value in hnsw_settings.items():
+        session.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
+
+    conditions = ["t.workspace = :workspace", f"vector_dims(t.content_vector) = {dim}"]
+    params = {"workspace": workspace, "embedding": "[" + ",".join(map(str, embedding)) + "]", "top_k": top_k}
+    if doc_ids:
+        conditions.append(doc_filter)
+        params["doc_ids"] = doc_ids
+
+    distance = f"t.content_vector::{vector_type}({dim}) <=> CAST(:embedding AS {vector_type}({dim}))"
+    candidates_sql = text(
+        f"""
+        SELECT {columns}, {distance} AS cosine_distance
+        FROM {table}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY {distance}
+        LIMIT :top_k
+        """
+    )
+    candidates = session.execute(candidates_sql, params).all()
+    if len(candidates) < top_k:
+        # Without index scans the planner sorts every matching row, so the result is exact
+        session.execute(text("SELECT set_config('enable_indexscan', 'off', true)"))
+        candidates = session.execute(candidates_sql, params).all()
+        session.execute(text("SELECT set_config('enable_indexscan', 'on', true)"))
+
+    # Iterative scans in relaxed order may return candidates slightly out of order
+    rows = sorted((dict(row._mapping) for row in candidates), key=lambda row: row["cosine_distance"])
+    results = []
+    for row in rows:
+        row["distance"] = 1 - row["cosine_distance"]
+        if row["distance"] > threshold:
+            results.append(row)
+    return results
+
+
+def _load_vector(vector_data):
+    """Vectors may arrive serialized as JSON strings"""
+    if isinstance(vector_data, str):
+        return json.loads(vector_data)
+    return vector_data
+
 
 class LightragRepositoryMixin(SyncRepositoryProtocol):
     # LightRAG Doc Chunks Operations
@@ -157,49 +254,42 @@ class LightragRepositoryMixin(SyncRepositoryProtocol):
         return self._execute_query(_query)
 
     def upsert_lightrag_vdb_entity(self, workspace: str, entity_data: dict):
-        """Upsert LightRAG VDB Entity records using PostgreSQL UPSERT"""
+        """Upsert LightRAG VDB Entity records with multi-row PostgreSQL UPSERT statements"""
+        if not entity_data:
+            return
 
         def _operation(session):
-            for entity_id, entity_info in entity_data.items():
-                # Prepare vector data - convert from JSON string if needed
-                vector_data = entity_info.get("content_vector")
-                if isinstance(vector_data, str):
-                    import json
-
-                    vector_data = json.loads(vector_data)
-
-                # Use raw SQL UPSERT to avoid race conditions
-                sql = """
-                INSERT INTO lightrag_vdb_entity (workspace, id, entity_name, content, content_vector, chunk_ids, file_path, create_time, update_time)
-                VALUES (:workspace, :id, :entity_name, :content, :content_vector, :chunk_ids, :file_path, :create_time, :update_time)
-                ON CONFLICT (workspace, id) DO UPDATE SET
-                    entity_name = EXCLUDED.entity_name,
-                    content = EXCLUDED.content,
-                    content_vector = CASE 
-                        WHEN EXCLUDED.content_vector IS NOT NULL THEN EXCLUDED.content_vector 
-                        ELSE lightrag_vdb_entity.content_vector 
-                    END,
-                    chunk_ids = EXCLUDED.chunk_ids,
-                    file_path = EXCLUDED.file_path,
-                    update_time = EXCLUDED.update_time
-                """
-
-                from sqlalchemy import text
-
-                session.execute(
-                    text(sql),
-                    {
-                        "workspace": workspace,
-                        "id": entity_id,
-                        "entity_name": entity_info.get("entity_name"),
-                        "content": entity_info.get("content", ""),
-                        "content_vector": vector_data,
-                        "chunk_ids": entity_info.get("chunk_ids"),
-                        "file_path": entity_info.get("file_path"),
-                        "create_time": utc_now(),
-                        "update_time": utc_now(),
-                    },
+            now = utc_now()
+            rows = [
+                {
+                    "workspace": workspace,
+                    "id": entity_id,
+                    "entity_name": entity_info.get("entity_name"),
+                    "content": entity_info.get("content", ""),
+                    "content_vector": _load_vector(entity_info.get("content_vector")),
+                    "chunk_ids": entity_info.get("chunk_ids"),
+                    "file_path": entity_info.get("file_path"),
+                    "create_time": now,
+                    "update_time": now,
+                }
+                for entity_id, entity_info in entity_data.items()
+            ]
+            for i in range(0, len(rows), _VDB_UPSERT_BATCH_SIZE):
+                stmt = insert(LightRAGVDBEntityModel).values(rows[i : i + _VDB_UPSERT_BATCH_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["workspace", "id"],
+                    set_=dict(
+                        entity_name=stmt.excluded.entity_name,
+                        content=stmt.excluded.content,
+                        content_vector=func.coalesce(
+                            stmt.excluded.content_vector, LightRAGVDBEntityModel.content_vector
+                        ),
+                        chunk_ids=stmt.excluded.chunk_ids,
+                        file_path=stmt.excluded.file_path,
+                        update_time=stmt.excluded.update_time,
+                    ),
                 )
+                session.execute(stmt)
 
             session.commit()
 
@@ -236,51 +326,44 @@ class LightragRepositoryMixin(SyncRepositoryProtocol):
         return self._execute_query(_query)
 
     def upsert_lightrag_vdb_relation(self, workspace: str, relation_data: dict):
-        """Upsert LightRAG VDB Relation records using PostgreSQL UPSERT"""
+        """Upsert LightRAG VDB Relation records with multi-row PostgreSQL UPSERT statements"""
+        if not relation_data:
+            return
 
         def _operation(session):
-            for relation_id, relation_info in relation_data.items():
-                # Prepare vector data - convert from JSON string if needed
-                vector_data = relation_info.get("content_vector")
-                if isinstance(vector_data, str):
-                    import json
-
-                    vector_data = json.loads(vector_data)
-
-                # Use raw SQL UPSERT to avoid race conditions
-                sql = """
-                INSERT INTO lightrag_vdb_relation (workspace, id, source_id, target_id, content, content_vector, chunk_ids, file_path, create_time, update_time)
-                VALUES (:workspace, :id, :source_id, :target_id, :content, :content_vector, :chunk_ids, :file_path, :create_time, :update_time)
-                ON CONFLICT (workspace, id) DO UPDATE SET
-                    source_id = EXCLUDED.source_id,
-                    target_id = EXCLUDED.target_id,
-                    content = EXCLUDED.content,
-                    content_vector = CASE 
-                        WHEN EXCLUDED.content_vector IS NOT NULL THEN EXCLUDED.content_vector 
-                        ELSE lightrag_vdb_relation.content_vector 
-                    END,
-                    chunk_ids = EXCLUDED.chunk_ids,
-                    file_path = EXCLUDED.file_path,
-                    update_time = EXCLUDED.update_time
-                """
-
-                from sqlalchemy import text
-
-                session.execute(
-                    text(sql),
-                    {
-                        "workspace": workspace,
-                        "id": relation_id,
-                        "source_id": relation_info.get("source_id"),
-                        "target_id": relation_info.get("target_id"),
-                        "content": relation_info.get("content", ""),
-                        "content_vector": vector_data,
-                        "chunk_ids": relation_info.get("chunk_ids"),
-                        "file_path": relation_info.get("file_path"),
-                        "create_time": utc_now(),
-                        "update_time": utc_now(),
-                    },
+            now = utc_now()
+            rows = [
+                {
+                    "workspace": workspace,
+                    "id": relation_id,
+                    "source_id": relation_info.get("source_id"),
+                    "target_id": relation_info.get("target_id"),
+                    "content": relation_info.get("content", ""),
+                    "content_vector": _load_vector(relation_info.get("content_vector")),
+                    "chunk_ids": relation_info.get("chunk_ids"),
+                    "file_path": relation_info.get("file_path"),
+                    "create_time": now,
+                    "update_time": now,
+                }
+                for relation_id, relation_info in relation_data.items()
+            ]
+            for i in range(0, len(rows), _VDB_UPSERT_BATCH_SIZE):
+                stmt = insert(LightRAGVDBRelationModel).values(rows[i : i + _VDB_UPSERT_BATCH_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["workspace", "id"],
+                    set_=dict(
+                        source_id=stmt.excluded.source_id,
+                        target_id=stmt.excluded.target_id,
+                        content=stmt.excluded.content,
+                        content_vector=func.coalesce(
+                            stmt.excluded.content_vector, LightRAGVDBRelationModel.content_vector
+                        ),
+                        chunk_ids=stmt.excluded.chunk_ids,
+                        file_path=stmt.excluded.file_path,
+                        update_time=stmt.excluded.update_time,
+                    ),
                 )
+                session.execute(stmt)
 
             session.commit()
 
@@ -305,175 +388,83 @@ class LightragRepositoryMixin(SyncRepositoryProtocol):
 
     # Add vector similarity search methods
     def query_lightrag_doc_chunks_similarity(
-        self, workspace: str, embedding: list, top_k: int, doc_ids: list = None, threshold: float = 0.2
+        self,
+        workspace: str,
+        embedding: list,
+        top_k: int,
+        doc_ids: list = None,
+        threshold: float = 0.2,
+        ef_search: int | None = None,
     ):
         """Query similar document chunks using vector similarity"""
 
         def _query(session):
-            from sqlalchemy import text
-
-            # Convert embedding to PostgreSQL array format
-            embedding_string = ",".join(map(str, embedding))
-
-            if doc_ids:
-                # Query with document ID filter
-                sql = text(
-                    """
-                    WITH relevant_chunks AS (
-                        SELECT id as chunk_id
-                        FROM lightrag_doc_chunks
-                        WHERE workspace = :workspace AND full_doc_id = ANY(:doc_ids)
-                    )
-                    SELECT id, content, file_path, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_doc_chunks
-                    WHERE workspace = :workspace
-                    AND id IN (SELECT chunk_id FROM relevant_chunks)
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(
-                    sql, {"workspace": workspace, "doc_ids": doc_ids, "threshold": threshold, "top_k": top_k}
-                )
-            else:
-                # Query without document ID filter
-                sql = text(
-                    """
-                    SELECT id, content, file_path, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_doc_chunks
-                    WHERE workspace = :workspace
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(sql, {"workspace": workspace, "threshold": threshold, "top_k": top_k})
-
-            # Properly convert SQLAlchemy Row objects to dictionaries
-            return [dict(row._mapping) for row in result]
+            return _similarity_search(
+                session,
+                "lightrag_doc_chunks t",
+                "id, content, file_path, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at",
+                "t.full_doc_id = ANY(:doc_ids)",
+                workspace,
+                embedding,
+                top_k,
+                doc_ids,
+                threshold,
+                ef_search,
+            )
 
         return self._execute_query(_query)
 
     def query_lightrag_vdb_entity_similarity(
-        self, workspace: str, embedding: list, top_k: int, doc_ids: list = None, threshold: float = 0.2
+        self,
+        workspace: str,
+        embedding: list,
+        top_k: int,
+        doc_ids: list = None,
+        threshold: float = 0.2,
+        ef_search: int | None = None,
     ):
         """Query similar entities using vector similarity"""
 
         def _query(session):
-            from sqlalchemy import text
-
-            # Convert embedding to PostgreSQL array format
-            embedding_string = ",".join(map(str, embedding))
-
-            if doc_ids:
-                # Query with document ID filter
-                sql = text(
-                    """
-                    WITH relevant_chunks AS (
-                        SELECT id as chunk_id
-                        FROM lightrag_doc_chunks
-                        WHERE workspace = :workspace AND full_doc_id = ANY(:doc_ids)
-                    )
-                    SELECT entity_name, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_entity e
-                    WHERE e.workspace = :workspace
-                    AND EXISTS (
-                        SELECT 1 FROM relevant_chunks rc 
-                        WHERE rc.chunk_id = ANY(e.chunk_ids)
-                    )
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(
-                    sql, {"workspace": workspace, "doc_ids": doc_ids, "threshold": threshold, "top_k": top_k}
-                )
-            else:
-                # Query without document ID filter
-                sql = text(
-                    """
-                    SELECT entity_name, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_entity
-                    WHERE workspace = :workspace
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(sql, {"workspace": workspace, "threshold": threshold, "top_k": top_k})
-
-            # Properly convert SQLAlchemy Row objects to dictionaries
-            return [dict(row._mapping) for row in result]
+            return _similarity_search(
+                session,
+                "lightrag_vdb_entity t",
+                "entity_name, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at",
+                _DOC_CHUNKS_FILTER,
+                workspace,
+                embedding,
+                top_k,
+                doc_ids,
+                threshold,
+                ef_search,
+            )
 
         return self._execute_query(_query)
 
     def query_lightrag_vdb_relation_similarity(
-        self, workspace: str, embedding: list, top_k: int, doc_ids: list = None, threshold: float = 0.2
+        self,
+        workspace: str,
+        embedding: list,
+        top_k: int,
+        doc_ids: list = None,
+        threshold: float = 0.2,
+        ef_search: int | None = None,
     ):
         """Query similar relations using vector similarity"""
 
         def _query(session):
-            from sqlalchemy import text
-
-            # Convert embedding to PostgreSQL array format
-            embedding_string = ",".join(map(str, embedding))
-
-            if doc_ids:
-                # Query with document ID filter
-                sql = text(
-                    """
-                    WITH relevant_chunks AS (
-                        SELECT id as chunk_id
-                        FROM lightrag_doc_chunks
-                        WHERE workspace = :workspace AND full_doc_id = ANY(:doc_ids)
-                    )
-                    SELECT source_id as src_id, target_id as tgt_id, 
-                           EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_relation r
-                    WHERE r.workspace = :workspace
-                    AND EXISTS (
-                        SELECT 1 FROM relevant_chunks rc 
-                        WHERE rc.chunk_id = ANY(r.chunk_ids)
-                    )
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(
-                    sql, {"workspace": workspace, "doc_ids": doc_ids, "threshold": threshold, "top_k": top_k}
-                )
-            else:
-                # Query without document ID filter
-                sql = text(
-                    """
-                    SELECT source_id as src_id, target_id as tgt_id,
-                           EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_relation
-                    WHERE workspace = :workspace
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(sql, {"workspace": workspace, "threshold": threshold, "top_k": top_k})
-
-            # Properly convert SQLAlchemy Row objects to dictionaries
-            return [dict(row._mapping) for row in result]
+            return _similarity_search(
+                session,
+                "lightrag_vdb_relation t",
+                "source_id as src_id, target_id as tgt_id, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at",
+                _DOC_CHUNKS_FILTER,
+                workspace,
+                embedding,
+                top_k,
+                doc_ids,
+                threshold,
+                ef_search,
+            )
 
         return self._execute_query(_query)
 
@@ -577,3 +568,239 @@ class LightragRepositoryMixin(SyncRepositoryProtocol):
             return {relation.id: relation for relation in result.scalars().all()}
 
         return self._execute_query(_query)
+
+    def update_lightrag_vdb_entity_chunk_ids(self, workspace: str, chunk_ids_by_id: dict):
+        """Update only the chunk_ids of LightRAG VDB Entity records, in one batch"""
+        return self._update_lightrag_vdb_chunk_ids(LightRAGVDBEntityModel, workspace, chunk_ids_by_id)
+
+    def update_lightrag_vdb_relation_chunk_ids(self, workspace: str, chunk_ids_by_id: dict):
+        """Update only the chunk_ids of LightRAG VDB Relation records, in one batch"""
+        return self._update_lightrag_vdb_chunk_ids(LightRAGVDBRelationModel, workspace, chunk_ids_by_id)
+
+    def _update_lightrag_vdb_chunk_ids(self, model, workspace: str, chunk_ids_by_id: dict):
+        if not chunk_ids_by_id:
+            return
+
+        def _operation(session):
+            # Bulk UPDATE by primary key, vectors are left untouched
+            now = utc_now()
+            session.execute(
+                update(model),
+                [
+                    {"workspace": workspace, "id": record_id, "chunk_ids": list(chunk_ids), "update_time": now}
+                    for record_id, chunk_ids in chunk_ids_by_id.items()
+                ],
+            )
+            session.commit()
+
+        return self._execute_transaction(_operation)
+
+    # LightRAG Doc Graph Refs Operations
+    def insert_lightrag_doc_graph_refs(self, workspace: str, refs: list):
+        """Insert LightRAG document graph refs, skipping the ones already recorded"""
+        if not refs:
+            return
+
+        def _operation(session):
+            now = utc_now()
+            values_list = [
+                {
+                    "workspace": workspace,
+                    "doc_id": ref["doc_id"],
+                    "chunk_id": ref["chunk_id"],
+                    "ref_type": ref["ref_type"],
+                    "entity_id": ref.get("entity_id") or "",
+                    "target_entity_id": ref.get("target_entity_id") or "",
+                    "create_time": now,
+                }
+                for ref in refs
+            ]
+            for i in range(0, len(values_list), _DOC_GRAPH_REFS_INSERT_BATCH_SIZE):
+                stmt = insert(LightRAGDocGraphRefModel).values(values_list[i : i + _DOC_GRAPH_REFS_INSERT_BATCH_SIZE])
+                session.execute(stmt.on_conflict_do_nothing(constraint="uq_lightrag_doc_graph_refs"))
+            session.commit()
+
+        return self._execute_transaction(_operation)
+
+    def query_lightrag_doc_graph_refs(self, workspace: str, doc_id: str):
+        """Query all LightRAG graph refs of a document"""
+
+        def _query(session):
+            stmt = select(LightRAGDocGraphRefModel).where(
+                LightRAGDocGraphRefModel.workspace == workspace, LightRAGDocGraphRefModel.doc_id == doc_id
+            )
+            result = session.execute(stmt)
+            return result.scalars().all()
+
+        return self._execute_query(_query)
+
+    def query_lightrag_shared_chunk_ids(self, workspace: str, doc_id: str, chunk_ids: list):
+        """Query which of the given chunks are also referenced by other documents"""
+
+        def _query(session):
+            if not chunk_ids:
+                return []
+            stmt = (
+                select(LightRAGDocGraphRefModel.chunk_id)
+                .where(
+                    LightRAGDocGraphRefModel.workspace == workspace,
+                    LightRAGDocGraphRefModel.chunk_id.in_(chunk_ids),
+                    LightRAGDocGraphRefModel.doc_id != doc_id,
+                )
+                .distinct()
+            )
+            result = session.execute(stmt)
+            return [row[0] for row in result.fetchall()]
+
+        return self._execute_query(_query)
+
+    def delete_lightrag_doc_graph_refs(self, workspace: str, doc_id: str):
+        """Delete all LightRAG graph refs of a document"""
+
+        def _operation(session):
+            stmt = delete(LightRAGDocGraphRefModel).where(
+                LightRAGDocGraphRefModel.workspace == workspace, LightRAGDocGraphRefModel.doc_id == doc_id
+            )
+            result = session.execute(stmt)
+            session.commit()
+            return result.rowcount
+
+        return self._execute_transaction(_operation)
+
+    def redirect_lightrag_doc_graph_refs(self, workspace: str, entity_ids: list, target_entity_id: str):
+        """Rewrite the LightRAG graph refs of merged entities to the entity they were merged into"""
+        if not entity_ids:
+            return 0
+
+        def _operation(session):
+            stmt = select(LightRAGDocGraphRefModel).where(
+                LightRAGDocGraphRefModel.workspace == workspace,
+                or_(
+                    LightRAGDocGraphRefModel.entity_id.in_(entity_ids),
+                    LightRAGDocGraphRefModel.target_entity_id.in_(entity_ids),
+                ),
+            )
+            models = session.execute(stmt).scalars().all()
+            if not models:
+                return 0
+
+            merged_ids = set(entity_ids)
+            now = utc_now()
+            values_list = []
+            for model in models:
+                entity_id = target_entity_id if model.entity_id in merged_ids else model.entity_id
+                other_entity_id = target_entity_id if model.target_entity_id in merged_ids else model.target_entity_id
+                if model.ref_type == "relation":
+                    # Relations between merged entities became self-loops, which are not kept
+                    if entity_id == other_entity_id:
+                        continue
+                    entity_id, other_entity_id = sorted((entity_id, other_entity_id))
+                values_list.append(
+                    {
+                        "workspace": workspace,
+                        "doc_id": model.doc_id,
+                        "chunk_id": model.chunk_id,
+                        "ref_type": model.ref_type,
+                        "entity_id": entity_id,
+                        "target_entity_id": other_entity_id,
+                        "create_time": now,
+                    }
+                )
+
+            session.execute(
+                delete(LightRAGDocGraphRefModel).where(LightRAGDocGraphRefModel.id.in_([model.id for model in models]))
+            )
+            for i in range(0, len(values_list), _DOC_GRAPH_REFS_INSERT_BATCH_SIZE):
+                stmt = insert(LightRAGDocGraphRefModel).values(values_list[i : i + _DOC_GRAPH_REFS_INSERT_BATCH_SIZE])
+                session.execute(stmt.on_conflict_do_nothing(constraint="uq_lightrag_doc_graph_refs"))
+            session.commit()
+            return len(models)
+
+        return self._execute_transaction(_operation)
+
+    # LightRAG LLM Cache Operations
+    def query_lightrag_llm_cache_by_ids(self, workspace: str, cache_ids: list):
+        """Query LightRAG LLM cache records by IDs"""
+
+        def _query(session):
+            if not cache_ids:
+                return []
+            stmt = select(LightRAGLLMCacheModel).where(
+                LightRAGLLMCacheModel.workspace == workspace, LightRAGLLMCacheModel.id.in_(cache_ids)
+            )
+            result = session.execute(stmt)
+            return result.scalars().all()
+
+        return self._execute_query(_query)
+
+    def upsert_lightrag_llm_cache(self, workspace: str, cache_data: dict):
+        """Upsert LightRAG LLM cache records"""
+        if not cache_data:
+            return
+
+        def _operation(session):
+            now = utc_now()
+            stmt = insert(LightRAGLLMCacheModel).values(
+                [
+                    {
+                        "id": cache_id,
+                        "workspace": workspace,
+                        "cache_type": cache_info.get("cache_type", "extract"),
+                        "model": cache_info.get("model"),
+                        "return_value": cache_info.get("return_value"),
+                        "create_time": now,
+                        "update_time": now,
+                    }
+                    for cache_id, cache_info in cache_data.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[LightRAGLLMCacheModel.id, LightRAGLLMCacheModel.workspace],
+                set_={
+                    "cache_type": stmt.excluded.cache_type,
+                    "model": stmt.excluded.model,
+                    "return_value": stmt.excluded.return_value,
+                    "update_time": stmt.excluded.update_time,
+                },
+            )
+            session.execute(stmt)
+            session.commit()
+
+        return self._execute_transaction(_operation)
+
+    def delete_lightrag_llm_cache(self, workspace: str, cache_ids: list):
+        """Delete LightRAG LLM cache records"""
+
+        def _operation(session):
+            stmt = delete(LightRAGLLMCacheModel).where(
+                LightRAGLLMCacheModel.workspace == workspace, LightRAGLLMCacheModel.id.in_(cache_ids)
+            )
+            result = session.execute(stmt)
+            session.commit()
+            return result.rowcount
+
+        return self._execute_transaction(_operation)
+
+    def delete_lightrag_llm_cache_by_workspace(self, workspace: str):
+        """Delete all LightRAG LLM cache records of a workspace"""
+
+        def _operation(session):
+            stmt = delete(LightRAGLLMCacheModel).where(LightRAGLLMCacheModel.workspace == workspace)
+            result = session.execute(stmt)
+            session.commit()
+            return result.rowcount
+
+        return self._execute_transaction(_operation)
+
+    def delete_expired_lightrag_llm_cache(self, updated_before, cache_type: str = None):
+        """Delete LightRAG LLM cache records last written before the given time"""
+
+        def _operation(session):
+            stmt = delete(LightRAGLLMCacheModel).where(LightRAGLLMCacheModel.update_time < updated_before)
+            if cache_type is not None:
+                stmt = stmt.where(LightRAGLLMCacheModel.cache_type == cache_type)
+            result = session.execute(stmt)
+            session.commit()
+            return result.rowcount
+
+        return self._execute_transaction(_operation)
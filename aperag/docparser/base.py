@@ -14,7 +14,7 @@
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from pydantic import BaseModel, Field
 
@@ -80,3 +80,7 @@ class BaseParser(ABC):  # 抽象类型文件解析器定义
 
     @abstractmethod
     def parse_file(self, path: Path, metadata: dict[str, Any] = {}, **kwargs) -> list[Part]: ...
+
+    def iter_parse_file(self, path: Path, metadata: dict[str, Any] = {}, **kwargs) -> Iterator[Part]:
+        """Yield parts as they are parsed. Parsers that can produce parts incrementally should override this."""
+        yield from self.parse_file(path, metadata, **kwargs)
@@ -13,15 +13,22 @@
 # limitations under the License.
 
 from dataclasses import dataclass
-from typing import Callable, List
+from typing import Callable, Iterable, Iterator, List, Optional
 
 from aperag.docparser.base import Part
+from aperag.utils.tokenizer import get_batch_tokenizer
+
+BatchTokenizer = Callable[[List[str]], List[List[int]]]
 
 
 def rechunk(
-    parts: list[Part], chunk_size: int, chunk_overlap: int, tokenizer: Callable[[str], List[int]]
+    parts: list[Part],
+    chunk_size: int,
+    chunk_overlap: int,
+    tokenizer: Callable[[str], List[int]],
+    batch_tokenizer: Optional[BatchTokenizer] = None,
 ) -> list[Part]:
-    rechunker = Rechunker(chunk_size, chunk_overlap, tokenizer)
+    rechunker = Rechunker(chunk_size, chunk_overlap, tokenizer, batch_tokenizer)
     return rechunker(parts)
 
 
@@ -34,32 +41,63 @@ class Group:
 
 
 class Rechunker:
-    def __init__(self, chunk_size: int, chunk_overlap: int, tokenizer: Callable[[str], List[int]]):
+    # Number of parts whose tokens are counted in one batch encode
+    PRECOUNT_BATCH_SIZE = 256
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        tokenizer: Callable[[str], List[int]],
+        batch_tokenizer: Optional[BatchTokenizer] = None,
+    ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.tokenizer = tokenizer
+        self.batch_tokenizer = batch_tokenizer or get_batch_tokenizer(tokenizer)
+        self._separator_tokens: int | None = None
+        # ids of merged chunks whose "tokens" is a carried-forward estimate
+        self._estimated_tokens: set[int] = set()
 
     def __call__(self, parts: list[Part]) -> list[Part]:
-        groups = self._to_groups(parts)
-        groups = self._merge_consecutive_title_groups(groups)
-        return self._rechunk(groups)
+        return list(self.iter_chunks(parts))
+
+    def iter_chunks(self, parts: Iterable[Part]) -> Iterator[Part]:
+        """
+        Consume parts lazily and yield chunks as soon as they are sealed.
+
+        Only the current title group, plus one group of lookahead for merging titles,
+        is held at a time. Token counts are precounted in batches of groups.
+        """
+        groups = self._iter_groups(part for part in parts if part.content)
+        groups = self._iter_precounted(groups)
+        groups = self._iter_merged_title_groups(groups)
+        for chunk in self._rechunk(groups):
+            yield self._seal(chunk)
+
+    def _seal(self, chunk: Part) -> Part:
+        """Replace the estimated token count of a merged chunk with an exact one."""
+        if id(chunk) in self._estimated_tokens:
+            self._estimated_tokens.discard(id(chunk))
+            chunk.metadata["tokens"] = len(self.batch_tokenizer([chunk.content])[0])
+        return chunk
 
     def _is_pure_title_group(self, group: Group) -> bool:
         """A group is considered a pure title if it has a title and only one item."""
         return group.title_level > 0 and len(group.items) == 1
 
     def _merge_consecutive_title_groups(self, groups: list[Group]) -> list[Group]:
-        if not groups:
-            return []
+        return list(self._iter_merged_title_groups(groups))
 
-        new_groups: list[Group] = []
-        i = 0
-        while i < len(groups):
-            current_group = groups[i]
+    def _iter_merged_title_groups(self, groups: Iterable[Group]) -> Iterator[Group]:
+        groups = iter(groups)
+        next_group = next(groups, None)
+        while next_group is not None:
+            current_group = next_group
+            next_group = next(groups, None)
 
             if not self._is_pure_title_group(current_group):
-                new_groups.append(current_group)
-                i += 1
+                yield current_group
                 continue
 
             # It's a pure title group, let's look ahead to merge.
@@ -67,43 +105,34 @@ class Rechunker:
             # The highest level is the smallest number.
             highest_level = current_group.title_level
 
-            j = i + 1
             # 1. Merge consecutive pure title groups
-            while j < len(groups):
-                next_group = groups[j]
-                if not self._is_pure_title_group(next_group):
-                    break  # Stop merging titles
-
+            while next_group is not None and self._is_pure_title_group(next_group):
                 # Check hierarchy: don't merge a higher-level title (e.g., H2 into an H3 group)
                 if next_group.title_level < highest_level:
                     break
 
                 # Merge it
                 merged_items.extend(next_group.items)
-                j += 1
+                next_group = next(groups, None)
 
             # 2. After merging titles, try to merge one more content group
-            if j < len(groups):
-                next_group = groups[j]
-                if not self._is_pure_title_group(next_group):
-                    if next_group.title_level == 0 or next_group.title_level >= current_group.title_level:
-                        merged_items.extend(next_group.items)
-                        j += 1  # This content group is also merged
+            if next_group is not None and not self._is_pure_title_group(next_group):
+                if next_group.title_level == 0 or next_group.title_level >= current_group.title_level:
+                    merged_items.extend(next_group.items)
+                    next_group = next(groups, None)  # This content group is also merged
 
             # Create the new merged group
             # The title and title_level of the merged group should be from the first group.
-            new_group = Group(
+            yield Group(
                 title_level=current_group.title_level,
                 title=current_group.title,
                 items=merged_items,
             )
-            new_groups.append(new_group)
-            i = j  # Move index to the next un-processed group
-
-        return new_groups
 
     def _to_groups(self, parts: list[Part]) -> list[Group]:
-        result: list[Group] = []
+        return list(self._iter_groups(parts))
+
+    def _iter_groups(self, parts: Iterable[Part]) -> Iterator[Group]:
         curr_group: Group | None = None
 
         for part in parts:
@@ -119,7 +148,6 @@ class Rechunker:
 
             if curr_group is None:
                 curr_group = Group(title_level=title_level, title=title, items=[part])
-                result.append(curr_group)
                 continue
 
             # For simplicity, titles within lower-level nesting will not create new groups.
@@ -127,15 +155,31 @@ class Rechunker:
                 curr_group.items.append(part)
                 continue
 
+            yield curr_group
             curr_group = Group(title_level=title_level, title=title, items=[part])
-            result.append(curr_group)
 
-        return result
+        if curr_group is not None:
+            yield curr_group
 
-    def _rechunk(self, groups: list[Group]) -> list[Part]:
+    def _iter_precounted(self, groups: Iterable[Group]) -> Iterator[Group]:
+        """Count the tokens of the parts in a window of groups with one batch encode."""
+        window: list[Group] = []
+        window_size = 0
+        for group in groups:
+            window.append(group)
+            window_size += len(group.items)
+            if window_size >= self.PRECOUNT_BATCH_SIZE:
+                self._precount_tokens([part for g in window for part in g.items])
+                yield from window
+                window = []
+                window_size = 0
+        if window:
+            self._precount_tokens([part for g in window for part in g.items])
+            yield from window
+
+    def _rechunk(self, groups: Iterable[Group]) -> Iterator[Part]:
         title_stack: list[tuple[str, int]] = []
         titles: list[str] = []
-        result: list[Part] = []
         last_part: Part | None = None
         highest_level_in_last_part: int | None = None
 
@@ -154,6 +198,7 @@ class Rechunker:
                 # Do not merge if the current group has a higher title level
                 # (e.g., merging content under a main heading into a sub-heading)
                 can_merge = False
+            # Merged parts carry an estimated token count forward, so this does not re-encode last_part
             last_part_tokens = 0 if last_part is None else self._count_tokens(last_part)
             if last_part_tokens + group_tokens > self.chunk_size:
                 can_merge = False
@@ -167,7 +212,7 @@ class Rechunker:
             # Since the current group can't be merged into the last part,
             # the last part can be sealed.
             if last_part is not None:
-                result.append(last_part)
+                yield last_part
                 last_part = None
                 highest_level_in_last_part = None
 
@@ -197,7 +242,7 @@ class Rechunker:
                 # Don't merge parts if too many tokens, or the previous part is splitted.
                 if tokens_sum + tokens > self.chunk_size or (prev_part_splitted and not curr_part_splitted):
                     if last_part is not None:
-                        result.append(last_part)
+                        yield last_part
                         last_part = None
                         tokens_sum = 0
 
@@ -207,14 +252,12 @@ class Rechunker:
 
             # Don't merge any group into a partial group
             if last_part is not None:
-                result.append(last_part)
+                yield last_part
                 last_part = None
                 highest_level_in_last_part = None
 
         if last_part is not None:
-            result.append(last_part)
-
-        return result
+            yield last_part
 
     def _append_group_to_part(self, group: Group, dest: Part | None, titles: list[str]) -> Part:
         for part in group.items:
@@ -228,10 +271,15 @@ class Rechunker:
                 metadata["titles"] = titles.copy()
             # Normalize to a Part
             return Part(content=part.content, metadata=metadata)
+        dest_tokens = dest.metadata.get("tokens", None)
         dest.content += "\n\n" + part.content
         self._merge_md_source_map(dest, part)
         self._merge_pdf_source_map(dest, part)
-        dest.metadata.pop("tokens", None)
+        if dest_tokens is not None:
+            # Carry an estimate forward instead of re-encoding the merged content on every append,
+            # BPE merges across the separator make it inexact, so it is recounted once in _seal
+            dest.metadata["tokens"] = dest_tokens + self._count_separator_tokens() + self._count_tokens(part)
+            self._estimated_tokens.add(id(dest))
         return dest
 
     def _merge_md_source_map(self, dest: Part, src: Part):
@@ -263,6 +311,19 @@ class Rechunker:
                 new_map.append(item)
         dest.metadata["pdf_source_map"] = new_map
 
+    def _precount_tokens(self, parts: list[Part]) -> None:
+        """Count the tokens of all parts in a single batch encode, instead of one encode per part."""
+        pending = [part for part in parts if part.content and part.metadata.get("tokens", None) is None]
+        if not pending:
+            return
+        for part, tokens in zip(pending, self.batch_tokenizer([part.content for part in pending])):
+            part.metadata["tokens"] = len(tokens)
+
+    def _count_separator_tokens(self) -> int:
+        if self._separator_tokens is None:
+            self._separator_tokens = len(self.tokenizer("\n\n"))
+        return self._separator_tokens
+
     def _count_tokens(self, elem: Group | Part) -> int:
         if isinstance(elem, Group):
             if elem.tokens is not None:
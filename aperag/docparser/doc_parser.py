@@ -15,7 +15,7 @@
 import logging
 import os
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -130,14 +130,28 @@ class DocParser(BaseParser):  # 文档解析器入口类定义，内置了支持
         return self.supported
 
     def parse_file(self, path: Path, metadata: dict[str, Any] = {}, **kwargs) -> list[Part]:
+        return list(self.iter_parse_file(path, metadata, **kwargs))
+
+    def iter_parse_file(self, path: Path, metadata: dict[str, Any] = {}, **kwargs) -> Iterator[Part]:
+        """
+        Yield parts from the first parser that accepts the file.
+
+        A parser can only fall back to the next one before it has yielded its first part.
+        """
         extension = path.suffix  # 获取文件扩展名
         last_err = None
         for parser_name in self.parsing_order:
             parser = self.parsers[parser_name]
             if not self._parser_accept(parser_name, extension):  # 过滤掉不合适的解析器
                 continue
+            parts = parser.iter_parse_file(path, metadata, **kwargs)  # 采用合适的解析器对文件进行解析分段
             try:
-                return parser.parse_file(path, metadata, **kwargs)  # 采用合适的解析器对文件进行解析分段
+                first_part = next(parts, None)
             except FallbackError as e:
                 last_err = e
+                continue
+            if first_part is not None:
+                yield first_part
+                yield from parts
+            return
         raise ValueError(f'No parser can handle file with extension "{extension}"') from last_err
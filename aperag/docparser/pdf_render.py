@@ -0,0 +1,171 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+PDF page rendering for vision assets.
+
+Rendering is CPU bound and pdfium is not thread safe, so pages are rendered in a
+process pool. Workers open the PDF from a file path (the PDF bytes are not pickled
+for every page) and keep the document open for the following pages. At most
+`max_in_flight` rendered pages are pending at any time, and pages are yielded in
+page order.
+
+This module is imported by the pool workers, keep its imports light.
+"""
+
+import io
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+
+import pypdfium2 as pdfium
+
+logger = logging.getLogger(__name__)
+
+# format name -> (PIL format, mime type, file extension)
+_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    "png": ("PNG", "image/png", "png"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+    "jpg": ("JPEG", "image/jpeg", "jpg"),
+    "webp": ("WEBP", "image/webp", "webp"),
+}
+
+# PDF user space is 72 points per inch
+_PDF_POINTS_PER_INCH = 72
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# Per worker process: the document opened by the last task
+_worker_doc: Optional[Tuple[str, pdfium.PdfDocument]] = None
+
+
+def get_image_format(image_format: str) -> Tuple[str, str, str]:
+    """
+    Resolve a configured image format.
+
+    Returns:
+        Tuple of (PIL format, mime type, file extension)
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    try:
+        return _FORMATS[image_format.lower()]
+    except KeyError:
+        raise ValueError(f"unsupported PDF render format: {image_format}, expected one of png, jpeg, webp")
+
+
+def get_page_count(pdf_path: str) -> int:
+    pdf_doc = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf_doc)
+    finally:
+        pdf_doc.close()
+
+
+def _open_document(pdf_path: str) -> pdfium.PdfDocument:
+    global _worker_doc
+    if _worker_doc is not None and _worker_doc[0] == pdf_path:
+        return _worker_doc[1]
+    if _worker_doc is not None:
+        _worker_doc[1].close()
+    _worker_doc = (pdf_path, pdfium.PdfDocument(pdf_path))
+    return _worker_doc[1]
+
+
+def _render(pdf_doc: pdfium.PdfDocument, page_idx: int, dpi: int, image_format: str, quality: int) -> bytes:
+    pil_format, _, _ = get_image_format(image_format)
+    page = pdf_doc[page_idx]
+    try:
+        image = page.render(scale=dpi / _PDF_POINTS_PER_INCH).to_pil()
+    finally:
+        page.close()
+    if pil_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+
+    save_kwargs = {} if pil_format == "PNG" else {"quality": quality}
+    with io.BytesIO() as buffer:
+        image.save(buffer, format=pil_format, **save_kwargs)
+        return buffer.getvalue()
+
+
+def render_page(pdf_path: str, page_idx: int, dpi: int, image_format: str, quality: int) -> bytes:
+    """Render one page of the PDF at pdf_path to encoded image bytes. Runs in the pool workers."""
+    return _render(_open_document(pdf_path), page_idx, dpi, image_format, quality)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # Spawn instead of fork: the parent may be a threaded Celery worker
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def iter_rendered_pages(
+    pdf_path: str,
+    page_count: int,
+    dpi: int = 72,
+    image_format: str = "png",
+    quality: int = 85,
+    workers: int = 1,
+    max_in_flight: int = 1,
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Render the pages of a PDF, yielding (page index, image bytes) in page order.
+
+    Args:
+        pdf_path: Path of the PDF file; it must exist until the iterator is exhausted or closed
+        page_count: Number of pages to render
+        dpi: Render resolution
+        image_format: png, jpeg or webp
+        quality: Encoder quality for jpeg and webp
+        workers: Size of the render process pool, 1 renders in the calling thread
+        max_in_flight: Maximum number of pages submitted but not yet yielded
+    """
+    get_image_format(image_format)
+
+    if workers <= 1:
+        pdf_doc = pdfium.PdfDocument(pdf_path)
+        try:
+            for page_idx in range(page_count):
+                yield page_idx, _render(pdf_doc, page_idx, dpi, image_format, quality)
+        finally:
+            pdf_doc.close()
+        return
+
+    pool = _get_pool(workers)
+    max_in_flight = max(max_in_flight, 1)
+    pending: deque[Tuple[int, Future]] = deque()
+    next_page = 0
+    try:
+        while next_page < page_count or pending:
+            while next_page < page_count and len(pending) < max_in_flight:
+                pending.append((next_page, pool.submit(render_page, pdf_path, next_page, dpi, image_format, quality)))
+                next_page += 1
+            page_idx, future = pending.popleft()
+            yield page_idx, future.result()
+    finally:
+        # The consumer stopped early or a page failed, drop the pages not started yet
+        for _, future in pending:
+            future.cancel()
@@ -16,6 +16,7 @@ from .fulltext_search import FulltextSearchNodeRunner
 from .graph_search import GraphSearchNodeRunner
 from .llm import LLMNodeRunner
 from .merge import MergeNodeRunner
+from .multi_index_search import MultiIndexSearchNodeRunner
 from .rerank import RerankNodeRunner
 from .start import StartNodeRunner
 from .summary_search import SummarySearchNodeRunner
@@ -26,6 +27,7 @@ __all__ = [
     "FulltextSearchNodeRunner",
     "LLMNodeRunner",
     "MergeNodeRunner",
+    "MultiIndexSearchNodeRunner",
     "RerankNodeRunner",
     "StartNodeRunner",
     "VectorSearchNodeRunner",
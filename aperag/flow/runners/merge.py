@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Optional, Tuple
+import hashlib
+import math
+import re
+from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -20,10 +23,27 @@ from aperag.flow.base.exceptions import ValidationError
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
 from aperag.query.query import DocumentWithScore
 
+MERGE_STRATEGIES = ["union", "rrf", "minmax", "zscore"]
+DEDUPE_METHODS = ["text", "content_hash", "simhash"]
+
+# Input fields in the order their docs are merged, named after the recall_type of their docs
+_SOURCES = ["vector_search", "fulltext_search", "graph_search", "summary_search", "vision_search"]
+
+_TOKEN_RE = re.compile(r"\w+")
+
 
 class MergeInput(BaseModel):
-    merge_strategy: str = Field("union", description="How to merge results")
+    merge_strategy: str = Field("union", description="How to merge results: union, rrf, minmax or zscore")
     deduplicate: bool = Field(True, description="Whether to deduplicate merged results")
+    dedupe_method: str = Field(
+        "text", description="How duplicates are detected: text, content_hash of the source chunk or simhash"
+    )
+    simhash_distance: int = Field(3, description="Max SimHash bit distance between near-duplicate docs")
+    rrf_k: int = Field(60, description="Rank constant of reciprocal rank fusion")
+    source_weights: Optional[Dict[str, float]] = Field(
+        default=None, description="Fusion weight per source, e.g. {'vector_search': 1.0}, missing sources weigh 1.0"
+    )
+    top_n: Optional[int] = Field(None, description="Number of merged docs to keep, None to keep all")
     vector_search_docs: Optional[List[DocumentWithScore]] = Field(
         default_factory=list, description="Vector search docs"
     )
@@ -43,6 +63,104 @@ class MergeOutput(BaseModel):
     docs: List[DocumentWithScore]
 
 
+def _simhash(text: str) -> int:
+    """64-bit SimHash of the word tokens of text, close texts get hashes a few bits apart"""
+    weights = [0] * 64
+    for token in _TOKEN_RE.findall(text.lower()):
+        h = int.from_bytes(hashlib.md5(token.encode("utf-8")).digest()[:8], "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+class _DuplicateIndex:
+    """Assigns each doc the group of the first doc it duplicates"""
+
+    def __init__(self, method: str, simhash_distance: int):
+        self.method = method
+        self.simhash_distance = simhash_distance
+        self.keys: Dict[object, int] = {}
+        self.simhashes: List[Tuple[int, int]] = []
+
+    def group(self, doc: DocumentWithScore, new_group: int) -> int:
+        keys = [("text", doc.text)]
+        if self.method in ("content_hash", "simhash"):
+            # Written by the vector and fulltext indexers, so the same chunk matches across sources
+            content_hash = (doc.metadata or {}).get("content_hash")
+            if content_hash:
+                keys.insert(0, ("content_hash", content_hash))
+
+        group = next((self.keys[key] for key in keys if key in self.keys), None)
+        simhash = None
+        if self.method == "simhash" and doc.text:
+            simhash = _simhash(doc.text)
+            if group is None:
+                group = next(
+                    (g for h, g in self.simhashes if bin(h ^ simhash).count("1") <= self.simhash_distance),
+                    None,
+                )
+        if group is None:
+            group = new_group
+        if simhash is not None:
+            # Every text of a group is kept, a near-duplicate of any of them joins the group
+            self.simhashes.append((simhash, group))
+        for key in keys:
+            self.keys.setdefault(key, group)
+        return group
+
+
+def _normalized_scores(docs: List[DocumentWithScore], strategy: str) -> List[float]:
+    """Per-source scores fused by the strategy, higher is better"""
+    if strategy == "rrf":
+        return [0.0] * len(docs)
+    scores = [doc.score if doc.score is not None else 0.0 for doc in docs]
+    # A source that cannot tell its docs apart, e.g. with a single doc, gives each of them full credit
+    if max(scores) == min(scores):
+        return [1.0] * len(scores)
+    if strategy == "minmax":
+        low, high = min(scores), max(scores)
+        return [(score - low) / (high - low) for score in scores]
+    mean = sum(scores) / len(scores)
+    std = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+    return [(score - mean) / std for score in scores]
+
+
+def merge_docs(docs_by_source: Dict[str, List[DocumentWithScore]], ui: MergeInput) -> List[DocumentWithScore]:
+    """
+    Merge the docs of each source into one list.
+
+    union keeps the docs in source order. rrf, minmax and zscore sort the docs by their
+    fused score, the weighted sum over sources of the reciprocal rank or the min-max or
+    z-score normalized score of the doc in that source, and return it as the doc score.
+    Duplicates are merged into the first doc seen, adding up their fusion contributions.
+    """
+    weights = ui.source_weights or {}
+    index = _DuplicateIndex(ui.dedupe_method, ui.simhash_distance)
+    merged: List[DocumentWithScore] = []
+    fused: List[float] = []
+
+    for source in _SOURCES:
+        docs = docs_by_source.get(source) or []
+        if not docs:
+            continue
+        weight = weights.get(source, 1.0)
+        for rank, (doc, score) in enumerate(zip(docs, _normalized_scores(docs, ui.merge_strategy)), start=1):
+            if ui.merge_strategy == "rrf":
+                score = 1.0 / (ui.rrf_k + rank)
+            group = index.group(doc, len(merged)) if ui.deduplicate else len(merged)
+            if group == len(merged):
+                merged.append(doc)
+                fused.append(0.0)
+            fused[group] += weight * score
+
+    if ui.merge_strategy != "union":
+        order = sorted(range(len(merged)), key=lambda i: fused[i], reverse=True)
+        merged = [merged[i].model_copy(update={"score": fused[i]}) for i in order]
+    if ui.top_n is not None:
+        merged = merged[: ui.top_n]
+    return merged
+
+
 @register_node_runner(
     "merge",
     input_model=MergeInput,
@@ -54,24 +172,10 @@ class MergeNodeRunner(BaseNodeRunner):
         Run merge node. ui: user input; si: system input (SystemInput).
         Returns (output, system_output)
         """
-        docs_a: List[DocumentWithScore] = ui.vector_search_docs or []
-        docs_b: List[DocumentWithScore] = ui.fulltext_search_docs or []
-        docs_c: List[DocumentWithScore] = ui.graph_search_docs or []
-        docs_d: List[DocumentWithScore] = ui.summary_search_docs or []
-        docs_e: List[DocumentWithScore] = ui.vision_search_docs or []
-        merge_strategy: str = ui.merge_strategy
-        deduplicate: bool = ui.deduplicate
-
-        if merge_strategy not in ["union"]:
-            raise ValidationError(f"Unknown merge strategy: {merge_strategy}")
-
-        all_docs = docs_a + docs_b + docs_c + docs_d + docs_e
-        if deduplicate:
-            seen = set()
-            unique_docs = []
-            for doc in all_docs:
-                if doc.text not in seen:
-                    seen.add(doc.text)
-                    unique_docs.append(doc)
-            return MergeOutput(docs=unique_docs), {}
-        return MergeOutput(docs=all_docs), {}
+        if ui.merge_strategy not in MERGE_STRATEGIES:
+            raise ValidationError(f"Unknown merge strategy: {ui.merge_strategy}")
+        if ui.dedupe_method not in DEDUPE_METHODS:
+            raise ValidationError(f"Unknown dedupe method: {ui.dedupe_method}")
+
+        docs_by_source = {source: getattr(ui, f"{source}_docs") for source in _SOURCES}
+        return MergeOutput(docs=merge_docs(docs_by_source, ui)), {}
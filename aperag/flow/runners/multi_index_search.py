@@ -0,0 +1,173 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from aperag.aperag_config import settings
+from aperag.context.context import ContextManager
+from aperag.db.models import Collection
+from aperag.db.ops import async_db_ops
+from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
+from aperag.flow.runners.vision_search import _deduplicate_vision_results
+from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
+from aperag.llm.llm_error_types import (
+    EmbeddingError,
+    ProviderNotFoundError,
+)
+from aperag.query.query import DocumentWithScore
+from aperag.utils.utils import generate_vector_db_collection_name
+
+logger = logging.getLogger(__name__)
+
+
+# User input model for multi-index search node. A search is enabled when its top_k is set.
+class MultiIndexSearchInput(BaseModel):
+    vector_top_k: Optional[int] = Field(None, description="Number of top vector results, None to skip vector search")
+    vector_similarity_threshold: float = Field(0.2, description="Similarity threshold for vector search")
+    summary_top_k: Optional[int] = Field(None, description="Number of top summary results, None to skip summaries")
+    summary_similarity_threshold: float = Field(0.2, description="Similarity threshold for summary search")
+    vision_top_k: Optional[int] = Field(None, description="Number of top vision results, None to skip vision search")
+    vision_similarity_threshold: float = Field(0.2, description="Similarity threshold for vision search")
+    collection_ids: Optional[List[str]] = Field(default_factory=list, description="Collection IDs")
+    chat_id: Optional[str] = Field(None, description="Chat ID to filter chat documents in vector search")
+
+
+# User output model for multi-index search node, one docs list per search like the single-index nodes
+class MultiIndexSearchOutput(BaseModel):
+    vector_search_docs: List[DocumentWithScore] = Field(default_factory=list)
+    summary_search_docs: List[DocumentWithScore] = Field(default_factory=list)
+    vision_search_docs: List[DocumentWithScore] = Field(default_factory=list)
+
+
+# Database operations interface
+class MultiIndexSearchRepository:
+    """Repository interface for multi-index search database operations"""
+
+    async def get_collection(self, user, collection_id: str) -> Optional[Collection]:
+        """Get collection by ID for the user"""
+        return await async_db_ops.query_collection(user, collection_id)
+
+
+# Business logic service
+class MultiIndexSearchService:
+    """Service class running vector, summary and vision searches as one vector database request"""
+
+    def __init__(self, repository: MultiIndexSearchRepository):
+        self.repository = repository
+
+    async def execute_multi_index_search(
+        self, user, query: str, ui: MultiIndexSearchInput, chat_id: Optional[str] = None
+    ) -> Dict[str, List[DocumentWithScore]]:
+        """Execute the enabled searches, returning their docs keyed by search name"""
+        collection = None
+        if ui.collection_ids:
+            collection = await self.repository.get_collection(user, ui.collection_ids[0])
+
+        if not collection:
+            return {}
+
+        # The same filters and top_k adjustments as the single-index search nodes
+        searches = {}
+        if ui.vector_top_k is not None:
+            searches["vector_search"] = {
+                "topk": ui.vector_top_k,
+                "score_threshold": ui.vector_similarity_threshold,
+                "index_types": ["vector"],
+                "chat_id": chat_id,
+            }
+        if ui.summary_top_k is not None:
+            searches["summary_search"] = {
+                "topk": ui.summary_top_k,
+                "score_threshold": ui.summary_similarity_threshold,
+                "index_types": ["summary"],
+            }
+        if ui.vision_top_k is not None:
+            # Doubled to keep enough results after deduplication, see VisionSearchService
+            searches["vision_search"] = {
+                "topk": ui.vision_top_k * 2,
+                "score_threshold": ui.vision_similarity_threshold,
+                "index_types": ["vision"],
+            }
+        if not searches:
+            return {}
+
+        try:
+            collection_name = generate_vector_db_collection_name(collection.id)
+            embedding_model, vector_size = get_collection_embedding_service_sync(collection)
+            vectordb_ctx = json.loads(settings.vector_db_context)
+            vectordb_ctx["collection"] = collection_name
+            context_manager = ContextManager(collection_name, embedding_model, settings.vector_db_type, vectordb_ctx)
+
+            vector = await embedding_model.aembed_query(query)
+
+            batch_results = await context_manager.aquery_batch(query, list(searches.values()), vector=vector)
+
+            docs = {}
+            for (name, search), results in zip(searches.items(), batch_results):
+                # Add recall type metadata
+                for item in results:
+                    if item.metadata is None:
+                        item.metadata = {}
+                    item.metadata["recall_type"] = name
+                if name == "vision_search":
+                    results = _deduplicate_vision_results(results)[: search["topk"]]
+                docs[name] = results
+            return docs
+        except ProviderNotFoundError as e:
+            # Configuration error - gracefully degrade by returning empty results
+            logger.warning(
+                f"Multi-index search skipped for collection {collection.id} due to provider not found: {str(e)}"
+            )
+            return {}
+        except EmbeddingError as e:
+            # Embedding error - gracefully degrade by returning empty results
+            logger.warning(
+                f"Multi-index search skipped for collection {collection.id} due to embedding error: {str(e)}"
+            )
+            return {}
+        except Exception as e:
+            logger.error(f"Multi-index search failed for collection {collection.id}: {str(e)}")
+            return {}
+
+
+@register_node_runner(
+    "multi_index_search",
+    input_model=MultiIndexSearchInput,
+    output_model=MultiIndexSearchOutput,
+)
+class MultiIndexSearchNodeRunner(BaseNodeRunner):
+    def __init__(self):
+        self.repository = MultiIndexSearchRepository()
+        self.service = MultiIndexSearchService(self.repository)
+
+    async def run(self, ui: MultiIndexSearchInput, si: SystemInput) -> Tuple[MultiIndexSearchOutput, dict]:
+        """
+        Run multi-index search node. ui: user configurable params; si: system injected params (SystemInput).
+        Returns (uo, so)
+        """
+        chat_id = ui.chat_id or getattr(si, "chat_id", None)
+        if not ui.collection_ids:
+            ui.collection_ids = getattr(si, "collection_ids", [])
+
+        docs = await self.service.execute_multi_index_search(
+            user=si.user,
+            query=si.query,
+            ui=ui,
+            chat_id=chat_id,
+        )
+        return MultiIndexSearchOutput(**docs), {}
@@ -0,0 +1,168 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Query-time cache for assembled knowledge graph contexts.
+
+Building a graph query context runs vector searches, graph lookups and text-unit
+retrieval. Popular questions produce the same keywords over and over, so the
+assembled context is cached per workspace, keyed by the keywords and the query
+parameters that shape retrieval.
+
+Every workspace has a graph version counter in Redis. Indexing and deletion bump
+it when they commit, which makes all cached contexts of the older version
+unreachable. The counter must be shared by API and Celery workers, so without
+Redis the context cache is bypassed.
+
+Two tiers are used:
+- A process-local LRU for hot entries
+- A shared Redis tier so every API worker benefits from each other's work
+
+Redis is accessed through the sync client in a worker thread, so lookups never block
+the event loop of the query.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "aperag:graph_context"
+_VERSION_KEY_PREFIX = "aperag:graph_version"
+
+
+def make_graph_context_cache_key(workspace: str, version: int, key_parts: Any) -> str:
+    digest = hashlib.sha256(json.dumps(key_parts, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:{workspace}:{version}:{digest}"
+
+
+class GraphContextCache:
+    """Graph query context cache with a local LRU tier and a Redis tier, invalidated by graph version."""
+
+    def __init__(self, local_max_size: int = 1000, ttl: int = 86400, use_redis: bool = True):
+        self.local_max_size = local_max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._local: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get_version(self, workspace: str) -> Optional[int]:
+        """
+        Get the current graph version of a workspace.
+
+        Returns:
+            The version (0 if the graph never changed), or None if it cannot be determined,
+            in which case the caller must not use the cache.
+        """
+        if not self.use_redis:
+            return None
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            raw = await asyncio.to_thread(get_sync_redis_client().get, f"{_VERSION_KEY_PREFIX}:{workspace}")
+        except Exception as e:
+            logger.warning(f"Graph context cache version lookup failed, bypassing cache: {e}")
+            return None
+        return int(raw) if raw is not None else 0
+
+    async def bump_version(self, workspace: str) -> None:
+        """Invalidate every cached context of a workspace after its graph changed."""
+        if not self.use_redis:
+            return
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            await asyncio.to_thread(get_sync_redis_client().incr, f"{_VERSION_KEY_PREFIX}:{workspace}")
+        except Exception as e:
+            logger.warning(f"Failed to bump graph version of workspace {workspace}: {e}")
+
+    async def get(self, workspace: str, version: int, key_parts: Any) -> Optional[Any]:
+        key = make_graph_context_cache_key(workspace, version, key_parts)
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self._local.move_to_end(key)
+                return value
+
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            raw = await asyncio.to_thread(get_sync_redis_client().get, key)
+        except Exception as e:
+            logger.warning(f"Graph context cache Redis lookup failed: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            value = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        self._local_put(key, value)
+        return value
+
+    async def put(self, workspace: str, version: int, key_parts: Any, value: Any) -> None:
+        key = make_graph_context_cache_key(workspace, version, key_parts)
+        self._local_put(key, value)
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            await asyncio.to_thread(
+                get_sync_redis_client().set, key, json.dumps(value, ensure_ascii=False), ex=self.ttl
+            )
+        except Exception as e:
+            logger.warning(f"Graph context cache Redis write failed: {e}")
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _local_put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_size:
+                self._local.popitem(last=False)
+
+
+_graph_context_cache: Optional[GraphContextCache] = None
+_graph_context_cache_lock = threading.Lock()
+
+
+def get_graph_context_cache() -> Optional[GraphContextCache]:
+    """
+    Get the process-wide graph context cache.
+
+    Returns:
+        The shared GraphContextCache, or None if caching is disabled in settings.
+    """
+    global _graph_context_cache
+
+    from aperag.aperag_config import settings
+
+    if not settings.cache_enabled or not settings.graph_context_cache_enabled:
+        return None
+
+    if _graph_context_cache is None:
+        with _graph_context_cache_lock:
+            if _graph_context_cache is None:
+                _graph_context_cache = GraphContextCache(
+                    local_max_size=settings.graph_context_cache_local_size,
+                    ttl=settings.cache_ttl,
+                )
+    return _graph_context_cache
@@ -33,6 +33,7 @@ Modifications by ApeRAG Team:
 
 from __future__ import annotations
 
+import asyncio
 import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
@@ -87,6 +88,9 @@ class QueryParam:
     top_k: int = int(os.getenv("TOP_K", "60"))
     """Number of top items to retrieve. Represents entities in 'local' mode and relationships in 'global' mode."""
 
+    ef_search: int = int(os.getenv("HNSW_EF_SEARCH", "100"))
+    """Candidate list size for HNSW vector search. Raised to top_k when smaller; higher values improve recall."""
+
     max_token_for_text_unit: int = int(os.getenv("MAX_TOKEN_TEXT_CHUNK", "4000"))
     """Maximum number of tokens allowed for each retrieved text chunk."""
 
@@ -180,8 +184,14 @@ class BaseVectorStorage(StorageNameSpace, ABC):
     meta_fields: set[str] = field(default_factory=set)
 
     @abstractmethod
-    async def query(self, query: str, top_k: int, ids: list[str] | None = None) -> list[dict[str, Any]]:
-        """Query the vector storage and retrieve top_k results."""
+    async def query(
+        self, query: str, top_k: int, ids: list[str] | None = None, ef_search: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Query the vector storage and retrieve top_k results.
+
+        ef_search sizes the candidate list of approximate nearest-neighbour indexes, trading
+        latency for recall. Storages without such an index ignore it.
+        """
 
     @abstractmethod
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
@@ -237,6 +247,14 @@ class BaseVectorStorage(StorageNameSpace, ABC):
         """
         pass
 
+    @abstractmethod
+    async def update_chunk_ids(self, chunk_ids_by_id: dict[str, list[str]]) -> None:
+        """Replace the source chunk ids of existing records without re-embedding them
+
+        Args:
+            chunk_ids_by_id: Mapping of record ID to its new chunk ids
+        """
+
     @abstractmethod
     async def delete(self, ids: list[str]):
         """Delete vectors with specified IDs
@@ -292,6 +310,26 @@ class BaseKVStorage(StorageNameSpace, ABC):
         """
 
 
+@dataclass
+class EgoNetwork:
+    """Seed nodes with their one-hop neighbourhood, as returned by BaseGraphStorage.get_ego_network.
+
+    node_edges lists the incident edges of every seed in stored direction, while edges
+    holds edge properties keyed by the sorted endpoint pair. Degrees are empty when
+    they were not requested.
+    """
+
+    nodes: dict[str, dict] = field(default_factory=dict)
+    node_edges: dict[str, list[tuple[str, str]]] = field(default_factory=dict)
+    edges: dict[tuple[str, str], dict] = field(default_factory=dict)
+    node_degrees: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def edge_degrees(self) -> dict[tuple[str, str], int]:
+        """Combined degree of both endpoints of every edge"""
+        return {(src, tgt): self.node_degrees.get(src, 0) + self.node_degrees.get(tgt, 0) for src, tgt in self.edges}
+
+
 @dataclass
 class BaseGraphStorage(StorageNameSpace, ABC):
     embedding_func: EmbeddingFunc
@@ -446,6 +484,41 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             result[node_id] = edges if edges is not None else []
         return result
 
+    async def get_ego_network(self, node_ids: list[str], include_degrees: bool = True) -> EgoNetwork:
+        """Get seed nodes together with their incident edges and one-hop neighbours
+
+        Default implementation composes the batch operations above in two round trips.
+        Override this method for better performance in storage backends that can
+        fetch the whole neighbourhood in a single query.
+
+        Args:
+            node_ids: IDs of the seed nodes
+            include_degrees: Whether to compute the degrees of all returned nodes
+
+        Returns:
+            EgoNetwork with the seeds, their neighbours and their incident edges
+        """
+        batch_edges_dict = await self.get_nodes_edges_batch(node_ids)
+        node_edges = {node_id: batch_edges_dict.get(node_id, []) for node_id in node_ids}
+
+        pairs = list(dict.fromkeys(tuple(sorted(e)) for edges in node_edges.values() for e in edges))
+        member_ids = list(dict.fromkeys([*node_ids, *(node_id for pair in pairs for node_id in pair)]))
+
+        tasks = [
+            self.get_nodes_batch(member_ids),
+            self.get_edges_batch([{"src": src, "tgt": tgt} for src, tgt in pairs]),
+        ]
+        if include_degrees:
+            tasks.append(self.node_degrees_batch(member_ids))
+        results = await asyncio.gather(*tasks)
+
+        return EgoNetwork(
+            nodes=results[0],
+            node_edges=node_edges,
+            edges={pair: results[1][pair] for pair in pairs if pair in results[1]},
+            node_degrees=results[2] if include_degrees else {},
+        )
+
     @abstractmethod
     async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
         """Insert a new node or update an existing node in the graph.
@@ -475,6 +548,32 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             edge_data: A dictionary of edge properties
         """
 
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Insert or update several nodes at once.
+
+        Default implementation upserts nodes one by one.
+        Override this method for better performance in storage backends
+        that support batch operations.
+
+        Args:
+            nodes: Mapping of node ID to node properties
+        """
+        for node_id, node_data in nodes.items():
+            await self.upsert_node(node_id, node_data)
+
+    async def upsert_edges_batch(self, edges: dict[tuple[str, str], dict[str, str]]) -> None:
+        """Insert or update several edges at once.
+
+        Default implementation upserts edges one by one.
+        Override this method for better performance in storage backends
+        that support batch operations.
+
+        Args:
+            edges: Mapping of (source node ID, target node ID) to edge properties
+        """
+        for (source_node_id, target_node_id), edge_data in edges.items():
+            await self.upsert_edge(source_node_id, target_node_id, edge_data)
+
     @abstractmethod
     async def delete_node(self, node_id: str) -> None:
         """Delete a node from the graph.
@@ -538,6 +637,58 @@ class BaseGraphStorage(StorageNameSpace, ABC):
         """
 
 
+class DocGraphRefType(str, Enum):
+    """Kind of item a document chunk contributed to the graph"""
+
+    CHUNK = "chunk"
+    ENTITY = "entity"
+    RELATION = "relation"
+
+
+@dataclass(frozen=True)
+class DocGraphRef:
+    """One row of the document -> chunk -> entity/relation reverse index.
+
+    Chunk refs have empty entity ids, entity refs only set entity_id, and relation
+    refs set both endpoints in sorted order.
+    """
+
+    doc_id: str
+    chunk_id: str
+    ref_type: DocGraphRefType
+    entity_id: str = ""
+    target_entity_id: str = ""
+
+
+@dataclass
+class BaseDocGraphIndexStorage(StorageNameSpace, ABC):
+    """Reverse index from documents to the chunks, entities and relations they produced.
+
+    It is maintained while merging extraction results, so deleting a document only
+    touches the graph items built from its chunks instead of scanning the workspace.
+    """
+
+    @abstractmethod
+    async def add_refs(self, refs: list[DocGraphRef]) -> None:
+        """Record refs, ignoring the ones already recorded"""
+
+    @abstractmethod
+    async def get_doc_refs(self, doc_id: str) -> list[DocGraphRef]:
+        """Get all refs recorded for a document"""
+
+    @abstractmethod
+    async def get_shared_chunk_ids(self, doc_id: str, chunk_ids: list[str]) -> set[str]:
+        """Return the chunk ids that are also recorded for other documents"""
+
+    @abstractmethod
+    async def delete_doc_refs(self, doc_id: str) -> None:
+        """Delete all refs recorded for a document"""
+
+    @abstractmethod
+    async def redirect_entity_refs(self, entity_ids: list[str], target_entity_id: str) -> None:
+        """Point the entity and relation refs of merged entities at the entity they were merged into"""
+
+
 class DocStatus(str, Enum):
     """Document processing status"""
 
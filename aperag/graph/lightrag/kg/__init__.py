@@ -34,6 +34,7 @@ Modifications by ApeRAG Team:
 # Direct import of storage implementations
 from .nebula_sync_impl import NebulaSyncStorage
 from .neo4j_sync_impl import Neo4JSyncStorage
+from .pg_ops_sync_doc_graph_index_storage import PGOpsSyncDocGraphIndexStorage
 from .pg_ops_sync_graph_storage import PGOpsSyncGraphStorage
 from .pg_ops_sync_kv_storage import PGOpsSyncKVStorage
 from .pg_ops_sync_vector_storage import PGOpsSyncVectorStorage
@@ -42,6 +43,7 @@ from .pg_ops_sync_vector_storage import PGOpsSyncVectorStorage
 STORAGES = {
     "Neo4JSyncStorage": Neo4JSyncStorage,
     "NebulaSyncStorage": NebulaSyncStorage,
+    "PGOpsSyncDocGraphIndexStorage": PGOpsSyncDocGraphIndexStorage,
     "PGOpsSyncGraphStorage": PGOpsSyncGraphStorage,
     "PGOpsSyncKVStorage": PGOpsSyncKVStorage,
     "PGOpsSyncVectorStorage": PGOpsSyncVectorStorage,
@@ -58,7 +60,7 @@ def verify_storage_implementation(storage_type: str, storage_name: str) -> None:
     Raises:
         ValueError: If storage implementation is incompatible with storage type or not found
     """
-    from ..base import BaseGraphStorage, BaseKVStorage, BaseVectorStorage
+    from ..base import BaseDocGraphIndexStorage, BaseGraphStorage, BaseKVStorage, BaseVectorStorage
 
     # Check if storage implementation exists in STORAGES
     if storage_name not in STORAGES:
@@ -72,6 +74,8 @@ def verify_storage_implementation(storage_type: str, storage_name: str) -> None:
             expected_base_class = BaseVectorStorage
         case "GRAPH_STORAGE":
             expected_base_class = BaseGraphStorage
+        case "DOC_GRAPH_INDEX_STORAGE":
+            expected_base_class = BaseDocGraphIndexStorage
         case _:
             raise ValueError(f"Unknown storage type: {storage_type}")
 
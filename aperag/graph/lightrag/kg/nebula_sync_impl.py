@@ -33,6 +33,7 @@ Modifications by ApeRAG Team:
 
 import asyncio
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import final
 
@@ -91,6 +92,27 @@ def _quote_vid(vid: str) -> str:
     return f'"{escaped}"'
 
 
+# Maximum number of rows written by a single multi-row INSERT statement
+_INSERT_BATCH_SIZE = 256
+
+
+def _build_multi_row_insert(prefix: str, prop_names: tuple[str, ...], rows: list[tuple[str, dict]]) -> tuple[str, dict]:
+    """
+    Build a parameterized multi-row INSERT statement.
+    Each row is (quoted vid or edge key, properties); values are bound as $p{row}_{prop}.
+    """
+    value_clauses = []
+    param_dict = {}
+    for row_index, (key, props) in enumerate(rows):
+        placeholders = []
+        for prop_name in prop_names:
+            param_key = f"p{row_index}_{prop_name}"
+            placeholders.append(f"${param_key}")
+            param_dict[param_key] = props[prop_name]
+        value_clauses.append(f"{key}:({', '.join(placeholders)})")
+    return f"{prefix} {', '.join(value_clauses)}", param_dict
+
+
 def _convert_nebula_value(value) -> any:
     """Convert a single Nebula Value to Python type."""
     if value.is_null():
@@ -673,6 +695,72 @@ class NebulaSyncStorage(BaseGraphStorage):
 
         return await asyncio.to_thread(_sync_upsert_edge)
 
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Upsert multiple nodes with multi-row INSERT VERTEX statements.
+
+        INSERT overwrites the listed properties of an existing vertex, so callers are
+        expected to pass complete property sets (as the merge stage does).
+        """
+        if not nodes:
+            return
+
+        def _sync_upsert_nodes_batch():
+            rows_by_props = defaultdict(list)
+            for node_id, node_data in nodes.items():
+                if "entity_id" not in node_data:
+                    raise ValueError("Nebula: node properties must contain an 'entity_id' field")
+                valid_props = {k: v for k, v in node_data.items() if v is not None}
+                rows_by_props[tuple(sorted(valid_props))].append((_quote_vid(node_id), valid_props))
+
+            with NebulaSyncConnectionManager.get_session(space=self._space_name) as session:
+                for prop_names, rows in rows_by_props.items():
+                    for i in range(0, len(rows), _INSERT_BATCH_SIZE):
+                        query, param_dict = _build_multi_row_insert(
+                            f"INSERT VERTEX base({', '.join(prop_names)}) VALUES",
+                            prop_names,
+                            rows[i : i + _INSERT_BATCH_SIZE],
+                        )
+                        result = session.execute_parameter(query, _prepare_nebula_params(param_dict))
+                        if not result.is_succeeded():
+                            logger.error(f"Failed to batch upsert nodes: {_safe_error_msg(result)}")
+                            raise RuntimeError(f"Failed to batch upsert nodes: {_safe_error_msg(result)}")
+
+                logger.debug(f"Batch upserted {len(nodes)} nodes")
+
+        return await asyncio.to_thread(_sync_upsert_nodes_batch)
+
+    async def upsert_edges_batch(self, edges: dict[tuple[str, str], dict[str, str]]) -> None:
+        """Upsert multiple edges with multi-row INSERT EDGE statements."""
+        if not edges:
+            return
+
+        def _sync_upsert_edges_batch():
+            rows_by_props = defaultdict(list)
+            for (source_node_id, target_node_id), edge_data in edges.items():
+                valid_props = {k: v for k, v in edge_data.items() if v is not None}
+                if not valid_props:
+                    logger.warning(f"No valid properties to upsert for edge {source_node_id} -> {target_node_id}")
+                    continue
+                edge_key = f"{_quote_vid(source_node_id)}->{_quote_vid(target_node_id)}"
+                rows_by_props[tuple(sorted(valid_props))].append((edge_key, valid_props))
+
+            with NebulaSyncConnectionManager.get_session(space=self._space_name) as session:
+                for prop_names, rows in rows_by_props.items():
+                    for i in range(0, len(rows), _INSERT_BATCH_SIZE):
+                        query, param_dict = _build_multi_row_insert(
+                            f"INSERT EDGE DIRECTED({', '.join(prop_names)}) VALUES",
+                            prop_names,
+                            rows[i : i + _INSERT_BATCH_SIZE],
+                        )
+                        result = session.execute_parameter(query, _prepare_nebula_params(param_dict))
+                        if not result.is_succeeded():
+                            logger.error(f"Failed to batch upsert edges: {_safe_error_msg(result)}")
+                            raise RuntimeError(f"Failed to batch upsert edges: {_safe_error_msg(result)}")
+
+                logger.debug(f"Batch upserted {len(edges)} edges")
+
+        return await asyncio.to_thread(_sync_upsert_edges_batch)
+
     def _sync_check_node_exists(self, node_id: str, session) -> bool:
         """Synchronous helper to check if a node exists using parameterized query."""
         query = "MATCH (v:base) WHERE id(v) == $node_id RETURN v LIMIT 1"
@@ -33,6 +33,7 @@ Modifications by ApeRAG Team:
 
 import asyncio
 import logging
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import final
 
@@ -44,7 +45,7 @@ from tenacity import (
     wait_exponential,
 )
 
-from ..base import BaseGraphStorage
+from ..base import BaseGraphStorage, EgoNetwork
 from ..types import KnowledgeGraph, KnowledgeGraphEdge, KnowledgeGraphNode
 from ..utils import logger
 
@@ -375,6 +376,75 @@ class Neo4JSyncStorage(BaseGraphStorage):
 
         return await asyncio.to_thread(_sync_get_nodes_edges_batch)
 
+    async def get_ego_network(self, node_ids: list[str], include_degrees: bool = True) -> EgoNetwork:
+        """Retrieve seed nodes, incident edges, neighbours and degrees in one query."""
+
+        def _sync_get_ego_network():
+            with Neo4jSyncConnectionManager.get_session(database=self._DATABASE) as session:
+                node_degree = "count { (n)--() }" if include_degrees else "0"
+                connected_degree = "count { (connected)--() }" if include_degrees else "0"
+                query = f"""
+                    UNWIND $node_ids AS id
+                    MATCH (n:base {{entity_id: id}})
+                    OPTIONAL MATCH (n)-[r]-(connected:base)
+                    RETURN id AS queried_id, n, {node_degree} AS degree,
+                           collect(CASE WHEN r IS NULL THEN NULL ELSE {{
+                               connected: connected,
+                               connected_degree: {connected_degree},
+                               start_entity_id: startNode(r).entity_id,
+                               edge: properties(r)
+                           }} END) AS neighbours
+                """
+                result = session.run(query, node_ids=node_ids)
+
+                ego = EgoNetwork(node_edges={node_id: [] for node_id in node_ids})
+
+                def _add_node(node, degree):
+                    node_dict = dict(node)
+                    # Remove the 'base' label if present
+                    if "labels" in node_dict:
+                        node_dict["labels"] = [label for label in node_dict["labels"] if label != "base"]
+                    ego.nodes[node_dict["entity_id"]] = node_dict
+                    if include_degrees:
+                        ego.node_degrees[node_dict["entity_id"]] = degree
+
+                for record in result:
+                    queried_id = record["queried_id"]
+                    _add_node(record["n"], record["degree"])
+
+                    for neighbour in record["neighbours"]:
+                        connected_entity_id = neighbour["connected"].get("entity_id")
+                        if not connected_entity_id:
+                            continue
+                        _add_node(neighbour["connected"], neighbour["connected_degree"])
+
+                        if neighbour["start_entity_id"] == queried_id:
+                            edge = (queried_id, connected_entity_id)
+                        else:
+                            edge = (connected_entity_id, queried_id)
+                        ego.node_edges[queried_id].append(edge)
+
+                        edge_props = dict(neighbour["edge"])
+                        # Ensure required keys exist
+                        for key, default in {
+                            "weight": 0.0,
+                            "source_id": None,
+                            "description": None,
+                            "keywords": None,
+                        }.items():
+                            if key not in edge_props:
+                                edge_props[key] = default
+                        ego.edges.setdefault(tuple(sorted(edge)), edge_props)
+
+                if include_degrees:
+                    # Set degree to 0 for missing nodes
+                    for nid in node_ids:
+                        ego.node_degrees.setdefault(nid, 0)
+
+                return ego
+
+        return await asyncio.to_thread(_sync_get_ego_network)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -446,6 +516,82 @@ class Neo4JSyncStorage(BaseGraphStorage):
 
         return await asyncio.to_thread(_sync_upsert_edge)
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type(
+            (
+                neo4jExceptions.ServiceUnavailable,
+                neo4jExceptions.TransientError,
+                neo4jExceptions.WriteServiceUnavailable,
+                neo4jExceptions.ClientError,
+            )
+        ),
+    )
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Upsert multiple nodes using UNWIND, one query per entity type label."""
+        if not nodes:
+            return
+
+        def _sync_upsert_nodes_batch():
+            nodes_by_type = defaultdict(list)
+            for node_id, properties in nodes.items():
+                if "entity_id" not in properties:
+                    raise ValueError("Neo4j: node properties must contain an 'entity_id' field")
+                nodes_by_type[properties["entity_type"]].append({"entity_id": node_id, "properties": properties})
+
+            with Neo4jSyncConnectionManager.get_session(database=self._DATABASE) as session:
+                for entity_type, batch in nodes_by_type.items():
+                    query = (
+                        """
+                        UNWIND $nodes AS node
+                        MERGE (n:base {entity_id: node.entity_id})
+                        SET n += node.properties
+                        SET n:`%s`
+                        """
+                        % entity_type
+                    )
+                    session.run(query, nodes=batch)
+                logger.debug(f"Batch upserted {len(nodes)} nodes")
+
+        return await asyncio.to_thread(_sync_upsert_nodes_batch)
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type(
+            (
+                neo4jExceptions.ServiceUnavailable,
+                neo4jExceptions.TransientError,
+                neo4jExceptions.WriteServiceUnavailable,
+                neo4jExceptions.ClientError,
+            )
+        ),
+    )
+    async def upsert_edges_batch(self, edges: dict[tuple[str, str], dict[str, str]]) -> None:
+        """Upsert multiple edges using UNWIND."""
+        if not edges:
+            return
+
+        def _sync_upsert_edges_batch():
+            batch = [
+                {"src": src_id, "tgt": tgt_id, "properties": properties}
+                for (src_id, tgt_id), properties in edges.items()
+            ]
+            with Neo4jSyncConnectionManager.get_session(database=self._DATABASE) as session:
+                query = """
+                UNWIND $edges AS edge
+                MATCH (source:base {entity_id: edge.src})
+                WITH source, edge
+                MATCH (target:base {entity_id: edge.tgt})
+                MERGE (source)-[r:DIRECTED]-(target)
+                SET r += edge.properties
+                """
+                session.run(query, edges=batch)
+                logger.debug(f"Batch upserted {len(edges)} edges")
+
+        return await asyncio.to_thread(_sync_upsert_edges_batch)
+
     async def get_knowledge_graph(
         self,
         node_label: str,
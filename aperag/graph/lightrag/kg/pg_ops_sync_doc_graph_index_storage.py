@@ -0,0 +1,149 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+LightRAG Module for ApeRAG
+
+This module is based on the original LightRAG project with extensive modifications.
+
+Original Project:
+- Repository: https://github.com/HKUDS/LightRAG
+- Paper: "LightRAG: Simple and Fast Retrieval-Augmented Generation" (arXiv:2410.05779)
+- Authors: Zirui Guo, Lianghao Xia, Yanhua Yu, Tu Ao, Chao Huang
+- License: MIT License
+
+Modifications by ApeRAG Team:
+- Removed global state management for true concurrent processing
+- Added stateless interfaces for Celery/Prefect integration
+- Implemented instance-level locking mechanism
+- Enhanced error handling and stability
+- See changelog.md for detailed modifications
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import final
+
+from ..base import (
+    BaseDocGraphIndexStorage,
+    DocGraphRef,
+    DocGraphRefType,
+)
+from ..utils import logger
+
+
+@final
+@dataclass
+class PGOpsSyncDocGraphIndexStorage(BaseDocGraphIndexStorage):
+    """PostgreSQL document graph reverse index using DatabaseOps with sync interface."""
+
+    async def initialize(self):
+        """Initialize storage."""
+        logger.debug(f"PGOpsSyncDocGraphIndexStorage initialized for workspace '{self.workspace}'")
+
+    async def finalize(self):
+        """Clean up resources."""
+        logger.debug(f"PGOpsSyncDocGraphIndexStorage finalized for workspace '{self.workspace}'")
+
+    async def add_refs(self, refs: list[DocGraphRef]) -> None:
+        """Record refs, ignoring the ones already recorded"""
+
+        def _sync_add_refs():
+            if not refs:
+                return
+
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            db_ops.insert_lightrag_doc_graph_refs(
+                self.workspace,
+                [
+                    {
+                        "doc_id": ref.doc_id,
+                        "chunk_id": ref.chunk_id,
+                        "ref_type": ref.ref_type.value,
+                        "entity_id": ref.entity_id,
+                        "target_entity_id": ref.target_entity_id,
+                    }
+                    for ref in set(refs)
+                ],
+            )
+
+        await asyncio.to_thread(_sync_add_refs)
+
+    async def get_doc_refs(self, doc_id: str) -> list[DocGraphRef]:
+        """Get all refs recorded for a document"""
+
+        def _sync_get_doc_refs():
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            models = db_ops.query_lightrag_doc_graph_refs(self.workspace, doc_id)
+            return [
+                DocGraphRef(
+                    doc_id=model.doc_id,
+                    chunk_id=model.chunk_id,
+                    ref_type=DocGraphRefType(model.ref_type),
+                    entity_id=model.entity_id or "",
+                    target_entity_id=model.target_entity_id or "",
+                )
+                for model in models
+            ]
+
+        return await asyncio.to_thread(_sync_get_doc_refs)
+
+    async def get_shared_chunk_ids(self, doc_id: str, chunk_ids: list[str]) -> set[str]:
+        """Return the chunk ids that are also recorded for other documents"""
+
+        def _sync_get_shared_chunk_ids():
+            if not chunk_ids:
+                return set()
+
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            return set(db_ops.query_lightrag_shared_chunk_ids(self.workspace, doc_id, chunk_ids))
+
+        return await asyncio.to_thread(_sync_get_shared_chunk_ids)
+
+    async def delete_doc_refs(self, doc_id: str) -> None:
+        """Delete all refs recorded for a document"""
+
+        def _sync_delete_doc_refs():
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            deleted_count = db_ops.delete_lightrag_doc_graph_refs(self.workspace, doc_id)
+            logger.debug(f"Deleted {deleted_count} graph refs of document {doc_id}")
+
+        await asyncio.to_thread(_sync_delete_doc_refs)
+
+    async def redirect_entity_refs(self, entity_ids: list[str], target_entity_id: str) -> None:
+        """Point the entity and relation refs of merged entities at the entity they were merged into"""
+
+        def _sync_redirect_entity_refs():
+            if not entity_ids:
+                return
+
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            redirected_count = db_ops.redirect_lightrag_doc_graph_refs(self.workspace, entity_ids, target_entity_id)
+            logger.debug(f"Redirected {redirected_count} graph refs of {entity_ids} to {target_entity_id}")
+
+        await asyncio.to_thread(_sync_redirect_entity_refs)
+
+    async def drop(self) -> dict[str, str]:
+        """Drop the storage - not implemented for safety"""
+        return {"status": "error", "message": "Drop operation not supported for database-backed storage"}
@@ -29,7 +29,7 @@ import asyncio
 from dataclasses import dataclass
 from typing import final
 
-from ..base import BaseGraphStorage
+from ..base import BaseGraphStorage, EgoNetwork
 from ..types import KnowledgeGraph, KnowledgeGraphEdge, KnowledgeGraphNode
 from ..utils import logger
 
@@ -85,6 +85,34 @@ class PGOpsSyncGraphStorage(BaseGraphStorage):
         await asyncio.to_thread(_sync_upsert_edge)
         logger.debug(f"Upserted edge from '{source_node_id}' to '{target_node_id}'")
 
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Upsert multiple nodes with a single multi-row statement."""
+        if not nodes:
+            return
+
+        def _sync_upsert_nodes_batch():
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            db_ops.upsert_graph_nodes_batch(self.workspace, nodes)
+
+        await asyncio.to_thread(_sync_upsert_nodes_batch)
+        logger.debug(f"Batch upserted {len(nodes)} nodes")
+
+    async def upsert_edges_batch(self, edges: dict[tuple[str, str], dict[str, str]]) -> None:
+        """Upsert multiple edges with a single multi-row statement."""
+        if not edges:
+            return
+
+        def _sync_upsert_edges_batch():
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            db_ops.upsert_graph_edges_batch(self.workspace, edges)
+
+        await asyncio.to_thread(_sync_upsert_edges_batch)
+        logger.debug(f"Batch upserted {len(edges)} edges")
+
     # Query methods
     async def has_node(self, node_id: str) -> bool:
         """Check if a node exists."""
@@ -235,6 +263,38 @@ class PGOpsSyncGraphStorage(BaseGraphStorage):
 
         return await asyncio.to_thread(_sync_get_nodes_edges_batch)
 
+    async def get_ego_network(self, node_ids: list[str], include_degrees: bool = True) -> EgoNetwork:
+        """Retrieve seed nodes, incident edges, neighbours and degrees with a single SQL query."""
+
+        def _sync_get_ego_network():
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+
+            return db_ops.get_graph_ego_network(self.workspace, node_ids, include_degrees)
+
+        result = await asyncio.to_thread(_sync_get_ego_network)
+
+        node_edges = {node_id: [] for node_id in node_ids}
+        edges = {}
+        for edge in result["edges"]:
+            src, tgt = edge.pop("source"), edge.pop("target")
+            if src in node_edges:
+                node_edges[src].append((src, tgt))
+            if tgt in node_edges:
+                node_edges[tgt].append((src, tgt))
+            # An edge stored in sorted direction wins over its reverse, like get_edges_batch lookups
+            pair = tuple(sorted((src, tgt)))
+            if pair not in edges or pair == (src, tgt):
+                edges[pair] = edge
+
+        node_degrees = {}
+        if include_degrees:
+            node_degrees = {node_id: 0 for node_id in result["nodes"]}
+            node_degrees.update({node_id: 0 for node_id in node_ids})
+            node_degrees.update(result["node_degrees"])
+
+        return EgoNetwork(nodes=result["nodes"], node_edges=node_edges, edges=edges, node_degrees=node_degrees)
+
     async def delete_node(self, node_id: str) -> None:
         """Delete a node and all its related edges in a single transaction."""
 
@@ -104,6 +104,11 @@ class PGOpsSyncKVStorage(BaseKVStorage):
                     "content_vector": model.content_vector,  # Now returns list[float] directly
                     "file_path": model.file_path,
                 }
+            elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+                models = db_ops.query_lightrag_llm_cache_by_ids(self.workspace, [id])
+                if not models:
+                    return None
+                return self._llm_cache_to_dict(models[0])
             else:
                 logger.error(f"Unknown namespace for get_by_id: {self.namespace}")
                 return None
@@ -135,6 +140,9 @@ class PGOpsSyncKVStorage(BaseKVStorage):
                     }
                     for model in models
                 ]
+            elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+                models = db_ops.query_lightrag_llm_cache_by_ids(self.workspace, ids)
+                return [self._llm_cache_to_dict(model) for model in models]
             else:
                 logger.error(f"Unknown namespace for get_by_ids: {self.namespace}")
                 return []
@@ -155,6 +163,10 @@ class PGOpsSyncKVStorage(BaseKVStorage):
             keys_list = list(keys)
             if is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
                 existing_keys = db_ops.filter_lightrag_doc_chunks_keys(self.workspace, keys_list)
+            elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+                existing_keys = [
+                    model.id for model in db_ops.query_lightrag_llm_cache_by_ids(self.workspace, keys_list)
+                ]
             else:
                 logger.error(f"Unknown namespace for filter_keys: {self.namespace}")
                 return keys
@@ -179,6 +191,8 @@ class PGOpsSyncKVStorage(BaseKVStorage):
             if is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
                 # Use data directly for chunks
                 db_ops.upsert_lightrag_doc_chunks(self.workspace, data)
+            elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+                db_ops.upsert_lightrag_llm_cache(self.workspace, data)
             else:
                 logger.error(f"Unknown namespace for upsert: {self.namespace}")
 
@@ -198,11 +212,23 @@ class PGOpsSyncKVStorage(BaseKVStorage):
             if is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
                 deleted_count = db_ops.delete_lightrag_doc_chunks(self.workspace, ids)
                 logger.debug(f"Successfully deleted {deleted_count} records from {self.namespace}")
+            elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+                deleted_count = db_ops.delete_lightrag_llm_cache(self.workspace, ids)
+                logger.debug(f"Successfully deleted {deleted_count} records from {self.namespace}")
             else:
                 logger.error(f"Unknown namespace for deletion: {self.namespace}")
 
         await asyncio.to_thread(_sync_delete)
 
+    @staticmethod
+    def _llm_cache_to_dict(model) -> dict[str, Any]:
+        return {
+            "id": model.id,
+            "cache_type": model.cache_type,
+            "model": model.model,
+            "return_value": model.return_value,
+        }
+
     async def drop(self) -> dict[str, str]:
         """Drop the storage - not implemented for safety"""
         return {"status": "error", "message": "Drop operation not supported for database-backed storage"}
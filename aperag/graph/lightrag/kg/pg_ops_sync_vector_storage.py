@@ -214,7 +214,9 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
 
         await asyncio.to_thread(_sync_upsert_with_vectors)
 
-    async def query(self, query: str, top_k: int, ids: list[str] | None = None) -> list[dict[str, Any]]:
+    async def query(
+        self, query: str, top_k: int, ids: list[str] | None = None, ef_search: int | None = None
+    ) -> list[dict[str, Any]]:
         """Query vectors by similarity"""
         # Compute embedding for query
         embeddings = await self.embedding_func([query])
@@ -234,7 +236,7 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
             # Use appropriate similarity search method based on namespace
             if is_namespace(self.namespace, NameSpace.VECTOR_STORE_CHUNKS):
                 results = db_ops.query_lightrag_doc_chunks_similarity(
-                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold
+                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold, ef_search
                 )
                 # Convert results to expected format for chunks
                 formatted_results = []
@@ -260,7 +262,7 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
 
             elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_ENTITIES):
                 results = db_ops.query_lightrag_vdb_entity_similarity(
-                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold
+                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold, ef_search
                 )
                 # Convert results to expected format for entities
                 formatted_results = []
@@ -281,7 +283,7 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
 
             elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_RELATIONSHIPS):
                 results = db_ops.query_lightrag_vdb_relation_similarity(
-                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold
+                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold, ef_search
                 )
                 # Convert results to expected format for relationships
                 formatted_results = []
@@ -488,6 +490,26 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
 
         return await asyncio.to_thread(_sync_get_by_ids)
 
+    async def update_chunk_ids(self, chunk_ids_by_id: dict[str, list[str]]) -> None:
+        """Replace the source chunk ids of existing records without re-embedding them"""
+
+        def _sync_update_chunk_ids():
+            if not chunk_ids_by_id:
+                return
+
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+            from aperag.graph.lightrag.namespace import NameSpace, is_namespace
+
+            if is_namespace(self.namespace, NameSpace.VECTOR_STORE_ENTITIES):
+                db_ops.update_lightrag_vdb_entity_chunk_ids(self.workspace, chunk_ids_by_id)
+            elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_RELATIONSHIPS):
+                db_ops.update_lightrag_vdb_relation_chunk_ids(self.workspace, chunk_ids_by_id)
+            else:
+                raise ValueError(f"{self.namespace} does not track chunk ids")
+
+        await asyncio.to_thread(_sync_update_chunk_ids)
+
     async def drop(self) -> dict[str, str]:
         """Drop the storage - not implemented for safety"""
         return {"status": "error", "message": "Drop operation not supported for database-backed storage"}
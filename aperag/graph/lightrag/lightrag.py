@@ -34,6 +34,7 @@ Modifications by ApeRAG Team:
 from __future__ import annotations
 
 import asyncio
+import time
 from dataclasses import dataclass, field
 from functools import partial
 from typing import (
@@ -49,6 +50,7 @@ from typing import (
 
 from aperag.graph.lightrag.constants import (
     DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE,
+    DEFAULT_MAX_PARALLEL_COMPONENTS,
     DEFAULT_MAX_TOKEN_SUMMARY,
 )
 from aperag.graph.lightrag.kg import (
@@ -58,9 +60,12 @@ from aperag.graph.lightrag.kg import (
 from aperag.graph.lightrag.utils import LightRAGLogger, get_env_value
 
 from .base import (
+    BaseDocGraphIndexStorage,
     BaseGraphStorage,
     BaseKVStorage,
     BaseVectorStorage,
+    DocGraphRef,
+    DocGraphRefType,
     QueryParam,
     StoragesStatus,
 )
@@ -103,18 +108,39 @@ class LightRAG:
     graph_storage: str = field(default="Neo4JSyncStorage")
     """Storage backend for knowledge graphs."""
 
+    doc_graph_index_storage: str = field(default="PGOpsSyncDocGraphIndexStorage")
+    """Storage backend for the document -> chunk -> entity/relation reverse index."""
+
     # Entity extraction
     # ---
 
     entity_extract_max_gleaning: int = field(default=1)
     """Maximum number of entity extraction attempts for ambiguous content."""
 
+    enable_llm_cache_for_entity_extract: bool = field(default=True)
+    """If True, raw entity extraction results are cached and reused for identical chunk content."""
+
+    # Query
+    # ---
+
+    enable_llm_cache: bool = field(default=True)
+    """If True, keywords extracted from queries are cached and reused for identical queries."""
+
+    query_context_cache: Any = field(default=None)
+    """Optional cache of assembled query contexts, invalidated by a per-workspace graph version.
+    Must provide get_version/bump_version/get/put, see aperag.graph.graph_query_cache."""
+
     summary_to_max_tokens: int = field(default=get_env_value("MAX_TOKEN_SUMMARY", DEFAULT_MAX_TOKEN_SUMMARY, int))
 
     force_llm_summary_on_merge: int = field(
         default=get_env_value("FORCE_LLM_SUMMARY_ON_MERGE", DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE, int)
     )
 
+    max_parallel_components: int = field(
+        default=get_env_value("MAX_PARALLEL_COMPONENTS", DEFAULT_MAX_PARALLEL_COMPONENTS, int)
+    )
+    """Maximum number of disjoint connected components merged concurrently."""
+
     # Text chunking
     # ---
 
@@ -247,6 +273,7 @@ class LightRAG:
             ("KV_STORAGE", self.kv_storage),
             ("VECTOR_STORAGE", self.vector_storage),
             ("GRAPH_STORAGE", self.graph_storage),
+            ("DOC_GRAPH_INDEX_STORAGE", self.doc_graph_index_storage),
         ]
 
         for storage_type, storage_name in storage_configs:
@@ -275,6 +302,16 @@ class LightRAG:
         self.graph_storage_cls = partial(  # type: ignore
             self.graph_storage_cls
         )
+        self.doc_graph_index_storage_cls: type[BaseDocGraphIndexStorage] = self._get_storage_class(  # type: ignore
+            self.doc_graph_index_storage
+        )
+        self.llm_response_cache: BaseKVStorage | None = None
+        if self.enable_llm_cache_for_entity_extract or self.enable_llm_cache:
+            self.llm_response_cache = self.key_string_value_json_storage_cls(  # type: ignore
+                namespace=NameSpace.KV_STORE_LLM_RESPONSE_CACHE,
+                workspace=self.workspace,
+                embedding_func=self.embedding_func,
+            )
         # TODO: deprecating, text_chunks is redundant with chunks_vdb
         self.text_chunks: BaseKVStorage = self.key_string_value_json_storage_cls(  # type: ignore
             namespace=NameSpace.KV_STORE_TEXT_CHUNKS,
@@ -311,6 +348,10 @@ class LightRAG:
             _max_batch_size=self.max_batch_size,
             meta_fields={"full_doc_id", "content", "file_path"},
         )
+        self.doc_graph_index: BaseDocGraphIndexStorage = self.doc_graph_index_storage_cls(  # type: ignore
+            namespace=NameSpace.DOC_GRAPH_INDEX,
+            workspace=self.workspace,
+        )
         # -- 初始化存储状态和日志实例
         self._storages_status = StoragesStatus.CREATED
         self.lightrag_logger = create_lightrag_logger(workspace=self.workspace)
@@ -321,11 +362,13 @@ class LightRAG:
             tasks = []
 
             for storage in (
+                self.llm_response_cache,
                 self.text_chunks,
                 self.entities_vdb,
                 self.relationships_vdb,
                 self.chunks_vdb,
                 self.chunk_entity_relation_graph,
+                self.doc_graph_index,
             ):
                 if storage:
                     tasks.append(storage.initialize())
@@ -341,11 +384,13 @@ class LightRAG:
             tasks = []
 
             for storage in (
+                self.llm_response_cache,
                 self.text_chunks,
                 self.entities_vdb,
                 self.relationships_vdb,
                 self.chunks_vdb,
                 self.chunk_entity_relation_graph,
+                self.doc_graph_index,
             ):
                 if storage:
                     tasks.append(storage.finalize())
@@ -355,6 +400,15 @@ class LightRAG:
             self._storages_status = StoragesStatus.FINALIZED
             logger.debug("Finalized Storages")
 
+    @property
+    def _query_llm_response_cache(self) -> BaseKVStorage | None:
+        return self.llm_response_cache if self.enable_llm_cache else None
+
+    async def _bump_graph_version(self) -> None:
+        """Invalidate cached query contexts of this workspace after the graph changed"""
+        if self.query_context_cache is not None:
+            await self.query_context_cache.bump_version(self.workspace)
+
     async def get_graph_labels(self):
         text = await self.chunk_entity_relation_graph.get_all_labels()
         return text
@@ -401,64 +455,81 @@ class LightRAG:
 
     # ============= New Stateless Interfaces =============
 
-    def _find_connected_components(self, chunk_results: List[tuple[dict, dict]]) -> List[List[str]]:
+    def _group_by_connected_components(
+        self, chunk_results: List[tuple[dict, dict]]
+    ) -> List[tuple[List[str], List[tuple[dict, dict]]]]:
         """
-        Find connected components in the extracted entities and relationships.
+        Group the extracted entities and relationships by connected component.
+
+        Components are found with union-find, then every node and edge is routed to
+        its component in a single pass over the chunk results.
 
         Args:
             chunk_results: List of (nodes_dict, edges_dict) tuples from entity extraction
 
         Returns:
-            List of entity groups, where each group is a list of connected entity names
+            List of (component, component_chunk_results) tuples, where component is the list
+            of connected entity names and component_chunk_results holds the per-chunk
+            (nodes_dict, edges_dict) restricted to that component
         """
-        # Build adjacency list
-        adjacency: Dict[str, set[str]] = {}
+        parent: Dict[str, str] = {}
+        size: Dict[str, int] = {}
+
+        def _find(entity_name: str) -> str:
+            root = entity_name
+            while parent[root] != root:
+                root = parent[root]
+            # Path compression
+            while parent[entity_name] != root:
+                parent[entity_name], entity_name = root, parent[entity_name]
+            return root
+
+        def _add(entity_name: str):
+            if entity_name not in parent:
+                parent[entity_name] = entity_name
+                size[entity_name] = 1
+
+        def _union(src: str, tgt: str):
+            src_root, tgt_root = _find(src), _find(tgt)
+            if src_root == tgt_root:
+                return
+            # Union by size keeps the trees shallow
+            if size[src_root] < size[tgt_root]:
+                src_root, tgt_root = tgt_root, src_root
+            parent[tgt_root] = src_root
+            size[src_root] += size[tgt_root]
 
         for nodes, edges in chunk_results:
-            # Add all nodes to adjacency list
-            for entity_name in nodes.keys():
-                if entity_name not in adjacency:
-                    adjacency[entity_name] = set()
-
-            # Add edges to create connections
-            for src, tgt in edges.keys():
-                if src not in adjacency:
-                    adjacency[src] = set()
-                if tgt not in adjacency:
-                    adjacency[tgt] = set()
-                adjacency[src].add(tgt)
-                adjacency[tgt].add(src)
-
-        # Find connected components using BFS
-        visited = set()
-        components = []
-
-        for node in adjacency:
-            if node not in visited:
-                # Start BFS from this node
-                component = []
-                queue = [node]
-                visited.add(node)
-
-                while queue:
-                    current = queue.pop(0)
-                    component.append(current)
-
-                    # Visit all neighbors
-                    for neighbor in adjacency.get(current, set()):
-                        if neighbor not in visited:
-                            visited.add(neighbor)
-                            queue.append(neighbor)
-
-                components.append(component)
-
-        self.lightrag_logger.debug(f"Found {len(components)} connected components from {len(adjacency)} entities")
-        return components
+            for entity_name in nodes:
+                _add(entity_name)
+            for src, tgt in edges:
+                _add(src)
+                _add(tgt)
+                _union(src, tgt)
+
+        # Components keep the order in which their entities were first seen
+        components: Dict[str, List[str]] = {}
+        for entity_name in parent:
+            components.setdefault(_find(entity_name), []).append(entity_name)
+
+        component_chunk_results: Dict[str, List[tuple[dict, dict]]] = {root: [] for root in components}
+        for nodes, edges in chunk_results:
+            chunk_groups: Dict[str, tuple[dict, dict]] = {}
+            for entity_name, entity_data in nodes.items():
+                chunk_groups.setdefault(_find(entity_name), ({}, {}))[0][entity_name] = entity_data
+            for (src, tgt), edge_data in edges.items():
+                chunk_groups.setdefault(_find(src), ({}, {}))[1][(src, tgt)] = edge_data
+            for root, chunk_group in chunk_groups.items():
+                component_chunk_results[root].append(chunk_group)
+
+        self.lightrag_logger.debug(f"Found {len(components)} connected components from {len(parent)} entities")
+        return [(component, component_chunk_results[root]) for root, component in components.items()]
 
     async def _grouping_process_chunk_results(
         self,
         chunk_results: List[tuple[dict, dict]],
         collection_id: str | None = None,
+        chunk_doc_ids: dict[str, str] | None = None,
     ) -> dict[str, Any]:
         """
         Process entities and relationships in groups based on connected components.
@@ -466,11 +537,12 @@ class LightRAG:
         Args:
             chunk_results: List of (nodes_dict, edges_dict) from entity extraction
             collection_id: Optional collection ID for logging
+            chunk_doc_ids: Optional mapping of chunk ID to document ID for the document graph index
 
         Returns:
             Dict with processing results
         """
-        components = self._find_connected_components(chunk_results)
+        components = self._group_by_connected_components(chunk_results)
 
         # Handle case where no entities were extracted
         if not components:
@@ -485,34 +557,7 @@ class LightRAG:
         # Prepare component data for parallel processing
         component_tasks = []
 
-        for i, component in enumerate(components):
-            # Create a set for quick lookup
-            component_entities = set(component)
-
-            # Filter chunk results for this component
-            component_chunk_results = []
-
-            for nodes, edges in chunk_results:
-                # Filter nodes belonging to this component
-                filtered_nodes = {
-                    entity_name: entity_data
-                    for entity_name, entity_data in nodes.items()
-                    if entity_name in component_entities
-                }
-
-                # Filter edges where both endpoints belong to this component
-                filtered_edges = {
-                    (src, tgt): edge_data
-                    for (src, tgt), edge_data in edges.items()
-                    if src in component_entities and tgt in component_entities
-                }
-
-                if filtered_nodes or filtered_edges:
-                    component_chunk_results.append((filtered_nodes, filtered_edges))
-
-            if not component_chunk_results:
-                continue
-
+        for i, (component, component_chunk_results) in enumerate(components):
             # Add task data for this component
             component_tasks.append(
                 {
@@ -520,11 +565,14 @@ class LightRAG:
                     "component": component,
                     "component_chunk_results": component_chunk_results,
                     "total_components": len(components),
+                    "size": sum(len(nodes) + len(edges) for nodes, edges in component_chunk_results),
                 }
             )
 
-        # Process components concurrently with semaphore
-        semaphore = asyncio.Semaphore(1)
+        # Components are disjoint, so they can be merged concurrently. Start the largest
+        # ones first so a big component does not become the tail of the whole batch.
+        component_tasks.sort(key=lambda task_data: task_data["size"], reverse=True)
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_components))
 
         async def _process_component_with_semaphore(task_data):
             async with semaphore:
@@ -532,6 +580,7 @@ class LightRAG:
                     f"Processing component {task_data['index'] + 1}/{task_data['total_components']} "
                     f"with {len(task_data['component'])} entities"
                 )
+                start_time = time.perf_counter()
 
                 # Call merge_nodes_and_edges with component information
                 result = await merge_nodes_and_edges(
@@ -548,11 +597,14 @@ class LightRAG:
                     addon_params=self.addon_params or PROMPTS["DEFAULT_LANGUAGE"],
                     force_llm_summary_on_merge=self.force_llm_summary_on_merge,
                     lightrag_logger=self.lightrag_logger,
+                    doc_graph_index=self.doc_graph_index,
+                    chunk_doc_ids=chunk_doc_ids,
                 )
 
-                self.lightrag_logger.debug(
-                    f"Completed component {task_data['index'] + 1}: "
-                    f"{result['entity_count']} entities, {result['relation_count']} relations"
+                self.lightrag_logger.log_timing(
+                    f"merge component {task_data['index'] + 1}/{task_data['total_components']}",
+                    time.perf_counter() - start_time,
+                    f"{result['entity_count']} entities, {result['relation_count']} relations",
                 )
 
                 return result
@@ -702,6 +754,9 @@ class LightRAG:
             await self.chunks_vdb.upsert(chunks)
             self.lightrag_logger.debug(f"LightRAG: Calling text_chunks.upsert with {len(chunks)} chunks")
             await self.text_chunks.upsert(chunks)
+            await self.doc_graph_index.add_refs(
+                [DocGraphRef(doc_id, chunk_id, DocGraphRefType.CHUNK) for chunk_id in chunks]
+            )
             self.lightrag_logger.debug(f"LightRAG: Completed all upsert operations for {doc_id}")
 
             self.lightrag_logger.debug(f"Inserted and chunked document {doc_id}: {len(chunks)} chunks")
@@ -756,17 +811,24 @@ class LightRAG:
             self.lightrag_logger.debug(f"Starting graph indexing for {len(chunks)} chunks")
 
             # 1. Extract entities and relations from chunks (completely parallel, no lock)
-            chunk_results = await extract_entities(
+            chunk_results, extraction_cache_hits = await extract_entities(
                 chunks,
                 use_llm_func=self.llm_model_func,
                 entity_extract_max_gleaning=self.entity_extract_max_gleaning,
                 addon_params=self.addon_params,
                 llm_model_max_async=self.llm_model_max_async,
                 lightrag_logger=self.lightrag_logger,
+                llm_response_cache=self.llm_response_cache if self.enable_llm_cache_for_entity_extract else None,
+                llm_model_name=self.llm_model_name,
             )
 
             # 2. Process each component group with its own lock scope
-            result = await self._grouping_process_chunk_results(chunk_results, collection_id)
+            chunk_doc_ids = {
+                chunk_id: chunk_data["full_doc_id"]
+                for chunk_id, chunk_data in chunks.items()
+                if chunk_data.get("full_doc_id")
+            }
+            result = await self._grouping_process_chunk_results(chunk_results, collection_id, chunk_doc_ids)
 
             # Count total results
             entity_count = sum(len(nodes) for nodes, _ in chunk_results)
@@ -774,8 +836,9 @@ class LightRAG:
 
             self.lightrag_logger.info(
                 f"Graph indexing completed: {entity_count} entities, {relation_count} relations "
-                f"in {result['groups_processed']} groups"
+                f"in {result['groups_processed']} groups, {extraction_cache_hits} extraction cache hits"
             )
+            await self._bump_graph_version()
 
             return {
                 "status": "success",
@@ -783,6 +846,7 @@ class LightRAG:
                 "entities_extracted": entity_count,
                 "relations_extracted": relation_count,
                 "groups_processed": result["groups_processed"],
+                "extraction_cache_hits": extraction_cache_hits,
                 "collection_id": collection_id,
             }
 
@@ -812,6 +876,10 @@ class LightRAG:
             self.llm_model_func,
             self.addon_params,
             chunks_vdb=self.chunks_vdb,
+            llm_response_cache=self._query_llm_response_cache,
+            llm_model_name=self.llm_model_name,
+            workspace=self.workspace,
+            context_cache=self.query_context_cache,
         )
 
         if context_data is None:
@@ -902,6 +970,10 @@ class LightRAG:
                 self.addon_params,
                 system_prompt=system_prompt,
                 chunks_vdb=self.chunks_vdb,
+                llm_response_cache=self._query_llm_response_cache,
+                llm_model_name=self.llm_model_name,
+                workspace=self.workspace,
+                context_cache=self.query_context_cache,
             )
         elif param.mode == "naive":
             response = await naive_query(
@@ -930,9 +1002,181 @@ class LightRAG:
     async def adelete_by_doc_id(self, doc_id: str) -> None:
         """Delete a document and all its related data
 
+        The document graph index is used to touch only the chunks, entities and relations
+        built from this document. Documents indexed before the index existed have no refs
+        and fall back to scanning the workspace.
+
         Args:
             doc_id: Document ID to delete
         """
+        refs = await self.doc_graph_index.get_doc_refs(doc_id)
+        if not refs:
+            self.lightrag_logger.info(f"No graph refs recorded for document {doc_id}, scanning workspace")
+            try:
+                await self._adelete_by_doc_id_scan(doc_id)
+            finally:
+                await self._bump_graph_version()
+            return
+
+        try:
+            self.lightrag_logger.info(f"Starting deletion for document {doc_id} from {len(refs)} graph refs")
+
+            # ========== STEP 1: Resolve the chunks, entities and relations of this document ==========
+            doc_chunk_ids = {ref.chunk_id for ref in refs}
+            # Chunk ids are content hashes, identical chunks of other documents must survive
+            shared_chunk_ids = await self.doc_graph_index.get_shared_chunk_ids(doc_id, list(doc_chunk_ids))
+            chunk_ids = doc_chunk_ids - shared_chunk_ids
+            entity_names = sorted({ref.entity_id for ref in refs if ref.ref_type == DocGraphRefType.ENTITY})
+            relation_pairs = sorted(
+                {(ref.entity_id, ref.target_entity_id) for ref in refs if ref.ref_type == DocGraphRefType.RELATION}
+            )
+            self.lightrag_logger.info(
+                f"Found {len(chunk_ids)} chunks ({len(shared_chunk_ids)} shared), {len(entity_names)} entities "
+                f"and {len(relation_pairs)} relationships for document {doc_id}"
+            )
+
+            if not chunk_ids:
+                await self.doc_graph_index.delete_doc_refs(doc_id)
+                return
+
+            # ========== STEP 2: Handle Graph Storage References (source_id strings) ==========
+            nodes = await self.chunk_entity_relation_graph.get_nodes_batch(entity_names)
+            edges = await self.chunk_entity_relation_graph.get_edges_batch(
+                [{"src": src, "tgt": tgt} for src, tgt in relation_pairs]
+            )
+            missing_count = sum(1 for entity_name in entity_names if not nodes.get(entity_name)) + sum(
+                1 for pair in relation_pairs if not (edges.get(pair) or {}).get("source_id")
+            )
+            if missing_count:
+                # The refs no longer match the graph (e.g. entities changed outside of extraction
+                # and merging), only a scan finds where the chunks of this document went
+                self.lightrag_logger.warning(
+                    f"{missing_count} graph items referenced by document {doc_id} no longer exist, scanning workspace"
+                )
+                await self._adelete_by_doc_id_scan(doc_id)
+                await self.doc_graph_index.delete_doc_refs(doc_id)
+                return
+
+            entities_to_delete_from_graph = []
+            entities_to_update_in_graph = {}
+            for entity_name, node_data in nodes.items():
+                remaining = self._remaining_source_ids(node_data.get("source_id"), chunk_ids)
+                if remaining is None:
+                    continue
+                if not remaining:
+                    entities_to_delete_from_graph.append(entity_name)
+                else:
+                    node_data["source_id"] = GRAPH_FIELD_SEP.join(remaining)
+                    entities_to_update_in_graph[entity_name] = node_data
+
+            relationships_to_delete_from_graph = []
+            relationships_to_update_in_graph = {}
+            for (src, tgt), edge_data in edges.items():
+                remaining = self._remaining_source_ids(edge_data.get("source_id"), chunk_ids)
+                if remaining is None:
+                    continue
+                if not remaining:
+                    relationships_to_delete_from_graph.append((src, tgt))
+                else:
+                    edge_data["source_id"] = GRAPH_FIELD_SEP.join(remaining)
+                    relationships_to_update_in_graph[(src, tgt)] = edge_data
+
+            # ========== STEP 3: Handle Vector Storage References (chunk_ids arrays) ==========
+            entity_vdb_ids = [
+                compute_mdhash_id(entity_name, prefix="ent-", workspace=self.workspace) for entity_name in entity_names
+            ]
+            entities_to_delete_from_vdb, entities_to_update_in_vdb = self._split_vdb_chunk_ids(
+                await self.entities_vdb.get_by_ids(entity_vdb_ids), chunk_ids
+            )
+
+            # Relations may have been stored under either endpoint order
+            relation_vdb_ids = []
+            for src, tgt in relation_pairs:
+                relation_vdb_ids.append(compute_mdhash_id(src + tgt, prefix="rel-", workspace=self.workspace))
+                relation_vdb_ids.append(compute_mdhash_id(tgt + src, prefix="rel-", workspace=self.workspace))
+            relationships_to_delete_from_vdb, relationships_to_update_in_vdb = self._split_vdb_chunk_ids(
+                await self.relationships_vdb.get_by_ids(relation_vdb_ids), chunk_ids
+            )
+
+            # ========== STEP 4: Execute all deletions and updates ==========
+
+            # 4.1 Delete and update entities and relationships in vector storage
+            if entities_to_delete_from_vdb:
+                await self.entities_vdb.delete(entities_to_delete_from_vdb)
+            if entities_to_update_in_vdb:
+                await self.entities_vdb.update_chunk_ids(entities_to_update_in_vdb)
+            if relationships_to_delete_from_vdb:
+                await self.relationships_vdb.delete(relationships_to_delete_from_vdb)
+            if relationships_to_update_in_vdb:
+                await self.relationships_vdb.update_chunk_ids(relationships_to_update_in_vdb)
+
+            # 4.2 Delete and update entities in graph storage
+            if entities_to_delete_from_graph:
+                await self.chunk_entity_relation_graph.remove_nodes(entities_to_delete_from_graph)
+            if entities_to_update_in_graph:
+                await self.chunk_entity_relation_graph.upsert_nodes_batch(entities_to_update_in_graph)
+
+            # 4.3 Delete and update relationships in graph storage
+            if relationships_to_delete_from_graph:
+                await self.chunk_entity_relation_graph.remove_edges(relationships_to_delete_from_graph)
+            if relationships_to_update_in_graph:
+                await self.chunk_entity_relation_graph.upsert_edges_batch(relationships_to_update_in_graph)
+
+            # 4.4 Finally, delete the chunks themselves and the refs of this document
+            await self.chunks_vdb.delete(list(chunk_ids))
+            await self.text_chunks.delete(list(chunk_ids))
+            await self.doc_graph_index.delete_doc_refs(doc_id)
+
+            self.lightrag_logger.info(
+                f"Document deletion completed for {doc_id}. "
+                f"Summary: {len(chunk_ids)} chunks, "
+                f"{len(entities_to_delete_from_vdb)} entities deleted and "
+                f"{len(entities_to_update_in_vdb)} updated in VDB, "
+                f"{len(relationships_to_delete_from_vdb)} relationships deleted and "
+                f"{len(relationships_to_update_in_vdb)} updated in VDB, "
+                f"{len(entities_to_delete_from_graph)} entities deleted and "
+                f"{len(entities_to_update_in_graph)} updated in graph, "
+                f"{len(relationships_to_delete_from_graph)} relationships deleted and "
+                f"{len(relationships_to_update_in_graph)} updated in graph."
+            )
+
+        except Exception as e:
+            self.lightrag_logger.error(f"Error while deleting document {doc_id}: {e}")
+            raise
+        finally:
+            # Even a failed deletion may have changed part of the graph
+            await self._bump_graph_version()
+
+    @staticmethod
+    def _remaining_source_ids(source_id: str | None, chunk_ids: set[str]) -> list[str] | None:
+        """Source chunk ids left after removing chunk_ids, or None if none of them were referenced"""
+        if not source_id:
+            return None
+        sources = set(source_id.split(GRAPH_FIELD_SEP))
+        if sources.isdisjoint(chunk_ids):
+            return None
+        return sorted(sources - chunk_ids)
+
+    @staticmethod
+    def _split_vdb_chunk_ids(
+        records: list[dict[str, Any]], chunk_ids: set[str]
+    ) -> tuple[list[str], dict[str, list[str]]]:
+        """Split VDB records into ids to delete and ids whose chunk_ids must be narrowed"""
+        ids_to_delete = []
+        chunk_ids_to_update = {}
+        for record in records:
+            old_chunk_ids = set(record.get("chunk_ids") or [])
+            if old_chunk_ids.isdisjoint(chunk_ids):
+                continue
+            new_chunk_ids = old_chunk_ids - chunk_ids
+            if not new_chunk_ids:
+                ids_to_delete.append(record["id"])
+            else:
+                chunk_ids_to_update[record["id"]] = sorted(new_chunk_ids)
+        return ids_to_delete, chunk_ids_to_update
+
+    async def _adelete_by_doc_id_scan(self, doc_id: str) -> None:
+        """Delete a document by scanning every chunk, entity and relation of the workspace"""
         try:
             self.lightrag_logger.info(f"Starting deletion for document {doc_id}")
 
@@ -1189,8 +1433,6 @@ class LightRAG:
         Raises:
             Exception: If suggestion generation fails
         """
-        import time
-
         from .operate import (
             analyze_entities_with_llm,
             filter_and_deduplicate_suggestions,
@@ -1481,9 +1723,10 @@ class LightRAG:
                 relation_updates[relation_key]["data"] = merged_relation
                 self.lightrag_logger.debug(f"Merged duplicate relationship: {new_src} <-> {new_tgt}")
             else:
+                # Store the endpoints in sorted order like extraction does, so the doc graph refs find the edge
                 relation_updates[relation_key] = {
-                    "src": new_src,
-                    "tgt": new_tgt,
+                    "src": relation_key[0],
+                    "tgt": relation_key[1],
                     "data": edge_data.copy(),
                 }
 
@@ -1555,6 +1798,9 @@ class LightRAG:
             await self.chunk_entity_relation_graph.delete_node(entity_id)
             self.lightrag_logger.debug(f"Deleted source entity {entity_id} from graph storage")
 
+        # Documents that built the source entities now reach them through the target entity
+        await self.doc_graph_index.redirect_entity_refs(source_entities, target_entity_name)
+
         self.lightrag_logger.info(
             f"Multi-node merge completed: {source_entities} -> {target_entity_name}, redirected {redirected_edges} edges"
         )
@@ -1568,6 +1814,8 @@ class LightRAG:
             "file_path": merged_entity_data.get("file_path", ""),
         }
 
+        await self._bump_graph_version()
+
         return {
             "status": "success",
             "message": f"Successfully merged {len(source_entities)} entities into {target_entity_name}",
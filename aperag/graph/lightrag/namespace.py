@@ -38,6 +38,7 @@ from typing import Iterable
 
 class NameSpace:
     KV_STORE_TEXT_CHUNKS = "text_chunks"
+    KV_STORE_LLM_RESPONSE_CACHE = "llm_response_cache"
 
     VECTOR_STORE_ENTITIES = "entities"
     VECTOR_STORE_RELATIONSHIPS = "relationships"
@@ -45,6 +46,8 @@ class NameSpace:
 
     GRAPH_STORE_CHUNK_ENTITY_RELATION = "chunk_entity_relation"
 
+    DOC_GRAPH_INDEX = "doc_graph_index"
+
 
 def is_namespace(namespace: str, base_namespace: str | Iterable[str]):
     """Check if namespace matches the base namespace"""
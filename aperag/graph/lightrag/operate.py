@@ -34,19 +34,25 @@ Modifications by ApeRAG Team:
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import os
 import re
 import time
 from collections import Counter, defaultdict
+from contextlib import AsyncExitStack
 from typing import Any, AsyncIterator
 
 from aperag.concurrent_control import get_or_create_lock
 
 from .base import (
+    BaseDocGraphIndexStorage,
     BaseGraphStorage,
     BaseKVStorage,
     BaseVectorStorage,
+    DocGraphRef,
+    DocGraphRefType,
+    EgoNetwork,
     QueryParam,
     TextChunkSchema,
 )
@@ -231,10 +237,10 @@ async def _handle_single_relationship_extraction(
     )
 
 
-async def _merge_nodes_then_upsert(
+async def _merge_nodes(
     entity_name: str,
     nodes_data: list[dict],
-    knowledge_graph_inst: BaseGraphStorage,
+    already_node: dict | None,
     llm_model_func: callable,
     tokenizer: Tokenizer,
     llm_model_max_token_size: int,
@@ -242,22 +248,22 @@ async def _merge_nodes_then_upsert(
     language: str,
     force_llm_summary_on_merge: int,
     lightrag_logger: LightRAGLogger | None = None,
-    workspace: str = "",
 ):
     """
-    Merge multiple entity nodes with the same name and upsert the result to knowledge graph.
+    Merge multiple entity nodes with the same name with the stored entity.
 
     This function handles entity deduplication by:
-    1. Retrieving existing entity data from knowledge graph
+    1. Collecting the stored entity data, if any
     2. Merging existing data with new entity data
     3. Determining the final entity properties through aggregation
     4. Optionally using LLM to summarize lengthy descriptions
-    5. Upserting the merged entity back to knowledge graph
+
+    The caller is responsible for upserting the result, so writes can be batched.
 
     Args:
         entity_name: The name of the entity to merge
         nodes_data: List of new entity data dictionaries to merge
-        knowledge_graph_inst: Knowledge graph storage instance
+        already_node: The stored entity data, or None if the entity is new
         llm_model_func: LLM function for description summarization
         tokenizer: Tokenizer for text processing
         llm_model_max_token_size: Maximum token size for LLM input
@@ -265,10 +271,9 @@ async def _merge_nodes_then_upsert(
         language: Language for LLM summarization
         force_llm_summary_on_merge: Threshold for triggering LLM summarization
         lightrag_logger: Optional logger instance
-        workspace: Workspace identifier for lock creation
 
     Returns:
-        dict: The merged node data that was upserted
+        dict: The merged node data to upsert
     """
 
     # 1. Initialize containers for collecting existing entity data
@@ -277,20 +282,23 @@ async def _merge_nodes_then_upsert(
     already_description = []
     already_file_paths = []
 
-    # 2. Retrieve existing entity from knowledge graph if it exists
-    already_node = await knowledge_graph_inst.get_node(entity_name)
+    # 2. Collect the existing entity from knowledge graph if it exists
     if already_node:
         # 2.1. Collect existing entity type
-        already_entity_types.append(already_node["entity_type"])
+        if already_node.get("entity_type"):
+            already_entity_types.append(already_node["entity_type"])
 
         # 2.2. Split and collect existing source IDs (multiple IDs separated by GRAPH_FIELD_SEP)
-        already_source_ids.extend(split_string_by_multi_markers(already_node["source_id"], [GRAPH_FIELD_SEP]))
+        if already_node.get("source_id"):
+            already_source_ids.extend(split_string_by_multi_markers(already_node["source_id"], [GRAPH_FIELD_SEP]))
 
         # 2.3. Split and collect existing file paths (multiple paths separated by GRAPH_FIELD_SEP)
-        already_file_paths.extend(split_string_by_multi_markers(already_node["file_path"], [GRAPH_FIELD_SEP]))
+        if already_node.get("file_path"):
+            already_file_paths.extend(split_string_by_multi_markers(already_node["file_path"], [GRAPH_FIELD_SEP]))
 
         # 2.4. Collect existing description
-        already_description.append(already_node["description"])
+        if already_node.get("description"):
+            already_description.append(already_node["description"])
 
     # 3. Merge and determine final entity properties
 
@@ -346,22 +354,14 @@ async def _merge_nodes_then_upsert(
         created_at=int(time.time()),
     )
 
-    # 7. Upsert the merged entity to knowledge graph
-    await knowledge_graph_inst.upsert_node(
-        entity_name,
-        node_data=node_data,
-    )
-
-    # 8. Add entity_name to returned data and return the final merged entity
-    node_data["entity_name"] = entity_name
     return node_data
 
 
-async def _merge_edges_then_upsert(
+async def _merge_edges(
     src_id: str,
     tgt_id: str,
     edges_data: list[dict],
-    knowledge_graph_inst: BaseGraphStorage,
+    already_edge: dict | None,
     llm_model_func: callable,
     tokenizer: Tokenizer,
     llm_model_max_token_size: int,
@@ -369,8 +369,16 @@ async def _merge_edges_then_upsert(
     language: str,
     force_llm_summary_on_merge: int,
     lightrag_logger: LightRAGLogger,
-    workspace: str = "",
 ):
+    """
+    Merge multiple relationships between the same entities with the stored relationship.
+
+    The caller is responsible for upserting the result and any missing endpoint nodes,
+    so writes can be batched.
+
+    Returns:
+        dict | None: The merged edge data to upsert, or None for a self loop
+    """
     if src_id == tgt_id:
         return None
 
@@ -380,28 +388,26 @@ async def _merge_edges_then_upsert(
     already_keywords = []
     already_file_paths = []
 
-    if await knowledge_graph_inst.has_edge(src_id, tgt_id):
-        already_edge = await knowledge_graph_inst.get_edge(src_id, tgt_id)
-        # Handle the case where get_edge returns None or missing fields
-        if already_edge:
-            # Get weight with default 0.0 if missing
-            already_weights.append(already_edge.get("weight", 0.0))
+    # Handle the case where the stored edge is missing or has missing fields
+    if already_edge:
+        # Get weight with default 0.0 if missing
+        already_weights.append(already_edge.get("weight", 0.0))
 
-            # Get source_id with empty string default if missing or None
-            if already_edge.get("source_id") is not None:
-                already_source_ids.extend(split_string_by_multi_markers(already_edge["source_id"], [GRAPH_FIELD_SEP]))
+        # Get source_id with empty string default if missing or None
+        if already_edge.get("source_id") is not None:
+            already_source_ids.extend(split_string_by_multi_markers(already_edge["source_id"], [GRAPH_FIELD_SEP]))
 
-            # Get file_path with empty string default if missing or None
-            if already_edge.get("file_path") is not None:
-                already_file_paths.extend(split_string_by_multi_markers(already_edge["file_path"], [GRAPH_FIELD_SEP]))
+        # Get file_path with empty string default if missing or None
+        if already_edge.get("file_path") is not None:
+            already_file_paths.extend(split_string_by_multi_markers(already_edge["file_path"], [GRAPH_FIELD_SEP]))
 
-            # Get description with empty string default if missing or None
-            if already_edge.get("description") is not None:
-                already_description.append(already_edge["description"])
+        # Get description with empty string default if missing or None
+        if already_edge.get("description") is not None:
+            already_description.append(already_edge["description"])
 
-            # Get keywords with empty string default if missing or None
-            if already_edge.get("keywords") is not None:
-                already_keywords.extend(split_string_by_multi_markers(already_edge["keywords"], [GRAPH_FIELD_SEP]))
+        # Get keywords with empty string default if missing or None
+        if already_edge.get("keywords") is not None:
+            already_keywords.extend(split_string_by_multi_markers(already_edge["keywords"], [GRAPH_FIELD_SEP]))
 
     # Process edges_data with None checks
     weight = sum([dp["weight"] for dp in edges_data] + already_weights)
@@ -429,20 +435,6 @@ async def _merge_edges_then_upsert(
         set([dp["file_path"] for dp in edges_data if dp.get("file_path")] + already_file_paths)
     )
 
-    for need_insert_id in [src_id, tgt_id]:
-        if not (await knowledge_graph_inst.has_node(need_insert_id)):
-            await knowledge_graph_inst.upsert_node(
-                need_insert_id,
-                node_data={
-                    "entity_id": need_insert_id,
-                    "source_id": source_id,
-                    "description": description,
-                    "entity_type": "UNKNOWN",
-                    "file_path": file_path,
-                    "created_at": int(time.time()),
-                },
-            )
-
     num_fragment = description.count(GRAPH_FIELD_SEP) + 1
     num_new_fragment = len(set([dp["description"] for dp in edges_data if dp.get("description")]))
 
@@ -463,22 +455,8 @@ async def _merge_edges_then_upsert(
         else:
             lightrag_logger.log_relation_merge(src_id, tgt_id, num_fragment, num_new_fragment, is_llm_summary=False)
 
-    await knowledge_graph_inst.upsert_edge(
-        src_id,
-        tgt_id,
-        edge_data=dict(
-            weight=weight,
-            description=description,
-            keywords=keywords,
-            source_id=source_id,
-            file_path=file_path,
-            created_at=int(time.time()),
-        ),
-    )
-
-    edge_data = dict(
-        src_id=src_id,
-        tgt_id=tgt_id,
+    return dict(
+        weight=weight,
         description=description,
         keywords=keywords,
         source_id=source_id,
@@ -486,8 +464,6 @@ async def _merge_edges_then_upsert(
         created_at=int(time.time()),
     )
 
-    return edge_data
-
 
 @timing_wrapper("merge_nodes_and_edges")
 async def merge_nodes_and_edges(
@@ -504,6 +480,8 @@ async def merge_nodes_and_edges(
     addon_params,
     force_llm_summary_on_merge,
     lightrag_logger: LightRAGLogger,
+    doc_graph_index: BaseDocGraphIndexStorage | None = None,
+    chunk_doc_ids: dict[str, str] | None = None,
 ) -> dict[str, int]:
     # Now using fine-grained locking inside _merge_nodes_and_edges_impl
     return await _merge_nodes_and_edges_impl(
@@ -519,6 +497,8 @@ async def merge_nodes_and_edges(
         addon_params,
         force_llm_summary_on_merge,
         lightrag_logger,
+        doc_graph_index,
+        chunk_doc_ids,
     )
 
 
@@ -535,8 +515,10 @@ async def _merge_nodes_and_edges_impl(
     addon_params,
     force_llm_summary_on_merge,
     lightrag_logger: LightRAGLogger,
+    doc_graph_index: BaseDocGraphIndexStorage | None = None,
+    chunk_doc_ids: dict[str, str] | None = None,
 ) -> dict[str, int]:
-    """Internal implementation of merge_nodes_and_edges with fine-grained locking"""
+    """Internal implementation of merge_nodes_and_edges, batching graph writes per component"""
 
     # Extract language from addon_params
     language = addon_params.get("language", "English")
@@ -555,19 +537,25 @@ async def _merge_nodes_and_edges_impl(
             sorted_edge_key = tuple(sorted(edge_key))
             all_edges[sorted_edge_key].extend(edges)
 
-    # Process entities with fine-grained locking
-    entity_count = 0
-
-    for entity_name, entities in all_nodes.items():
-        # Create lock for this specific entity
-        entity_lock = get_or_create_lock(f"entity:{entity_name}:{workspace}")
-
-        async with entity_lock:
-            # Process and update entity in graph db
-            entity_data = await _merge_nodes_then_upsert(
+    entity_names = sorted(all_nodes)
+    edge_keys = sorted(all_edges)
+
+    async with AsyncExitStack() as locks:
+        # Hold the locks of every entity and relationship in this component while reading,
+        # merging and writing them as a batch. A stable order avoids lock-order deadlocks.
+        for entity_name in entity_names:
+            await locks.enter_async_context(get_or_create_lock(f"entity:{entity_name}:{workspace}"))
+        for src_id, tgt_id in edge_keys:
+            await locks.enter_async_context(get_or_create_lock(f"relationship:{src_id}:{tgt_id}:{workspace}"))
+
+        # 1. Merge entities with their stored versions
+        already_nodes = await knowledge_graph_inst.get_nodes_batch(entity_names)
+        nodes_to_upsert = {}
+        for entity_name in entity_names:
+            nodes_to_upsert[entity_name] = await _merge_nodes(
                 entity_name,
-                entities,
-                knowledge_graph_inst,
+                all_nodes[entity_name],
+                already_nodes.get(entity_name),
                 llm_model_func,
                 tokenizer,
                 llm_model_max_token_size,
@@ -575,40 +563,19 @@ async def _merge_nodes_and_edges_impl(
                 language,  # Pass language instead of addon_params
                 force_llm_summary_on_merge,
                 lightrag_logger,
-                workspace,
             )
 
-            # Update entity in vector db immediately under the same lock
-            if entity_vdb is not None and entity_data:
-                vdb_data = {
-                    compute_mdhash_id(entity_data["entity_name"], prefix="ent-", workspace=workspace): {
-                        "entity_name": entity_data["entity_name"],
-                        "entity_type": entity_data["entity_type"],
-                        "content": f"{entity_data['entity_name']}\n{entity_data['description']}",
-                        "source_id": entity_data["source_id"],
-                        "file_path": entity_data.get("file_path", "unknown_source"),
-                    }
-                }
-                await entity_vdb.upsert(vdb_data)
-
-            entity_count += 1
-
-    # Process relationships with fine-grained locking
-    relation_count = 0
-
-    for edge_key, edges in all_edges.items():
-        # Create lock for this specific relationship
-        # Sort edge key to ensure consistent lock naming
-        sorted_edge_key = tuple(sorted(edge_key))
-        relationship_lock = get_or_create_lock(f"relationship:{sorted_edge_key[0]}:{sorted_edge_key[1]}:{workspace}")
-
-        async with relationship_lock:
-            # Process and update relationship in graph db
-            edge_data = await _merge_edges_then_upsert(
-                edge_key[0],
-                edge_key[1],
-                edges,
-                knowledge_graph_inst,
+        # 2. Merge relationships with their stored versions
+        already_edges = await knowledge_graph_inst.get_edges_batch(
+            [{"src": src_id, "tgt": tgt_id} for src_id, tgt_id in edge_keys if src_id != tgt_id]
+        )
+        edges_to_upsert = {}
+        for src_id, tgt_id in edge_keys:
+            edge_data = await _merge_edges(
+                src_id,
+                tgt_id,
+                all_edges[(src_id, tgt_id)],
+                already_edges.get((src_id, tgt_id)),
                 llm_model_func,
                 tokenizer,
                 llm_model_max_token_size,
@@ -616,29 +583,104 @@ async def _merge_nodes_and_edges_impl(
                 language,  # Pass language instead of addon_params
                 force_llm_summary_on_merge,
                 lightrag_logger,
-                workspace,
             )
+            if edge_data is not None:
+                edges_to_upsert[(src_id, tgt_id)] = edge_data
+
+        # 3. Endpoints that are neither extracted here nor stored yet get a placeholder node
+        endpoint_ids = sorted({node_id for edge_key in edges_to_upsert for node_id in edge_key} - set(nodes_to_upsert))
+        existing_endpoints = await knowledge_graph_inst.get_nodes_batch(endpoint_ids) if endpoint_ids else {}
+        for edge_key, edge_data in edges_to_upsert.items():
+            for node_id in edge_key:
+                if node_id in nodes_to_upsert or node_id in existing_endpoints:
+                    continue
+                nodes_to_upsert[node_id] = {
+                    "entity_id": node_id,
+                    "source_id": edge_data["source_id"],
+                    "description": edge_data["description"],
+                    "entity_type": "UNKNOWN",
+                    "file_path": edge_data["file_path"],
+                    "created_at": int(time.time()),
+                }
 
-            # Update relationship in vector db immediately under the same lock
-            if relationships_vdb is not None and edge_data is not None:
-                vdb_data = {
-                    compute_mdhash_id(edge_data["src_id"] + edge_data["tgt_id"], prefix="rel-", workspace=workspace): {
-                        "src_id": edge_data["src_id"],
-                        "tgt_id": edge_data["tgt_id"],
-                        "keywords": edge_data["keywords"],
-                        "content": f"{edge_data['src_id']}\t{edge_data['tgt_id']}\n{edge_data['keywords']}\n{edge_data['description']}",
-                        "source_id": edge_data["source_id"],
-                        "file_path": edge_data.get("file_path", "unknown_source"),
-                    }
+        # 4. Flush the component to the graph, nodes first so every edge has its endpoints
+        await knowledge_graph_inst.upsert_nodes_batch(nodes_to_upsert)
+        await knowledge_graph_inst.upsert_edges_batch(edges_to_upsert)
+
+        # 5. Update entities and relationships in vector db under the same locks. Each storage gets the
+        # whole component in one upsert, so embeddings are computed in large batches and rows are
+        # written with multi-row statements.
+        entity_vdb_data = {}
+        if entity_vdb is not None:
+            for entity_name in entity_names:
+                node_data = nodes_to_upsert[entity_name]
+                entity_vdb_data[compute_mdhash_id(entity_name, prefix="ent-", workspace=workspace)] = {
+                    "entity_name": entity_name,
+                    "entity_type": node_data["entity_type"],
+                    "content": f"{entity_name}\n{node_data['description']}",
+                    "source_id": node_data["source_id"],
+                    "file_path": node_data.get("file_path", "unknown_source"),
                 }
-                await relationships_vdb.upsert(vdb_data)
 
-            if edge_data is not None:
-                relation_count += 1
+        relationship_vdb_data = {}
+        if relationships_vdb is not None:
+            for (src_id, tgt_id), edge_data in edges_to_upsert.items():
+                relationship_vdb_data[compute_mdhash_id(src_id + tgt_id, prefix="rel-", workspace=workspace)] = {
+                    "src_id": src_id,
+                    "tgt_id": tgt_id,
+                    "keywords": edge_data["keywords"],
+                    "content": f"{src_id}\t{tgt_id}\n{edge_data['keywords']}\n{edge_data['description']}",
+                    "source_id": edge_data["source_id"],
+                    "file_path": edge_data.get("file_path", "unknown_source"),
+                }
+
+        vdb_upserts = []
+        if entity_vdb_data:
+            vdb_upserts.append(entity_vdb.upsert(entity_vdb_data))
+        if relationship_vdb_data:
+            vdb_upserts.append(relationships_vdb.upsert(relationship_vdb_data))
+        await asyncio.gather(*vdb_upserts)
+
+    entity_count = len(entity_names)
+    relation_count = len(edges_to_upsert)
+
+    # Record which document chunks produced each entity and relation, so deleting a
+    # document can find its graph items without scanning the whole workspace
+    if doc_graph_index is not None and chunk_doc_ids:
+        await doc_graph_index.add_refs(_collect_doc_graph_refs(all_nodes, all_edges, chunk_doc_ids))
 
     return {"entity_count": entity_count, "relation_count": relation_count}
 
 
+def _collect_doc_graph_refs(
+    all_nodes: dict[str, list[dict]],
+    all_edges: dict[tuple[str, str], list[dict]],
+    chunk_doc_ids: dict[str, str],
+) -> list[DocGraphRef]:
+    """Build the document graph refs of merged nodes and edges from their source chunks"""
+    refs = set()
+
+    for entity_name, entities in all_nodes.items():
+        for dp in entities:
+            doc_id = chunk_doc_ids.get(dp["source_id"])
+            if doc_id:
+                refs.add(DocGraphRef(doc_id, dp["source_id"], DocGraphRefType.ENTITY, entity_name))
+
+    for (src_id, tgt_id), edges in all_edges.items():
+        if src_id == tgt_id:
+            continue
+        for dp in edges:
+            doc_id = chunk_doc_ids.get(dp.get("source_id"))
+            if not doc_id:
+                continue
+            refs.add(DocGraphRef(doc_id, dp["source_id"], DocGraphRefType.RELATION, src_id, tgt_id))
+            # Endpoints may have been created from this edge alone, so they carry its chunks too
+            refs.add(DocGraphRef(doc_id, dp["source_id"], DocGraphRefType.ENTITY, src_id))
+            refs.add(DocGraphRef(doc_id, dp["source_id"], DocGraphRefType.ENTITY, tgt_id))
+
+    return list(refs)
+
+
 @timing_wrapper("extract_entities")
 async def extract_entities(
     chunks: dict[str, TextChunkSchema],
@@ -647,7 +689,19 @@ async def extract_entities(
     addon_params: dict,
     llm_model_max_async: int,
     lightrag_logger: LightRAGLogger,
-) -> list:
+    llm_response_cache: BaseKVStorage | None = None,
+    llm_model_name: str = "",
+) -> tuple[list, int]:
+    """Extract entities and relationships from chunks.
+
+    Raw LLM outputs are cached in llm_response_cache, keyed by model, prompt version,
+    language, entity types and chunk content, so identical chunks are never sent to
+    the LLM twice.
+
+    Returns:
+        tuple: (chunk_results, cache_hits) where chunk_results holds one (nodes, edges)
+        pair per chunk and cache_hits counts chunks served from the cache
+    """
     ordered_chunks = list(chunks.items())
     # add language and example number params to prompt
     language = addon_params.get("language", PROMPTS["DEFAULT_LANGUAGE"])
@@ -683,6 +737,34 @@ async def extract_entities(
 
     processed_chunks = 0
     total_chunks = len(ordered_chunks)
+    cache_hits = 0
+
+    # Any change to the prompts or the gleaning rounds invalidates previous extractions
+    prompt_version = hashlib.sha256(
+        "\n".join(
+            [
+                entity_extract_prompt.format(**{**context_base, "input_text": ""}),
+                continue_prompt,
+                if_loop_prompt,
+                str(entity_extract_max_gleaning),
+            ]
+        ).encode("utf-8")
+    ).hexdigest()
+
+    def _extraction_cache_key(content: str) -> str:
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        key_parts = json.dumps([llm_model_name, prompt_version, language, list(entity_types), content_hash])
+        return "extract-" + hashlib.sha256(key_parts.encode("utf-8")).hexdigest()
+
+    cached_extractions = {}
+    if llm_response_cache is not None:
+        cache_keys = list({_extraction_cache_key(chunk_dp["content"]) for _, chunk_dp in ordered_chunks})
+        try:
+            for cache_item in await llm_response_cache.get_by_ids(cache_keys):
+                cached_extractions[cache_item["id"]] = json.loads(cache_item["return_value"])
+        except Exception as e:
+            # The cache is an optimization; extraction must not fail because of it
+            lightrag_logger.warning(f"Failed to read extraction cache: {e}")
 
     async def _process_extraction_result(result: str, chunk_key: str, file_path: str = "unknown_source"):
         """Process a single extraction result (either initial or gleaning)
@@ -719,6 +801,36 @@ async def extract_entities(
 
         return maybe_nodes, maybe_edges
 
+    async def _extract_raw_results(content: str) -> list[str]:
+        """Run the initial extraction and gleaning rounds on the LLM
+        Args:
+            content (str): The chunk content
+        Returns:
+            list[str]: The raw initial extraction result followed by the gleaning results
+        """
+        # Get initial extraction
+        hint_prompt = entity_extract_prompt.format(**{**context_base, "input_text": content})
+
+        final_result = await use_llm_func(hint_prompt)
+        history = pack_user_ass_to_openai_messages(hint_prompt, final_result)
+        raw_results = [final_result]
+
+        for now_glean_index in range(entity_extract_max_gleaning):
+            glean_result = await use_llm_func(continue_prompt, history_messages=history)
+
+            history += pack_user_ass_to_openai_messages(continue_prompt, glean_result)
+            raw_results.append(glean_result)
+
+            if now_glean_index == entity_extract_max_gleaning - 1:
+                break
+
+            if_loop_result: str = await use_llm_func(if_loop_prompt, history_messages=history)
+            if_loop_result = if_loop_result.strip().strip('"').strip("'").lower()
+            if if_loop_result != "yes":
+                break
+
+        return raw_results
+
     async def _process_single_content(chunk_key_dp: tuple[str, TextChunkSchema]):
         """Process a single chunk
         Args:
@@ -727,28 +839,38 @@ async def extract_entities(
         Returns:
             tuple: (maybe_nodes, maybe_edges) containing extracted entities and relationships
         """
-        nonlocal processed_chunks
+        nonlocal processed_chunks, cache_hits
         chunk_key = chunk_key_dp[0]
         chunk_dp = chunk_key_dp[1]
         content = chunk_dp["content"]
         # Get file path from chunk data or use default
         file_path = chunk_dp.get("file_path", "unknown_source")
 
-        # Get initial extraction
-        hint_prompt = entity_extract_prompt.format(**{**context_base, "input_text": content})
-
-        final_result = await use_llm_func(hint_prompt)
-        history = pack_user_ass_to_openai_messages(hint_prompt, final_result)
+        cache_key = _extraction_cache_key(content) if llm_response_cache is not None else None
+        raw_results = cached_extractions.get(cache_key)
+        if raw_results:
+            cache_hits += 1
+        else:
+            raw_results = await _extract_raw_results(content)
+            if cache_key is not None:
+                try:
+                    await llm_response_cache.upsert(
+                        {
+                            cache_key: {
+                                "cache_type": "extract",
+                                "model": llm_model_name,
+                                "return_value": json.dumps(raw_results, ensure_ascii=False),
+                            }
+                        }
+                    )
+                except Exception as e:
+                    lightrag_logger.warning(f"Failed to write extraction cache for chunk {chunk_key}: {e}")
 
         # Process initial extraction with file path
-        maybe_nodes, maybe_edges = await _process_extraction_result(final_result, chunk_key, file_path)
+        maybe_nodes, maybe_edges = await _process_extraction_result(raw_results[0], chunk_key, file_path)
 
         # Process additional gleaning results
-        for now_glean_index in range(entity_extract_max_gleaning):
-            glean_result = await use_llm_func(continue_prompt, history_messages=history)
-
-            history += pack_user_ass_to_openai_messages(continue_prompt, glean_result)
-
+        for glean_result in raw_results[1:]:
             # Process gleaning result separately with file path
             glean_nodes, glean_edges = await _process_extraction_result(glean_result, chunk_key, file_path)
 
@@ -760,14 +882,6 @@ async def extract_entities(
                 if edge_key not in maybe_edges:  # Only accetp edges with new name in gleaning stage
                     maybe_edges[edge_key].extend(edges)
 
-            if now_glean_index == entity_extract_max_gleaning - 1:
-                break
-
-            if_loop_result: str = await use_llm_func(if_loop_prompt, history_messages=history)
-            if_loop_result = if_loop_result.strip().strip('"').strip("'").lower()
-            if if_loop_result != "yes":
-                break
-
         processed_chunks += 1
         entities_count = len(maybe_nodes)
         relations_count = len(maybe_edges)
@@ -811,8 +925,11 @@ async def extract_entities(
     # If all tasks completed successfully, collect results
     chunk_results = [task.result() for task in tasks]
 
+    if llm_response_cache is not None:
+        lightrag_logger.info(f"Extraction cache: {cache_hits}/{total_chunks} chunks served from cache")
+
     # Return the chunk_results for later processing in merge_nodes_and_edges
-    return chunk_results
+    return chunk_results, cache_hits
 
 
 async def build_query_context(
@@ -826,14 +943,32 @@ async def build_query_context(
     llm_model_func: callable,
     addon_params: dict,
     chunks_vdb: BaseVectorStorage = None,
+    llm_response_cache: BaseKVStorage | None = None,
+    llm_model_name: str = "",
+    workspace: str = "",
+    context_cache: Any = None,
 ):
+    """
+    Extract keywords from the query and build the entity, relation and text unit contexts.
+
+    Keywords are cached in llm_response_cache by model and prompt. Assembled contexts are
+    cached in context_cache by the workspace graph version, the keywords and the query
+    parameters that shape retrieval, so a graph change invalidates them.
+    """
     if query_param.model_func:
         use_model_func = query_param.model_func
     else:
         use_model_func = llm_model_func
 
     hl_keywords, ll_keywords = await get_keywords_from_query(
-        query, query_param, tokenizer, use_model_func, addon_params
+        query,
+        query_param,
+        tokenizer,
+        use_model_func,
+        addon_params,
+        # A custom model function has no name to key the cache on
+        llm_response_cache=None if query_param.model_func else llm_response_cache,
+        llm_model_name=llm_model_name,
     )
 
     logger.debug(f"High-level keywords: {hl_keywords}")
@@ -859,8 +994,29 @@ async def build_query_context(
     ll_keywords_str = ", ".join(ll_keywords) if ll_keywords else ""
     hl_keywords_str = ", ".join(hl_keywords) if hl_keywords else ""
 
+    graph_version = await context_cache.get_version(workspace) if context_cache is not None else None
+    context_key = None
+    if graph_version is not None:
+        context_key = [
+            ll_keywords_str,
+            hl_keywords_str,
+            query_param.mode,
+            query_param.top_k,
+            query_param.ef_search,
+            query_param.max_token_for_text_unit,
+            query_param.max_token_for_global_context,
+            query_param.max_token_for_local_context,
+            query_param.ids,
+            # Mix mode also runs a vector search on the original query
+            query_param.original_query if query_param.mode == "mix" else None,
+        ]
+        cached_context = await context_cache.get(workspace, graph_version, context_key)
+        if cached_context is not None:
+            logger.debug(f"Graph context cache hit for workspace {workspace}")
+            return tuple(cached_context)
+
     # Build context
-    return await _build_query_context_from_keywords(
+    context_data = await _build_query_context_from_keywords(
         ll_keywords_str,
         hl_keywords_str,
         knowledge_graph_inst,
@@ -872,6 +1028,10 @@ async def build_query_context(
         chunks_vdb,
     )
 
+    if context_key is not None and isinstance(context_data, tuple):
+        await context_cache.put(workspace, graph_version, context_key, list(context_data))
+    return context_data
+
 
 async def kg_query(
     query: str,
@@ -885,6 +1045,10 @@ async def kg_query(
     addon_params: dict,
     system_prompt: str | None = None,
     chunks_vdb: BaseVectorStorage = None,
+    llm_response_cache: BaseKVStorage | None = None,
+    llm_model_name: str = "",
+    workspace: str = "",
+    context_cache: Any = None,
 ) -> str | AsyncIterator[str]:
     if query_param.model_func:
         use_model_func = query_param.model_func
@@ -903,6 +1067,10 @@ async def kg_query(
         llm_model_func,
         addon_params,
         chunks_vdb,
+        llm_response_cache=llm_response_cache,
+        llm_model_name=llm_model_name,
+        workspace=workspace,
+        context_cache=context_cache,
     )
 
     # 转换为 JSON 字符串
@@ -981,6 +1149,8 @@ async def get_keywords_from_query(
     tokenizer: Tokenizer,
     llm_model_func: callable,
     addon_params: dict,
+    llm_response_cache: BaseKVStorage | None = None,
+    llm_model_name: str = "",
 ) -> tuple[list[str], list[str]]:
     """
     Retrieves high-level and low-level keywords for RAG operations.
@@ -996,7 +1166,15 @@ async def get_keywords_from_query(
         return query_param.hl_keywords, query_param.ll_keywords
 
     # Extract keywords using extract_keywords_only function which already supports conversation history
-    hl_keywords, ll_keywords = await extract_keywords_only(query, query_param, tokenizer, llm_model_func, addon_params)
+    hl_keywords, ll_keywords = await extract_keywords_only(
+        query,
+        query_param,
+        tokenizer,
+        llm_model_func,
+        addon_params,
+        llm_response_cache=llm_response_cache,
+        llm_model_name=llm_model_name,
+    )
     return hl_keywords, ll_keywords
 
 
@@ -1006,11 +1184,16 @@ async def extract_keywords_only(
     tokenizer: Tokenizer,
     llm_model_func: callable,
     addon_params: dict,
+    llm_response_cache: BaseKVStorage | None = None,
+    llm_model_name: str = "",
 ) -> tuple[list[str], list[str]]:
     """
     Extract high-level and low-level keywords from the given 'text' using the LLM.
     This method does NOT build the final RAG context or provide a final answer.
     It ONLY extracts keywords (hl_keywords, ll_keywords).
+
+    Results are cached in llm_response_cache, keyed by model and the rendered prompt,
+    which covers the query, language, examples and conversation history.
     """
     # 2. Build the examples
     example_number = addon_params.get("example_number", None)
@@ -1033,6 +1216,19 @@ async def extract_keywords_only(
     len_of_prompts = len(tokenizer.encode(kw_prompt))
     logger.debug(f"[kg_query]Prompt Tokens: {len_of_prompts}")
 
+    cache_key = None
+    if llm_response_cache is not None:
+        key_parts = json.dumps([llm_model_name, kw_prompt], ensure_ascii=False)
+        cache_key = "keywords-" + hashlib.sha256(key_parts.encode("utf-8")).hexdigest()
+        try:
+            cached = await llm_response_cache.get_by_id(cache_key)
+            if cached:
+                keywords_data = json.loads(cached["return_value"])
+                return keywords_data["high_level_keywords"], keywords_data["low_level_keywords"]
+        except Exception as e:
+            # The cache is an optimization; queries must not fail because of it
+            logger.warning(f"Failed to read keywords cache: {e}")
+
     # 5. Call the LLM for keyword extraction
     if param.model_func:
         use_model_func = param.model_func
@@ -1055,6 +1251,23 @@ async def extract_keywords_only(
     hl_keywords = keywords_data.get("high_level_keywords", [])
     ll_keywords = keywords_data.get("low_level_keywords", [])
 
+    if cache_key is not None and (hl_keywords or ll_keywords):
+        try:
+            await llm_response_cache.upsert(
+                {
+                    cache_key: {
+                        "cache_type": "keywords",
+                        "model": llm_model_name,
+                        "return_value": json.dumps(
+                            {"high_level_keywords": hl_keywords, "low_level_keywords": ll_keywords},
+                            ensure_ascii=False,
+                        ),
+                    }
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write keywords cache: {e}")
+
     return hl_keywords, ll_keywords
 
 
@@ -1081,7 +1294,9 @@ async def _get_vector_context(
         compatible with _get_edge_data and _get_node_data format
     """
     try:
-        results = await chunks_vdb.query(query, top_k=query_param.top_k, ids=query_param.ids)
+        results = await chunks_vdb.query(
+            query, top_k=query_param.top_k, ids=query_param.ids, ef_search=query_param.ef_search
+        )
         if not results:
             return [], [], []
 
@@ -1250,7 +1465,9 @@ async def _get_node_data(
         f"Query nodes: {query}, top_k: {query_param.top_k}, cosine: {entities_vdb.cosine_better_than_threshold}"
     )
 
-    results = await entities_vdb.query(query, top_k=query_param.top_k, ids=query_param.ids)
+    results = await entities_vdb.query(
+        query, top_k=query_param.top_k, ids=query_param.ids, ef_search=query_param.ef_search
+    )
 
     if not len(results):
         return "", "", ""
@@ -1258,15 +1475,12 @@ async def _get_node_data(
     # Extract all entity IDs from your results list
     node_ids = [r["entity_name"] for r in results]
 
-    # Call the batch node retrieval and degree functions concurrently.
-    nodes_dict, degrees_dict = await asyncio.gather(
-        knowledge_graph_inst.get_nodes_batch(node_ids),
-        knowledge_graph_inst.node_degrees_batch(node_ids),
-    )
+    # Fetch the nodes, their incident edges, one-hop neighbours and degrees in one storage call.
+    ego_network = await knowledge_graph_inst.get_ego_network(node_ids)
 
     # Now, if you need the node data and degree in order:
-    node_datas = [nodes_dict.get(nid) for nid in node_ids]
-    node_degrees = [degrees_dict.get(nid, 0) for nid in node_ids]
+    node_datas = [ego_network.nodes.get(nid) for nid in node_ids]
+    node_degrees = [ego_network.node_degrees.get(nid, 0) for nid in node_ids]
 
     if not all([n is not None for n in node_datas]):
         logger.warning("Some nodes are missing, maybe the storage is damaged")
@@ -1286,13 +1500,13 @@ async def _get_node_data(
         node_datas,
         query_param,
         text_chunks_db,
-        knowledge_graph_inst,
+        ego_network,
         tokenizer,
     )
-    use_relations = await _find_most_related_edges_from_entities(
+    use_relations = _find_most_related_edges_from_entities(
         node_datas,
         query_param,
-        knowledge_graph_inst,
+        ego_network,
         tokenizer,
     )
 
@@ -1373,7 +1587,7 @@ async def _find_most_related_text_unit_from_entities(
     node_datas: list[dict],
     query_param: QueryParam,
     text_chunks_db: BaseKVStorage,
-    knowledge_graph_inst: BaseGraphStorage,
+    ego_network: EgoNetwork,
     tokenizer: Tokenizer,
 ):
     text_units = [
@@ -1383,27 +1597,14 @@ async def _find_most_related_text_unit_from_entities(
     ]
 
     node_names = [dp["entity_name"] for dp in node_datas]
-    batch_edges_dict = await knowledge_graph_inst.get_nodes_edges_batch(node_names)
     # Build the edges list in the same order as node_datas.
-    edges = [batch_edges_dict.get(name, []) for name in node_names]
-
-    all_one_hop_nodes = set()
-    for this_edges in edges:
-        if not this_edges:
-            continue
-        all_one_hop_nodes.update([e[1] for e in this_edges])
-
-    all_one_hop_nodes = list(all_one_hop_nodes)
+    edges = [ego_network.node_edges.get(name, []) for name in node_names]
 
-    # Batch retrieve one-hop node data using get_nodes_batch
-    all_one_hop_nodes_data_dict = await knowledge_graph_inst.get_nodes_batch(all_one_hop_nodes)
-    all_one_hop_nodes_data = [all_one_hop_nodes_data_dict.get(e) for e in all_one_hop_nodes]
-
-    # Add null check for node data
+    # The ego network already holds the data of all one-hop nodes
     all_one_hop_text_units_lookup = {
         k: set(split_string_by_multi_markers(v["source_id"], [GRAPH_FIELD_SEP]))
-        for k, v in zip(all_one_hop_nodes, all_one_hop_nodes_data)
-        if v is not None and "source_id" in v  # Add source_id check
+        for k, v in ego_network.nodes.items()
+        if "source_id" in v
     }
 
     all_text_units_lookup = {}
@@ -1415,14 +1616,8 @@ async def _find_most_related_text_unit_from_entities(
                 all_text_units_lookup[c_id] = index
                 tasks.append((c_id, index, this_edges))
 
-    # Process in batches tasks at a time to avoid overwhelming resources
-    batch_size = 5
-    results = []
-
-    for i in range(0, len(tasks), batch_size):
-        batch_tasks = tasks[i : i + batch_size]
-        batch_results = await asyncio.gather(*[text_chunks_db.get_by_id(c_id) for c_id, _, _ in batch_tasks])
-        results.extend(batch_results)
+    chunks_by_id = await _get_text_chunks_by_ids(text_chunks_db, [c_id for c_id, _, _ in tasks])
+    results = [chunks_by_id.get(c_id) for c_id, _, _ in tasks]
 
     for (c_id, index, this_edges), data in zip(tasks, results):
         all_text_units_lookup[c_id] = {
@@ -1463,37 +1658,28 @@ async def _find_most_related_text_unit_from_entities(
     return all_text_units
 
 
-async def _find_most_related_edges_from_entities(
+def _find_most_related_edges_from_entities(
     node_datas: list[dict],
     query_param: QueryParam,
-    knowledge_graph_inst: BaseGraphStorage,
+    ego_network: EgoNetwork,
     tokenizer: Tokenizer,
 ):
     node_names = [dp["entity_name"] for dp in node_datas]
-    batch_edges_dict = await knowledge_graph_inst.get_nodes_edges_batch(node_names)
 
     all_edges = []
     seen = set()
 
     for node_name in node_names:
-        this_edges = batch_edges_dict.get(node_name, [])
+        this_edges = ego_network.node_edges.get(node_name, [])
         for e in this_edges:
             sorted_edge = tuple(sorted(e))
             if sorted_edge not in seen:
                 seen.add(sorted_edge)
                 all_edges.append(sorted_edge)
 
-    # Prepare edge pairs in two forms:
-    # For the batch edge properties function, use dicts.
-    edge_pairs_dicts = [{"src": e[0], "tgt": e[1]} for e in all_edges]
-    # For edge degrees, use tuples.
-    edge_pairs_tuples = list(all_edges)  # all_edges is already a list of tuples
-
-    # Call the batched functions concurrently.
-    edge_data_dict, edge_degrees_dict = await asyncio.gather(
-        knowledge_graph_inst.get_edges_batch(edge_pairs_dicts),
-        knowledge_graph_inst.edge_degrees_batch(edge_pairs_tuples),
-    )
+    # Edge properties and degrees were fetched together with the ego network.
+    edge_data_dict = ego_network.edges
+    edge_degrees_dict = ego_network.edge_degrees
 
     # Reconstruct edge_datas list in the same order as the deduplicated results.
     all_edges_data = []
@@ -1538,7 +1724,9 @@ async def _get_edge_data(
         f"Query edges: {keywords}, top_k: {query_param.top_k}, cosine: {relationships_vdb.cosine_better_than_threshold}"
     )
 
-    results = await relationships_vdb.query(keywords, top_k=query_param.top_k, ids=query_param.ids)
+    results = await relationships_vdb.query(
+        keywords, top_k=query_param.top_k, ids=query_param.ids, ef_search=query_param.ef_search
+    )
 
     if not len(results):
         return "", "", ""
@@ -1707,6 +1895,14 @@ async def _find_most_related_entities_from_relationships(
     return node_datas
 
 
+async def _get_text_chunks_by_ids(text_chunks_db: BaseKVStorage, chunk_ids: list[str]) -> dict[str, dict]:
+    """Fetch text chunks with a single storage call, keyed by chunk id"""
+    if not chunk_ids:
+        return {}
+    chunks = await text_chunks_db.get_by_ids(chunk_ids)
+    return {chunk["id"]: chunk for chunk in chunks if chunk is not None}
+
+
 async def _find_related_text_unit_from_relationships(
     edge_datas: list[dict],
     query_param: QueryParam,
@@ -1718,24 +1914,22 @@ async def _find_related_text_unit_from_relationships(
         for dp in edge_datas
         if dp["source_id"] is not None
     ]
-    all_text_units_lookup = {}
-
-    async def fetch_chunk_data(c_id, index):
-        if c_id not in all_text_units_lookup:
-            chunk_data = await text_chunks_db.get_by_id(c_id)
-            # Only store valid data
-            if chunk_data is not None and "content" in chunk_data:
-                all_text_units_lookup[c_id] = {
-                    "data": chunk_data,
-                    "order": index,
-                }
-
-    tasks = []
+    chunk_orders = {}
     for index, unit_list in enumerate(text_units):
         for c_id in unit_list:
-            tasks.append(fetch_chunk_data(c_id, index))
+            chunk_orders.setdefault(c_id, index)
+
+    chunks_by_id = await _get_text_chunks_by_ids(text_chunks_db, list(chunk_orders))
 
-    await asyncio.gather(*tasks)
+    all_text_units_lookup = {}
+    for c_id, index in chunk_orders.items():
+        chunk_data = chunks_by_id.get(c_id)
+        # Only store valid data
+        if chunk_data is not None and "content" in chunk_data:
+            all_text_units_lookup[c_id] = {
+                "data": chunk_data,
+                "order": index,
+            }
 
     if not all_text_units_lookup:
         logger.warning("No valid text chunks found")
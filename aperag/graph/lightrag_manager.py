@@ -13,14 +13,20 @@
 # limitations under the License.
 
 import asyncio
+import hashlib
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import numpy
 
+from aperag.concurrent_control import get_or_create_lock
 from aperag.db.models import Collection
-from aperag.db.ops import db_ops
+from aperag.db.ops import async_db_ops, db_ops
+from aperag.graph.graph_query_cache import get_graph_context_cache
 from aperag.graph.lightrag import LightRAG
 from aperag.graph.lightrag.utils import EmbeddingFunc
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
@@ -45,6 +51,8 @@ class LightRAGConfig:
     ENTITY_EXTRACT_MAX_GLEANING = 0
     SUMMARY_TO_MAX_TOKENS = 2000
     FORCE_LLM_SUMMARY_ON_MERGE = 10
+    INSTANCE_CACHE_MAX_SIZE = 32
+    INSTANCE_CACHE_TTL_SECONDS = 600
     EMBEDDING_MAX_TOKEN_SIZE = 8192
     # DEFAULT_LANGUAGE = "Simplified Chinese"
     DEFAULT_LANGUAGE = "The same language like input text"
@@ -68,6 +76,7 @@ async def create_lightrag_instance(collection: Collection) -> LightRAG:  # 基
         # Generate embedding and LLM functions
         embed_func, embed_dim = await _gen_embed_func(collection)
         llm_func = await _gen_llm_func(collection)
+        completion_config = parseCollectionConfig(collection.config).completion
 
         # Get storage configuration from environment
         # -- 从环境变量获取图谱相关存储参数【由于Windows环境不便设置环境变量，此处采用默认值设置】
@@ -86,6 +95,7 @@ async def create_lightrag_instance(collection: Collection) -> LightRAG:  # 基
             chunk_overlap_token_size=LightRAGConfig.CHUNK_OVERLAP_TOKEN_SIZE,
             # -- llm和embedding操作
             llm_model_func=llm_func,
+            llm_model_name=f"{completion_config.custom_llm_provider}/{completion_config.model}",
             embedding_func=EmbeddingFunc(
                 embedding_dim=embed_dim,
                 max_token_size=LightRAGConfig.EMBEDDING_MAX_TOKEN_SIZE,
@@ -100,6 +110,7 @@ async def create_lightrag_instance(collection: Collection) -> LightRAG:  # 基
             summary_to_max_tokens=LightRAGConfig.SUMMARY_TO_MAX_TOKENS,
             force_llm_summary_on_merge=LightRAGConfig.FORCE_LLM_SUMMARY_ON_MERGE,
             addon_params={"language": LightRAGConfig.DEFAULT_LANGUAGE},
+            query_context_cache=get_graph_context_cache(),
             # -- 图谱相关存储
             kv_storage=kv_storage,
             vector_storage=vector_storage,
@@ -114,6 +125,95 @@ async def create_lightrag_instance(collection: Collection) -> LightRAG:  # 基
         raise LightRAGError(f"Failed to create LightRAG instance: {str(e)}") from e
 
 
+# --- Instance Cache for Queries ---
+
+# (collection_id, config_version) -> (instance, event loop, creation time), in LRU order
+_instance_cache: "OrderedDict[tuple[str, str], tuple[LightRAG, asyncio.AbstractEventLoop, float]]" = OrderedDict()
+_instance_cache_lock = threading.Lock()
+
+
+async def _collection_config_version(collection: Collection) -> str:
+    """
+    Version of the collection settings a LightRAG instance is built from.
+
+    Besides the collection config, this covers the update time and API key fingerprint of
+    every provider the instance calls, so provider changes made through any process
+    rebuild the instance without relying on process-local invalidation.
+    """
+    parts = [collection.config or ""]
+    config = parseCollectionConfig(collection.config)
+    provider_names = {spec.model_service_provider for spec in (config.completion, config.embedding) if spec is not None}
+    for provider_name in sorted(filter(None, provider_names)):
+        provider = await async_db_ops.query_llm_provider_by_name(provider_name)
+        api_key = await async_db_ops.query_provider_api_key(provider_name, collection.user)
+        parts += [
+            provider_name,
+            provider.gmt_updated.isoformat() if provider is not None and provider.gmt_updated else "",
+            hashlib.sha256((api_key or "").encode("utf-8")).hexdigest(),
+        ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _get_cached_instance(key: tuple[str, str]) -> Optional[LightRAG]:
+    loop = asyncio.get_running_loop()
+    now = time.monotonic()
+    with _instance_cache_lock:
+        entry = _instance_cache.get(key)
+        if entry is None:
+            return None
+        rag, entry_loop, created_at = entry
+        # LLM call limiters inside the instance are bound to the loop that created it
+        if entry_loop is not loop or now - created_at > LightRAGConfig.INSTANCE_CACHE_TTL_SECONDS:
+            del _instance_cache[key]
+            return None
+        _instance_cache.move_to_end(key)
+        return rag
+
+
+def _put_cached_instance(key: tuple[str, str], rag: LightRAG) -> None:
+    with _instance_cache_lock:
+        # A new config version replaces every older instance of the collection
+        for stale_key in [k for k in _instance_cache if k[0] == key[0]]:
+            del _instance_cache[stale_key]
+        _instance_cache[key] = (rag, asyncio.get_running_loop(), time.monotonic())
+        while len(_instance_cache) > LightRAGConfig.INSTANCE_CACHE_MAX_SIZE:
+            _instance_cache.popitem(last=False)
+
+
+async def get_lightrag_instance(collection: Collection) -> LightRAG:
+    """
+    Get a LightRAG instance for read-only queries, reusing a cached one when possible.
+
+    Instances are keyed by collection id and config version (which includes the
+    providers' update times and API key fingerprints), evicted after
+    INSTANCE_CACHE_TTL_SECONDS and bounded to INSTANCE_CACHE_MAX_SIZE. Callers must not
+    finalize the returned instance; storages hold no per-instance connections, so
+    evicted instances are simply dropped. Indexing paths keep using create_lightrag_instance.
+    """
+    key = (str(collection.id), await _collection_config_version(collection))
+    rag = _get_cached_instance(key)
+    if rag is not None:
+        return rag
+
+    # Serialize cold starts per collection so concurrent queries build a single instance
+    async with get_or_create_lock(f"lightrag_instance:{key[0]}"):
+        rag = _get_cached_instance(key)
+        if rag is None:
+            rag = await create_lightrag_instance(collection)
+            _put_cached_instance(key, rag)
+        return rag
+
+
+def invalidate_lightrag_instances(collection_id: Optional[str] = None) -> None:
+    """Drop cached LightRAG instances of a collection, or all of them when collection_id is None"""
+    with _instance_cache_lock:
+        if collection_id is None:
+            _instance_cache.clear()
+            return
+        for key in [k for k in _instance_cache if k[0] == str(collection_id)]:
+            del _instance_cache[key]
+
+
 # --- Celery Support Functions ---
 
 
@@ -173,7 +273,13 @@ async def _process_document_async(
             }
 
         # Process results
-        total_stats = {"chunks_created": 0, "entities_extracted": 0, "relations_extracted": 0, "documents": []}
+        total_stats = {
+            "chunks_created": 0,
+            "entities_extracted": 0,
+            "relations_extracted": 0,
+            "extraction_cache_hits": 0,
+            "documents": [],
+        }
 
         for doc_result in results:
             doc_result_id = doc_result.get("doc_id")
@@ -187,6 +293,7 @@ async def _process_document_async(
                 total_stats["chunks_created"] += chunk_count
                 total_stats["entities_extracted"] += graph_result.get("entities_extracted", 0)
                 total_stats["relations_extracted"] += graph_result.get("relations_extracted", 0)
+                total_stats["extraction_cache_hits"] += graph_result.get("extraction_cache_hits", 0)
 
                 total_stats["documents"].append(
                     {
@@ -194,6 +301,7 @@ async def _process_document_async(
                         "chunks_created": chunk_count,
                         "entities_extracted": graph_result.get("entities_extracted", 0),
                         "relations_extracted": graph_result.get("relations_extracted", 0),
+                        "extraction_cache_hits": graph_result.get("extraction_cache_hits", 0),
                     }
                 )
 
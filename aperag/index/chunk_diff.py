@@ -0,0 +1,97 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Chunk-level diffing for incremental index updates.
+
+Indexers store one content hash per chunk in DocumentIndex.index_data, next to the
+ids of the stored chunks. On update, the new chunks are hashed and matched against
+the old ones, so only changed chunks are written and only vanished chunks are deleted.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+def compute_chunk_hash(content: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Hash everything that ends up in the stored chunk, so metadata-only edits are detected too."""
+    payload = json.dumps(
+        {"content": content, "metadata": metadata or {}}, sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compute_content_hash(content: str) -> str:
+    """Hash of the chunk text alone, equal in every index built from the chunk so search results can be matched."""
+    return compute_chunk_hash(content.strip())
+
+
+@dataclass
+class ChunkDiff:
+    """Result of matching new chunk hashes against the chunks already stored for a document"""
+
+    # Stored id reused by each new chunk, or None if the chunk must be written
+    reused_ids: List[Optional[str]] = field(default_factory=list)
+    # Stored ids that no new chunk matches
+    removed_ids: List[str] = field(default_factory=list)
+
+    @property
+    def added_indices(self) -> List[int]:
+        return [i for i, chunk_id in enumerate(self.reused_ids) if chunk_id is None]
+
+    @property
+    def unchanged_count(self) -> int:
+        return len(self.reused_ids) - len(self.added_indices)
+
+    def to_metadata(self) -> Dict[str, int]:
+        return {
+            "unchanged_chunks": self.unchanged_count,
+            "added_chunks": len(self.added_indices),
+            "removed_chunks": len(self.removed_ids),
+        }
+
+
+def diff_chunks(old_ids: List[str], old_hashes: Optional[List[str]], new_hashes: List[str]) -> ChunkDiff:
+    """
+    Match new chunks to stored chunks by content hash.
+
+    Identical chunks appearing several times are matched one-to-one. If the old index
+    has no usable hashes (e.g. it was built before hashes were recorded), every old
+    chunk is removed and every new chunk is added.
+
+    Args:
+        old_ids: Ids of the stored chunks
+        old_hashes: Content hashes of the stored chunks, aligned with old_ids
+        new_hashes: Content hashes of the new chunks, in document order
+
+    Returns:
+        ChunkDiff: Which new chunks can reuse a stored id, and which stored ids vanished
+    """
+    if not old_hashes or len(old_hashes) != len(old_ids):
+        return ChunkDiff(reused_ids=[None] * len(new_hashes), removed_ids=list(old_ids))
+
+    available: Dict[str, List[str]] = defaultdict(list)
+    for chunk_id, chunk_hash in zip(old_ids, old_hashes):
+        available[chunk_hash].append(chunk_id)
+
+    reused_ids: List[Optional[str]] = []
+    for chunk_hash in new_hashes:
+        candidates = available.get(chunk_hash)
+        reused_ids.append(candidates.pop(0) if candidates else None)
+
+    removed_ids = [chunk_id for ids in available.values() for chunk_id in ids]
+    return ChunkDiff(reused_ids=reused_ids, removed_ids=removed_ids)
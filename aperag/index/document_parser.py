@@ -15,15 +15,20 @@
 import io
 import logging
 import mimetypes
+import tempfile
+from contextlib import closing
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pikepdf
-import pypdfium2 as pdfium
 
-from aperag.docparser.base import AssetBinPart, MarkdownPart, PdfPart
+from aperag.aperag_config import settings
+from aperag.docparser.base import AssetBinPart, MarkdownPart, Part, PdfPart
+from aperag.docparser.chunking import Rechunker
 from aperag.docparser.doc_parser import DocParser
+from aperag.docparser.pdf_render import get_image_format, get_page_count, iter_rendered_pages
 from aperag.objectstore.base import get_object_store
+from aperag.utils.tokenizer import get_default_tokenizer
 
 logger = logging.getLogger(__name__)
 
@@ -35,10 +40,18 @@ def is_image_file(suffix_name: str) -> bool:
 class DocumentParsingResult:
     """Result of document parsing operation"""
 
-    def __init__(self, doc_parts: List[Any], content: str, metadata: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        doc_parts: List[Any],
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunks: Optional[List[Any]] = None,
+    ):
         self.doc_parts = doc_parts
         self.content = content
         self.metadata = metadata or {}
+        # Text chunks produced once by the shared chunking stage, consumed by every indexer
+        self.chunks = chunks or []
 
 
 class DocumentParser:
@@ -61,6 +74,22 @@ class DocumentParser:
         Returns:
             List of document parts (MarkdownPart, AssetBinPart, etc.)
 
+        Raises:
+            ValueError: If the file type is unsupported
+        """
+        parts = list(self.iter_parse_document(filepath, file_metadata, parser_config))
+        logger.info(f"Parsed document {filepath} into {len(parts)} parts")
+        return parts
+
+    def iter_parse_document(
+        self, filepath: str, file_metadata: Dict[str, Any], parser_config: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Any]:
+        """
+        Parse document into a stream of parts using DocParser.
+
+        PDF pages are rendered to image assets one at a time after the parser output,
+        so at most one rendered page is held by the generator.
+
         Raises:
             ValueError: If the file type is unsupported
         """
@@ -71,13 +100,18 @@ class DocumentParser:
         if not parser.accept(filepath_obj.suffix):  # 检验当前文件扩展名是否支持解析
             raise ValueError(f"unsupported file type: {filepath_obj.suffix}")
 
-        parts = parser.parse_file(filepath_obj, file_metadata)  # 基于文件元数据对文件进行解析分段处理
+        pdf_parts = []
+        for part in parser.iter_parse_file(filepath_obj, file_metadata):  # 基于文件元数据对文件进行解析分段处理
+            if isinstance(part, PdfPart):
+                pdf_parts.append(part)
+            yield part
 
         # If there are no PdfPart in parts and the doc is a pdf, then add the doc itself as a PdfPart
-        if filepath_obj.suffix.lower() == ".pdf":
-            if not any(isinstance(p, PdfPart) for p in parts):
-                with open(filepath_obj, "rb") as f:
-                    parts.append(PdfPart(data=f.read()))
+        if filepath_obj.suffix.lower() == ".pdf" and not pdf_parts:
+            with open(filepath_obj, "rb") as f:
+                pdf_part = PdfPart(data=f.read())
+            pdf_parts.append(pdf_part)
+            yield pdf_part
 
         if is_image_file(filepath_obj.suffix):
             # Convert the image file to an asset
@@ -92,27 +126,42 @@ class DocumentParser:
                     }
                 )
                 asset_id = f"file{filepath_obj.suffix}"
-                asset_part = AssetBinPart(
+                yield AssetBinPart(
                     asset_id=asset_id,
                     data=image_data,
                     metadata=metadata,
                     mime_type=mime_type,
                 )
-                parts.append(asset_part)
         else:
             # Convert PdfPart to image assets
-            pdf_parts = [p for p in parts if isinstance(p, PdfPart)]
             for pdf_part in pdf_parts:
-                try:
-                    pdf_doc = pdfium.PdfDocument(pdf_part.data)
-                    for i, page in enumerate(pdf_doc):
-                        # Render page to a PIL image
-                        image = page.render(scale=1).to_pil()
-                        # Save image to a bytes buffer
-                        with io.BytesIO() as buffer:
-                            image.save(buffer, format="PNG")
-                            image_data = buffer.getvalue()
+                yield from self._iter_pdf_page_assets(pdf_part, file_metadata)
+
+    def _iter_pdf_page_assets(self, pdf_part: PdfPart, file_metadata: Dict[str, Any]) -> Iterator[AssetBinPart]:
+        """
+        Render the pages of a PDF part to image assets.
 
+        Pages are rendered by a process pool with a bounded number of pages in flight,
+        and yielded in page order as soon as they are ready.
+        """
+        _, mime_type, extension = get_image_format(settings.pdf_render_format)
+        page_count = 0
+        try:
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+                # Workers open the PDF by path instead of receiving its bytes with every page
+                pdf_file.write(pdf_part.data)
+                pdf_file.flush()
+                rendered_pages = iter_rendered_pages(
+                    pdf_file.name,
+                    get_page_count(pdf_file.name),
+                    dpi=settings.pdf_render_dpi,
+                    image_format=settings.pdf_render_format,
+                    quality=settings.pdf_render_quality,
+                    workers=settings.pdf_render_workers,
+                    max_in_flight=settings.pdf_render_max_in_flight,
+                )
+                with closing(rendered_pages):
+                    for i, image_data in rendered_pages:
                         # Create a new AssetBinPart for each page
                         metadata = file_metadata.copy()
                         metadata.update(
@@ -122,21 +171,17 @@ class DocumentParser:
                                 "vision_index": True,
                             }
                         )
-                        asset_id = f"page_{i}.png"
-                        asset_part = AssetBinPart(
-                            asset_id=asset_id,
+                        yield AssetBinPart(
+                            asset_id=f"page_{i}.{extension}",
                             data=image_data,
                             metadata=metadata,
-                            mime_type="image/png",
+                            mime_type=mime_type,
                         )
-                        parts.append(asset_part)
-
-                    logger.info(f"Converted {len(pdf_doc)} pages from a PDF part to image assets.")
-                except Exception as e:
-                    logger.warning(f"Failed to convert PDF part to images: {e}", exc_info=True)
+                        page_count += 1
 
-        logger.info(f"Parsed document {filepath} into {len(parts)} parts")
-        return parts
+            logger.info(f"Converted {page_count} pages from a PDF part to image assets.")
+        except Exception as e:
+            logger.warning(f"Failed to convert PDF part to images: {e}", exc_info=True)
 
     def linearize_pdf(self, data: bytes) -> bytes:
         with pikepdf.open(io.BytesIO(data)) as pdf:
@@ -144,37 +189,65 @@ class DocumentParser:
                 pdf.save(buffer, linearize=True)
                 return buffer.getvalue()
 
-    def save_processed_content_and_assets(self, doc_parts: List[Any], object_store_base_path: Optional[str]) -> str:  # 将解析后的文本分段，基于对象存储基本路径存入对象存储中
+    def save_processed_content_and_assets(
+        self, doc_parts: Iterable[Any], object_store_base_path: Optional[str]
+    ) -> Tuple[str, List[Any]]:  # 将解析后的文本分段，基于对象存储基本路径存入对象存储中
         """
-        Save processed content and assets to object storage.
+        Save processed content and assets to object storage while consuming a stream of parts.
+
+        Assets are uploaded as soon as they are produced. Only the ones needed by the vision
+        index are kept, as references to the uploaded objects, so page images do not pile up
+        in memory or in the parse output.
 
         Args:
-            doc_parts: List of document parts from DocParser
+            doc_parts: Stream of document parts from DocParser
             object_store_base_path: Base path for object storage, if None, skip saving  基本路径规则：“user-{用户id}/{知识库id}/{文档信息id}”
 
         Returns:
-            Full markdown content of the document
+            Full markdown content of the document, and the parts left for indexing
 
         Raises:
             Exception: If object storage operations fail
         """
-
         content = ""
-        # -- 处理分段中的markdown类型的第一个和pdf类型的第一个元素 TODO 这里处理的目的是什么呢？【推测：要想明确这里的保存逻辑，需要知道此前的文档解析分段逻辑，猜测是将文档解析为一个markdown格式，一个pdf格式和asserts【猜测是具体的文本分段】】
-        # Extract full markdown content if available
-        md_part = next((part for part in doc_parts if isinstance(part, MarkdownPart)), None)  # 从doc_parts列表中查找第一个MarkdownPart类型的元素，并将其赋值给md_part；如果找不到，则md_part为None。
-        if md_part is not None:
-            content = md_part.markdown
-            doc_parts.remove(md_part)  # 这里删除的目的是已经处理当前分段，后续不在进行判断处理
+        md_part = None
+        pdf_part = None
+        remaining_parts = []
+        asset_count = 0
+        obj_store = get_object_store() if object_store_base_path is not None else None  # 获取对象存储实例
+
+        for part in doc_parts:
+            # -- 第一个markdown分段作为文档全文，第一个pdf分段作为转换后的pdf，二者都不参与索引
+            # The first MarkdownPart is the full content and the first PdfPart the converted pdf,
+            # neither is indexed
+            if md_part is None and isinstance(part, MarkdownPart):
+                md_part = part
+                content = part.markdown
+                continue
+            if pdf_part is None and isinstance(part, PdfPart):
+                pdf_part = part
+                continue
+
+            if obj_store is not None and isinstance(part, AssetBinPart):
+                # 保存数据资产到“{对象存储根路径}/user-{用户id}/{知识库id}/{文档信息id}/assets/{part.asset_id}”
+                asset_upload_path = f"{object_store_base_path}/assets/{part.asset_id}"
+                obj_store.put(asset_upload_path, part.data)
+                asset_count += 1
+                logger.info(f"uploaded asset to {asset_upload_path}, size: {len(part.data)}")
+                if not part.metadata.get("vision_index"):
+                    # Only vision assets are needed after upload
+                    continue
+                # Keep a reference instead of the bytes, the vision index reads them back from the object store
+                part = part.model_copy(
+                    update={"data": b"", "metadata": {**part.metadata, "asset_path": asset_upload_path}}
+                )
+
+            remaining_parts.append(part)
 
-        pdf_part = next((part for part in doc_parts if isinstance(part, PdfPart)), None)  # 从doc_parts列表中查找第一个PdfPart类型的元素，并将其赋值给pdf_part；如果找不到，则pdf_part为None。
-        if pdf_part is not None:
-            doc_parts.remove(pdf_part)  # 这里删除的目的是什么呢？
         # 基本路径非空时，保存至对象存储
         # Save to object storage if base path is provided
-        if object_store_base_path is not None:
+        if obj_store is not None:
             base_path = object_store_base_path
-            obj_store = get_object_store()  # 获取对象存储实例【aperag.objectstore.local.Local】
             # -- 保存分段中的第一个markdown内容到“{对象存储根路径}/user-{用户id}/{知识库id}/{文档信息id}/parsed.md”
             # Save markdown content
             md_upload_path = f"{base_path}/parsed.md"
@@ -187,28 +260,23 @@ class DocumentParser:
                 linearized_pdf_data = self.linearize_pdf(pdf_part.data)
                 obj_store.put(converted_pdf_upload_path, linearized_pdf_data)  # 文件路径，文件内容
                 logger.info(f"uploaded converted pdf to {converted_pdf_upload_path}, size: {len(linearized_pdf_data)}")
-            # -- 保存数据资产？
-            # Save assets
-            to_be_deleted = []
-            asset_count = 0
-            for part in doc_parts:
-                if not isinstance(part, AssetBinPart):  # 过滤掉非资产
-                    continue
-                if not part.metadata.get("vision_index"):  # 收集视觉数据到to_be_deleted
-                    to_be_deleted.append(part)
-
-                asset_upload_path = f"{base_path}/assets/{part.asset_id}"
-                obj_store.put(asset_upload_path, part.data)  # 保存数据资产到“{对象存储根路径}/user-{用户id}/{知识库id}/{文档信息id}/assets/{part.asset_id}”
-                asset_count += 1
-                logger.info(f"uploaded asset to {asset_upload_path}, size: {len(part.data)}")
-            # 删除视觉数据？
-            if to_be_deleted:
-                for part in to_be_deleted:
-                    doc_parts.remove(part)
 
             logger.info(f"Saved {asset_count} assets to object storage")
         # 返回markdown内容
-        return content
+        return content, remaining_parts
+
+    def chunk_parts(self, doc_parts: Iterable[Any]) -> List[Part]:
+        """
+        Shared chunking stage: chunk the text parts of a document once for all indexers.
+
+        Args:
+            doc_parts: Document parts; parts without text content are ignored
+
+        Returns:
+            Text chunks in document order
+        """
+        rechunker = Rechunker(settings.chunk_size, settings.chunk_overlap_size, get_default_tokenizer())
+        return list(rechunker.iter_chunks(part for part in doc_parts if getattr(part, "content", None)))
 
     def extract_content_from_parts(self, doc_parts: List[Any]) -> str:
         """
@@ -255,14 +323,22 @@ class DocumentParser:
             DocumentParsingResult containing parsed parts and content
         """
         try:
-            # -- 将文件解析为分段
-            # Parse document into parts
-            doc_parts = self.parse_document(filepath, file_metadata, parser_config)
-            # -- 将文件分段保存至对象存储
-            # Save processed content and assets to object storage
-            content = self.save_processed_content_and_assets(doc_parts, object_store_base_path)  # 将解析后的文本分段，基于对象存储基本路径存入对象存储中
-
-            return DocumentParsingResult(doc_parts=doc_parts, content=content, metadata={"parts_count": len(doc_parts)})
+            # -- 将文件解析为分段流，边解析边保存资产
+            # Parse document into a stream of parts, saving assets to object storage as they arrive
+            doc_parts = self.iter_parse_document(filepath, file_metadata, parser_config)
+            content, doc_parts = self.save_processed_content_and_assets(doc_parts, object_store_base_path)  # 将解析后的文本分段，基于对象存储基本路径存入对象存储中
+            # -- 只切分一次，所有索引共用同一份分块
+            # Chunk once; every indexer consumes the same chunks
+            chunks = self.chunk_parts(doc_parts)
+            # Text now lives in the chunks, keep only the parts indexed as-is (e.g. vision assets)
+            doc_parts = [part for part in doc_parts if not getattr(part, "content", None)]
+
+            return DocumentParsingResult(
+                doc_parts=doc_parts,
+                content=content,
+                metadata={"parts_count": len(doc_parts), "chunk_count": len(chunks)},
+                chunks=chunks,
+            )
 
         except Exception as e:
             raise Exception(f"Document parsing failed for {filepath}: {str(e)}")
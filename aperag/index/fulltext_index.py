@@ -16,14 +16,16 @@ import json
 import logging
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from elasticsearch import AsyncElasticsearch, Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch, helpers
+from sqlalchemy import and_, select
 
 from aperag.aperag_config import settings
 from aperag.db.ops import db_ops
 from aperag.docparser.chunking import rechunk
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
+from aperag.index.chunk_diff import ChunkDiff, compute_chunk_hash, compute_content_hash, diff_chunks
 from aperag.llm.completion.completion_service import CompletionService
 from aperag.query.query import DocumentWithScore
 from aperag.utils.tokenizer import get_default_tokenizer
@@ -41,6 +43,10 @@ def _create_es_client_config() -> Dict[str, Any]:
     }
 
 
+# Maximum number of failed bulk items reported in IndexResult metadata
+_MAX_REPORTED_BULK_ERRORS = 20
+
+
 class FulltextIndexer(BaseIndexer):
     """Fulltext index implementation"""
 
@@ -67,54 +73,124 @@ class FulltextIndexer(BaseIndexer):
 
         return chunk_content, title_text, chunk_metadata
 
-    def _process_chunks(
-        self, document_id: int, doc_parts: List[Any], document_name: str, index_name: str
-    ) -> Tuple[int, int]:
-        """Process and insert all chunks for a document. Returns (chunk_count, total_content_length)"""
-        chunk_count = 0
-        total_content_length = 0
-
-        chunk_size = settings.chunk_size
-        chunk_overlap_size = settings.chunk_overlap_size
-        tokenizer = get_default_tokenizer()
-
-        # Rechunk the document parts (resulting in text parts)
-        # After rechunk(), parts only contains TextPart
-        chunked_parts = rechunk(doc_parts, chunk_size, chunk_overlap_size, tokenizer)
-
-        for chunk_idx, part in enumerate(chunked_parts):
+    def _build_chunks(
+        self, doc_parts: List[Any], chunked_parts: Optional[List[Any]] = None
+    ) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Turn the shared chunks, or document parts rechunked here if none were provided,
+        into (content, title, metadata) tuples, skipping empty chunks
+        """
+        if chunked_parts is None:
+            chunk_size = settings.chunk_size
+            chunk_overlap_size = settings.chunk_overlap_size
+            tokenizer = get_default_tokenizer()
+
+            # Rechunk the document parts (resulting in text parts)
+            # After rechunk(), parts only contains TextPart
+            chunked_parts = rechunk(doc_parts, chunk_size, chunk_overlap_size, tokenizer)
+
+        chunks = []
+        for part in chunked_parts:
             chunk_content, title_text, chunk_metadata = self._extract_chunk_data(part)
-            if not chunk_content:
-                continue
+            if chunk_content:
+                chunks.append((chunk_content, title_text, chunk_metadata))
+        return chunks
 
+    def _process_chunks(
+        self,
+        document_id: int,
+        doc_parts: List[Any],
+        document_name: str,
+        index_name: str,
+        old_chunk_ids: List[str] = None,
+        old_chunk_hashes: List[str] = None,
+        chunked_parts: Optional[List[Any]] = None,
+    ) -> Tuple[List[str], List[str], int, ChunkDiff, List[Dict[str, Any]]]:
+        """
+        Bulk insert the chunks of a document that are not already indexed.
+
+        Chunks whose hash matches a stored chunk keep their id and are not rewritten.
+        Returns (chunk_ids, chunk_hashes, total_content_length, diff, bulk_errors).
+        """
+        chunks = self._build_chunks(doc_parts, chunked_parts)
+        chunk_hashes = [
+            compute_chunk_hash(content, {"title": title, "metadata": metadata}) for content, title, metadata in chunks
+        ]
+        diff = diff_chunks(old_chunk_ids or [], old_chunk_hashes, chunk_hashes)
+
+        # Keep the positional id scheme for new chunks unless a retained chunk still uses that id
+        retained_ids = {chunk_id for chunk_id in diff.reused_ids if chunk_id}
+        chunk_ids = list(diff.reused_ids)
+        actions = []
+        for chunk_idx in diff.added_indices:
             chunk_id = f"{document_id}_{chunk_idx}"
-            self._insert_chunk(
-                index_name, chunk_id, document_id, document_name, chunk_content, title_text, chunk_metadata
+            if chunk_id in retained_ids:
+                chunk_id = f"{chunk_id}_{chunk_hashes[chunk_idx][:8]}"
+            chunk_ids[chunk_idx] = chunk_id
+
+            chunk_content, title_text, chunk_metadata = chunks[chunk_idx]
+            actions.append(
+                self._chunk_action(
+                    index_name, chunk_id, document_id, document_name, chunk_content, title_text, chunk_metadata
+                )
             )
-            chunk_count += 1
-            total_content_length += len(chunk_content)
 
-        return chunk_count, total_content_length
+        bulk_errors = self._bulk(index_name, actions)
+        if bulk_errors:
+            # Leave failed chunks out of the recorded state, so the next update writes them again
+            failed_ids = {error["id"] for error in bulk_errors}
+            kept = [i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in failed_ids]
+            chunk_ids = [chunk_ids[i] for i in kept]
+            chunk_hashes = [chunk_hashes[i] for i in kept]
+            chunks = [chunks[i] for i in kept]
+
+        total_content_length = sum(len(content) for content, _, _ in chunks)
+        return chunk_ids, chunk_hashes, total_content_length, diff, bulk_errors
 
     def _create_success_result(
         self,
         index_name: str,
         document_name: str,
-        chunk_count: int,
+        chunk_ids: List[str],
+        chunk_hashes: List[str],
         total_content_length: int,
         operation: str = "created",
+        diff: Optional[ChunkDiff] = None,
+        bulk_errors: Optional[List[Dict[str, Any]]] = None,
     ) -> IndexResult:
         """Create a success IndexResult with chunk statistics"""
+        chunk_count = len(chunk_ids)
+        metadata = {
+            "total_content_length": total_content_length,
+            "chunk_count": chunk_count,
+            "avg_chunk_length": total_content_length // chunk_count if chunk_count > 0 else 0,
+            "operation": operation,
+        }
+        if diff is not None:
+            metadata.update(diff.to_metadata())
+        if bulk_errors:
+            metadata["failed_chunks"] = len(bulk_errors)
+            metadata["bulk_errors"] = bulk_errors[:_MAX_REPORTED_BULK_ERRORS]
         return IndexResult(
             success=True,
             index_type=self.index_type,
-            data={"index_name": index_name, "document_name": document_name, "chunk_count": chunk_count},
-            metadata={
-                "total_content_length": total_content_length,
+            data={
+                "index_name": index_name,
+                "document_name": document_name,
                 "chunk_count": chunk_count,
-                "avg_chunk_length": total_content_length // chunk_count if chunk_count > 0 else 0,
-                "operation": operation,
+                "chunk_ids": chunk_ids,
+                "chunk_hashes": chunk_hashes,
             },
+            metadata=metadata,
+        )
+
+    def _create_bulk_failure_result(self, operation: str, bulk_errors: List[Dict[str, Any]]) -> IndexResult:
+        """Create a failed IndexResult when no chunk could be written"""
+        return IndexResult(
+            success=False,
+            index_type=self.index_type,
+            error=f"Fulltext index {operation} failed: all {len(bulk_errors)} chunks were rejected",
+            metadata={"failed_chunks": len(bulk_errors), "bulk_errors": bulk_errors[:_MAX_REPORTED_BULK_ERRORS]},
         )
 
     def create_index(self, document_id: int, content: str, doc_parts: List[Any], collection, **kwargs) -> IndexResult:
@@ -122,8 +198,9 @@ class FulltextIndexer(BaseIndexer):
         try:
             # Filter out non-text parts
             doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
+            chunked_parts = kwargs.get("chunks")
 
-            if not doc_parts:
+            if not doc_parts and not chunked_parts:
                 logger.info(f"No doc_parts to index for document {document_id}")
                 return IndexResult(
                     success=True,
@@ -136,10 +213,16 @@ class FulltextIndexer(BaseIndexer):
                 raise Exception(f"Document {document_id} not found")
 
             index_name = generate_fulltext_index_name(collection.id)
-            chunk_count, total_content_length = self._process_chunks(document_id, doc_parts, document.name, index_name)
+            chunk_ids, chunk_hashes, total_content_length, _, bulk_errors = self._process_chunks(
+                document_id, doc_parts, document.name, index_name, chunked_parts=chunked_parts
+            )
+            if bulk_errors and not chunk_ids:
+                return self._create_bulk_failure_result("creation", bulk_errors)
 
-            logger.info(f"Fulltext index created for document {document_id} with {chunk_count} chunks")
-            return self._create_success_result(index_name, document.name, chunk_count, total_content_length, "created")
+            logger.info(f"Fulltext index created for document {document_id} with {len(chunk_ids)} chunks")
+            return self._create_success_result(
+                index_name, document.name, chunk_ids, chunk_hashes, total_content_length, "created", None, bulk_errors
+            )
 
         except Exception as e:
             logger.error(f"Fulltext index creation failed for document {document_id}: {str(e)}")
@@ -147,7 +230,9 @@ class FulltextIndexer(BaseIndexer):
                 success=False, index_type=self.index_type, error=f"Fulltext index creation failed: {str(e)}"
             )
 
-    def update_index(self, document_id: int, content: str, doc_parts: List[Any], collection, **kwargs) -> IndexResult:  # 更新全文索引操作
+    def update_index(
+        self, document_id: int, content: str, doc_parts: List[Any], collection, **kwargs
+    ) -> IndexResult:  # 更新全文索引操作
         """Update fulltext index for document chunks"""
         try:
             # -- 查询文档信息
@@ -156,33 +241,46 @@ class FulltextIndexer(BaseIndexer):
                 raise Exception(f"Document {document_id} not found")
             # -- 基于知识库id生成全文索引的索引名称
             index_name = generate_fulltext_index_name(collection.id)
-            # -- 清除旧的索引数据 TODO 【异常处理逻辑仅打印了警告日志，若清理旧数据失败，仍会执行后续逻辑。存在旧数据仍然存在，又插入新数据的可能性】
-            # Remove old chunks for this document
-            try:
-                self._remove_document_chunks(index_name, document_id)
-                logger.debug(f"Removed old fulltext chunks for document {document_id}")
-            except Exception as e:
-                logger.warning(f"Failed to remove old fulltext chunks for document {document_id}: {str(e)}")
+            old_chunk_ids, old_chunk_hashes = self._get_indexed_chunks(document_id)
+            if old_chunk_hashes is None:
+                # Indexed before chunk hashes were recorded: fall back to a full rebuild
+                try:
+                    self._remove_document_chunks(index_name, document_id)
+                    logger.debug(f"Removed old fulltext chunks for document {document_id}")
+                except Exception as e:
+                    logger.warning(f"Failed to remove old fulltext chunks for document {document_id}: {str(e)}")
+                old_chunk_ids = []
             # -- 过滤出文本内容
             # Filter out text parts
             doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
-            # -- 对文本内容进行全文索引操作【新增和更新都会调用self._process_chunks】
-            # Create new chunks if there are doc_parts
-            if doc_parts:
-                chunk_count, total_content_length = self._process_chunks(
-                    document_id, doc_parts, document.name, index_name
-                )
-                logger.info(f"Fulltext index updated for document {document_id} with {chunk_count} chunks")
-                return self._create_success_result(
-                    index_name, document.name, chunk_count, total_content_length, "updated"
-                )
-            else:  # 没有文本内容时，直接返回提示“没有文本进行索引”
+            # -- 仅写入内容发生变化的分块，再删除已消失的分块
+            # Only write changed chunks, then delete the chunks that vanished
+            chunk_ids, chunk_hashes, total_content_length, diff, bulk_errors = self._process_chunks(
+                document_id, doc_parts, document.name, index_name, old_chunk_ids, old_chunk_hashes, kwargs.get("chunks")
+            )
+            if bulk_errors and not chunk_ids:
+                return self._create_bulk_failure_result("update", bulk_errors)
+            # Removed ids that were reassigned to a new chunk have already been overwritten
+            current_ids = set(chunk_ids)
+            stale_ids = [chunk_id for chunk_id in diff.removed_ids if chunk_id not in current_ids]
+            if stale_ids:
+                bulk_errors += self._remove_chunks_by_id(index_name, stale_ids)
+
+            if not chunk_ids:  # 没有文本内容时，直接返回提示“没有文本进行索引”
                 return IndexResult(
                     success=True,
                     index_type=self.index_type,
                     metadata={"message": "No doc_parts to index", "status": "skipped"},
                 )
 
+            logger.info(
+                f"Fulltext index updated for document {document_id} with {len(chunk_ids)} chunks "
+                f"({diff.unchanged_count} unchanged, {len(diff.added_indices)} added, {len(stale_ids)} removed)"
+            )
+            return self._create_success_result(
+                index_name, document.name, chunk_ids, chunk_hashes, total_content_length, "updated", diff, bulk_errors
+            )
+
         except Exception as e:
             logger.error(f"Fulltext index update failed for document {document_id}: {str(e)}")
             return IndexResult(
@@ -227,7 +325,65 @@ class FulltextIndexer(BaseIndexer):
             logger.error(f"Failed to remove chunks for document {doc_id} from index {index}: {str(e)}")
             return 0
 
-    def _insert_chunk(
+    def _remove_chunks_by_id(self, index: str, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        """Bulk delete specific chunks by id, returning per-item errors"""
+        actions = ({"_op_type": "delete", "_index": index, "_id": chunk_id} for chunk_id in chunk_ids)
+        bulk_errors = self._bulk(index, actions)
+        logger.info(f"Deleted {len(chunk_ids) - len(bulk_errors)} stale chunks from index {index}")
+        return bulk_errors
+
+    def _bulk(self, index: str, actions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send actions through the _bulk API in chunks of settings.es_bulk_chunk_size.
+
+        Per-item failures do not abort the request; they are returned as a list of
+        {"id", "op", "status", "error"} dicts. Deleting a missing document is not a failure.
+        """
+        if not self.es.indices.exists(index=index).body:
+            logger.warning("index %s not exists", index)
+            return []
+
+        bulk_errors = []
+        for ok, item in helpers.streaming_bulk(
+            self.es,
+            actions,
+            chunk_size=settings.es_bulk_chunk_size,
+            refresh=settings.es_bulk_refresh,
+            raise_on_error=False,
+        ):
+            if ok:
+                continue
+            op_type, result = next(iter(item.items()))
+            if op_type == "delete" and result.get("status") == 404:
+                continue
+            bulk_errors.append(
+                {
+                    "id": result.get("_id"),
+                    "op": op_type,
+                    "status": result.get("status"),
+                    "error": str(result.get("error")),
+                }
+            )
+        if bulk_errors:
+            logger.warning(f"{len(bulk_errors)} bulk actions failed on index {index}: {bulk_errors[0]['error']}")
+        return bulk_errors
+
+    def _get_indexed_chunks(self, document_id: int) -> Tuple[List[str], Optional[List[str]]]:
+        """Get (chunk_ids, chunk_hashes) recorded for the current fulltext index of a document"""
+        from aperag.aperag_config import get_sync_session
+        from aperag.db.models import DocumentIndex, DocumentIndexType
+
+        for session in get_sync_session():
+            stmt = select(DocumentIndex).where(
+                and_(DocumentIndex.document_id == document_id, DocumentIndex.index_type == DocumentIndexType.FULLTEXT)
+            )
+            doc_index = session.execute(stmt).scalar_one_or_none()
+            if doc_index and doc_index.index_data:
+                index_data = json.loads(doc_index.index_data)
+                return index_data.get("chunk_ids", []), index_data.get("chunk_hashes")
+        return [], None
+
+    def _chunk_action(
         self,
         index: str,
         chunk_id: str,
@@ -236,21 +392,22 @@ class FulltextIndexer(BaseIndexer):
         content: str,
         title_text: str = "",
         metadata: Dict[str, Any] = None,
-    ):  # 插入全文索引到es存储
-        """Insert a document chunk into the fulltext index"""
-        if not self.es.indices.exists(index=index).body:
-            logger.warning("index %s not exists", index)
-            return
-
-        doc = {
-            "document_id": doc_id,
-            "chunk_id": chunk_id,
-            "name": doc_name,
-            "content": content,
-            "title": title_text,
-            "metadata": metadata or {},
+    ) -> Dict[str, Any]:  # 构造写入es的全文索引文档
+        """Build the bulk index action for a document chunk"""
+        return {
+            "_op_type": "index",
+            "_index": index,
+            "_id": chunk_id,
+            "_source": {
+                "document_id": doc_id,
+                "chunk_id": chunk_id,
+                "name": doc_name,
+                "content": content,
+                "title": title_text,
+                # content_hash matches the vector index metadata of the same chunk
+                "metadata": {**(metadata or {}), "content_hash": compute_content_hash(content)},
+            },
         }
-        self.es.index(index=index, id=chunk_id, document=doc)
 
     async def search_document(
         self, index: str, keywords: List[str], topk=3, chat_id: str = None
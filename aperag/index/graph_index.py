@@ -237,6 +237,7 @@ class GraphIndexer(AsyncIndexer):
                         "chunks_created": result.get("chunks_created", 0),
                         "entities_extracted": result.get("entities_extracted", 0),
                         "relations_extracted": result.get("relations_extracted", 0),
+                        "extraction_cache_hits": result.get("extraction_cache_hits", 0),
                     },
                     metadata={"status": "complete", "processing_time": result.get("processing_time")},
                 )
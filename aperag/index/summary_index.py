@@ -71,6 +71,10 @@ class SummaryIndexer(BaseIndexer):
             if not document:
                 raise Exception(f"Document {document_id} not found")
 
+            # Map over the shared chunks when the parse task provided them
+            if kwargs.get("chunks") is not None:
+                doc_parts = kwargs["chunks"]
+
             # Generate summary using map-reduce strategy
             summary = self._generate_document_summary(content, doc_parts, collection)
 
@@ -14,20 +14,31 @@
 
 import json
 import logging
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
+from llama_index.core.schema import TextNode
 from sqlalchemy import and_, select
 
 from aperag.aperag_config import get_vector_db_connector, settings
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
+from aperag.index.chunk_diff import compute_chunk_hash, diff_chunks
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
-from aperag.llm.embed.embedding_utils import create_embeddings_and_store
+from aperag.llm.embed.embedding_utils import build_text_nodes, build_text_nodes_from_chunks, embed_and_store_nodes
 from aperag.utils.tokenizer import get_default_tokenizer
 from aperag.utils.utils import generate_vector_db_collection_name
 
 logger = logging.getLogger(__name__)
 
 
+def _drop_failed_chunks(ctx_ids: List[Optional[str]], chunk_hashes: List[str]) -> Tuple[List[str], List[str], int]:
+    """Leave chunks that failed to embed out of the recorded state, so the next update embeds them again"""
+    kept = [i for i, ctx_id in enumerate(ctx_ids) if ctx_id is not None]
+    failed_chunks = len(ctx_ids) - len(kept)
+    if failed_chunks:
+        logger.warning(f"{failed_chunks} chunks failed to embed and are missing from the vector index")
+    return [ctx_ids[i] for i in kept], [chunk_hashes[i] for i in kept], failed_chunks
+
+
 class VectorIndexer(BaseIndexer):
     """Vector index implementation"""
 
@@ -38,6 +49,25 @@ class VectorIndexer(BaseIndexer):
         """Vector indexing is always enabled"""
         return True
 
+    def _build_nodes(self, doc_parts: List[Any], chunks: Optional[List[Any]]) -> List[TextNode]:
+        """Build text nodes from the shared chunks, or chunk the parts here if none were provided"""
+        if chunks is not None:
+            nodes = build_text_nodes_from_chunks(chunks)
+        else:
+            # Filter out non-text parts
+            doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
+            nodes = build_text_nodes(
+                doc_parts,
+                chunk_size=settings.chunk_size,
+                chunk_overlap=settings.chunk_overlap_size,
+                tokenizer=get_default_tokenizer(),
+            )
+
+        # Add indexer metadata to nodes for proper identification
+        for node in nodes:
+            node.metadata["indexer"] = "vector"
+        return nodes
+
     def create_index(self, document_id: str, content: str, doc_parts: List[Any], collection, **kwargs) -> IndexResult:
         """
         Create vector index for document
@@ -59,37 +89,27 @@ class VectorIndexer(BaseIndexer):
                 collection=generate_vector_db_collection_name(collection_id=collection.id)
             )
 
-            # Filter out non-text parts
-            doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
-
-            # Add indexer metadata to parts for proper identification
-            for part in doc_parts:
-                if not hasattr(part, "metadata"):
-                    part.metadata = {}
-                part.metadata["indexer"] = "vector"
-
             # Generate embeddings and store in vector database
-            ctx_ids = create_embeddings_and_store(
-                parts=doc_parts,
-                vector_store_adaptor=vector_store_adaptor,
-                embedding_model=embedding_model,
-                chunk_size=settings.chunk_size,
-                chunk_overlap=settings.chunk_overlap_size,
-                tokenizer=get_default_tokenizer(),
-            )
+            nodes = self._build_nodes(doc_parts, kwargs.get("chunks"))
+            chunk_hashes = [compute_chunk_hash(node.get_content(), node.metadata) for node in nodes]
+            ctx_ids = embed_and_store_nodes(nodes, vector_store_adaptor, embedding_model)
+            ctx_ids, chunk_hashes, failed_chunks = _drop_failed_chunks(ctx_ids, chunk_hashes)
 
             logger.info(f"Vector index created for document {document_id}: {len(ctx_ids)} vectors")
 
+            metadata = {
+                "vector_count": len(ctx_ids),
+                "vector_size": vector_size,
+                "chunk_size": settings.chunk_size,
+                "chunk_overlap": settings.chunk_overlap_size,
+            }
+            if failed_chunks:
+                metadata["failed_chunks"] = failed_chunks
             return IndexResult(
                 success=True,
                 index_type=self.index_type,
-                data={"context_ids": ctx_ids},
-                metadata={
-                    "vector_count": len(ctx_ids),
-                    "vector_size": vector_size,
-                    "chunk_size": settings.chunk_size,
-                    "chunk_overlap": settings.chunk_overlap_size,
-                },
+                data={"context_ids": ctx_ids, "chunk_hashes": chunk_hashes},
+                metadata=metadata,
             )
 
         except Exception as e:
@@ -118,6 +138,7 @@ class VectorIndexer(BaseIndexer):
             from aperag.db.models import DocumentIndex, DocumentIndexType
 
             old_ctx_ids = []
+            old_chunk_hashes = None
             doc_index = None
             for session in get_sync_session():
                 stmt = select(DocumentIndex).where(
@@ -129,48 +150,53 @@ class VectorIndexer(BaseIndexer):
                 if doc_index and doc_index.index_data:
                     index_data = json.loads(doc_index.index_data)
                     old_ctx_ids = index_data.get("context_ids", [])
+                    old_chunk_hashes = index_data.get("chunk_hashes")
 
             # Get vector store adaptor
             vector_store_adaptor = get_vector_db_connector(
                 collection=generate_vector_db_collection_name(collection_id=collection.id)
             )
 
-            # Delete old vectors
-            if old_ctx_ids:
-                vector_store_adaptor.connector.delete(ids=old_ctx_ids)
-                logger.info(f"Deleted {len(old_ctx_ids)} old vectors for document {document_id}")
-
-            # Filter out non-text parts
-            doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
-
-            # Add indexer metadata to parts for proper identification
-            for part in doc_parts:
-                if not hasattr(part, "metadata"):
-                    part.metadata = {}
-                part.metadata["indexer"] = "vector"
+            # Diff the new chunks against the stored ones, so only changed chunks are re-embedded
+            nodes = self._build_nodes(doc_parts, kwargs.get("chunks"))
+            chunk_hashes = [compute_chunk_hash(node.get_content(), node.metadata) for node in nodes]
+            diff = diff_chunks(old_ctx_ids, old_chunk_hashes, chunk_hashes)
 
-            # Create new vectors
+            # Create vectors for new or changed chunks first, so a failure leaves the old index intact
             embedding_model, vector_size = get_collection_embedding_service_sync(collection)
-            ctx_ids = create_embeddings_and_store(
-                parts=doc_parts,
-                vector_store_adaptor=vector_store_adaptor,
-                embedding_model=embedding_model,
-                chunk_size=settings.chunk_size,
-                chunk_overlap=settings.chunk_overlap_size,
-                tokenizer=get_default_tokenizer(),
+            added_indices = diff.added_indices
+            added_ctx_ids = embed_and_store_nodes(
+                [nodes[i] for i in added_indices], vector_store_adaptor, embedding_model
             )
 
-            logger.info(f"Vector index updated for document {document_id}: {len(ctx_ids)} vectors")
+            # Delete vanished vectors
+            if diff.removed_ids:
+                vector_store_adaptor.connector.delete(ids=diff.removed_ids)
+                logger.info(f"Deleted {len(diff.removed_ids)} old vectors for document {document_id}")
+
+            ctx_ids = list(diff.reused_ids)
+            for i, ctx_id in zip(added_indices, added_ctx_ids):
+                ctx_ids[i] = ctx_id
+            ctx_ids, chunk_hashes, failed_chunks = _drop_failed_chunks(ctx_ids, chunk_hashes)
+
+            logger.info(
+                f"Vector index updated for document {document_id}: {len(ctx_ids)} vectors "
+                f"({diff.unchanged_count} unchanged, {len(added_indices)} added, {len(diff.removed_ids)} removed)"
+            )
 
+            metadata = {
+                "vector_count": len(ctx_ids),
+                "old_vector_count": len(old_ctx_ids),
+                "vector_size": vector_size,
+                **diff.to_metadata(),
+            }
+            if failed_chunks:
+                metadata["failed_chunks"] = failed_chunks
             return IndexResult(
                 success=True,
                 index_type=self.index_type,
-                data={"context_ids": ctx_ids},
-                metadata={
-                    "vector_count": len(ctx_ids),
-                    "old_vector_count": len(old_ctx_ids),
-                    "vector_size": vector_size,
-                },
+                data={"context_ids": ctx_ids, "chunk_hashes": chunk_hashes},
+                metadata=metadata,
             )
 
         except Exception as e:
@@ -23,6 +23,7 @@ from sqlalchemy import and_, select
 
 from aperag.aperag_config import get_vector_db_connector
 from aperag.db.models import Collection
+from aperag.docparser.base import AssetBinPart
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
 from aperag.llm.completion.base_completion import get_collection_completion_service_sync
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
@@ -32,6 +33,7 @@ from aperag.llm.llm_error_types import (
     LLMError,
     is_retryable_error,
 )
+from aperag.objectstore.base import get_object_store
 from aperag.schema.utils import parseCollectionConfig
 from aperag.utils.utils import generate_vector_db_collection_name
 
@@ -52,6 +54,19 @@ class VisionIndexer(BaseIndexer):
         except Exception:
             return False
 
+    def _read_image_data(self, part: AssetBinPart) -> bytes:
+        """Return the image bytes of an asset, reading uploaded assets back from the object store"""
+        if part.data:
+            return part.data
+        asset_path = part.metadata.get("asset_path")
+        if not asset_path:
+            raise ValueError(f"Asset {part.asset_id} has neither data nor an object store path")
+        stream = get_object_store().get(asset_path)
+        if stream is None:
+            raise FileNotFoundError(f"Asset {part.asset_id} not found at {asset_path}")
+        with stream:
+            return stream.read()
+
     def create_index(
         self, document_id: str, content: str, doc_parts: List[Any], collection: Collection, **kwargs
     ) -> IndexResult:
@@ -82,9 +97,8 @@ class VisionIndexer(BaseIndexer):
                 },
             )
 
-        # Type info are lost, can't just check `isinstance(part, AssetBinPart)`
         image_parts = [
-            part for part in doc_parts if hasattr(part, "mime_type") and (part.mime_type or "").startswith("image/")
+            part for part in doc_parts if isinstance(part, AssetBinPart) and (part.mime_type or "").startswith("image/")
         ]
         if not image_parts:
             return IndexResult(
@@ -102,7 +116,7 @@ class VisionIndexer(BaseIndexer):
                 nodes: List[TextNode] = []
                 image_uris = []
                 for part in image_parts:
-                    b64_image = base64.b64encode(part.data).decode("utf-8")
+                    b64_image = base64.b64encode(self._read_image_data(part)).decode("utf-8")
                     mime_type = part.mime_type or "image/png"
                     data_uri = f"data:{mime_type};base64,{b64_image}"
                     image_uris.append(data_uri)
@@ -139,7 +153,7 @@ class VisionIndexer(BaseIndexer):
             try:
                 text_nodes: List[TextNode] = []
                 for part in image_parts:
-                    b64_image = base64.b64encode(part.data).decode("utf-8")
+                    b64_image = base64.b64encode(self._read_image_data(part)).decode("utf-8")
                     mime_type = part.mime_type or "image/png"
                     data_uri = f"data:{mime_type};base64,{b64_image}"
 
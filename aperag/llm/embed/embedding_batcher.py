@@ -0,0 +1,201 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Token-aware adaptive batching for embedding requests.
+
+Inputs are packed into batches bounded by both a chunk count and a token budget.
+The token budget is learned per (provider, model): it shrinks when the provider
+rejects a request as too large (HTTP 413 / context window errors) and grows back on
+success, but never beyond the smallest request size known to fail.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from aperag.llm.llm_error_types import EmptyTextError, TextTooLongError
+
+logger = logging.getLogger(__name__)
+
+# Substrings of provider messages for oversized requests, which many providers return as a plain 400
+_TOO_LARGE_KEYWORDS = (
+    "request entity too large",
+    "payload too large",
+    "context length",
+    "context_length",
+    "maximum context",
+    "too many tokens",
+    "text too long",
+    "input too large",
+)
+
+# litellm raises this (a BadRequestError subclass) when an input exceeds the model context
+_TOO_LARGE_ERROR_TYPES = ("ContextWindowExceededError",)
+
+# Statuses of errors caused by the content of the request rather than the state of the provider
+_TOO_LARGE_STATUS = 413
+_INPUT_ERROR_STATUSES = (400, 413, 422)
+
+_MIN_TOKEN_BUDGET = 256
+_GROWTH_FACTOR = 1.25
+_SHRINK_FACTOR = 0.5
+
+
+def _status_code(e: BaseException) -> Optional[int]:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _is_transient_status(status: Optional[int]) -> bool:
+    return status is not None and (status in (408, 429) or status >= 500)
+
+
+def is_request_too_large_error(e: BaseException) -> bool:
+    """Check whether an error (or the error it wraps) means the request exceeded a size limit."""
+    while e is not None:
+        status = _status_code(e)
+        if status == _TOO_LARGE_STATUS or isinstance(e, TextTooLongError):
+            return True
+        if type(e).__name__ in _TOO_LARGE_ERROR_TYPES:
+            return True
+        if _is_transient_status(status):
+            return False
+        error_msg = str(e).lower()
+        if any(keyword in error_msg for keyword in _TOO_LARGE_KEYWORDS):
+            return True
+        e = e.__cause__
+    return False
+
+
+def is_input_error(e: BaseException) -> bool:
+    """
+    Check whether an error was caused by the inputs of the request, so that splitting
+    the batch can isolate the inputs at fault. Rate limits, timeouts, server and
+    connection errors are not input errors: splitting would only multiply the requests.
+    """
+    if is_request_too_large_error(e):
+        return True
+    while e is not None:
+        status = _status_code(e)
+        if status in _INPUT_ERROR_STATUSES or isinstance(e, EmptyTextError):
+            return True
+        if status is not None:
+            return False
+        e = e.__cause__
+    return False
+
+
+@dataclass
+class _TokenBudgetState:
+    budget: int
+    # Smallest batch size (in tokens) the provider is known to have rejected, minus one
+    ceiling: int
+
+
+class TokenBudgetRegistry:
+    """Process-wide registry of learned token budgets, keyed by (provider, model)."""
+
+    def __init__(self):
+        self._states: Dict[Tuple[str, str], _TokenBudgetState] = {}
+        self._lock = threading.Lock()
+
+    def get_budget(self, provider: str, model: str, default_budget: int) -> int:
+        with self._lock:
+            state = self._states.get((provider, model))
+            return state.budget if state else default_budget
+
+    def record_success(self, provider: str, model: str, default_budget: int, batch_tokens: int) -> None:
+        with self._lock:
+            state = self._states.get((provider, model))
+            if state is None or batch_tokens < state.budget * _SHRINK_FACTOR:
+                # Nothing learned yet, or the batch was too small to say anything about the limit
+                return
+            state.budget = min(state.ceiling, max(state.budget + 1, int(state.budget * _GROWTH_FACTOR)))
+
+    def record_too_large(self, provider: str, model: str, default_budget: int, batch_tokens: int) -> None:
+        with self._lock:
+            state = self._states.setdefault((provider, model), _TokenBudgetState(default_budget, default_budget))
+            state.ceiling = max(_MIN_TOKEN_BUDGET, min(state.ceiling, batch_tokens - 1))
+            state.budget = max(_MIN_TOKEN_BUDGET, min(state.ceiling, int(batch_tokens * _SHRINK_FACTOR)))
+            logger.info(
+                f"Embedding request of {batch_tokens} tokens rejected by {provider}/{model}, "
+                f"token budget is now {state.budget} (ceiling {state.ceiling})"
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+token_budget_registry = TokenBudgetRegistry()
+
+
+class AdaptiveEmbeddingBatcher:
+    """Packs embedding inputs by count and token budget, and adapts the budget to provider feedback."""
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        max_count: Optional[int],
+        default_token_budget: int,
+        token_counter: Callable[[Sequence[str]], List[int]],
+        registry: TokenBudgetRegistry = token_budget_registry,
+    ):
+        self.provider = provider
+        self.model = model
+        self.max_count = max_count
+        self.default_token_budget = default_token_budget
+        self.token_counter = token_counter
+        self.registry = registry
+
+    @property
+    def token_budget(self) -> int:
+        return self.registry.get_budget(self.provider, self.model, self.default_token_budget)
+
+    def count_tokens(self, texts: Sequence[str]) -> List[int]:
+        return self.token_counter(texts)
+
+    def plan(self, token_counts: Sequence[int]) -> List[List[int]]:
+        """
+        Group input indices into batches, preserving order.
+
+        A single input larger than the token budget is placed in a batch of its own.
+        """
+        budget = self.token_budget
+        max_count = self.max_count or len(token_counts)
+
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, tokens in enumerate(token_counts):
+            if current and (len(current) >= max_count or current_tokens + tokens > budget):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def record_success(self, batch_tokens: int) -> None:
+        self.registry.record_success(self.provider, self.model, self.default_token_budget, batch_tokens)
+
+    def record_too_large(self, batch_tokens: int) -> None:
+        self.registry.record_too_large(self.provider, self.model, self.default_token_budget, batch_tokens)
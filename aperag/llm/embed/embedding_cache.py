@@ -0,0 +1,323 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Content-addressed embedding cache.
+
+LiteLLM's cache keys on the whole request, so a batch that differs by a single
+chunk misses entirely. This cache stores one vector per text, keyed by
+(provider, model, sha256(text)), so re-indexing a mostly unchanged document only
+embeds the chunks that actually changed.
+
+Two tiers are used:
+- A process-local LRU for hot entries
+- A shared Redis tier so every API and Celery worker benefits from each other's work
+
+Search queries use a separate short-lived cache keyed by the normalized query, so
+the vector, summary and vision searches of one chat turn share a single embedding
+call. Concurrent identical queries are coalesced into one provider request.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aperag.llm import litellm_cache
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "aperag:embedding"
+_QUERY_KEY_PREFIX = "aperag:query_embedding"
+
+
+def make_embedding_cache_key(provider: str, model: str, text: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:{provider}:{model}:{digest}"
+
+
+class EmbeddingCache:
+    """Per-text embedding cache with a local LRU tier and an optional Redis tier."""
+
+    def __init__(self, local_max_size: int = 10000, ttl: int = 86400, use_redis: bool = True):
+        self.local_max_size = local_max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, provider: str, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for the given texts.
+
+        Returns:
+            A list aligned with `texts`, holding the cached vector or None for a miss.
+        """
+        keys = [make_embedding_cache_key(provider, model, text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(keys)
+
+        remote_indices = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._local.get(key)
+                if vector is not None:
+                    self._local.move_to_end(key)
+                    results[i] = vector
+                else:
+                    remote_indices.append(i)
+
+        if remote_indices and self.use_redis:
+            remote_values = self._redis_get_many([keys[i] for i in remote_indices])
+            for i, vector in zip(remote_indices, remote_values):
+                if vector is not None:
+                    results[i] = vector
+                    self._local_put(keys[i], vector)
+
+        hits = sum(1 for vector in results if vector is not None)
+        litellm_cache.record_embedding_cache_lookup(hits=hits, misses=len(results) - hits)
+        return results
+
+    def put_many(self, provider: str, model: str, texts: Sequence[str], vectors: Sequence[List[float]]) -> None:
+        """Store embeddings for the given texts in both tiers."""
+        entries: Dict[str, List[float]] = {}
+        for text, vector in zip(texts, vectors):
+            entries[make_embedding_cache_key(provider, model, text)] = vector
+
+        for key, vector in entries.items():
+            self._local_put(key, vector)
+        if self.use_redis and entries:
+            self._redis_put_many(entries)
+        litellm_cache.record_embedding_cache_added(len(entries))
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _local_put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._local[key] = vector
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_size:
+                self._local.popitem(last=False)
+
+    def _redis_get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            raw_values = get_sync_redis_client().mget(keys)
+        except Exception as e:
+            # The shared tier is an optimization; never fail an embedding call because of it
+            logger.warning(f"Embedding cache Redis lookup failed, falling back to local tier: {e}")
+            return [None] * len(keys)
+
+        values: List[Optional[List[float]]] = []
+        for raw in raw_values:
+            if raw is None:
+                values.append(None)
+                continue
+            try:
+                values.append(json.loads(raw))
+            except (TypeError, ValueError):
+                values.append(None)
+        return values
+
+    def _redis_put_many(self, entries: Dict[str, List[float]]) -> None:
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            pipe = get_sync_redis_client().pipeline(transaction=False)
+            for key, vector in entries.items():
+                pipe.set(key, json.dumps(vector), ex=self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Embedding cache Redis write failed: {e}")
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get the process-wide embedding cache.
+
+    Returns:
+        The shared EmbeddingCache, or None if caching is disabled in settings.
+    """
+    global _embedding_cache
+
+    from aperag.aperag_config import settings
+
+    if not settings.cache_enabled or not settings.embedding_cache_enabled:
+        return None
+
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(
+                    local_max_size=settings.embedding_cache_local_size,
+                    ttl=settings.cache_ttl,
+                    use_redis=settings.embedding_cache_redis_enabled,
+                )
+    return _embedding_cache
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different spellings of a query share one embedding."""
+    return " ".join(query.split())
+
+
+def make_query_embedding_cache_key(provider: str, model: str, query: str) -> str:
+    digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+    return f"{_QUERY_KEY_PREFIX}:{provider}:{model}:{digest}"
+
+
+class QueryEmbeddingCache:
+    """
+    Short-TTL query embedding cache with a local tier, an optional Redis tier and
+    request coalescing (singleflight).
+
+    get_or_embed must always be called from the same event loop, which the embedding
+    runtime guarantees, so in-flight requests need no locking.
+    """
+
+    def __init__(self, local_max_size: int = 1000, ttl: int = 300, use_redis: bool = True):
+        self.local_max_size = local_max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._local: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_embed(
+        self, provider: str, model: str, query: str, embed: Callable[[str], Awaitable[List[float]]]
+    ) -> List[float]:
+        """
+        Get the embedding of a query, computing it with `embed` at most once for concurrent callers.
+
+        Args:
+            embed: Coroutine function embedding the normalized query text
+
+        Returns:
+            The query embedding
+        """
+        key = make_query_embedding_cache_key(provider, model, query)
+        vector = self._local_get(key)
+        if vector is not None:
+            return vector
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield so that a cancelled waiter does not cancel the shared request
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            vector = await asyncio.to_thread(self._redis_get, key) if self.use_redis else None
+            if vector is None:
+                vector = await embed(normalize_query(query))
+                if self.use_redis:
+                    await asyncio.to_thread(self._redis_put, key, vector)
+            self._local_put(key, vector)
+            future.set_result(vector)
+            return vector
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # waiters re-raise it, avoid "exception was never retrieved" when there are none
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _local_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, vector = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return vector
+
+    def _local_put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl, vector)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_size:
+                self._local.popitem(last=False)
+
+    def _redis_get(self, key: str) -> Optional[List[float]]:
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            raw = get_sync_redis_client().get(key)
+        except Exception as e:
+            logger.warning(f"Query embedding cache Redis lookup failed, falling back to local tier: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+
+    def _redis_put(self, key: str, vector: List[float]) -> None:
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            get_sync_redis_client().set(key, json.dumps(vector), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Query embedding cache Redis write failed: {e}")
+
+
+_query_embedding_cache: Optional[QueryEmbeddingCache] = None
+
+
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """
+    Get the process-wide query embedding cache.
+
+    Returns:
+        The shared QueryEmbeddingCache, or None if caching is disabled in settings.
+    """
+    global _query_embedding_cache
+
+    from aperag.aperag_config import settings
+
+    if not settings.cache_enabled or not settings.query_embedding_cache_enabled:
+        return None
+
+    if _query_embedding_cache is None:
+        with _embedding_cache_lock:
+            if _query_embedding_cache is None:
+                _query_embedding_cache = QueryEmbeddingCache(
+                    local_max_size=settings.query_embedding_cache_local_size,
+                    ttl=settings.query_embedding_cache_ttl,
+                    use_redis=settings.embedding_cache_redis_enabled,
+                )
+    return _query_embedding_cache
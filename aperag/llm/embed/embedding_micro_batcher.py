@@ -0,0 +1,240 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cross-document embedding micro-batching.
+
+Celery workers run many index tasks concurrently (--pool=threads), and each one
+embeds a single document's chunks. When many small documents are uploaded at once
+that turns into many tiny provider requests. The micro-batcher collects the texts
+of concurrent callers that share the same embedding model and flushes them together,
+either when enough texts are queued or when the oldest request reaches its deadline.
+
+All batcher state lives on the embedding runtime loop, so no locking is needed.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from aperag.llm.llm_error_types import BatchProcessingError
+
+logger = logging.getLogger(__name__)
+
+EmbedFunc = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+# Local in-memory statistics, in the same spirit as litellm_cache._cache_stats.
+# In multi-process environments (e.g., Celery prefork), each process maintains its own stats.
+_micro_batch_stats = {
+    "requests": 0,
+    "chunks": 0,
+    "flushes": 0,
+    "embed_seconds": 0.0,
+    "total_queue_latency": 0.0,
+    "max_queue_latency": 0.0,
+}
+
+
+class _PendingRequest:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str], future: asyncio.Future):
+        self.texts = texts
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class EmbeddingMicroBatcher:
+    """Coalesces concurrent embedding requests for one embedding model into shared flushes."""
+
+    def __init__(self, embed_func: EmbedFunc, max_batch_size: int, max_wait_seconds: float):
+        self.embed_func = embed_func
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[_PendingRequest] = []
+        self._pending_count = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks, so running flushes are held here
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        request = _PendingRequest(texts, loop.create_future())
+        self._pending.append(request)
+        self._pending_count += len(texts)
+
+        if self._pending_count >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await request.future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        pending, self._pending, self._pending_count = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: List[_PendingRequest]) -> None:
+        started_at = time.monotonic()
+        texts = [text for request in pending for text in request.texts]
+        try:
+            vectors = await self.embed_func(texts)
+        except BatchProcessingError as e:
+            if e.embeddings is None:
+                for request in pending:
+                    _set_exception(request, e)
+                return
+            # Only the requests owning a failed input fail, their batch mates get their vectors
+            _dispatch_partial(pending, e)
+            return
+        except Exception as e:
+            # Not caused by any one request (rate limits, timeouts, server errors): all of them fail
+            for request in pending:
+                _set_exception(request, e)
+            return
+        finally:
+            _record_flush(pending, len(texts), started_at)
+
+        offset = 0
+        for request in pending:
+            if not request.future.done():
+                request.future.set_result(vectors[offset : offset + len(request.texts)])
+            offset += len(request.texts)
+
+
+def _dispatch_partial(pending: List[_PendingRequest], error: BatchProcessingError) -> None:
+    failed = set(error.failed_indices)
+    offset = 0
+    for request in pending:
+        end = offset + len(request.texts)
+        vectors = error.embeddings[offset:end]
+        failed_indices = [i - offset for i in range(offset, end) if i in failed]
+        if not failed_indices:
+            if not request.future.done():
+                request.future.set_result(vectors)
+        else:
+            _set_exception(
+                request,
+                BatchProcessingError(
+                    batch_size=len(request.texts),
+                    failed_indices=failed_indices,
+                    reason=error.reason,
+                    embeddings=vectors,
+                ),
+            )
+        offset = end
+
+
+def _set_exception(request: _PendingRequest, e: Exception) -> None:
+    if not request.future.done():
+        request.future.set_exception(e)
+
+
+def _record_flush(pending: List[_PendingRequest], chunk_count: int, started_at: float) -> None:
+    global _micro_batch_stats
+    now = time.monotonic()
+    queue_latencies = [started_at - request.enqueued_at for request in pending]
+
+    _micro_batch_stats["requests"] += len(pending)
+    _micro_batch_stats["chunks"] += chunk_count
+    _micro_batch_stats["flushes"] += 1
+    _micro_batch_stats["embed_seconds"] += now - started_at
+    _micro_batch_stats["total_queue_latency"] += sum(queue_latencies)
+    _micro_batch_stats["max_queue_latency"] = max(_micro_batch_stats["max_queue_latency"], *queue_latencies)
+
+    logger.debug(
+        f"Embedding micro-batch flushed: {len(pending)} requests, {chunk_count} chunks, "
+        f"{now - started_at:.3f}s embedding, {max(queue_latencies):.3f}s max queue latency"
+    )
+    if _micro_batch_stats["flushes"] % 100 == 0:
+        stats = get_micro_batch_stats()
+        logger.info(
+            f"Embedding micro-batch throughput: {stats['chunks_per_second']} chunks/sec, "
+            f"avg queue latency: {stats['avg_queue_latency']}s, avg requests per flush: {stats['avg_requests_per_flush']}"
+        )
+
+
+# Keys carry the provider credentials, so rotated API keys would otherwise add batchers forever
+_MAX_MICRO_BATCHERS = 64
+_micro_batchers: "OrderedDict[Hashable, EmbeddingMicroBatcher]" = OrderedDict()
+
+
+def get_micro_batcher(key: Hashable, embed_func: EmbedFunc) -> EmbeddingMicroBatcher:
+    """
+    Get the micro-batcher for an embedding model, creating it on first use.
+
+    Must be called from the embedding runtime loop. `embed_func` is only used when
+    the batcher is created; callers sharing a key must embed identically. Only the
+    most recently used batchers are kept.
+    """
+    batcher = _micro_batchers.get(key)
+    if batcher is not None:
+        _micro_batchers.move_to_end(key)
+    else:
+        from aperag.aperag_config import settings
+
+        batcher = EmbeddingMicroBatcher(
+            embed_func=embed_func,
+            max_batch_size=settings.embedding_micro_batch_max_size,
+            max_wait_seconds=settings.embedding_micro_batch_max_wait_ms / 1000,
+        )
+        _micro_batchers[key] = batcher
+        if len(_micro_batchers) > _MAX_MICRO_BATCHERS:
+            # Requests already queued on an evicted batcher are still flushed by its timer
+            _micro_batchers.popitem(last=False)
+    return batcher
+
+
+def get_micro_batch_stats() -> Dict[str, Any]:
+    """
+    Get embedding micro-batching statistics for the current process.
+
+    Returns:
+        Dict containing throughput (chunks/sec) and queue latency figures.
+    """
+    stats = _micro_batch_stats.copy()
+
+    stats["chunks_per_second"] = round(stats["chunks"] / stats["embed_seconds"], 2) if stats["embed_seconds"] else 0.0
+    if stats["requests"] > 0:
+        stats["avg_queue_latency"] = round(stats["total_queue_latency"] / stats["requests"], 4)
+    else:
+        stats["avg_queue_latency"] = 0.0
+    if stats["flushes"] > 0:
+        stats["avg_requests_per_flush"] = round(stats["requests"] / stats["flushes"], 2)
+    else:
+        stats["avg_requests_per_flush"] = 0.0
+
+    return stats
+
+
+def clear_micro_batch_stats() -> None:
+    """Reset embedding micro-batching statistics for the current process."""
+    global _micro_batch_stats
+    _micro_batch_stats = {
+        "requests": 0,
+        "chunks": 0,
+        "flushes": 0,
+        "embed_seconds": 0.0,
+        "total_queue_latency": 0.0,
+        "max_queue_latency": 0.0,
+    }
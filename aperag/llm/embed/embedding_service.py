@@ -15,22 +15,86 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Sequence, Tuple
+import threading
+from typing import Coroutine, Dict, List, Optional, Sequence
 
 import litellm
 
+from aperag.llm.embed.embedding_batcher import (
+    AdaptiveEmbeddingBatcher,
+    is_input_error,
+    is_request_too_large_error,
+)
+from aperag.llm.embed.embedding_cache import get_embedding_cache, get_query_embedding_cache
+from aperag.llm.embed.embedding_micro_batcher import get_micro_batcher
 from aperag.llm.llm_error_types import (
     BatchProcessingError,
     EmbeddingError,
     EmptyTextError,
     wrap_litellm_error,
 )
+from aperag.utils.tokenizer import get_default_batch_tokenizer
 
 logger = logging.getLogger(__name__)
 
 
+class _EmbeddingRuntime:
+    """
+    A long-lived event loop shared by all embedding calls in the process.
+
+    Running every provider call on one loop lets litellm reuse its async HTTP clients
+    (and their connection pools) instead of building new ones per call or per caller loop,
+    and gives a single place to bound concurrency per provider.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def in_runtime_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        # Only called from coroutines running on the runtime loop, so no locking is needed
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            from aperag.aperag_config import settings
+
+            semaphore = asyncio.Semaphore(settings.embedding_max_concurrency_per_provider)
+            self._semaphores[provider] = semaphore
+        return semaphore
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="embedding-runtime", daemon=True)
+                    thread.start()
+                    self._thread = thread
+                    self._loop = loop
+        return self._loop
+
+
+_runtime = _EmbeddingRuntime()
+
+
+def _count_tokens(texts: Sequence[str]) -> List[int]:
+    # Images are sent as data URIs; their size is not measured in text tokens
+    text_indices = [i for i, text in enumerate(texts) if not text.startswith("data:")]
+    counts = [0] * len(texts)
+    for i, tokens in zip(text_indices, get_default_batch_tokenizer()([texts[i] for i in text_indices])):
+        counts[i] = len(tokens)
+    return counts
+
+
 class EmbeddingService:
     def __init__(
         self,
@@ -47,20 +111,83 @@ class EmbeddingService:
         self.api_base = embedding_service_url
         self.api_key = embedding_service_api_key
         self.max_chunks = embedding_max_chunks_in_batch
-        self.max_workers = 8
         self.multimodal = multimodal
         self.caching = caching
 
-    def embed_documents(self, contents: List[str]) -> List[List[float]]:
+    def embed_documents(self, contents: List[str], micro_batch: bool = False) -> List[List[float]]:
+        """Synchronous wrapper over aembed_documents, for callers without an event loop."""
+        return self._run_sync(self._aembed_documents(contents, micro_batch))
+
+    async def aembed_documents(self, contents: List[str], micro_batch: bool = False) -> List[List[float]]:
         """
-        Embed multiple documents in parallel batches.
+        Embed multiple documents in concurrent batches.
 
         Args:
             contents: List of documents (texts or base64-encoded images) to embed
+            micro_batch: Share provider requests with concurrent callers using the same model.
+                Trades a short queueing delay for fewer, fuller requests; meant for indexing.
 
         Returns:
             List of embedding vectors in the same order as input contents
         """
+        return await self._run_async(self._aembed_documents(contents, micro_batch))
+
+    def embed_query(self, content: str) -> List[float]:
+        """Synchronous wrapper over aembed_query, for callers without an event loop."""
+        return self._run_sync(self._aembed_query(content))
+
+    async def aembed_query(self, content: str) -> List[float]:
+        """
+        Embed a single query content.
+
+        Args:
+            content: content to embed
+
+        Returns:
+            List of floats representing the embedding vector
+        """
+        return await self._run_async(self._aembed_query(content))
+
+    def is_multimodal(self) -> bool:
+        return self.multimodal
+
+    @staticmethod
+    def _run_sync(coro: Coroutine):
+        if _runtime.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("Synchronous embedding API cannot be called from the embedding runtime loop")
+        return _runtime.submit(coro).result()
+
+    @staticmethod
+    async def _run_async(coro: Coroutine):
+        if _runtime.in_runtime_thread():
+            return await coro
+        return await asyncio.wrap_future(_runtime.submit(coro))
+
+    async def _aembed_query(self, content: str) -> List[float]:
+        if not content or not content.strip():
+            raise EmptyTextError(1)
+
+        try:
+            query_cache = get_query_embedding_cache() if self.caching else None
+            if query_cache is None:
+                return (await self._aembed_documents([content]))[0]
+
+            # Queries are one-off texts, so they skip the per-text document cache
+            return await query_cache.get_or_embed(
+                self.embedding_provider, self.model, content, self._aembed_query_contents
+            )
+        except (EmptyTextError, EmbeddingError):
+            # Re-raise our custom embedding errors
+            raise
+        except Exception as e:
+            logger.error(f"Query embedding failed: {str(e)}")
+            raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
+
+    async def _aembed_query_contents(self, clean_content: str) -> List[float]:
+        return (await self._aembed_contents([clean_content]))[0]
+
+    async def _aembed_documents(self, contents: List[str], micro_batch: bool = False) -> List[List[float]]:
         # Validate inputs
         if not contents:
             raise EmptyTextError(0)
@@ -75,43 +202,51 @@ class EmbeddingService:
         try:
             # Clean contents by replacing newlines with spaces
             clean_contents = [t.replace("\n", " ") if t and t.strip() else " " for t in contents]
-            # Determine batch size (use max_chunks or process all at once if not set)
-            batch_size = self.max_chunks or len(clean_contents)
-
-            # Store results with original indices to ensure correct ordering
-            results_dict: Dict[int, List[float]] = {}
-
-            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
-                futures = []
-
-                # Submit batches for processing with their starting indices
-                for start in range(0, len(clean_contents), batch_size):
-                    batch = clean_contents[start : start + batch_size]
-                    # Pass both the batch and starting index to track position
-                    future = pool.submit(self._embed_batch_with_indices, batch, start)
-                    futures.append(future)
-
-                # Process completed futures and store results by index
-                failed_batches = []
-                for future in as_completed(futures):
-                    try:
-                        # Get results with their original indices
-                        batch_results = future.result()
-                        for idx, embedding in batch_results:
-                            results_dict[idx] = embedding
-                    except Exception as e:
-                        failed_batches.append(str(e))
-                        logger.error(f"Batch processing failed: {e}")
-
-                if failed_batches:
-                    raise BatchProcessingError(
-                        batch_size=batch_size,
-                        reason=f"Failed to process {len(failed_batches)} batches: {failed_batches[:3]} "
-                        f"contents: {contents}",
-                    )
 
-            # Reconstruct the result list in the original order
-            results = [results_dict[i] for i in range(len(clean_contents))]
+            embed_func = self._aembed_contents
+            if micro_batch:
+                key = (self.embedding_provider, self.model, self.api_base, self.api_key, self.max_chunks)
+                embed_func = get_micro_batcher(key, self._aembed_contents).embed
+
+            cache = get_embedding_cache() if self.caching else None
+            if cache is None:
+                return await embed_func(clean_contents)
+
+            # Only send cache misses to the provider, deduplicating identical texts.
+            # The cache may hit Redis synchronously, so keep it off the event loop.
+            results = await asyncio.to_thread(cache.get_many, self.embedding_provider, self.model, clean_contents)
+            missing_texts = list(dict.fromkeys(clean_contents[i] for i, vec in enumerate(results) if vec is None))
+            if missing_texts:
+                failure = None
+                try:
+                    missing_vectors = await embed_func(missing_texts)
+                except BatchProcessingError as e:
+                    if e.embeddings is None:
+                        raise
+                    # Keep what was embedded, so a retry only pays for the failed inputs
+                    missing_vectors, failure = e.embeddings, e
+
+                embedded = [(text, vec) for text, vec in zip(missing_texts, missing_vectors) if vec is not None]
+                if embedded:
+                    await asyncio.to_thread(
+                        cache.put_many,
+                        self.embedding_provider,
+                        self.model,
+                        [text for text, _ in embedded],
+                        [vec for _, vec in embedded],
+                    )
+                vectors_by_text = dict(zip(missing_texts, missing_vectors))
+                results = [
+                    vec if vec is not None else vectors_by_text[text] for vec, text in zip(results, clean_contents)
+                ]
+                if failure is not None:
+                    # Report the failures by position in the caller's contents, not in the deduplicated misses
+                    raise BatchProcessingError(
+                        batch_size=len(contents),
+                        failed_indices=[i for i, vec in enumerate(results) if vec is None],
+                        reason=failure.reason,
+                        embeddings=results,
+                    ) from failure
             return results
         except (EmptyTextError, BatchProcessingError, EmbeddingError):
             # Re-raise our custom embedding errors
@@ -120,49 +255,112 @@ class EmbeddingService:
             logger.error(f"Document embedding failed: {str(e)}")
             raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
 
-    async def aembed_documents(self, contents: List[str]) -> List[List[float]]:
-        return await asyncio.to_thread(self.embed_documents, contents)
-
-    def embed_query(self, content: str) -> List[float]:
+    async def _aembed_contents(self, clean_contents: List[str]) -> List[List[float]]:
         """
-        Embed a single query content.
-
-        Args:
-            content: content to embed
+        Embed already-cleaned contents with the provider, in concurrent token-aware batches.
 
-        Returns:
-            List of floats representing the embedding vector
+        Raises BatchProcessingError listing only the inputs that failed on their own, with
+        the embeddings of the other inputs attached. Errors that are not caused by the
+        inputs (rate limits, timeouts, server errors) are raised as they are.
         """
-        if not content or not content.strip():
-            raise EmptyTextError(1)
-
-        try:
-            return self.embed_documents([content])[0]
-        except (EmptyTextError, EmbeddingError):
-            # Re-raise our custom embedding errors
-            raise
-        except Exception as e:
-            logger.error(f"Query embedding failed: {str(e)}")
-            raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
-
-    async def aembed_query(self, content: str) -> List[float]:
-        return await asyncio.to_thread(self.embed_query, content)
+        batcher = self._get_batcher()
+        token_counts = batcher.count_tokens(clean_contents)
+        batches = batcher.plan(token_counts)
+
+        # gather() preserves the order of the batches, so results line up with the input
+        batch_results = await asyncio.gather(
+            *(self._aembed_with_bisection(batcher, batch, clean_contents, token_counts) for batch in batches),
+            return_exceptions=True,
+        )
+
+        errors: List[BatchProcessingError] = []
+        results: List[Optional[List[float]]] = [None] * len(clean_contents)
+        for batch, batch_result in zip(batches, batch_results):
+            if isinstance(batch_result, BatchProcessingError):
+                errors.append(batch_result)
+                batch_result = batch_result.embeddings
+            elif isinstance(batch_result, BaseException):
+                logger.error(f"Batch processing failed: {batch_result}")
+                raise batch_result
+            for i, embedding in zip(batch, batch_result):
+                results[i] = embedding
+
+        if errors:
+            failed_indices = sorted(i for error in errors for i in error.failed_indices)
+            logger.error(f"Failed to embed {len(failed_indices)} of {len(clean_contents)} inputs: {errors[0].reason}")
+            raise BatchProcessingError(
+                batch_size=len(clean_contents),
+                failed_indices=failed_indices,
+                reason=f"{len(failed_indices)} inputs failed: {errors[0].reason}",
+                embeddings=results,
+            )
+        return results
 
-    def is_multimodal(self) -> bool:
-        return self.multimodal
+    async def _aembed_with_bisection(
+        self,
+        batcher: AdaptiveEmbeddingBatcher,
+        indices: List[int],
+        clean_contents: List[str],
+        token_counts: List[int],
+    ) -> List[List[float]]:
+        """
+        Embed one planned batch, retrying batches rejected for their inputs by splitting them in half.
 
-    def _embed_batch_with_indices(self, batch: Sequence[str], start_idx: int) -> List[Tuple[int, List[float]]]:
-        """Process a batch of texts and return embeddings with their original indices."""
+        Only the inputs that still fail on their own are reported, so one bad chunk
+        does not fail the rest of the document. Other errors are raised unchanged.
+        """
+        batch_tokens = sum(token_counts[i] for i in indices)
         try:
-            embeddings = self._embed_batch(batch)
-            # Return each embedding with its corresponding index in the original list
-            return [(start_idx + i, embedding) for i, embedding in enumerate(embeddings)]
+            embeddings = await self._aembed_batch([clean_contents[i] for i in indices])
+            batcher.record_success(batch_tokens)
+            return embeddings
         except Exception as e:
-            logger.error(f"Batch embedding with indices failed: {str(e)}")
-            # Convert litellm errors for batch processing
-            raise wrap_litellm_error(e, "embedding", self.embedding_provider, self.model) from e
-
-    def _embed_batch(self, batch: Sequence[str]) -> List[List[float]]:
+            # Splitting cannot fix auth, quota or transient errors, it would only multiply the requests
+            if not is_input_error(e):
+                raise
+            if len(indices) == 1:
+                # A single oversized input says nothing about the batch budget of other requests
+                raise BatchProcessingError(
+                    batch_size=1, failed_indices=list(indices), reason=str(e), embeddings=[None]
+                ) from e
+            if is_request_too_large_error(e):
+                batcher.record_too_large(batch_tokens)
+
+        mid = len(indices) // 2
+        halves = await asyncio.gather(
+            self._aembed_with_bisection(batcher, indices[:mid], clean_contents, token_counts),
+            self._aembed_with_bisection(batcher, indices[mid:], clean_contents, token_counts),
+            return_exceptions=True,
+        )
+        for half in halves:
+            if isinstance(half, BaseException) and not isinstance(half, BatchProcessingError):
+                raise half
+        errors = [half for half in halves if isinstance(half, BatchProcessingError)]
+        if errors:
+            raise BatchProcessingError(
+                batch_size=len(indices),
+                failed_indices=[i for error in errors for i in error.failed_indices],
+                reason=errors[0].reason,
+                embeddings=[
+                    embedding
+                    for half in halves
+                    for embedding in (half.embeddings if isinstance(half, BatchProcessingError) else half)
+                ],
+            ) from errors[0]
+        return halves[0] + halves[1]
+
+    def _get_batcher(self) -> AdaptiveEmbeddingBatcher:
+        from aperag.aperag_config import settings
+
+        return AdaptiveEmbeddingBatcher(
+            provider=self.embedding_provider,
+            model=self.model,
+            max_count=self.max_chunks,
+            default_token_budget=settings.embedding_max_tokens_in_batch,
+            token_counter=_count_tokens,
+        )
+
+    async def _aembed_batch(self, batch: Sequence[str]) -> List[List[float]]:
         """
         Embed a batch of contents using litellm.
 
@@ -177,14 +375,15 @@ class EmbeddingService:
         """
 
         try:
-            response = litellm.embedding(
-                custom_llm_provider=self.embedding_provider,
-                model=self.model,
-                api_base=self.api_base,
-                api_key=self.api_key,
-                input=list(batch),
-                caching=self.caching,
-            )
+            async with _runtime.get_semaphore(self.embedding_provider):
+                response = await litellm.aembedding(
+                    custom_llm_provider=self.embedding_provider,
+                    model=self.model,
+                    api_base=self.api_base,
+                    api_key=self.api_key,
+                    input=list(batch),
+                    caching=self.caching,
+                )
 
             if not response or "data" not in response:
                 raise EmbeddingError(
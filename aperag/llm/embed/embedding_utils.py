@@ -16,7 +16,7 @@
 # -*- coding: utf-8 -*-
 # import faulthandler
 import logging
-from typing import List
+from typing import List, Optional
 
 from langchain_core.embeddings import Embeddings
 from llama_index.core.schema import BaseNode, TextNode
@@ -24,6 +24,9 @@ from llama_index.core.schema import BaseNode, TextNode
 from aperag.aperag_config import settings
 from aperag.docparser.base import Part
 from aperag.docparser.chunking import rechunk
+from aperag.index.chunk_diff import compute_content_hash
+from aperag.llm.embed.embedding_service import EmbeddingService
+from aperag.llm.llm_error_types import BatchProcessingError
 from aperag.utils.tokenizer import get_default_tokenizer
 from aperag.vectorstore.connector import VectorStoreConnectorAdaptor
 
@@ -58,19 +61,58 @@ def create_embeddings_and_store(
     if not parts:
         return []
 
+    nodes = build_text_nodes(parts, chunk_size, chunk_overlap, tokenizer)
+    ctx_ids = [ctx_id for ctx_id in embed_and_store_nodes(nodes, vector_store_adaptor, embedding_model) if ctx_id]
+    logger.info(f"processed document with {len(parts)} parts and {len(ctx_ids)} chunks")
+    return ctx_ids
+
+
+def build_text_nodes(
+    parts: List[Part],
+    chunk_size: int = None,
+    chunk_overlap: int = None,
+    tokenizer=None,
+) -> List[TextNode]:
+    """
+    Rechunk document parts and build the text nodes to embed, including
+    hierarchy and label paddings.
+
+    Args:
+        parts: List of document parts to process
+        chunk_size: Size for chunking text (defaults to settings.chunk_size)
+        chunk_overlap: Overlap size for chunking (defaults to settings.chunk_overlap_size)
+        tokenizer: Tokenizer to use (defaults to default tokenizer)
+
+    Returns:
+        List[TextNode]: Nodes in document order, without embeddings
+    """
     # Initialize parameters with defaults
     chunk_size = chunk_size or settings.chunk_size
     chunk_overlap = chunk_overlap or settings.chunk_overlap_size
     tokenizer = tokenizer or get_default_tokenizer()
 
-    nodes: List[BaseNode] = []
-
     # 1. Rechunk the document parts (resulting in text parts)
     # After rechunk(), parts only contains TextPart
     chunked_parts = rechunk(parts, chunk_size, chunk_overlap, tokenizer)
 
+    return build_text_nodes_from_chunks(chunked_parts)
+
+
+def build_text_nodes_from_chunks(chunks: List[Part]) -> List[TextNode]:
+    """
+    Build the text nodes to embed from already chunked parts, including
+    hierarchy and label paddings.
+
+    Args:
+        chunks: Text chunks, e.g. from the shared chunking stage of the parse task
+
+    Returns:
+        List[TextNode]: Nodes in document order, without embeddings
+    """
+    nodes: List[TextNode] = []
+
     # 2. Process each text chunk
-    for part in chunked_parts:
+    for part in chunks:
         if not part.content:
             continue
 
@@ -103,16 +145,52 @@ def create_embeddings_and_store(
         # 2.3 Prepare metadata for the node
         metadata = part.metadata.copy()
         metadata["source"] = metadata.get("name", "")
+        # Lets search results of this chunk be matched with those of other indexes
+        metadata["content_hash"] = compute_content_hash(part.content)
         # 2.4 Create TextNode
         nodes.append(TextNode(text=text, metadata=metadata))
 
+    return nodes
+
+
+def embed_and_store_nodes(
+    nodes: List[BaseNode],
+    vector_store_adaptor: VectorStoreConnectorAdaptor,
+    embedding_model: Embeddings,
+) -> List[Optional[str]]:
+    """
+    Generate embeddings for text nodes and add them to the vector store.
+
+    Nodes whose content fails to embed on its own are skipped, retrying cannot fix them.
+    The call only fails if no node could be embedded.
+
+    Returns:
+        List[Optional[str]]: Vector store IDs, aligned with nodes, None for skipped nodes
+    """
+    if not nodes:
+        return []
+
     # 3. Generate embeddings for text chunks
     texts = [node.get_content() for node in nodes]
-    vectors = embedding_model.embed_documents(texts)
+    try:
+        if isinstance(embedding_model, EmbeddingService):
+            # Share provider round-trips with other documents being indexed concurrently by this worker
+            vectors = embedding_model.embed_documents(texts, micro_batch=settings.embedding_micro_batch_enabled)
+        else:
+            vectors = embedding_model.embed_documents(texts)
+    except BatchProcessingError as e:
+        if not e.embeddings or all(vector is None for vector in e.embeddings):
+            raise
+        logger.warning(f"Skipping {len(e.failed_indices)} of {len(nodes)} chunks that failed to embed: {e.reason}")
+        vectors = e.embeddings
+
     # 4. Assign embeddings to nodes
-    for i in range(len(vectors)):
-        nodes[i].embedding = vectors[i]
+    embedded_nodes = []
+    for node, vector in zip(nodes, vectors):
+        if vector is not None:
+            node.embedding = vector
+            embedded_nodes.append(node)
 
-    logger.info(f"processed document with {len(parts)} parts and {len(vectors)} chunks")
     # 5. Add nodes to vector store and return results
-    return vector_store_adaptor.connector.store.add(nodes)
+    stored_ids = iter(vector_store_adaptor.connector.store.add(embedded_nodes))
+    return [next(stored_ids) if vector is not None else None for vector in vectors]
@@ -20,6 +20,7 @@ This module configures LiteLLM's built-in caching functionality with:
 - Custom cache key generation
 - Cache hit/miss tracking
 - Cache statistics
+- Statistics for the per-text embedding cache (see aperag.llm.embed.embedding_cache)
 """
 
 import logging
@@ -41,6 +42,14 @@ _cache_stats = {
     "total_requests": 0,
 }
 
+# Per-text embedding cache statistics, counted per text rather than per request
+_embedding_cache_stats = {
+    "hits": 0,
+    "misses": 0,
+    "added": 0,
+    "total_lookups": 0,
+}
+
 
 # doc: https://docs.litellm.ai/docs/caching/all_caches#enabling-cache
 # All parameters for cache: https://docs.litellm.ai/docs/caching/all_caches#cache-initialization-parameters
@@ -180,3 +189,49 @@ def clear_cache_stats() -> None:
         "total_requests": 0,
     }
     logger.info("Local cache statistics cleared")
+
+
+def record_embedding_cache_lookup(hits: int, misses: int) -> None:
+    """Record the outcome of a per-text embedding cache lookup."""
+    global _embedding_cache_stats
+    _embedding_cache_stats["hits"] += hits
+    _embedding_cache_stats["misses"] += misses
+    _embedding_cache_stats["total_lookups"] += hits + misses
+
+
+def record_embedding_cache_added(count: int) -> None:
+    """Record embeddings written to the per-text embedding cache."""
+    global _embedding_cache_stats
+    _embedding_cache_stats["added"] += count
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """
+    Get per-text embedding cache statistics for the current process.
+
+    Returns:
+        Dict containing embedding cache statistics including hit rate calculation.
+    """
+    stats = _embedding_cache_stats.copy()
+
+    if stats["total_lookups"] > 0:
+        stats["hit_rate"] = round(stats["hits"] / stats["total_lookups"], 4)
+    else:
+        stats["hit_rate"] = 0.0
+
+    stats["cache_type"] = "embedding_per_text"
+    stats["note"] = "Process-specific stats, not thread-safe"
+
+    return stats
+
+
+def clear_embedding_cache_stats() -> None:
+    """Reset per-text embedding cache statistics for the current process."""
+    global _embedding_cache_stats
+    _embedding_cache_stats = {
+        "hits": 0,
+        "misses": 0,
+        "added": 0,
+        "total_lookups": 0,
+    }
+    logger.info("Local embedding cache statistics cleared")
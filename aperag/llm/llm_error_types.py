@@ -246,7 +246,13 @@ class DimensionMismatchError(EmbeddingError):
 class BatchProcessingError(EmbeddingError):
     """Raised when batch processing of embeddings fails"""
 
-    def __init__(self, batch_size: int, failed_indices: list = None, reason: str = "Batch processing failed"):
+    def __init__(
+        self,
+        batch_size: int,
+        failed_indices: list = None,
+        reason: str = "Batch processing failed",
+        embeddings: list = None,
+    ):
         message = f"Batch processing error (batch size: {batch_size}): {reason}"
         details = {"batch_size": batch_size, "reason": reason}
         if failed_indices:
@@ -255,6 +261,8 @@ class BatchProcessingError(EmbeddingError):
         self.batch_size = batch_size
         self.failed_indices = failed_indices or []
         self.reason = reason
+        # Embeddings of the inputs that succeeded, aligned with the input and None at failed_indices
+        self.embeddings = embeddings
 
 
 # Rerank-specific errors
@@ -359,7 +367,10 @@ def wrap_litellm_error(
 
     # Service-specific errors
     if service_type == "embedding":
-        if any(keyword in error_msg for keyword in ["text too long", "token limit", "input too large"]):
+        if any(
+            keyword in error_msg
+            for keyword in ["text too long", "token limit", "input too large", "context length", "payload too large"]
+        ):
             return TextTooLongError(None, None, model_name)  # Pass None when exact lengths are unavailable
         if any(keyword in error_msg for keyword in ["empty text", "no input"]):
             return EmptyTextError()
@@ -0,0 +1,43 @@
+"""add lightrag doc graph refs
+
+Revision ID: 9c3e5a7d1b24
+Revises: d112e0332219
+Create Date: 2025-10-16 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e5a7d1b24'
+down_revision: Union[str, None] = 'd112e0332219'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lightrag_doc_graph_refs',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('workspace', sa.String(length=255), nullable=False),
+    sa.Column('doc_id', sa.String(length=256), nullable=False),
+    sa.Column('chunk_id', sa.String(length=255), nullable=False),
+    sa.Column('ref_type', sa.String(length=16), nullable=False),
+    sa.Column('entity_id', sa.String(length=256), nullable=False),
+    sa.Column('target_entity_id', sa.String(length=256), nullable=False),
+    sa.Column('create_time', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('workspace', 'doc_id', 'chunk_id', 'ref_type', 'entity_id', 'target_entity_id', name='uq_lightrag_doc_graph_refs')
+    )
+    op.create_index('idx_lightrag_doc_graph_refs_workspace_doc', 'lightrag_doc_graph_refs', ['workspace', 'doc_id'], unique=False)
+    op.create_index('idx_lightrag_doc_graph_refs_workspace_chunk', 'lightrag_doc_graph_refs', ['workspace', 'chunk_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_lightrag_doc_graph_refs_workspace_chunk', table_name='lightrag_doc_graph_refs')
+    op.drop_index('idx_lightrag_doc_graph_refs_workspace_doc', table_name='lightrag_doc_graph_refs')
+    op.drop_table('lightrag_doc_graph_refs')
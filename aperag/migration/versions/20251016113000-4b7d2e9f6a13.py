@@ -0,0 +1,39 @@
+"""add lightrag llm cache
+
+Revision ID: 4b7d2e9f6a13
+Revises: 9c3e5a7d1b24
+Create Date: 2025-10-16 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7d2e9f6a13'
+down_revision: Union[str, None] = '9c3e5a7d1b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lightrag_llm_cache',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('workspace', sa.String(length=255), nullable=False),
+    sa.Column('cache_type', sa.String(length=32), nullable=False),
+    sa.Column('model', sa.String(length=255), nullable=True),
+    sa.Column('return_value', sa.Text(), nullable=True),
+    sa.Column('create_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('update_time', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'workspace')
+    )
+    op.create_index('idx_lightrag_llm_cache_update_time', 'lightrag_llm_cache', ['update_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_lightrag_llm_cache_update_time', table_name='lightrag_llm_cache')
+    op.drop_table('lightrag_llm_cache')
@@ -0,0 +1,51 @@
+"""add hnsw indexes for lightrag vector tables
+
+Revision ID: 7e1f4c8a2d65
+Revises: 4b7d2e9f6a13
+Create Date: 2025-10-16 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1f4c8a2d65'
+down_revision: Union[str, None] = '4b7d2e9f6a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The LightRAG vector tables are shared by collections using different embedding models, so
+# content_vector keeps an untyped dimension. HNSW needs a fixed dimension, therefore each table
+# gets one partial expression index per common embedding dimension. Similarity queries cast
+# content_vector to vector(N) and filter on vector_dims(content_vector) = N to match them.
+# HNSW supports at most 2000 dimensions for the vector type, larger embeddings are indexed
+# as halfvec(N), which supports up to 4000 dimensions.
+_TABLES = ('lightrag_doc_chunks', 'lightrag_vdb_entity', 'lightrag_vdb_relation')
+_DIMENSIONS = (384, 512, 768, 1024, 1536, 3072)
+_HNSW_MAX_VECTOR_DIMS = 2000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the indexes without locking out writes to the tables, which cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for table in _TABLES:
+            for dim in _DIMENSIONS:
+                vector_type = 'halfvec' if dim > _HNSW_MAX_VECTOR_DIMS else 'vector'
+                op.execute(sa.text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_{table}_hnsw_{dim} ON {table} "
+                    f"USING hnsw ((content_vector::{vector_type}({dim})) {vector_type}_cosine_ops) "
+                    f"WHERE vector_dims(content_vector) = {dim}"
+                ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in _TABLES:
+            for dim in _DIMENSIONS:
+                op.execute(sa.text(f"DROP INDEX CONCURRENTLY IF EXISTS idx_{table}_hnsw_{dim}"))
@@ -75,6 +75,19 @@ class ObjectStore(ABC):
         """
         ...
 
+    def local_path(self, path: str) -> str | None:
+        """
+        Gets the filesystem path of an object kept on local disk.
+
+        Args:
+            path: The path of the object.
+
+        Returns:
+            The local file path, or None if the object does not exist or the store is not
+            backed by the local filesystem. Callers then read through get or stream_range.
+        """
+        return None
+
     @abstractmethod
     def obj_exists(self, path: str) -> bool:
         """
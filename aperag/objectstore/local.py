@@ -241,6 +241,13 @@ class Local(ObjectStore):  # 本地对象存储定义
             logger.warning(f"Failed to open object at {path} for streaming: {e}")
             return None
 
+    def local_path(self, path: str) -> str | None:
+        try:
+            full_path = self._resolve_object_path(path)
+        except ValueError:  # From _resolve_object_path for invalid paths
+            return None
+        return str(full_path) if full_path.is_file() else None
+
     def obj_exists(self, path: str) -> bool:
         try:
             full_path = self._resolve_object_path(path)
@@ -117,12 +117,12 @@ class S3(ObjectStore):
 
     def stream_range(self, path: str, start: int, end: int | None = None) -> Tuple[IO[bytes], int] | None:
         self._ensure_conn()
-        path = self._final_path(path)
 
-        # Get total file size to validate range
+        # Get total file size to validate range, get_obj_size applies the prefix itself
         total_size = self.get_obj_size(path)
         if total_size is None:
             return None  # Object doesn't exist
+        path = self._final_path(path)
 
         if start < 0 or start >= total_size:
             raise ValueError("Start position is out of file bounds.")
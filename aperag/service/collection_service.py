@@ -237,6 +237,10 @@ class CollectionService:
         if not updated_instance:
             raise CollectionNotFoundException(collection_id)
 
+        from aperag.graph import lightrag_manager
+
+        lightrag_manager.invalidate_lightrag_instances(collection_id)
+
         return await self.build_collection_response(updated_instance)
 
     async def delete_collection(self, user: str, collection_id: str) -> Optional[view_models.Collection]:
@@ -282,7 +286,10 @@ class CollectionService:
         deleted_instance = await self.db_ops.execute_with_transaction(_delete_collection_with_quota)
 
         if deleted_instance:
+            from aperag.graph import lightrag_manager
+
             # Clean up related resources
+            lightrag_manager.invalidate_lightrag_instances(collection_id)
             collection_delete_task.delay(collection_id)
             return await self.build_collection_response(deleted_instance)
 
@@ -322,8 +329,12 @@ class CollectionService:
             "deduplicate": True,
         }
         query = data.query
+        # Vector, summary and vision searches query the same vector collection, so when more
+        # than one is requested they run as a single multi-index search with one query embedding
+        use_multi_index_search = sum(bool(s) for s in (data.vector_search, data.summary_search, data.vision_search)) > 1
+
         # Configure search nodes based on request
-        if data.vector_search:
+        if data.vector_search and not use_multi_index_search:
             node_id = "vector_search"
             input_values = {
                 "query": query,
@@ -381,7 +392,7 @@ class CollectionService:
             merge_node_values["graph_search_docs"] = "{{ nodes.graph_search.output.docs }}"
             edges.append(Edge(source="graph_search", target=merge_node_id))
 
-        if data.summary_search:
+        if data.summary_search and not use_multi_index_search:
             node_id = "summary_search"
             input_values = {
                 "query": query,
@@ -401,7 +412,7 @@ class CollectionService:
             merge_node_values["summary_search_docs"] = "{{ nodes.summary_search.output.docs }}"
             edges.append(Edge(source=node_id, target=merge_node_id))
 
-        if data.vision_search:
+        if data.vision_search and not use_multi_index_search:
             node_id = "vision_search"
             input_values = {
                 "query": query,
@@ -421,6 +432,35 @@ class CollectionService:
             merge_node_values["vision_search_docs"] = "{{ nodes.vision_search.output.docs }}"
             edges.append(Edge(source=node_id, target=merge_node_id))
 
+        if use_multi_index_search:
+            node_id = "multi_index_search"
+            input_values = {
+                "query": query,
+                "collection_ids": [collection_id],
+            }
+            for name, search in (
+                ("vector", data.vector_search),
+                ("summary", data.summary_search),
+                ("vision", data.vision_search),
+            ):
+                if search:
+                    input_values[f"{name}_top_k"] = search.topk if search.topk is not None else 5
+                    if search.similarity is not None:
+                        input_values[f"{name}_similarity_threshold"] = search.similarity
+                    merge_node_values[f"{name}_search_docs"] = (
+                        "{{ nodes.multi_index_search.output.%s_search_docs }}" % name
+                    )
+            # Add chat_id for filtering if provided
+            if chat_id:
+                input_values["chat_id"] = chat_id
+
+            nodes[node_id] = NodeInstance(
+                id=node_id,
+                type="multi_index_search",
+                input_values=input_values,
+            )
+            edges.append(Edge(source=node_id, target=merge_node_id))
+
         nodes[merge_node_id] = NodeInstance(
             id=merge_node_id,
             type="merge",
@@ -63,6 +63,14 @@ def _check_edit_permission(user_id: str, is_admin: bool, target_user_id: str = N
         raise PermissionDeniedError(error_msg)
 
 
+def _invalidate_provider_dependents():
+    """Drop cached objects built from provider base URLs and API keys"""
+    from aperag.graph import lightrag_manager
+
+    # Any collection may use the provider, so all cached LightRAG instances are dropped
+    lightrag_manager.invalidate_lightrag_instances()
+
+
 async def get_llm_configuration(user_id: str, is_admin: bool = False):
     """Get complete LLM configuration including providers and models
 
@@ -305,6 +313,8 @@ async def update_llm_provider(provider_name: str, update_data: dict, user_id: st
         if api_key and api_key.strip():
             await async_db_ops.upsert_msp(name=provider_name, api_key=api_key)
 
+    _invalidate_provider_dependents()
+
     return {
         "name": provider.name,
         "user_id": provider.user_id,
@@ -345,6 +355,8 @@ async def delete_llm_provider(provider_name: str, user_id: str, is_admin: bool =
     # Physical delete the API key for this provider
     await async_db_ops.delete_msp_by_name(provider_name)
 
+    _invalidate_provider_dependents()
+
     return True
 
 
@@ -184,6 +184,9 @@ class CollectionTask:
         # Execute async deletion
         async_to_sync(_delete_lightrag)()
 
+        # Cached LLM responses (e.g. entity extractions) belong to the collection's workspace
+        deletion_stats["llm_cache_deleted"] = db_ops.delete_lightrag_llm_cache_by_workspace(str(collection.id))
+
         return deletion_stats
 
     def _delete_vector_databases(self, collection_id: str) -> None:
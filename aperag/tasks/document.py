@@ -16,6 +16,7 @@ import logging
 
 from aperag.db.models import DocumentIndexType
 from aperag.tasks.models import IndexTaskResult, LocalDocumentInfo, ParsedDocumentData
+from aperag.tasks.parsed_data_store import save_parsed_document
 from aperag.tasks.utils import parse_document_content
 
 logger = logging.getLogger(__name__)
@@ -42,9 +43,12 @@ class DocumentIndexTask:
 
         document, collection = get_document_and_collection(document_id)
         # -- 根据知识库配置解析文档
-        content, doc_parts, local_doc = parse_document_content(document, collection)
+        content, doc_parts, chunks, local_doc = parse_document_content(document, collection)
 
         local_doc_info = LocalDocumentInfo(path=local_doc.path, is_temp=getattr(local_doc, "is_temp", False))
+        # -- 解析结果只写入对象存储一次，Celery中只传递引用
+        # Persist the parse output once; only its reference is passed through the broker
+        parsed_data_path = save_parsed_document(document.object_store_base_path(), content, doc_parts, chunks)
 
         return ParsedDocumentData(
             document_id=document_id,
@@ -53,6 +57,8 @@ class DocumentIndexTask:
             doc_parts=doc_parts,
             file_path=local_doc.path,
             local_doc_info=local_doc_info,
+            chunks=chunks,
+            parsed_data_path=parsed_data_path,
         )
 
     def create_index(self, document_id: str, index_type: str, parsed_data: ParsedDocumentData) -> IndexTaskResult:
@@ -82,6 +88,7 @@ class DocumentIndexTask:
                     document_id=document_id,
                     content=parsed_data.content,
                     doc_parts=parsed_data.doc_parts,
+                    chunks=parsed_data.chunks,
                     collection=collection,
                     file_path=parsed_data.file_path,
                 )
@@ -96,6 +103,7 @@ class DocumentIndexTask:
                     document_id=document_id,
                     content=parsed_data.content,
                     doc_parts=parsed_data.doc_parts,
+                    chunks=parsed_data.chunks,
                     collection=collection,
                     file_path=parsed_data.file_path,
                 )
@@ -137,6 +145,7 @@ class DocumentIndexTask:
                         document_id=document_id,
                         content=parsed_data.content,
                         doc_parts=parsed_data.doc_parts,
+                        chunks=parsed_data.chunks,
                         collection=collection,
                         file_path=parsed_data.file_path,
                     )
@@ -272,6 +281,7 @@ class DocumentIndexTask:
                     document_id=document_id,
                     content=parsed_data.content,
                     doc_parts=parsed_data.doc_parts,
+                    chunks=parsed_data.chunks,
                     collection=collection,
                     file_path=parsed_data.file_path,
                 )
@@ -286,6 +296,7 @@ class DocumentIndexTask:
                     document_id=document_id,
                     content=parsed_data.content,
                     doc_parts=parsed_data.doc_parts,
+                    chunks=parsed_data.chunks,
                     collection=collection,
                     file_path=parsed_data.file_path,
                 )
@@ -327,6 +338,7 @@ class DocumentIndexTask:
                         document_id=document_id,
                         content=parsed_data.content,
                         doc_parts=parsed_data.doc_parts,
+                        chunks=parsed_data.chunks,
                         collection=collection,
                         file_path=parsed_data.file_path,
                     )
@@ -53,17 +53,31 @@ class ParsedDocumentData:
     doc_parts: List[Any]
     file_path: str
     local_doc_info: LocalDocumentInfo
+    # Text chunks shared by all indexers; None for data parsed before chunking moved to the parse task
+    chunks: Optional[List[Any]] = None
+    # Object store reference of the persisted parse output, see aperag.tasks.parsed_data_store
+    parsed_data_path: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dict with proper serialization of doc_parts"""
-        return {
+        """
+        Convert to dict for passing through Celery.
+
+        When the parse output was persisted, only its reference is included.
+        """
+        data = {
             "document_id": self.document_id,
             "collection_id": self.collection_id,
-            "content": self.content,
-            "doc_parts": self._serialize_doc_parts(self.doc_parts),
             "file_path": self.file_path,
             "local_doc_info": self.local_doc_info.to_dict(),
         }
+        if self.parsed_data_path is not None:
+            data["parsed_data_path"] = self.parsed_data_path
+            return data
+
+        data["content"] = self.content
+        data["doc_parts"] = self._serialize_doc_parts(self.doc_parts)
+        data["chunks"] = self._serialize_doc_parts(self.chunks) if self.chunks is not None else None
+        return data
 
     def _serialize_doc_parts(self, doc_parts: List[Any]) -> List[Dict[str, Any]]:
         """Serialize doc_parts to JSON-compatible format"""
@@ -102,18 +116,39 @@ class ParsedDocumentData:
         return deserialized_parts
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> "ParsedDocumentData":
+    def from_dict(cls, data: Dict[str, Any], load_blobs: bool = True) -> "ParsedDocumentData":
+        """
+        Restore parsed data passed through Celery.
+
+        Args:
+            data: Dict produced by to_dict
+            load_blobs: Whether to map binary part data (e.g. images) of persisted parse output.
+                If False, parts carrying binary data are left out.
+        """
         local_doc_info = LocalDocumentInfo(**data["local_doc_info"])
         instance = cls(
             document_id=data["document_id"],
             collection_id=data["collection_id"],
-            content=data["content"],
+            content="",
             doc_parts=[],  # Will be set below
             file_path=data["file_path"],
             local_doc_info=local_doc_info,
         )
+        if data.get("parsed_data_path"):
+            from aperag.tasks.parsed_data_store import load_parsed_document
+
+            instance.parsed_data_path = data["parsed_data_path"]
+            instance.content, instance.doc_parts, instance.chunks = load_parsed_document(
+                instance.parsed_data_path, load_blobs=load_blobs
+            )
+            return instance
+
+        # Payloads queued before parse output was persisted carry the parts inline
+        instance.content = data["content"]
         # Deserialize doc_parts to restore object-like behavior
         instance.doc_parts = instance._deserialize_doc_parts(data["doc_parts"])
+        if data.get("chunks") is not None:
+            instance.chunks = instance._deserialize_doc_parts(data["chunks"])
         return instance
 
 
@@ -0,0 +1,188 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Object store persistence for parsed documents.
+
+parse_document_task writes its output once to the object store, and only a small
+reference travels through the Celery broker to the index tasks:
+
+    {base_path}/parsed/{parse_id}/parts.msgpack   content, parts and chunks
+    {base_path}/parsed/{parse_id}/blobs.bin       binary part fields, concatenated
+
+Every parse writes to its own prefix, so index tasks still queued from an earlier
+parse keep reading their own output. The workflow deletes its prefix with
+delete_parsed_document once all of its index tasks are done.
+
+Parts keep their type, and binary fields (e.g. AssetBinPart.data) are stored as
+(offset, length) into the blob file. Readers memory-map the blob file when the object
+store keeps it on local disk, so image bytes are only paged in when an indexer reads
+them. Otherwise each binary field is fetched with a ranged read of its own bytes.
+"""
+
+import logging
+import mmap
+import tempfile
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import msgpack
+
+from aperag.docparser import base as part_types
+from aperag.docparser.base import Part
+from aperag.objectstore.base import get_object_store
+
+logger = logging.getLogger(__name__)
+
+BlobReader = Callable[[int, int], bytes | memoryview]
+
+FORMAT_VERSION = 1
+_MANIFEST_NAME = "parts.msgpack"
+_BLOBS_NAME = "blobs.bin"
+
+
+def _parsed_data_prefix(base_path: str) -> str:
+    return f"{base_path}/parsed"
+
+
+def _part_class(type_name: str) -> type[Part]:
+    cls = getattr(part_types, type_name, None)
+    if isinstance(cls, type) and issubclass(cls, Part):
+        return cls
+    return Part
+
+
+def _encode_parts(parts: List[Any], blob_file) -> List[Dict[str, Any]]:
+    encoded = []
+    for part in parts:
+        fields = part.model_dump()
+        blobs = {}
+        for name, value in list(fields.items()):
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                blobs[name] = [blob_file.tell(), len(value)]
+                blob_file.write(value)
+                del fields[name]
+        encoded.append({"type": part.__class__.__name__, "fields": fields, "blobs": blobs})
+    return encoded
+
+
+def _decode_parts(encoded_parts: List[Dict[str, Any]], read_blob: Optional[BlobReader]) -> List[Part]:
+    parts = []
+    for encoded in encoded_parts:
+        fields = encoded["fields"]
+        for name, (offset, length) in encoded["blobs"].items():
+            # Without the blob file binary fields are left empty, the part itself is kept
+            # since it may still reference its data elsewhere (e.g. an uploaded asset)
+            fields[name] = read_blob(offset, length) if read_blob is not None and length else b""
+        # Fields were validated when the parts were created, skip validation (and copying blobs)
+        parts.append(_part_class(encoded["type"]).model_construct(**fields))
+    return parts
+
+
+def save_parsed_document(base_path: str, content: str, doc_parts: List[Any], chunks: List[Any]) -> str:
+    """
+    Persist parsed document output under a new prefix, leaving earlier parses untouched.
+
+    Args:
+        base_path: Object store base path of the document
+        content: Full markdown content
+        doc_parts: Parts indexed as-is (e.g. vision assets)
+        chunks: Text chunks shared by the indexers
+
+    Returns:
+        str: Reference to pass to the index tasks
+    """
+    obj_store = get_object_store()
+    path = f"{_parsed_data_prefix(base_path)}/{uuid.uuid4().hex}"
+
+    with tempfile.TemporaryFile() as blob_file:
+        manifest = {
+            "version": FORMAT_VERSION,
+            "content": content,
+            "doc_parts": _encode_parts(doc_parts, blob_file),
+            "chunks": _encode_parts(chunks, blob_file),
+        }
+        blob_size = blob_file.tell()
+        if blob_size:
+            blob_file.seek(0)
+            obj_store.put(f"{path}/{_BLOBS_NAME}", blob_file)
+        manifest["blob_size"] = blob_size
+
+        manifest_data = msgpack.packb(manifest, use_bin_type=True, default=str)
+        obj_store.put(f"{path}/{_MANIFEST_NAME}", manifest_data)
+
+    logger.info(
+        f"Saved parsed document to {path}: {len(doc_parts)} parts, {len(chunks)} chunks, "
+        f"manifest {len(manifest_data)} bytes, blobs {blob_size} bytes"
+    )
+    return path
+
+
+def load_parsed_document(path: str, load_blobs: bool = True) -> Tuple[str, List[Part], List[Part]]:
+    """
+    Load parsed document output saved by save_parsed_document.
+
+    Args:
+        path: Reference returned by save_parsed_document
+        load_blobs: Whether to map the blob file. If False, binary fields are left empty.
+
+    Returns:
+        Tuple of (content, doc_parts, chunks)
+    """
+    obj_store = get_object_store()
+    stream = obj_store.get(f"{path}/{_MANIFEST_NAME}")
+    if stream is None:
+        raise FileNotFoundError(f"Parsed document not found at {path}")
+    with stream:
+        manifest = msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported parsed document format version: {manifest.get('version')}")
+
+    read_blob = None
+    if load_blobs and manifest.get("blob_size"):
+        read_blob = _blob_reader(obj_store, f"{path}/{_BLOBS_NAME}")
+
+    doc_parts = _decode_parts(manifest["doc_parts"], read_blob)
+    chunks = _decode_parts(manifest["chunks"], read_blob)
+    return manifest["content"], doc_parts, chunks
+
+
+def delete_parsed_document(path: str):
+    """
+    Delete parsed document output saved by save_parsed_document.
+
+    Args:
+        path: Reference returned by save_parsed_document
+    """
+    get_object_store().delete_objects_by_prefix(f"{path}/")
+    logger.info(f"Deleted parsed document at {path}")
+
+
+def _blob_reader(obj_store, blob_path: str) -> BlobReader:
+    local_path = obj_store.local_path(blob_path)
+    if local_path is not None:
+        # The mapping keeps the data reachable after the file is closed
+        with open(local_path, "rb") as local_file:
+            blobs = memoryview(mmap.mmap(local_file.fileno(), 0, access=mmap.ACCESS_READ))
+        return lambda offset, length: blobs[offset : offset + length]
+
+    def read_range(offset: int, length: int) -> bytes:
+        ranged = obj_store.stream_range(blob_path, offset, offset + length - 1)
+        if ranged is None:
+            raise FileNotFoundError(f"Parsed document blobs not found at {blob_path}")
+        stream, _ = ranged
+        with stream:
+            return stream.read()
+
+    return read_range
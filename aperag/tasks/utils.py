@@ -24,8 +24,11 @@ class TaskConfig:
     RETRY_MAX_RETRIES_COLLECTION = 2
 
 
-def parse_document_content(document, collection) -> Tuple[str, List[Any], Any]:  # 解析文档【该操作可被所有类型的索引任务共用】
-    """Parse document content for indexing (shared across all index types)"""
+def parse_document_content(document, collection) -> Tuple[str, List[Any], List[Any], Any]:  # 解析文档【该操作可被所有类型的索引任务共用】
+    """Parse document content for indexing (shared across all index types)
+
+    Returns (content, doc_parts, chunks, local_doc); chunks are the text chunks shared by all indexers.
+    """
     from aperag.index.document_parser import document_parser
     from aperag.schema.utils import parseCollectionConfig
     from aperag.service.setting_service import setting_service
@@ -53,13 +56,14 @@ def parse_document_content(document, collection) -> Tuple[str, List[Any], Any]:
         # -- 如果文件是在对话过程中上传的，则为每个分段设置元数据【对话id和文件id】
         # Add chat metadata to all document parts if this is a chat upload
         doc_parts = parsing_result.doc_parts
+        chunks = parsing_result.chunks
         if document.doc_metadata:
             try:
                 doc_metadata = json.loads(document.doc_metadata)
                 if doc_metadata.get("file_type") == "chat_upload":
                     chat_id = doc_metadata.get("chat_id")
                     if chat_id:
-                        for part in doc_parts:
+                        for part in doc_parts + chunks:
                             if hasattr(part, "metadata"):
                                 if part.metadata is None:
                                     part.metadata = {}
@@ -71,7 +75,7 @@ def parse_document_content(document, collection) -> Tuple[str, List[Any], Any]:
             except json.JSONDecodeError:
                 pass
 
-        return parsing_result.content, doc_parts, local_doc
+        return parsing_result.content, doc_parts, chunks, local_doc
     except Exception as e:
         # Cleanup on error
         source.cleanup_document(local_doc.path)
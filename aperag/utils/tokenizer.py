@@ -13,11 +13,32 @@
 # limitations under the License.
 
 import os
+from functools import lru_cache
 from typing import Callable, List
 
 import tiktoken
 
 
+@lru_cache(maxsize=None)
+def _get_encoding(name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
+
+
+def _get_default_encoding() -> tiktoken.Encoding:
+    return _get_encoding(os.environ.get("DEFAULT_ENCODING_MODEL", "cl100k_base"))
+
+
 def get_default_tokenizer() -> Callable[[str], List[int]]:
-    encoding = tiktoken.get_encoding(os.environ.get("DEFAULT_ENCODING_MODEL", "cl100k_base"))
-    return encoding.encode
+    return _get_default_encoding().encode
+
+
+def get_default_batch_tokenizer() -> Callable[[List[str]], List[List[int]]]:
+    return _get_default_encoding().encode_batch
+
+
+def get_batch_tokenizer(tokenizer: Callable[[str], List[int]]) -> Callable[[List[str]], List[List[int]]]:
+    """Get a batch version of a tokenizer, using tiktoken's multi-threaded encode_batch when possible."""
+    encoding = getattr(tokenizer, "__self__", None)
+    if isinstance(encoding, tiktoken.Encoding) and tokenizer.__name__ == "encode":
+        return encoding.encode_batch
+    return lambda texts: [tokenizer(text) for text in texts]
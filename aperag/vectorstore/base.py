@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.vector_stores.types import VectorStore
@@ -18,6 +19,17 @@ class VectorStoreConnector(ABC):
     def search(self, query: QueryWithEmbedding, **kwargs) -> QueryResult:
         pass
 
+    async def asearch(self, query: QueryWithEmbedding, **kwargs) -> QueryResult:
+        # connectors without a native async client run the blocking search in a worker thread
+        return await asyncio.to_thread(self.search, query, **kwargs)
+
+    def search_batch(self, queries: List[Tuple[QueryWithEmbedding, Dict[str, Any]]]) -> List[QueryResult]:
+        # connectors without a batch API run the searches one by one
+        return [self.search(query, **kwargs) for query, kwargs in queries]
+
+    async def asearch_batch(self, queries: List[Tuple[QueryWithEmbedding, Dict[str, Any]]]) -> List[QueryResult]:
+        return await asyncio.gather(*[self.asearch(query, **kwargs) for query, kwargs in queries])
+
     @abstractmethod
     def delete(self, **delete_kwargs: Any):
         pass
@@ -1,18 +1,54 @@
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict
+import threading
+import weakref
+from typing import Any, Dict, List, Tuple
 
 import qdrant_client
 from llama_index.vector_stores.qdrant import QdrantVectorStore
-from qdrant_client.http.models import ScoredPoint
-from qdrant_client.models import VectorParams
+from qdrant_client.http.models import QueryResponse, ScoredPoint
+from qdrant_client.models import QueryRequest, VectorParams
 
 from aperag.query.query import DocumentWithScore, QueryResult, QueryWithEmbedding
 from aperag.vectorstore.base import VectorStoreConnector
 
 logger = logging.getLogger(__name__)
 
+# Payload fields read by _convert_scored_point_to_document_with_score. llama-index also
+# flattens node metadata into the payload, which search results never need.
+_SEARCH_PAYLOAD_FIELDS = ["text", "metadata", "_node_content"]
+
+# Qdrant clients hold connection pools, so they are shared by every connector talking to the
+# same endpoint for the lifetime of the process. Async clients are bound to the event loop
+# that created them and are therefore pooled per loop.
+_client_pool: Dict[tuple, qdrant_client.QdrantClient] = {}
+_async_client_pool: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_client_pool_lock = threading.Lock()
+
+
+def _get_client(endpoint: tuple, client_kwargs: Dict[str, Any]) -> qdrant_client.QdrantClient:
+    with _client_pool_lock:
+        client = _client_pool.get(endpoint)
+        if client is None:
+            client = qdrant_client.QdrantClient(**client_kwargs)
+            _client_pool[endpoint] = client
+        return client
+
+
+def _get_async_client(endpoint: tuple, client_kwargs: Dict[str, Any]) -> qdrant_client.AsyncQdrantClient:
+    loop = asyncio.get_running_loop()
+    with _client_pool_lock:
+        clients = _async_client_pool.setdefault(loop, {})
+        client = clients.get(endpoint)
+        if client is None:
+            client = qdrant_client.AsyncQdrantClient(**client_kwargs)
+            clients[endpoint] = client
+        return client
+
 
 class QdrantVectorStoreConnector(VectorStoreConnector):
     def __init__(self, ctx: Dict[str, Any], **kwargs: Any) -> None:
@@ -30,9 +66,11 @@ class QdrantVectorStoreConnector(VectorStoreConnector):
         self.distance = ctx.get("distance", "Cosine")
 
         if self.url == ":memory:":
+            # an in-memory client is private storage, so it cannot be shared
+            self._endpoint = None
             self.client = qdrant_client.QdrantClient(":memory:")
         else:
-            self.client = qdrant_client.QdrantClient(
+            self._client_kwargs = dict(
                 url=self.url,
                 port=self.port,
                 grpc_port=self.grpc_port,
@@ -41,30 +79,82 @@ class QdrantVectorStoreConnector(VectorStoreConnector):
                 timeout=self.timeout,
                 **kwargs,
             )
+            self._endpoint = tuple(sorted((k, repr(v)) for k, v in self._client_kwargs.items()))
+            self.client = _get_client(self._endpoint, self._client_kwargs)
+
+    @property
+    def store(self) -> QdrantVectorStore:
+        # QdrantVectorStore checks the collection on creation, only pay for it when indexing
+        if self._store is None:
+            self._store = QdrantVectorStore(
+                client=self.client,
+                collection_name=self.collection_name,
+                vectors_config=VectorParams(size=self.vector_size, distance=self.distance),
+            )
+        return self._store
 
-        self.store = QdrantVectorStore(
-            client=self.client,
-            collection_name=self.collection_name,
-            vectors_config=VectorParams(size=self.vector_size, distance=self.distance),
-        )
+    @store.setter
+    def store(self, value: QdrantVectorStore) -> None:
+        self._store = value
 
     def search(self, query: QueryWithEmbedding, **kwargs):
-        consistency = kwargs.get("consistency", "majority")
-        search_params = kwargs.get("search_params")
-        score_threshold = kwargs.get("score_threshold", 0.1)
-        filter_conditions = kwargs.get("filter")
+        hits = self.client.query_points(**self._query_points_kwargs(query, **kwargs))
+        return self._to_query_result(query, hits)
+
+    async def asearch(self, query: QueryWithEmbedding, **kwargs):
+        if self._endpoint is None:
+            return await super().asearch(query, **kwargs)
+
+        aclient = _get_async_client(self._endpoint, self._client_kwargs)
+        hits = await aclient.query_points(**self._query_points_kwargs(query, **kwargs))
+        return self._to_query_result(query, hits)
+
+    def search_batch(self, queries: List[Tuple[QueryWithEmbedding, Dict[str, Any]]]) -> List[QueryResult]:
+        responses = self.client.query_batch_points(**self._query_batch_points_kwargs(queries))
+        return [self._to_query_result(query, hits) for (query, _), hits in zip(queries, responses)]
+
+    async def asearch_batch(self, queries: List[Tuple[QueryWithEmbedding, Dict[str, Any]]]) -> List[QueryResult]:
+        if self._endpoint is None:
+            return await super().asearch_batch(queries)
+
+        aclient = _get_async_client(self._endpoint, self._client_kwargs)
+        responses = await aclient.query_batch_points(**self._query_batch_points_kwargs(queries))
+        return [self._to_query_result(query, hits) for (query, _), hits in zip(queries, responses)]
+
+    def _query_batch_points_kwargs(self, queries: List[Tuple[QueryWithEmbedding, Dict[str, Any]]]) -> Dict[str, Any]:
+        # consistency applies to the whole batch request, the first search decides it
+        consistency = queries[0][1].get("consistency", "majority") if queries else "majority"
+        requests = []
+        for query, kwargs in queries:
+            search = self._query_points_kwargs(query, **kwargs)
+            requests.append(
+                QueryRequest(
+                    query=search["query"],
+                    limit=search["limit"],
+                    filter=search["query_filter"],
+                    params=search["search_params"],
+                    score_threshold=search["score_threshold"],
+                    with_vector=search["with_vectors"],
+                    with_payload=search["with_payload"],
+                )
+            )
+        return dict(collection_name=self.collection_name, requests=requests, consistency=consistency)
 
-        hits = self.client.query_points(
+    def _query_points_kwargs(self, query: QueryWithEmbedding, **kwargs) -> Dict[str, Any]:
+        return dict(
             collection_name=self.collection_name,
             query=query.embedding,
-            with_vectors=True,
+            # stored vectors are large, only return them to callers that ask for them
+            with_vectors=kwargs.get("with_vectors", False),
+            with_payload=kwargs.get("with_payload", _SEARCH_PAYLOAD_FIELDS),
             limit=query.top_k,
-            consistency=consistency,
-            search_params=search_params,
-            score_threshold=score_threshold,
-            query_filter=filter_conditions,
+            consistency=kwargs.get("consistency", "majority"),
+            search_params=kwargs.get("search_params"),
+            score_threshold=kwargs.get("score_threshold", 0.1),
+            query_filter=kwargs.get("filter"),
         )
 
+    def _to_query_result(self, query: QueryWithEmbedding, hits: QueryResponse) -> QueryResult:
         results = [self._convert_scored_point_to_document_with_score(point) for point in hits.points]
         results = [result for result in results if result is not None]
 
@@ -74,7 +74,7 @@ async def create_embeddings(http_request: Request, request: EmbeddingRequest, us
         )
 
         # Generate embeddings
-        embeddings = embedding_service.embed_documents(input_texts)
+        embeddings = await embedding_service.aembed_documents(input_texts)
 
         # Calculate token usage (approximation)
         total_tokens = sum(len(text.split()) for text in input_texts)
@@ -60,6 +60,10 @@ app.conf.beat_schedule = {
         'task': 'config.celery_tasks.reconcile_evaluations_task',
         'schedule': 300.0,  # Run every 5 minute
     },
+    'lightrag-llm-cache-gc': {
+        'task': 'config.celery_tasks.cleanup_lightrag_llm_cache_task',
+        'schedule': 3600.0,  # Run every 1 hour
+    },
 }
 
 # Set up task routes if local queue is specified
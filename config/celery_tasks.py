@@ -261,7 +261,10 @@ def create_index_task(self, document_id: str, index_type: str, parsed_data_dict:
             return skip_reason
 
         # Convert dict back to structured data
-        parsed_data = ParsedDocumentData.from_dict(parsed_data_dict)
+        # Only the vision index reads binary assets, other indexes skip mapping them
+        parsed_data = ParsedDocumentData.from_dict(
+            parsed_data_dict, load_blobs=index_type == DocumentIndexType.VISION.value
+        )
 
         # Execute index creation
         result = document_index_task.create_index(document_id, index_type, parsed_data)
@@ -387,7 +390,10 @@ def update_index_task(self, document_id: str, index_type: str, parsed_data_dict:
             return skip_reason
 
         # Convert dict back to structured data
-        parsed_data = ParsedDocumentData.from_dict(parsed_data_dict)
+        # Only the vision index reads binary assets, other indexes skip mapping them
+        parsed_data = ParsedDocumentData.from_dict(
+            parsed_data_dict, load_blobs=index_type == DocumentIndexType.VISION.value
+        )
 
         # Execute index update
         result = document_index_task.update_index(document_id, index_type, parsed_data)  # 更新index_type类型的索引
@@ -436,6 +442,12 @@ def trigger_create_indexes_workflow(self, parsed_data_dict: dict, document_id: s
     try:
         logger.info(f"Triggering parallel index creation for document {document_id} with types: {index_types}")
 
+        if not index_types:
+            # No chord will run, so nothing else deletes the parse output
+            logger.info(f"No index types to create for document {document_id}, deleting parsed data")
+            _delete_parsed_data(parsed_data_dict.get("parsed_data_path"))
+            return None
+
         # Dynamically create parallel index creation tasks
         parallel_index_tasks = group([
             create_index_task.s(document_id, index_type, parsed_data_dict, context)
@@ -445,7 +457,7 @@ def trigger_create_indexes_workflow(self, parsed_data_dict: dict, document_id: s
         # Create a chord that executes the completion notification after all create tasks are done
         workflow_chord = chord(
             parallel_index_tasks,
-            notify_workflow_complete.s(document_id, IndexAction.CREATE, index_types)
+            _notify_and_cleanup(document_id, IndexAction.CREATE, index_types, parsed_data_dict)
         )
 
         # Execute the chord
@@ -456,6 +468,8 @@ def trigger_create_indexes_workflow(self, parsed_data_dict: dict, document_id: s
     except Exception as e:
         error_msg = f"Failed to trigger create indexes workflow: {str(e)}"
         logger.error(error_msg, exc_info=True)
+        # The chord was not dispatched, no index task or callback will use the parse output
+        _delete_parsed_data(parsed_data_dict.get("parsed_data_path"))
         raise
 
 
@@ -513,6 +527,12 @@ def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: s
     try:
         logger.info(f"Triggering parallel index update for document {document_id} with types: {index_types}")
 
+        if not index_types:
+            # No chord will run, so nothing else deletes the parse output
+            logger.info(f"No index types to update for document {document_id}, deleting parsed data")
+            _delete_parsed_data(parsed_data_dict.get("parsed_data_path"))
+            return None
+
         # Create parallel index update tasks
         parallel_update_tasks = group([
             update_index_task.s(document_id, index_type, parsed_data_dict, context)
@@ -522,7 +542,7 @@ def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: s
         # Create chord: parallel tasks + completion notification
         workflow_chord = chord(
             parallel_update_tasks,
-            notify_workflow_complete.s(document_id, IndexAction.UPDATE, index_types)
+            _notify_and_cleanup(document_id, IndexAction.UPDATE, index_types, parsed_data_dict)
         )
 
         chord_async_result = workflow_chord.apply_async()
@@ -532,11 +552,45 @@ def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: s
     except Exception as e:
         error_msg = f"Failed to trigger update indexes workflow: {str(e)}"
         logger.error(error_msg, exc_info=True)
+        # The chord was not dispatched, no index task or callback will use the parse output
+        _delete_parsed_data(parsed_data_dict.get("parsed_data_path"))
         raise
 
 
+def _notify_and_cleanup(document_id: str, operation: str, index_types: List[str], parsed_data_dict: dict):
+    """
+    Build the completion callback of an index workflow chord.
+
+    The parse output of the workflow is deleted once all of its index tasks are done,
+    whether the chord succeeds or fails.
+    """
+    parsed_data_path = parsed_data_dict.get("parsed_data_path")
+    callback = notify_workflow_complete.s(document_id, operation, index_types, parsed_data_path)
+    if parsed_data_path:
+        callback = callback.on_error(cleanup_parsed_data_task.s(parsed_data_path))
+    return callback
+
+
+def _delete_parsed_data(parsed_data_path: str):
+    if not parsed_data_path:
+        return
+    try:
+        from aperag.tasks.parsed_data_store import delete_parsed_document
+
+        delete_parsed_document(parsed_data_path)
+    except Exception as e:
+        logger.warning(f"Failed to delete parsed data at {parsed_data_path}: {e}", exc_info=True)
+
+
+@current_app.task
+def cleanup_parsed_data_task(request, exc, traceback, parsed_data_path: str):
+    """Error callback of an index workflow chord, deletes the parse output of the failed workflow."""
+    logger.info(f"Index workflow failed ({exc}), deleting parsed data at {parsed_data_path}")
+    _delete_parsed_data(parsed_data_path)
+
+
 @current_app.task(bind=True, base=BaseIndexTask)
-def notify_workflow_complete(self, index_results: List[dict], document_id: str, operation: str, index_types: List[str]) -> dict:
+def notify_workflow_complete(self, index_results: List[dict], document_id: str, operation: str, index_types: List[str], parsed_data_path: str = None) -> dict:
     """
     Workflow completion notification task.
 
@@ -548,10 +602,12 @@ def notify_workflow_complete(self, index_results: List[dict], document_id: str,
         document_id: Document ID that was processed
         operation: Operation type ('create', 'delete', 'update')
         index_types: List of index types that were processed
+        parsed_data_path: Parse output of the workflow, deleted now that no index task needs it
 
     Returns:
         Serialized WorkflowResult
     """
+    _delete_parsed_data(parsed_data_path)
     try:
         logger.info(f"Workflow {operation} completed for document {document_id}")
         logger.info(f"Index results: {index_results}")
@@ -844,6 +900,31 @@ def cleanup_expired_documents_task():
     logger.info(f"Celery task completed with result: {result}")
     return result
 
+
+@current_app.task
+def cleanup_lightrag_llm_cache_task():
+    """
+    Celery task to evict LightRAG LLM cache records older than LIGHTRAG_LLM_CACHE_TTL,
+    and query keyword records older than LIGHTRAG_KEYWORDS_CACHE_TTL.
+    Records of deleted collections are removed together with the collection.
+    """
+    from datetime import timedelta
+
+    from aperag.aperag_config import settings
+    from aperag.db.ops import db_ops
+    from aperag.utils.utils import utc_now
+
+    now = utc_now()
+    keywords_updated_before = now - timedelta(seconds=settings.lightrag_keywords_cache_ttl)
+    keywords_deleted_count = db_ops.delete_expired_lightrag_llm_cache(keywords_updated_before, cache_type="keywords")
+    updated_before = now - timedelta(seconds=settings.lightrag_llm_cache_ttl)
+    deleted_count = db_ops.delete_expired_lightrag_llm_cache(updated_before)
+    logger.info(
+        f"Evicted {deleted_count} LightRAG LLM cache records written before {updated_before} "
+        f"and {keywords_deleted_count} keyword records written before {keywords_updated_before}"
+    )
+    return {"deleted_count": deleted_count + keywords_deleted_count}
+
 # ========== Evaluation Tasks ==========
 
 # By default, get_async_session() uses a global AsyncEngine object.
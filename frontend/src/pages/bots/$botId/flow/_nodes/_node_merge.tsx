@@ -113,7 +113,12 @@ export const ApeNodeMerge = ({ node }: { node: ApeNode }) => {
                   <Select
                     variant="filled"
                     suffixIcon={null}
-                    options={[{ label: 'Union', value: 'union' }]}
+                    options={[
+                      { label: 'Union', value: 'union' },
+                      { label: 'Reciprocal Rank Fusion', value: 'rrf' },
+                      { label: 'Min-Max Fusion', value: 'minmax' },
+                      { label: 'Z-Score Fusion', value: 'zscore' },
+                    ]}
                     value={_.get(values, 'merge_strategy')}
                     onChange={(name) => {
                       _.set(values, 'merge_strategy', name);
@@ -273,7 +273,7 @@ export const nodeMergeDefinition = (params?: {
         merge_strategy: {
           type: 'string',
           default: 'union',
-          enum: ['union', 'intersection'],
+          enum: ['union', 'rrf', 'minmax', 'zscore'],
           description: 'How to merge results',
         },
         deduplicate: {
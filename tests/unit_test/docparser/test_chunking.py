@@ -396,3 +396,78 @@ def test_merge_consecutive_title_groups():
     assert len(merged7) == 2
     assert len(merged7[0].items) == 1
     assert len(merged7[1].items) == 2
+
+
+def test_rechunker_counts_tokens_in_one_batch():
+    batches = []
+
+    def batch_tokenizer(texts: List[str]) -> List[List[int]]:
+        batches.append(list(texts))
+        return [mock_tokenizer(text) for text in texts]
+
+    parts = [Part(content=f"Part number {i}.", metadata={}) for i in range(5)]
+    rechunker = Rechunker(chunk_size=100, chunk_overlap=0, tokenizer=mock_tokenizer, batch_tokenizer=batch_tokenizer)
+    rechunked_parts = rechunker(parts)
+
+    # One batch for all parts, and one recount of the merged chunk when it is sealed
+    assert batches == [[part.content for part in parts], [rechunked_parts[0].content]]
+    assert len(rechunked_parts) == 1
+    assert rechunked_parts[0].metadata["tokens"] == 15
+    assert rechunked_parts[0].metadata["tokens"] == len(mock_tokenizer(rechunked_parts[0].content))
+
+
+def test_rechunker_recounts_merged_chunks_exactly():
+    def pair_tokenizer(text: str) -> List[int]:
+        # Not additive over concatenation, like BPE merges across segment boundaries
+        return [ord(text[i]) for i in range(0, len(text), 2)]
+
+    parts = [Part(content="abc", metadata={}), Part(content="abc", metadata={}), Part(content="de", metadata={})]
+    rechunker = Rechunker(chunk_size=100, chunk_overlap=0, tokenizer=pair_tokenizer)
+    rechunked_parts = rechunker(parts)
+
+    assert len(rechunked_parts) == 1
+    assert rechunked_parts[0].content == "abc\n\nabc\n\nde"
+    # The carried-forward estimate would be 2 + 1 + 2 + 1 + 1 = 7
+    assert rechunked_parts[0].metadata["tokens"] == len(pair_tokenizer(rechunked_parts[0].content)) == 6
+
+
+def test_rechunker_keeps_exact_count_of_unmerged_parts():
+    batches = []
+
+    def batch_tokenizer(texts: List[str]) -> List[List[int]]:
+        batches.append(list(texts))
+        return [mock_tokenizer(text) for text in texts]
+
+    parts = [Part(content="one two three", metadata={}), Part(content="four five", metadata={})]
+    rechunker = Rechunker(chunk_size=4, chunk_overlap=0, tokenizer=mock_tokenizer, batch_tokenizer=batch_tokenizer)
+    rechunked_parts = rechunker(parts)
+
+    assert [part.metadata["tokens"] for part in rechunked_parts] == [3, 2]
+    assert len(batches) == 1
+
+
+def test_rechunker_consumes_parts_lazily():
+    consumed = []
+
+    def parts():
+        for i in range(10):
+            consumed.append(i)
+            yield TitlePart(content=f"# Title {i}", metadata={}, level=1)
+            yield Part(content=f"Body {i} " + "word " * 5, metadata={})
+
+    rechunker = Rechunker(chunk_size=10, chunk_overlap=0, tokenizer=mock_tokenizer)
+    rechunker.PRECOUNT_BATCH_SIZE = 2
+    chunks = rechunker.iter_chunks(parts())
+
+    first = next(chunks)
+    assert first.content.startswith("# Title 0")
+    # Only a bounded lookahead of the input has been pulled
+    assert len(consumed) < 5
+    assert len(list(chunks)) == 9
+    assert len(consumed) == 10
+
+
+def test_batch_tokenizer_falls_back_to_per_text_encoding():
+    from aperag.utils.tokenizer import get_batch_tokenizer
+
+    assert get_batch_tokenizer(mock_tokenizer)(["a bb", "ccc"]) == [[1, 2], [3]]
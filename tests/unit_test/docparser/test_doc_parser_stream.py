@@ -0,0 +1,90 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from aperag.docparser.base import AssetBinPart, BaseParser, FallbackError, MarkdownPart, Part, PdfPart
+from aperag.docparser.doc_parser import DocParser
+from aperag.index.document_parser import DocumentParser
+
+
+class _FailingParser(BaseParser):
+    def supported_extensions(self) -> list[str]:
+        return [".fake"]
+
+    def parse_file(self, path: Path, metadata: dict[str, Any] = {}, **kwargs) -> list[Part]:
+        raise FallbackError("service unavailable")
+
+
+class _StreamingParser(BaseParser):
+    def __init__(self, **kwargs):
+        self.yielded = 0
+
+    def supported_extensions(self) -> list[str]:
+        return [".fake"]
+
+    def parse_file(self, path: Path, metadata: dict[str, Any] = {}, **kwargs) -> list[Part]:
+        return list(self.iter_parse_file(path, metadata, **kwargs))
+
+    def iter_parse_file(self, path: Path, metadata: dict[str, Any] = {}, **kwargs):
+        for i in range(3):
+            self.yielded += 1
+            yield Part(content=f"part {i}")
+
+
+def _make_doc_parser(*parsers: BaseParser) -> DocParser:
+    doc_parser = DocParser(full_config=[])
+    for i, parser in enumerate(parsers):
+        doc_parser.parsing_order.append(f"parser-{i}")
+        doc_parser.parsers[f"parser-{i}"] = parser
+    return doc_parser
+
+
+def test_iter_parse_file_falls_back_before_first_part():
+    streaming_parser = _StreamingParser()
+    doc_parser = _make_doc_parser(_FailingParser(), streaming_parser)
+
+    parts = doc_parser.iter_parse_file(Path("a.fake"))
+    assert next(parts).content == "part 0"
+    # Parts are pulled lazily from the parser
+    assert streaming_parser.yielded == 1
+    assert [part.content for part in parts] == ["part 1", "part 2"]
+
+
+def test_iter_parse_file_without_parser():
+    with pytest.raises(ValueError):
+        list(_make_doc_parser(_FailingParser()).iter_parse_file(Path("a.fake")))
+
+
+def test_save_processed_content_consumes_stream():
+    def parts():
+        yield MarkdownPart(markdown="# Title", content=None)
+        yield Part(content="text")
+        yield PdfPart(data=b"%PDF")
+        yield MarkdownPart(markdown="other", content="other")
+
+    content, remaining = DocumentParser().save_processed_content_and_assets(parts(), None)
+    assert content == "# Title"
+    assert [part.content for part in remaining] == ["text", "other"]
+
+
+def test_save_processed_content_keeps_vision_assets_as_references(tmp_path, monkeypatch):
+    from aperag.index import document_parser
+    from aperag.objectstore.local import Local, LocalConfig
+
+    store = Local(LocalConfig(root_dir=str(tmp_path)))
+    monkeypatch.setattr(document_parser, "get_object_store", lambda: store)
+
+    def parts():
+        yield AssetBinPart(asset_id="page_0.png", data=b"page", metadata={"vision_index": True}, mime_type="image/png")
+        yield AssetBinPart(asset_id="figure.png", data=b"figure", mime_type="image/png")
+
+    _, remaining = DocumentParser().save_processed_content_and_assets(parts(), "user-1/col/doc")
+
+    assert len(remaining) == 1
+    assert remaining[0].data == b""
+    asset_path = remaining[0].metadata["asset_path"]
+    assert asset_path == "user-1/col/doc/assets/page_0.png"
+    with store.get(asset_path) as stream:
+        assert stream.read() == b"page"
+    assert store.obj_exists("user-1/col/doc/assets/figure.png")
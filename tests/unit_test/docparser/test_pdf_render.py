@@ -0,0 +1,71 @@
+import io
+
+import pypdfium2 as pdfium
+import pytest
+from PIL import Image
+
+from aperag.docparser.pdf_render import get_image_format, get_page_count, iter_rendered_pages
+
+# Page widths in points, so each rendered page can be told apart by its size
+_PAGE_WIDTHS = [100, 150, 200, 250, 300]
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    pdf_doc = pdfium.PdfDocument.new()
+    for width in _PAGE_WIDTHS:
+        pdf_doc.new_page(width, 100)
+    path = tmp_path / "pages.pdf"
+    pdf_doc.save(str(path))
+    pdf_doc.close()
+    return str(path)
+
+
+def _image(data: bytes) -> Image.Image:
+    return Image.open(io.BytesIO(data))
+
+
+def test_get_page_count(pdf_path):
+    assert get_page_count(pdf_path) == len(_PAGE_WIDTHS)
+
+
+def test_get_image_format():
+    assert get_image_format("PNG") == ("PNG", "image/png", "png")
+    assert get_image_format("jpeg") == ("JPEG", "image/jpeg", "jpg")
+    assert get_image_format("webp") == ("WEBP", "image/webp", "webp")
+    with pytest.raises(ValueError):
+        get_image_format("gif")
+
+
+def test_render_in_process_scales_with_dpi(pdf_path):
+    pages = list(iter_rendered_pages(pdf_path, len(_PAGE_WIDTHS), dpi=144, image_format="png", workers=1))
+
+    assert [page_idx for page_idx, _ in pages] == list(range(len(_PAGE_WIDTHS)))
+    for (_, data), width in zip(pages, _PAGE_WIDTHS):
+        image = _image(data)
+        assert image.format == "PNG"
+        assert image.size == (width * 2, 200)
+
+
+def test_render_jpeg(pdf_path):
+    _, data = next(iter_rendered_pages(pdf_path, 1, image_format="jpeg", quality=50, workers=1))
+    assert _image(data).format == "JPEG"
+
+
+def test_render_pool_yields_pages_in_order(pdf_path):
+    pages = list(
+        iter_rendered_pages(pdf_path, len(_PAGE_WIDTHS), dpi=72, image_format="webp", workers=2, max_in_flight=2)
+    )
+
+    assert [page_idx for page_idx, _ in pages] == list(range(len(_PAGE_WIDTHS)))
+    for (_, data), width in zip(pages, _PAGE_WIDTHS):
+        image = _image(data)
+        assert image.format == "WEBP"
+        assert image.size == (width, 100)
+
+
+def test_render_pool_stops_early(pdf_path):
+    rendered = iter_rendered_pages(pdf_path, len(_PAGE_WIDTHS), workers=2, max_in_flight=2)
+    page_idx, _ = next(rendered)
+    rendered.close()
+    assert page_idx == 0
@@ -0,0 +1,102 @@
+"""
+Unit tests for the merge strategies of MergeNodeRunner.
+"""
+
+import asyncio
+
+import pytest
+
+from aperag.flow.base.exceptions import ValidationError
+from aperag.flow.runners.merge import MergeInput, MergeNodeRunner, _simhash
+from aperag.query.query import DocumentWithScore
+
+
+def _doc(text, score=None, **metadata):
+    return DocumentWithScore(text=text, score=score, metadata=metadata)
+
+
+def _merge(**kwargs):
+    output, _ = asyncio.run(MergeNodeRunner().run(MergeInput(**kwargs), None))
+    return output.docs
+
+
+def test_union_keeps_source_order_and_dedupes_by_text():
+    docs = _merge(
+        vector_search_docs=[_doc("a", 0.9), _doc("b", 0.8)],
+        fulltext_search_docs=[_doc("b", 12.0), _doc("c", 3.0)],
+    )
+
+    assert [d.text for d in docs] == ["a", "b", "c"]
+    assert [d.score for d in docs] == [0.9, 0.8, 3.0]
+
+
+def test_rrf_ranks_docs_found_by_several_sources_first():
+    docs = _merge(
+        merge_strategy="rrf",
+        rrf_k=1,
+        vector_search_docs=[_doc("a", 0.9), _doc("b", 0.8)],
+        fulltext_search_docs=[_doc("b", 12.0), _doc("c", 3.0)],
+    )
+
+    assert [d.text for d in docs] == ["b", "a", "c"]
+    assert docs[0].score == pytest.approx(1 / 3 + 1 / 2)
+
+
+def test_weighted_minmax_fusion_and_top_n():
+    docs = _merge(
+        merge_strategy="minmax",
+        source_weights={"fulltext_search": 2.0},
+        top_n=2,
+        vector_search_docs=[_doc("a", 0.9), _doc("b", 0.5)],
+        fulltext_search_docs=[_doc("c", 20.0), _doc("d", 10.0)],
+    )
+
+    assert [d.text for d in docs] == ["c", "a"]
+    assert [d.score for d in docs] == [2.0, 1.0]
+
+
+def test_zscore_fusion_normalizes_each_source():
+    docs = _merge(
+        merge_strategy="zscore",
+        vector_search_docs=[_doc("a", 0.9), _doc("b", 0.1)],
+        fulltext_search_docs=[_doc("c", 30.0), _doc("d", 10.0)],
+    )
+
+    assert [d.score for d in docs] == [1.0, 1.0, -1.0, -1.0]
+
+
+def test_degenerate_sources_score_alike_in_minmax_and_zscore():
+    for strategy in ("minmax", "zscore"):
+        docs = _merge(
+            merge_strategy=strategy,
+            vector_search_docs=[_doc("a", 0.9)],
+            fulltext_search_docs=[_doc("b", 7.0), _doc("c", 7.0)],
+        )
+
+        assert [d.score for d in docs] == [1.0, 1.0, 1.0], strategy
+
+
+def test_content_hash_and_simhash_dedupe():
+    vector_docs = [_doc("> Hierarchy: Intro\n\nAlice met Bob in Paris last year.", 0.9, content_hash="h1")]
+    fulltext_docs = [
+        _doc("Alice met Bob in Paris last year.", 5.0, content_hash="h1", chunk_id="7_0"),
+        _doc("Alice met Bob in Paris last year!", 4.0, content_hash="h2"),
+        _doc("Carol works at the bakery on Main Street.", 3.0, content_hash="h3"),
+    ]
+
+    docs = _merge(dedupe_method="content_hash", vector_search_docs=vector_docs, fulltext_search_docs=fulltext_docs)
+    assert [d.text for d in docs] == [vector_docs[0].text, fulltext_docs[1].text, fulltext_docs[2].text]
+
+    docs = _merge(dedupe_method="simhash", vector_search_docs=vector_docs, fulltext_search_docs=fulltext_docs)
+    assert [d.text for d in docs] == [vector_docs[0].text, fulltext_docs[2].text]
+
+
+def test_simhash_is_stable_for_token_changes_in_case_and_punctuation():
+    assert _simhash("Hello, World!") == _simhash("hello world")
+
+
+def test_unknown_strategy_raises():
+    with pytest.raises(ValidationError):
+        _merge(merge_strategy="intersection")
+    with pytest.raises(ValidationError):
+        _merge(dedupe_method="embedding")
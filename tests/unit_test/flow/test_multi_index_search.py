@@ -0,0 +1,137 @@
+"""
+Unit tests for the multi-index search node and its use in search flows.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from aperag.flow.runners import multi_index_search, summary_search, vector_search, vision_search
+from aperag.flow.runners.multi_index_search import MultiIndexSearchInput, MultiIndexSearchService
+from aperag.query.query import DocumentWithScore
+from aperag.schema import view_models
+from aperag.service import collection_service as collection_service_module
+from aperag.service.collection_service import CollectionService
+
+
+class FakeContextManager:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def aquery(self, query, score_threshold=0.5, topk=3, vector=None, index_types=None, chat_id=None):
+        index_type = index_types[0]
+        docs = [
+            DocumentWithScore(
+                text=f"{index_type}-{i}",
+                score=1.0 - i / 10,
+                metadata={
+                    "indexer": index_type,
+                    "collection_id": "col1",
+                    "document_id": "doc",
+                    "asset_id": f"asset-{i // 2}",
+                },
+            )
+            for i in range(10)
+        ]
+        if index_type == "vision":
+            # Pairs of multimodal and vision-to-text vectors of the same asset
+            for doc in docs[1::2]:
+                doc.metadata["index_method"] = "vision_to_text"
+        return [doc for doc in docs if doc.score >= score_threshold][:topk]
+
+    async def aquery_batch(self, query, searches, vector=None):
+        return [await self.aquery(query, vector=vector, **search) for search in searches]
+
+
+@pytest.fixture
+def fake_vector_store(monkeypatch):
+    embedding_model = Mock(aembed_query=AsyncMock(return_value=[0.1, 0.2]))
+    fake_settings = SimpleNamespace(vector_db_context="{}", vector_db_type="qdrant")
+    for module in (multi_index_search, vector_search, summary_search, vision_search):
+        monkeypatch.setattr(module, "ContextManager", FakeContextManager)
+        monkeypatch.setattr(module, "get_collection_embedding_service_sync", lambda collection: (embedding_model, 2))
+        monkeypatch.setattr(module, "settings", fake_settings)
+    return embedding_model
+
+
+def _repository():
+    return Mock(get_collection=AsyncMock(return_value=SimpleNamespace(id="col1")))
+
+
+def test_multi_index_search_matches_single_index_searches(fake_vector_store):
+    async def _run():
+        repository = _repository()
+        combined = await MultiIndexSearchService(repository).execute_multi_index_search(
+            "user",
+            "query",
+            MultiIndexSearchInput(
+                vector_top_k=3,
+                vector_similarity_threshold=0.5,
+                summary_top_k=2,
+                vision_top_k=3,
+                collection_ids=["col1"],
+            ),
+        )
+        separate = {
+            "vector_search": await vector_search.VectorSearchService(repository).execute_vector_search(
+                "user", "query", 3, 0.5, ["col1"]
+            ),
+            "summary_search": await summary_search.SummarySearchService(repository).execute_summary_search(
+                "user", "query", 2, 0.2, ["col1"]
+            ),
+            "vision_search": await vision_search.VisionSearchService(repository).execute_vision_search(
+                "user", "query", 3, 0.2, ["col1"]
+            ),
+        }
+        return combined, separate
+
+    combined, separate = asyncio.run(_run())
+
+    assert combined == separate
+    # Multimodal vectors of assets that also have a vision-to-text vector are dropped
+    assert [doc.text for doc in combined["vision_search"]] == ["vision-1", "vision-3", "vision-5"]
+    # The query is embedded once for all searches
+    assert fake_vector_store.aembed_query.await_count == 1 + len(separate)
+
+
+def _build_search_flow(monkeypatch, **searches):
+    captured = {}
+
+    class FakeFlowEngine:
+        async def execute_flow(self, flow, initial_data):
+            captured["flow"] = flow
+            return {"rerank": SimpleNamespace(docs=[])}, {}
+
+    monkeypatch.setattr(collection_service_module, "FlowEngine", FakeFlowEngine)
+    data = view_models.SearchRequest(query="query", rerank=False, **searches)
+    asyncio.run(CollectionService().execute_search_flow(data, "col1", "user"))
+    return captured["flow"]
+
+
+def test_search_flow_uses_multi_index_node_for_several_searches(monkeypatch):
+    flow = _build_search_flow(
+        monkeypatch,
+        vector_search=view_models.VectorSearchParams(topk=3, similarity=0.5),
+        vision_search=view_models.VisionSearchParams(topk=4),
+    )
+
+    assert set(flow.nodes) == {"multi_index_search", "merge", "rerank"}
+    assert flow.nodes["multi_index_search"].input_values == {
+        "query": "query",
+        "collection_ids": ["col1"],
+        "vector_top_k": 3,
+        "vector_similarity_threshold": 0.5,
+        "vision_top_k": 4,
+    }
+    merge_values = flow.nodes["merge"].input_values
+    assert merge_values["vector_search_docs"] == "{{ nodes.multi_index_search.output.vector_search_docs }}"
+    assert merge_values["vision_search_docs"] == "{{ nodes.multi_index_search.output.vision_search_docs }}"
+    assert "summary_search_docs" not in merge_values
+
+
+def test_search_flow_keeps_single_index_node(monkeypatch):
+    flow = _build_search_flow(monkeypatch, vector_search=view_models.VectorSearchParams(topk=3))
+
+    assert set(flow.nodes) == {"vector_search", "merge", "rerank"}
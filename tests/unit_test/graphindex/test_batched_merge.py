@@ -0,0 +1,95 @@
+"""
+Unit tests for batched graph writes in LightRAG merge stage.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from aperag.graph.lightrag.operate import _merge_nodes_and_edges_impl
+
+
+def _graph_storage(stored_nodes=None):
+    stored_nodes = stored_nodes or {}
+    graph = Mock()
+    graph.get_nodes_batch = AsyncMock(side_effect=lambda ids: {i: stored_nodes[i] for i in ids if i in stored_nodes})
+    graph.get_edges_batch = AsyncMock(return_value={})
+    graph.upsert_nodes_batch = AsyncMock()
+    graph.upsert_edges_batch = AsyncMock()
+    return graph
+
+
+def _merge(graph, chunk_results):
+    return asyncio.run(
+        _merge_nodes_and_edges_impl(
+            chunk_results,
+            "test",
+            graph,
+            None,
+            None,
+            AsyncMock(),
+            Mock(),
+            4096,
+            500,
+            {},
+            10,
+            Mock(),
+        )
+    )
+
+
+def test_merge_writes_component_in_one_batch():
+    node = {"entity_type": "PERSON", "description": "desc", "source_id": "chunk-1", "file_path": "a.txt"}
+    edge = {"weight": 1.0, "description": "knows", "keywords": "friend", "source_id": "chunk-1", "file_path": "a.txt"}
+    graph = _graph_storage(stored_nodes={"Carol": {"entity_type": "PERSON"}})
+
+    result = _merge(
+        graph,
+        [
+            ({"Alice": [node]}, {("Bob", "Alice"): [edge], ("Alice", "Carol"): [edge], ("Alice", "Alice"): [edge]}),
+        ],
+    )
+
+    assert result == {"entity_count": 1, "relation_count": 2}
+    graph.upsert_nodes_batch.assert_awaited_once()
+    graph.upsert_edges_batch.assert_awaited_once()
+
+    nodes = graph.upsert_nodes_batch.await_args.args[0]
+    assert set(nodes) == {"Alice", "Bob"}
+    assert nodes["Alice"]["entity_type"] == "PERSON"
+    assert nodes["Bob"]["entity_type"] == "UNKNOWN"
+
+    edges = graph.upsert_edges_batch.await_args.args[0]
+    assert set(edges) == {("Alice", "Bob"), ("Alice", "Carol")}
+    assert edges[("Alice", "Bob")]["weight"] == 1.0
+
+
+def test_merge_upserts_vectors_once_per_component():
+    node = {"entity_type": "PERSON", "description": "desc", "source_id": "chunk-1", "file_path": "a.txt"}
+    edge = {"weight": 1.0, "description": "knows", "keywords": "friend", "source_id": "chunk-1", "file_path": "a.txt"}
+    graph = _graph_storage()
+    entity_vdb = Mock(upsert=AsyncMock())
+    relationships_vdb = Mock(upsert=AsyncMock())
+
+    asyncio.run(
+        _merge_nodes_and_edges_impl(
+            [({"Alice": [node], "Bob": [node]}, {("Alice", "Bob"): [edge], ("Bob", "Carol"): [edge]})],
+            "test",
+            graph,
+            entity_vdb,
+            relationships_vdb,
+            AsyncMock(),
+            Mock(),
+            4096,
+            500,
+            {},
+            10,
+            Mock(),
+        )
+    )
+
+    entity_vdb.upsert.assert_awaited_once()
+    relationships_vdb.upsert.assert_awaited_once()
+    entities = entity_vdb.upsert.await_args.args[0]
+    assert sorted(v["entity_name"] for v in entities.values()) == ["Alice", "Bob"]
+    relations = relationships_vdb.upsert.await_args.args[0]
+    assert sorted((v["src_id"], v["tgt_id"]) for v in relations.values()) == [("Alice", "Bob"), ("Bob", "Carol")]
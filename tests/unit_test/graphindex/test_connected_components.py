@@ -0,0 +1,98 @@
+"""
+Unit tests for connected component grouping in LightRAG graph indexing.
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+from aperag.graph.lightrag import lightrag as lightrag_module
+from aperag.graph.lightrag.lightrag import LightRAG
+
+
+def _group(chunk_results):
+    return LightRAG._group_by_connected_components(Mock(), chunk_results)
+
+
+def test_group_by_connected_components_routes_nodes_and_edges():
+    chunk_results = [
+        ({"A": ["a1"], "C": ["c1"]}, {("A", "B"): ["ab1"]}),
+        ({"D": ["d1"]}, {("C", "D"): ["cd1"]}),
+        ({"B": ["b1"]}, {("B", "E"): ["be1"]}),
+    ]
+
+    groups = _group(chunk_results)
+
+    assert groups == [
+        (
+            ["A", "B", "E"],
+            [({"A": ["a1"]}, {("A", "B"): ["ab1"]}), ({"B": ["b1"]}, {("B", "E"): ["be1"]})],
+        ),
+        (
+            ["C", "D"],
+            [({"C": ["c1"]}, {}), ({"D": ["d1"]}, {("C", "D"): ["cd1"]})],
+        ),
+    ]
+
+
+def test_group_by_connected_components_long_chain():
+    chain_length = 50_000
+    edges = {(f"e{i}", f"e{i + 1}"): [i] for i in range(chain_length)}
+
+    groups = _group([({}, edges)])
+
+    assert len(groups) == 1
+    component, component_chunk_results = groups[0]
+    assert len(component) == chain_length + 1
+    assert component_chunk_results == [({}, edges)]
+
+
+def test_group_by_connected_components_empty():
+    assert _group([({}, {})]) == []
+
+
+def test_group_by_connected_components_joins_chunks_sharing_entities():
+    chunk_results = [
+        ({"A": ["a1"]}, {("A", "B"): ["ab1"]}),
+        ({"C": ["c1"]}, {("C", "D"): ["cd1"]}),
+        # Mentions entities of both earlier components, which joins their trees
+        ({"B": ["b2"], "D": ["d2"]}, {("B", "D"): ["bd2"]}),
+        # Shares an entity but no edge with the others
+        ({"A": ["a3"], "F": ["f3"]}, {}),
+    ]
+
+    groups = _group(chunk_results)
+
+    assert len(groups) == 2
+    component, component_chunk_results = groups[0]
+    assert sorted(component) == ["A", "B", "C", "D"]
+    assert component_chunk_results == [
+        ({"A": ["a1"]}, {("A", "B"): ["ab1"]}),
+        ({"C": ["c1"]}, {("C", "D"): ["cd1"]}),
+        ({"B": ["b2"], "D": ["d2"]}, {("B", "D"): ["bd2"]}),
+        ({"A": ["a3"]}, {}),
+    ]
+    assert groups[1] == (["F"], [({"F": ["f3"]}, {})])
+
+
+def test_grouping_process_caps_concurrent_components(monkeypatch):
+    running = 0
+    max_running = 0
+
+    async def fake_merge_nodes_and_edges(chunk_results, component, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"entity_count": len(component), "relation_count": 0}
+
+    monkeypatch.setattr(lightrag_module, "merge_nodes_and_edges", fake_merge_nodes_and_edges)
+    rag = Mock(max_parallel_components=2, addon_params={})
+    rag._group_by_connected_components = _group
+
+    chunk_results = [({f"E{i}": [i]}, {}) for i in range(6)]
+    result = asyncio.run(LightRAG._grouping_process_chunk_results(rag, chunk_results))
+
+    assert result["groups_processed"] == 6
+    assert result["total_entities"] == 6
+    assert max_running == 2
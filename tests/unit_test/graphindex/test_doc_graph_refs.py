@@ -0,0 +1,214 @@
+"""
+Unit tests for the document graph reverse index helpers in LightRAG.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from aperag.graph.lightrag.base import DocGraphRef, DocGraphRefType
+from aperag.graph.lightrag.lightrag import LightRAG
+from aperag.graph.lightrag.operate import _collect_doc_graph_refs
+from aperag.graph.lightrag.prompt import GRAPH_FIELD_SEP
+
+
+def test_collect_doc_graph_refs_maps_chunks_to_documents():
+    all_nodes = {"Alice": [{"source_id": "chunk-1"}, {"source_id": "chunk-2"}]}
+    all_edges = {("Alice", "Bob"): [{"source_id": "chunk-2"}], ("Carol", "Carol"): [{"source_id": "chunk-1"}]}
+    chunk_doc_ids = {"chunk-1": "doc-a", "chunk-2": "doc-b"}
+
+    refs = set(_collect_doc_graph_refs(all_nodes, all_edges, chunk_doc_ids))
+
+    assert refs == {
+        DocGraphRef("doc-a", "chunk-1", DocGraphRefType.ENTITY, "Alice"),
+        DocGraphRef("doc-b", "chunk-2", DocGraphRefType.ENTITY, "Alice"),
+        DocGraphRef("doc-b", "chunk-2", DocGraphRefType.RELATION, "Alice", "Bob"),
+        DocGraphRef("doc-b", "chunk-2", DocGraphRefType.ENTITY, "Bob"),
+    }
+
+
+def test_collect_doc_graph_refs_skips_unknown_chunks():
+    refs = _collect_doc_graph_refs({"Alice": [{"source_id": "chunk-x"}]}, {}, {"chunk-1": "doc-a"})
+    assert refs == []
+
+
+def test_remaining_source_ids():
+    source_id = GRAPH_FIELD_SEP.join(["chunk-1", "chunk-2"])
+
+    assert LightRAG._remaining_source_ids(source_id, {"chunk-3"}) is None
+    assert LightRAG._remaining_source_ids(source_id, {"chunk-1"}) == ["chunk-2"]
+    assert LightRAG._remaining_source_ids(source_id, {"chunk-1", "chunk-2"}) == []
+
+
+def test_split_vdb_chunk_ids():
+    records = [
+        {"id": "ent-1", "chunk_ids": ["chunk-1"]},
+        {"id": "ent-2", "chunk_ids": ["chunk-1", "chunk-2"]},
+        {"id": "ent-3", "chunk_ids": ["chunk-3"]},
+    ]
+
+    ids_to_delete, chunk_ids_to_update = LightRAG._split_vdb_chunk_ids(records, {"chunk-1"})
+
+    assert ids_to_delete == ["ent-1"]
+    assert chunk_ids_to_update == {"ent-2": ["chunk-2"]}
+
+
+class _FakeGraph:
+    """Graph storage keeping each edge under the endpoint order it was written with"""
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+        self.batch_writes = 0
+
+    async def get_node(self, node_id):
+        return dict(self.nodes[node_id]) if node_id in self.nodes else None
+
+    async def has_node(self, node_id):
+        return node_id in self.nodes
+
+    async def node_degrees_batch(self, node_ids):
+        return {node_id: len(await self.get_node_edges(node_id)) for node_id in node_ids}
+
+    async def get_node_edges(self, node_id):
+        return [pair for pair in self.edges if node_id in pair]
+
+    async def get_edge(self, src, tgt):
+        edge = self.edges.get((src, tgt)) or self.edges.get((tgt, src))
+        return dict(edge) if edge else None
+
+    async def get_nodes_batch(self, node_ids):
+        return {node_id: dict(self.nodes[node_id]) for node_id in node_ids if node_id in self.nodes}
+
+    async def get_edges_batch(self, pairs):
+        keys = [(pair["src"], pair["tgt"]) for pair in pairs]
+        return {key: dict(self.edges[key]) for key in keys if key in self.edges}
+
+    async def upsert_node(self, node_id, node_data):
+        self.nodes[node_id] = dict(node_data)
+
+    async def upsert_edge(self, src, tgt, edge_data):
+        self.edges[(src, tgt)] = dict(edge_data)
+
+    async def upsert_nodes_batch(self, nodes):
+        self.batch_writes += 1
+        for node_id, node_data in nodes.items():
+            await self.upsert_node(node_id, node_data)
+
+    async def upsert_edges_batch(self, edges):
+        self.batch_writes += 1
+        for (src, tgt), edge_data in edges.items():
+            await self.upsert_edge(src, tgt, edge_data)
+
+    async def delete_node(self, node_id):
+        await self.remove_nodes([node_id])
+
+    async def remove_nodes(self, node_ids):
+        for node_id in node_ids:
+            self.nodes.pop(node_id, None)
+            self.edges = {pair: edge for pair, edge in self.edges.items() if node_id not in pair}
+
+    async def remove_edges(self, pairs):
+        for pair in pairs:
+            self.edges.pop(pair, None)
+
+
+class _FakeDocGraphIndex:
+    def __init__(self, refs):
+        self.refs = set(refs)
+
+    async def get_doc_refs(self, doc_id):
+        return [ref for ref in self.refs if ref.doc_id == doc_id]
+
+    async def get_shared_chunk_ids(self, doc_id, chunk_ids):
+        return {ref.chunk_id for ref in self.refs if ref.doc_id != doc_id and ref.chunk_id in chunk_ids}
+
+    async def delete_doc_refs(self, doc_id):
+        self.refs = {ref for ref in self.refs if ref.doc_id != doc_id}
+
+    async def redirect_entity_refs(self, entity_ids, target_entity_id):
+        redirected = set()
+        for ref in self.refs:
+            src = target_entity_id if ref.entity_id in entity_ids else ref.entity_id
+            tgt = target_entity_id if ref.target_entity_id in entity_ids else ref.target_entity_id
+            if ref.ref_type == DocGraphRefType.RELATION:
+                if src == tgt:
+                    continue
+                src, tgt = sorted((src, tgt))
+            redirected.add(DocGraphRef(ref.doc_id, ref.chunk_id, ref.ref_type, src, tgt))
+        self.refs = redirected
+
+
+def _vdb():
+    return Mock(
+        upsert=AsyncMock(),
+        delete=AsyncMock(),
+        delete_entity=AsyncMock(),
+        get_by_ids=AsyncMock(return_value=[]),
+        update_chunk_ids=AsyncMock(),
+    )
+
+
+def _rag(graph, doc_graph_index):
+    rag = object.__new__(LightRAG)
+    rag.workspace = "test"
+    rag.lightrag_logger = Mock()
+    rag.query_context_cache = None
+    rag.chunk_entity_relation_graph = graph
+    rag.doc_graph_index = doc_graph_index
+    rag.entities_vdb = _vdb()
+    rag.relationships_vdb = _vdb()
+    rag.chunks_vdb = _vdb()
+    rag.text_chunks = _vdb()
+    rag._adelete_by_doc_id_scan = AsyncMock()
+    return rag
+
+
+def _node(*chunk_ids):
+    return {"entity_type": "PERSON", "description": "desc", "source_id": GRAPH_FIELD_SEP.join(chunk_ids)}
+
+
+def test_delete_after_merge_follows_redirected_refs():
+    graph = _FakeGraph(
+        nodes={
+            "Alice": _node("chunk-1"),
+            "Alicia": _node("chunk-2"),
+            "Bob": _node("chunk-2"),
+            "Carol": _node("chunk-1"),
+        },
+        edges={("Alice", "Carol"): {"source_id": "chunk-1"}, ("Alicia", "Bob"): {"source_id": "chunk-2"}},
+    )
+    doc_graph_index = _FakeDocGraphIndex(
+        [
+            DocGraphRef("doc-a", "chunk-1", DocGraphRefType.ENTITY, "Alice"),
+            DocGraphRef("doc-a", "chunk-1", DocGraphRefType.ENTITY, "Carol"),
+            DocGraphRef("doc-a", "chunk-1", DocGraphRefType.RELATION, "Alice", "Carol"),
+            DocGraphRef("doc-b", "chunk-2", DocGraphRefType.ENTITY, "Alicia"),
+            DocGraphRef("doc-b", "chunk-2", DocGraphRefType.ENTITY, "Bob"),
+            DocGraphRef("doc-b", "chunk-2", DocGraphRefType.RELATION, "Alicia", "Bob"),
+        ]
+    )
+    rag = _rag(graph, doc_graph_index)
+
+    asyncio.run(rag.amerge_nodes(["Alice", "Alicia"], {"entity_name": "Alice"}))
+    assert set(graph.edges) == {("Alice", "Bob"), ("Alice", "Carol")}
+
+    asyncio.run(rag.adelete_by_doc_id("doc-b"))
+
+    rag._adelete_by_doc_id_scan.assert_not_awaited()
+    # Surviving nodes are updated with one batch write
+    assert graph.batch_writes == 1
+    assert set(graph.nodes) == {"Alice", "Carol"}
+    assert graph.nodes["Alice"]["source_id"] == "chunk-1"
+    assert set(graph.edges) == {("Alice", "Carol")}
+    assert {ref.doc_id for ref in doc_graph_index.refs} == {"doc-a"}
+
+
+def test_delete_with_stale_refs_falls_back_to_scan():
+    graph = _FakeGraph(nodes={"Alice": _node("chunk-1", "chunk-2")}, edges={})
+    doc_graph_index = _FakeDocGraphIndex([DocGraphRef("doc-b", "chunk-2", DocGraphRefType.ENTITY, "Alicia")])
+    rag = _rag(graph, doc_graph_index)
+
+    asyncio.run(rag.adelete_by_doc_id("doc-b"))
+
+    rag._adelete_by_doc_id_scan.assert_awaited_once_with("doc-b")
+    assert doc_graph_index.refs == set()
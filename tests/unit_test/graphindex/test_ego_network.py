@@ -0,0 +1,84 @@
+"""
+Unit tests for ego network retrieval used by LightRAG local queries.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from aperag.graph.lightrag.base import BaseGraphStorage, EgoNetwork, QueryParam
+from aperag.graph.lightrag.operate import (
+    _find_most_related_edges_from_entities,
+    _find_most_related_text_unit_from_entities,
+)
+
+
+def _tokenizer():
+    tokenizer = Mock()
+    tokenizer.encode = lambda text: list(text)
+    return tokenizer
+
+
+def _ego_network():
+    return EgoNetwork(
+        nodes={
+            "Alice": {"entity_id": "Alice", "source_id": "chunk-1"},
+            "Bob": {"entity_id": "Bob", "source_id": "chunk-1<SEP>chunk-2"},
+            "Carol": {"entity_id": "Carol", "source_id": "chunk-3"},
+        },
+        node_edges={"Alice": [("Alice", "Bob"), ("Carol", "Alice")]},
+        edges={
+            ("Alice", "Bob"): {"weight": 1.0, "description": "knows", "keywords": "friend", "source_id": "chunk-1"},
+            ("Alice", "Carol"): {"weight": 2.0, "description": "hires", "keywords": "work", "source_id": "chunk-3"},
+        },
+        node_degrees={"Alice": 2, "Bob": 3, "Carol": 1},
+    )
+
+
+def test_edge_degrees_combine_endpoint_degrees():
+    assert _ego_network().edge_degrees == {("Alice", "Bob"): 5, ("Alice", "Carol"): 3}
+
+
+def test_default_get_ego_network_composes_batch_calls():
+    graph = Mock()
+    graph.get_nodes_edges_batch = AsyncMock(return_value={"Alice": [("Alice", "Bob"), ("Carol", "Alice")]})
+    graph.get_nodes_batch = AsyncMock(side_effect=lambda ids: {i: {"entity_id": i} for i in ids})
+    graph.get_edges_batch = AsyncMock(
+        side_effect=lambda pairs: {(p["src"], p["tgt"]): {"weight": 1.0} for p in pairs if p["src"] != "Bob"}
+    )
+    graph.node_degrees_batch = AsyncMock(side_effect=lambda ids: {i: 1 for i in ids})
+
+    ego = asyncio.run(BaseGraphStorage.get_ego_network(graph, ["Alice", "Dave"]))
+
+    graph.get_nodes_batch.assert_awaited_once_with(["Alice", "Dave", "Bob", "Carol"])
+    assert set(ego.nodes) == {"Alice", "Dave", "Bob", "Carol"}
+    assert ego.node_edges == {"Alice": [("Alice", "Bob"), ("Carol", "Alice")], "Dave": []}
+    assert set(ego.edges) == {("Alice", "Bob"), ("Alice", "Carol")}
+    assert ego.node_degrees == {"Alice": 1, "Dave": 1, "Bob": 1, "Carol": 1}
+
+    ego = asyncio.run(BaseGraphStorage.get_ego_network(graph, ["Alice"], include_degrees=False))
+    assert ego.node_degrees == {}
+    graph.node_degrees_batch.assert_awaited_once()
+
+
+def test_find_most_related_edges_ranks_by_edge_degree():
+    node_datas = [{"entity_name": "Alice", "source_id": "chunk-1"}]
+
+    edges = _find_most_related_edges_from_entities(node_datas, QueryParam(), _ego_network(), _tokenizer())
+
+    assert [e["src_tgt"] for e in edges] == [("Alice", "Bob"), ("Alice", "Carol")]
+    assert [e["rank"] for e in edges] == [5, 3]
+
+
+def test_find_most_related_text_units_fetches_chunks_in_one_call():
+    node_datas = [{"entity_name": "Alice", "source_id": "chunk-1<SEP>chunk-9"}]
+    text_chunks_db = Mock()
+    text_chunks_db.get_by_ids = AsyncMock(return_value=[{"id": "chunk-1", "content": "Alice knows Bob"}])
+
+    text_units = asyncio.run(
+        _find_most_related_text_unit_from_entities(
+            node_datas, QueryParam(), text_chunks_db, _ego_network(), _tokenizer()
+        )
+    )
+
+    text_chunks_db.get_by_ids.assert_awaited_once_with(["chunk-1", "chunk-9"])
+    assert text_units == [{"id": "chunk-1", "content": "Alice knows Bob"}]
@@ -0,0 +1,81 @@
+"""
+Unit tests for the entity-extraction cache in LightRAG graph indexing.
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+from aperag.graph.lightrag.operate import extract_entities
+from aperag.graph.lightrag.prompt import PROMPTS
+
+
+class _DictKVStorage:
+    def __init__(self):
+        self.data = {}
+
+    async def get_by_ids(self, ids):
+        return [{"id": id, **self.data[id]} for id in ids if id in self.data]
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+
+class _CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, prompt, **kwargs):
+        self.calls += 1
+        return '("entity"<|>"Alice"<|>"person"<|>"Alice is a person.")<|COMPLETE|>'
+
+
+def _extract(cache, llm, model="model-a", max_gleaning=0, **addon_params):
+    chunks = {"chunk-1": {"content": "Alice lives in Paris.", "file_path": "a.txt"}}
+    return asyncio.run(
+        extract_entities(
+            chunks,
+            use_llm_func=llm,
+            entity_extract_max_gleaning=max_gleaning,
+            addon_params=addon_params,
+            llm_model_max_async=1,
+            lightrag_logger=Mock(),
+            llm_response_cache=cache,
+            llm_model_name=model,
+        )
+    )
+
+
+def test_cache_hit_skips_llm_call():
+    cache, llm = _DictKVStorage(), _CountingLLM()
+
+    first_results, first_hits = _extract(cache, llm)
+    assert (llm.calls, first_hits) == (1, 0)
+
+    second_results, second_hits = _extract(cache, llm)
+    assert (llm.calls, second_hits) == (1, 1)
+    assert second_results == first_results
+    assert "Alice" in second_results[0][0]
+
+
+def test_changed_extraction_settings_miss_cache():
+    cache, llm = _DictKVStorage(), _CountingLLM()
+    _extract(cache, llm)
+
+    for kwargs in (
+        {"model": "model-b"},
+        {"max_gleaning": 1},
+        {"language": "Chinese"},
+        {"entity_types": ["person", "place"]},
+    ):
+        _, cache_hits = _extract(cache, llm, **kwargs)
+        assert cache_hits == 0, kwargs
+
+
+def test_changed_prompt_misses_cache(monkeypatch):
+    cache, llm = _DictKVStorage(), _CountingLLM()
+    _extract(cache, llm)
+
+    monkeypatch.setitem(PROMPTS, "entity_extraction", PROMPTS["entity_extraction"] + "\nBe thorough.")
+    _, cache_hits = _extract(cache, llm)
+    assert cache_hits == 0
+    assert llm.calls == 2
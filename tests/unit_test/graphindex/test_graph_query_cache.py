@@ -0,0 +1,108 @@
+"""
+Unit tests for the graph query keyword and context caches.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from aperag.db import redis_manager
+from aperag.graph.graph_query_cache import GraphContextCache
+from aperag.graph.lightrag import operate
+from aperag.graph.lightrag.base import QueryParam
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+
+
+class FakeKV:
+    def __init__(self):
+        self.data = {}
+
+    async def get_by_id(self, id):
+        return self.data.get(id)
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(redis_manager, "get_sync_redis_client", lambda: redis)
+    return redis
+
+
+def test_version_bump_invalidates_contexts(fake_redis):
+    cache = GraphContextCache()
+
+    async def _run():
+        version = await cache.get_version("ws")
+        assert version == 0
+
+        await cache.put("ws", version, ["kw"], [[1], [2], [3]])
+        assert await cache.get("ws", await cache.get_version("ws"), ["kw"]) == [[1], [2], [3]]
+
+        await cache.bump_version("ws")
+        assert await cache.get("ws", await cache.get_version("ws"), ["kw"]) is None
+        # Other workspaces are untouched
+        assert await cache.get_version("other") == 0
+
+    asyncio.run(_run())
+
+
+def test_context_cache_is_bypassed_without_redis():
+    cache = GraphContextCache(use_redis=False)
+    assert asyncio.run(cache.get_version("ws")) is None
+
+
+def test_build_query_context_reuses_keywords_and_context(fake_redis, monkeypatch):
+    llm = AsyncMock(return_value='{"high_level_keywords": ["h"], "low_level_keywords": ["l"]}')
+    build = AsyncMock(return_value=([{"entity": "A"}], [], []))
+    monkeypatch.setattr(operate, "_build_query_context_from_keywords", build)
+    tokenizer = Mock(encode=lambda text: [0])
+    context_cache = GraphContextCache()
+    kv = FakeKV()
+
+    async def _query():
+        return await operate.build_query_context(
+            "what is A?",
+            None,
+            None,
+            None,
+            None,
+            QueryParam(mode="hybrid"),
+            tokenizer,
+            llm,
+            {},
+            llm_response_cache=kv,
+            llm_model_name="openai/gpt-4o",
+            workspace="ws",
+            context_cache=context_cache,
+        )
+
+    first = asyncio.run(_query())
+    second = asyncio.run(_query())
+    context_cache.clear_local()
+    third = asyncio.run(_query())
+
+    assert first == second == third == ([{"entity": "A"}], [], [])
+    assert llm.await_count == 1
+    assert build.await_count == 1
+
+    asyncio.run(context_cache.bump_version("ws"))
+    asyncio.run(_query())
+    assert llm.await_count == 1
+    assert build.await_count == 2
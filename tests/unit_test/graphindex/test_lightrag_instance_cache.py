@@ -0,0 +1,106 @@
+"""
+Unit tests for the LightRAG instance cache used by graph queries.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from aperag.graph import lightrag_manager
+
+
+@pytest.fixture
+def create_instance(monkeypatch):
+    lightrag_manager.invalidate_lightrag_instances()
+    create = AsyncMock(side_effect=lambda collection: Mock(name=f"rag-{collection.id}"))
+    monkeypatch.setattr(lightrag_manager, "create_lightrag_instance", create)
+    yield create
+    lightrag_manager.invalidate_lightrag_instances()
+
+
+def _collection(collection_id="col1", config='{"enable_knowledge_graph": true}'):
+    return Mock(id=collection_id, config=config)
+
+
+def test_instance_is_reused_for_same_config(create_instance):
+    async def _run():
+        first = await lightrag_manager.get_lightrag_instance(_collection())
+        second = await lightrag_manager.get_lightrag_instance(_collection())
+        return first, second
+
+    first, second = asyncio.run(_run())
+
+    assert first is second
+    assert create_instance.await_count == 1
+
+
+def test_config_change_and_invalidation_rebuild_instance(create_instance):
+    async def _run():
+        first = await lightrag_manager.get_lightrag_instance(_collection())
+        changed = await lightrag_manager.get_lightrag_instance(_collection(config="{}"))
+        lightrag_manager.invalidate_lightrag_instances("col1")
+        rebuilt = await lightrag_manager.get_lightrag_instance(_collection(config="{}"))
+        return first, changed, rebuilt
+
+    first, changed, rebuilt = asyncio.run(_run())
+
+    assert first is not changed
+    assert changed is not rebuilt
+    assert create_instance.await_count == 3
+
+
+def test_expired_instance_is_rebuilt(create_instance, monkeypatch):
+    monkeypatch.setattr(lightrag_manager.LightRAGConfig, "INSTANCE_CACHE_TTL_SECONDS", -1)
+
+    async def _run():
+        await lightrag_manager.get_lightrag_instance(_collection())
+        await lightrag_manager.get_lightrag_instance(_collection())
+
+    asyncio.run(_run())
+
+    assert create_instance.await_count == 2
+
+
+def test_cache_is_bounded(create_instance, monkeypatch):
+    monkeypatch.setattr(lightrag_manager.LightRAGConfig, "INSTANCE_CACHE_MAX_SIZE", 2)
+
+    async def _run():
+        for collection_id in ("col1", "col2", "col3", "col1"):
+            await lightrag_manager.get_lightrag_instance(_collection(collection_id))
+
+    asyncio.run(_run())
+
+    assert create_instance.await_count == 4
+    assert len(lightrag_manager._instance_cache) == 2
+
+
+def test_provider_change_rebuilds_instance(create_instance, monkeypatch):
+    provider = SimpleNamespace(gmt_updated=datetime(2025, 1, 1))
+    db_ops = Mock(
+        query_llm_provider_by_name=AsyncMock(return_value=provider),
+        query_provider_api_key=AsyncMock(return_value="key-1"),
+    )
+    monkeypatch.setattr(lightrag_manager, "async_db_ops", db_ops)
+    collection = _collection(config='{"completion": {"model": "m", "model_service_provider": "openai"}}')
+
+    async def _run():
+        instances = [await lightrag_manager.get_lightrag_instance(collection)]
+        # Another process updated the provider
+        provider.gmt_updated = datetime(2025, 1, 2)
+        instances.append(await lightrag_manager.get_lightrag_instance(collection))
+        # The API key changed
+        db_ops.query_provider_api_key.return_value = "key-2"
+        instances.append(await lightrag_manager.get_lightrag_instance(collection))
+        instances.append(await lightrag_manager.get_lightrag_instance(collection))
+        return instances
+
+    first, updated, rekeyed, reused = asyncio.run(_run())
+
+    assert first is not updated
+    assert updated is not rekeyed
+    assert rekeyed is reused
+    assert create_instance.await_count == 3
+    db_ops.query_provider_api_key.assert_awaited_with("openai", collection.user)
@@ -0,0 +1,35 @@
+from aperag.index.chunk_diff import compute_chunk_hash, diff_chunks
+
+
+def test_chunk_hash_includes_metadata():
+    assert compute_chunk_hash("text") == compute_chunk_hash("text", {})
+    assert compute_chunk_hash("text", {"titles": ["a"]}) != compute_chunk_hash("text", {"titles": ["b"]})
+
+
+def test_diff_detects_added_and_removed_chunks():
+    diff = diff_chunks(["id-a", "id-b", "id-c"], ["a", "b", "c"], ["a", "x", "c", "y"])
+    assert diff.reused_ids == ["id-a", None, "id-c", None]
+    assert diff.added_indices == [1, 3]
+    assert diff.removed_ids == ["id-b"]
+    assert diff.to_metadata() == {"unchanged_chunks": 2, "added_chunks": 2, "removed_chunks": 1}
+
+
+def test_diff_matches_duplicate_chunks_one_to_one():
+    diff = diff_chunks(["id-1", "id-2"], ["dup", "dup"], ["dup", "dup", "dup"])
+    assert diff.reused_ids == ["id-1", "id-2", None]
+    assert diff.removed_ids == []
+
+    diff = diff_chunks(["id-1", "id-2"], ["dup", "dup"], ["dup"])
+    assert diff.reused_ids == ["id-1"]
+    assert diff.removed_ids == ["id-2"]
+
+
+def test_diff_without_stored_hashes_rebuilds_everything():
+    diff = diff_chunks(["id-1", "id-2"], None, ["a", "b"])
+    assert diff.reused_ids == [None, None]
+    assert diff.removed_ids == ["id-1", "id-2"]
+
+    # Misaligned hashes cannot be trusted either
+    diff = diff_chunks(["id-1", "id-2"], ["a"], ["a"])
+    assert diff.added_indices == [0]
+    assert diff.removed_ids == ["id-1", "id-2"]
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from aperag.docparser.base import TextPart
+from aperag.index import fulltext_index as fulltext_index_module
+from aperag.index.fulltext_index import FulltextIndexer
+from aperag.llm.embed.embedding_utils import build_text_nodes_from_chunks
+
+
+class _FakeIndices:
+    def exists(self, index):
+        return SimpleNamespace(body=True)
+
+
+def _make_indexer(monkeypatch, results):
+    calls = []
+
+    def _streaming_bulk(client, actions, **kwargs):
+        calls.append((list(actions), kwargs))
+        yield from results
+
+    monkeypatch.setattr(fulltext_index_module.helpers, "streaming_bulk", _streaming_bulk)
+    indexer = FulltextIndexer(es_host="http://localhost:9200")
+    indexer.es = SimpleNamespace(indices=_FakeIndices())
+    return indexer, calls
+
+
+def test_bulk_collects_item_errors(monkeypatch):
+    indexer, calls = _make_indexer(
+        monkeypatch,
+        [
+            (True, {"index": {"_id": "1_0", "status": 201}}),
+            (False, {"index": {"_id": "1_1", "status": 400, "error": {"type": "mapper_parsing_exception"}}}),
+        ],
+    )
+    actions = [indexer._chunk_action("idx", f"1_{i}", 1, "doc", f"text {i}") for i in range(2)]
+    errors = indexer._bulk("idx", actions)
+
+    assert errors == [{"id": "1_1", "op": "index", "status": 400, "error": "{'type': 'mapper_parsing_exception'}"}]
+    sent, kwargs = calls[0]
+    assert [action["_id"] for action in sent] == ["1_0", "1_1"]
+    assert kwargs["raise_on_error"] is False
+    assert kwargs["chunk_size"] == fulltext_index_module.settings.es_bulk_chunk_size
+
+
+def test_bulk_delete_ignores_missing_documents(monkeypatch):
+    indexer, _ = _make_indexer(
+        monkeypatch,
+        [(False, {"delete": {"_id": "1_0", "status": 404, "result": "not_found"}})],
+    )
+    assert indexer._remove_chunks_by_id("idx", ["1_0"]) == []
+
+
+def test_chunk_content_hash_matches_vector_node(monkeypatch):
+    indexer, _ = _make_indexer(monkeypatch, [])
+    chunk = TextPart(content="Alice met Bob in Paris.\n", metadata={"titles": ["Intro"]})
+
+    node = build_text_nodes_from_chunks([chunk])[0]
+    content, title, metadata = indexer._extract_chunk_data(chunk)
+    action = indexer._chunk_action("idx", "1_0", 1, "doc", content, title, metadata)
+
+    # The vector node text carries the title padding, the content hash does not
+    assert node.get_content() != content
+    assert action["_source"]["metadata"]["content_hash"] == node.metadata["content_hash"]
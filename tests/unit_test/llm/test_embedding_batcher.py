@@ -0,0 +1,109 @@
+import pytest
+
+from aperag.llm.embed.embedding_batcher import (
+    AdaptiveEmbeddingBatcher,
+    TokenBudgetRegistry,
+    is_input_error,
+    is_request_too_large_error,
+)
+from aperag.llm.llm_error_types import LLMAPIError
+
+
+class _StatusError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _wrapped(cause: BaseException) -> LLMAPIError:
+    try:
+        try:
+            raise cause
+        except Exception as e:
+            raise LLMAPIError("Embedding API error") from e
+    except LLMAPIError as wrapped:
+        return wrapped
+
+
+def _make_batcher(max_count=None, budget=100, registry=None) -> AdaptiveEmbeddingBatcher:
+    return AdaptiveEmbeddingBatcher(
+        provider="openai",
+        model="text-embedding-3-small",
+        max_count=max_count,
+        default_token_budget=budget,
+        token_counter=lambda texts: [len(text) for text in texts],
+        registry=registry or TokenBudgetRegistry(),
+    )
+
+
+def test_plan_respects_count_and_token_budget():
+    batcher = _make_batcher(max_count=3, budget=100)
+    assert batcher.plan([10, 10, 10, 10]) == [[0, 1, 2], [3]]
+    assert batcher.plan([60, 50, 30, 20]) == [[0], [1, 2, 3]]
+
+
+def test_plan_puts_oversized_input_alone():
+    batcher = _make_batcher(budget=100)
+    assert batcher.plan([10, 500, 10]) == [[0], [1], [2]]
+
+
+def test_budget_shrinks_on_too_large_and_grows_back_to_ceiling():
+    registry = TokenBudgetRegistry()
+    batcher = _make_batcher(budget=4000, registry=registry)
+
+    batcher.record_too_large(2000)
+    assert batcher.token_budget == 1000
+
+    # Learned limits are shared by batchers for the same provider and model
+    other = _make_batcher(budget=4000, registry=registry)
+    assert other.token_budget == 1000
+
+    for _ in range(10):
+        batcher.record_success(batcher.token_budget)
+    assert batcher.token_budget == 1999
+
+
+def test_small_successes_do_not_grow_budget():
+    batcher = _make_batcher(budget=4000)
+    batcher.record_too_large(2000)
+    batcher.record_success(10)
+    assert batcher.token_budget == 1000
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ("Error code: 413 - Request Entity Too Large", True),
+        ("This model's maximum context length is 8192 tokens", True),
+        ("Invalid API key", False),
+    ],
+)
+def test_is_request_too_large_error(message, expected):
+    try:
+        try:
+            raise ValueError(message)
+        except ValueError as e:
+            raise LLMAPIError("Embedding API error") from e
+    except LLMAPIError as wrapped:
+        assert is_request_too_large_error(wrapped) is expected
+
+
+@pytest.mark.parametrize(
+    "message,status_code,too_large,input_error",
+    [
+        ("Request failed", 413, True, True),
+        ("This model's maximum context length is 8192 tokens", 400, True, True),
+        ("Invalid input at index 3", 400, False, True),
+        ("Rate limit: too many tokens per minute", 429, False, False),
+        ("Gateway error 413 in upstream trace", 502, False, False),
+        ("Connection reset", 503, False, False),
+    ],
+)
+def test_errors_are_classified_by_status_code(message, status_code, too_large, input_error):
+    error = _wrapped(_StatusError(message, status_code))
+    assert is_request_too_large_error(error) is too_large
+    assert is_input_error(error) is input_error
+
+
+def test_connection_errors_are_not_input_errors():
+    assert is_input_error(_wrapped(ConnectionError("connection refused"))) is False
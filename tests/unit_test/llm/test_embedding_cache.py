@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from aperag.llm import litellm_cache
+from aperag.llm.embed import embedding_service as embedding_service_module
+from aperag.llm.embed.embedding_cache import (
+    EmbeddingCache,
+    QueryEmbeddingCache,
+    make_embedding_cache_key,
+    make_query_embedding_cache_key,
+)
+from aperag.llm.embed.embedding_service import EmbeddingService
+
+
+def _make_service() -> EmbeddingService:
+    return EmbeddingService(
+        embedding_provider="openai",
+        embedding_model="text-embedding-3-small",
+        embedding_service_url="http://localhost",
+        embedding_service_api_key="test",
+        embedding_max_chunks_in_batch=10,
+    )
+
+
+def test_cache_key_depends_on_provider_model_and_text():
+    key = make_embedding_cache_key("openai", "m1", "hello")
+    assert key == make_embedding_cache_key("openai", "m1", "hello")
+    assert key != make_embedding_cache_key("openai", "m2", "hello")
+    assert key != make_embedding_cache_key("azure", "m1", "hello")
+    assert key != make_embedding_cache_key("openai", "m1", "hello!")
+
+
+def test_local_tier_lru_eviction():
+    cache = EmbeddingCache(local_max_size=2, use_redis=False)
+    cache.put_many("p", "m", ["a", "b"], [[1.0], [2.0]])
+    # Touch "a" so that "b" becomes the least recently used entry
+    assert cache.get_many("p", "m", ["a"]) == [[1.0]]
+    cache.put_many("p", "m", ["c"], [[3.0]])
+    assert cache.get_many("p", "m", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+
+def test_embed_documents_only_sends_misses(monkeypatch):
+    cache = EmbeddingCache(use_redis=False)
+    monkeypatch.setattr(embedding_service_module, "get_embedding_cache", lambda: cache)
+
+    sent_batches = []
+
+    async def fake_embed_contents(self, texts):
+        sent_batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(EmbeddingService, "_aembed_contents", fake_embed_contents)
+    litellm_cache.clear_embedding_cache_stats()
+
+    service = _make_service()
+    assert service.embed_documents(["aa", "bbb", "aa"]) == [[2.0], [3.0], [2.0]]
+    # Duplicates inside a call are embedded once
+    assert sent_batches == [["aa", "bbb"]]
+
+    assert service.embed_documents(["bbb", "cccc", "aa"]) == [[3.0], [4.0], [2.0]]
+    assert sent_batches[-1] == ["cccc"]
+
+    stats = litellm_cache.get_embedding_cache_stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["added"] == 3
+
+
+def test_embed_documents_without_cache(monkeypatch):
+    monkeypatch.setattr(embedding_service_module, "get_embedding_cache", lambda: None)
+
+    async def fake_embed_contents(self, texts):
+        return [[1.0] for _ in texts]
+
+    monkeypatch.setattr(EmbeddingService, "_aembed_contents", fake_embed_contents)
+
+    service = _make_service()
+    assert service.embed_documents(["a", "a"]) == [[1.0], [1.0]]
+
+
+def test_query_cache_key_normalizes_whitespace():
+    key = make_query_embedding_cache_key("openai", "m1", "what is  aperag?")
+    assert key == make_query_embedding_cache_key("openai", "m1", " what is\naperag? ")
+    assert key != make_query_embedding_cache_key("openai", "m2", "what is aperag?")
+
+
+def test_query_cache_coalesces_concurrent_requests():
+    cache = QueryEmbeddingCache(use_redis=False)
+    calls = []
+
+    async def embed(text):
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        return [1.0]
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_embed("p", "m", " hello\nworld", embed) for _ in range(5)])
+
+    assert asyncio.run(run()) == [[1.0]] * 5
+    assert calls == ["hello world"]
+
+    # Served from the local tier afterwards
+    assert asyncio.run(cache.get_or_embed("p", "m", "hello world", embed)) == [1.0]
+    assert len(calls) == 1
+
+
+def test_query_cache_expires_and_propagates_errors():
+    cache = QueryEmbeddingCache(ttl=0, use_redis=False)
+
+    async def failing_embed(text):
+        await asyncio.sleep(0.01)
+        raise ValueError("provider failure")
+
+    async def run():
+        return await asyncio.gather(
+            cache.get_or_embed("p", "m", "q", failing_embed),
+            cache.get_or_embed("p", "m", "q", failing_embed),
+            return_exceptions=True,
+        )
+
+    assert [type(r) for r in asyncio.run(run())] == [ValueError, ValueError]
+
+    async def embed(text):
+        return [2.0]
+
+    assert asyncio.run(cache.get_or_embed("p", "m", "q", embed)) == [2.0]
+    # ttl=0 entries are expired on the next lookup
+    assert cache._local_get(make_query_embedding_cache_key("p", "m", "q")) is None
+
+
+def test_aembed_query_uses_query_cache(monkeypatch):
+    cache = QueryEmbeddingCache(use_redis=False)
+    monkeypatch.setattr(embedding_service_module, "get_query_embedding_cache", lambda: cache)
+    monkeypatch.setattr(embedding_service_module, "get_embedding_cache", lambda: pytest.fail("document cache used"))
+
+    sent_batches = []
+
+    async def fake_embed_contents(self, texts):
+        sent_batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(EmbeddingService, "_aembed_contents", fake_embed_contents)
+
+    service = _make_service()
+    assert service.embed_query("a  b") == [3.0]
+    assert service.embed_query("a b") == [3.0]
+    assert sent_batches == [["a b"]]
@@ -0,0 +1,112 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from aperag.llm.embed import embedding_micro_batcher
+from aperag.llm.embed.embedding_micro_batcher import (
+    EmbeddingMicroBatcher,
+    clear_micro_batch_stats,
+    get_micro_batch_stats,
+    get_micro_batcher,
+)
+from aperag.llm.llm_error_types import BatchProcessingError, RateLimitError
+
+
+def _make_embed_func(calls):
+    async def embed_func(texts):
+        calls.append(list(texts))
+        if "busy" in texts:
+            raise RateLimitError("openai")
+        vectors = [None if text == "boom" else [float(len(text))] for text in texts]
+        if None in vectors:
+            failed_indices = [i for i, vector in enumerate(vectors) if vector is None]
+            raise BatchProcessingError(len(texts), failed_indices, "invalid input", embeddings=vectors)
+        return vectors
+
+    return embed_func
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_flush():
+    calls = []
+    batcher = EmbeddingMicroBatcher(_make_embed_func(calls), max_batch_size=100, max_wait_seconds=0.01)
+    clear_micro_batch_stats()
+
+    results = await asyncio.gather(batcher.embed(["a", "bb"]), batcher.embed(["ccc"]))
+
+    assert results == [[[1.0], [2.0]], [[3.0]]]
+    assert calls == [["a", "bb", "ccc"]]
+    stats = get_micro_batch_stats()
+    assert stats["flushes"] == 1
+    assert stats["requests"] == 2
+    assert stats["chunks"] == 3
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_size_reached():
+    calls = []
+    batcher = EmbeddingMicroBatcher(_make_embed_func(calls), max_batch_size=2, max_wait_seconds=10)
+
+    results = await asyncio.wait_for(asyncio.gather(batcher.embed(["a"]), batcher.embed(["bb"])), timeout=1)
+
+    assert results == [[[1.0]], [[2.0]]]
+    assert calls == [["a", "bb"]]
+
+
+@pytest.mark.asyncio
+async def test_failure_is_isolated_to_failing_request():
+    calls = []
+    batcher = EmbeddingMicroBatcher(_make_embed_func(calls), max_batch_size=100, max_wait_seconds=0.01)
+
+    good, bad = await asyncio.gather(batcher.embed(["a"]), batcher.embed(["bb", "boom"]), return_exceptions=True)
+
+    assert good == [[1.0]]
+    assert isinstance(bad, BatchProcessingError)
+    assert bad.failed_indices == [1]
+    assert bad.embeddings == [[2.0], None]
+    # The good request is served from the shared flush, nothing is embedded twice
+    assert calls == [["a", "bb", "boom"]]
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_fails_every_request_without_retries():
+    calls = []
+    batcher = EmbeddingMicroBatcher(_make_embed_func(calls), max_batch_size=100, max_wait_seconds=0.01)
+
+    results = await asyncio.gather(batcher.embed(["a"]), batcher.embed(["busy"]), return_exceptions=True)
+
+    assert all(isinstance(result, RateLimitError) for result in results)
+    assert calls == [["a", "busy"]]
+
+
+@pytest.mark.asyncio
+async def test_running_flushes_are_referenced_until_done():
+    release = asyncio.Event()
+
+    async def embed_func(texts):
+        await release.wait()
+        return [[1.0] for _ in texts]
+
+    batcher = EmbeddingMicroBatcher(embed_func, max_batch_size=1, max_wait_seconds=10)
+    request = asyncio.ensure_future(batcher.embed(["a"]))
+    await asyncio.sleep(0)
+
+    assert len(batcher._tasks) == 1
+    release.set()
+    assert await request == [[1.0]]
+    await asyncio.sleep(0)
+    assert not batcher._tasks
+
+
+def test_micro_batcher_registry_keeps_recently_used(monkeypatch):
+    monkeypatch.setattr(embedding_micro_batcher, "_MAX_MICRO_BATCHERS", 2)
+    monkeypatch.setattr(embedding_micro_batcher, "_micro_batchers", OrderedDict())
+    embed_func = _make_embed_func([])
+
+    first = get_micro_batcher("key-a", embed_func)
+    get_micro_batcher("key-b", embed_func)
+    assert get_micro_batcher("key-a", embed_func) is first
+    get_micro_batcher("key-c", embed_func)
+
+    assert list(embedding_micro_batcher._micro_batchers) == ["key-a", "key-c"]
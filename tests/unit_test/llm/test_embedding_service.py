@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from aperag.llm.embed import embedding_service as embedding_service_module
+from aperag.llm.embed.embedding_batcher import TokenBudgetRegistry
+from aperag.llm.embed.embedding_service import EmbeddingService
+from aperag.llm.llm_error_types import BatchProcessingError, RateLimitError
+
+
+class _ProviderError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _make_service(max_chunks: int = 2) -> EmbeddingService:
+    return EmbeddingService(
+        embedding_provider="openai",
+        embedding_model="text-embedding-3-small",
+        embedding_service_url="http://localhost",
+        embedding_service_api_key="test",
+        embedding_max_chunks_in_batch=max_chunks,
+        caching=False,
+    )
+
+
+@pytest.fixture
+def fake_aembedding(monkeypatch):
+    calls = []
+
+    async def _aembedding(**kwargs):
+        calls.append(list(kwargs["input"]))
+        # Finish later batches first to check that results are reassembled in order
+        await asyncio.sleep(0.01 / len(calls))
+        if any(text == "boom" for text in kwargs["input"]):
+            raise _ProviderError("invalid input", 400)
+        if any(text == "busy" for text in kwargs["input"]):
+            raise _ProviderError("Rate limit reached, too many requests", 429)
+        return {"data": [{"embedding": [float(len(text))]} for text in kwargs["input"]]}
+
+    monkeypatch.setattr(embedding_service_module.litellm, "aembedding", _aembedding)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_aembed_documents_preserves_order(fake_aembedding):
+    service = _make_service()
+    result = await service.aembed_documents(["a", "bb", "ccc", "dddd", "eeeee"])
+    assert result == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert sorted(fake_aembedding) == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+
+@pytest.mark.asyncio
+async def test_aembed_query(fake_aembedding):
+    service = _make_service()
+    assert await service.aembed_query("line1\nline2") == [11.0]
+    assert fake_aembedding == [["line1 line2"]]
+
+
+def test_sync_wrapper_inside_running_loop(fake_aembedding):
+    service = _make_service()
+
+    async def run():
+        # Sync callers inside async code (e.g. flow runners) must not deadlock
+        return service.embed_query("abc")
+
+    assert asyncio.run(run()) == [3.0]
+
+
+def test_failed_batch_raises(fake_aembedding):
+    service = _make_service()
+    with pytest.raises(BatchProcessingError):
+        service.embed_documents(["ok", "boom", "fine"])
+
+
+def test_failed_batch_reports_only_failing_inputs(fake_aembedding):
+    service = _make_service(max_chunks=4)
+    with pytest.raises(BatchProcessingError) as exc_info:
+        service.embed_documents(["ok", "boom", "fine", "good"])
+    assert exc_info.value.failed_indices == [1]
+
+
+def test_failed_batch_keeps_embeddings_of_other_inputs(fake_aembedding):
+    service = _make_service(max_chunks=4)
+    with pytest.raises(BatchProcessingError) as exc_info:
+        service.embed_documents(["ok", "boom", "fine", "good"])
+    assert exc_info.value.embeddings == [[2.0], None, [4.0], [4.0]]
+
+
+def test_transient_errors_are_not_bisected(fake_aembedding):
+    service = _make_service(max_chunks=4)
+    with pytest.raises(RateLimitError):
+        service.embed_documents(["ok", "busy", "fine", "good"])
+    assert fake_aembedding == [["ok", "busy", "fine", "good"]]
+
+
+def test_single_oversized_input_does_not_shrink_budget(monkeypatch):
+    async def _aembedding(**kwargs):
+        if any(len(text) > 10 for text in kwargs["input"]):
+            raise _ProviderError("Request Entity Too Large", 413)
+        return {"data": [{"embedding": [float(len(text))]} for text in kwargs["input"]]}
+
+    registry = TokenBudgetRegistry()
+    monkeypatch.setattr(embedding_service_module.litellm, "aembedding", _aembedding)
+    monkeypatch.setattr(
+        EmbeddingService,
+        "_get_batcher",
+        lambda self: embedding_service_module.AdaptiveEmbeddingBatcher(
+            provider="openai",
+            model="m",
+            max_count=None,
+            default_token_budget=1000,
+            token_counter=lambda texts: [len(text) for text in texts],
+            registry=registry,
+        ),
+    )
+
+    service = _make_service()
+    with pytest.raises(BatchProcessingError) as exc_info:
+        service.embed_documents(["x" * 20])
+    assert exc_info.value.failed_indices == [0]
+    assert registry.get_budget("openai", "m", 1000) == 1000
+
+    with pytest.raises(BatchProcessingError):
+        service.embed_documents(["a", "x" * 20])
+    assert registry.get_budget("openai", "m", 1000) < 1000
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from aperag.llm.embed.embedding_utils import embed_and_store_nodes
+from aperag.llm.llm_error_types import BatchProcessingError
+
+
+def _nodes(*texts):
+    return [SimpleNamespace(get_content=lambda text=text: text, embedding=None) for text in texts]
+
+
+def _adaptor():
+    store = Mock()
+    store.add.side_effect = lambda nodes: [f"id-{node.get_content()}" for node in nodes]
+    return SimpleNamespace(connector=SimpleNamespace(store=store)), store
+
+
+def test_embed_and_store_nodes_skips_inputs_that_fail_on_their_own():
+    model = Mock()
+    model.embed_documents.side_effect = BatchProcessingError(
+        batch_size=3, failed_indices=[1], reason="invalid input", embeddings=[[1.0], None, [3.0]]
+    )
+    adaptor, store = _adaptor()
+    nodes = _nodes("a", "bad", "c")
+
+    ctx_ids = embed_and_store_nodes(nodes, adaptor, model)
+
+    assert ctx_ids == ["id-a", None, "id-c"]
+    assert [node.get_content() for node in store.add.call_args.args[0]] == ["a", "c"]
+    assert nodes[1].embedding is None
+
+
+def test_embed_and_store_nodes_raises_when_nothing_was_embedded():
+    model = Mock()
+    model.embed_documents.side_effect = BatchProcessingError(
+        batch_size=1, failed_indices=[0], reason="invalid input", embeddings=[None]
+    )
+    adaptor, store = _adaptor()
+
+    with pytest.raises(BatchProcessingError):
+        embed_and_store_nodes(_nodes("bad"), adaptor, model)
+    store.add.assert_not_called()
@@ -0,0 +1,127 @@
+import pytest
+
+from aperag.docparser.base import AssetBinPart, Part, TitlePart
+from aperag.objectstore.local import Local, LocalConfig
+from aperag.tasks import parsed_data_store
+from aperag.tasks.models import LocalDocumentInfo, ParsedDocumentData
+
+
+@pytest.fixture
+def object_store(tmp_path, monkeypatch):
+    store = Local(LocalConfig(root_dir=str(tmp_path)))
+    monkeypatch.setattr(parsed_data_store, "get_object_store", lambda: store)
+    return store
+
+
+def _make_parsed_data(path: str = None) -> ParsedDocumentData:
+    return ParsedDocumentData(
+        document_id="doc1",
+        collection_id="col1",
+        content="# Title\n\ntext",
+        doc_parts=[AssetBinPart(asset_id="page_0.png", data=b"\x89PNG\x00\x01", mime_type="image/png")],
+        file_path="/tmp/doc.pdf",
+        local_doc_info=LocalDocumentInfo(path="/tmp/doc.pdf"),
+        chunks=[
+            TitlePart(content="# Title", level=1, metadata={"titles": ["# Title"]}),
+            Part(content="text", metadata={"pdf_source_map": [{"page_idx": 0}]}),
+        ],
+        parsed_data_path=path,
+    )
+
+
+def test_only_reference_is_passed_through_celery(object_store):
+    parsed_data = _make_parsed_data()
+    path = parsed_data_store.save_parsed_document(
+        "user-a/col1/doc1", parsed_data.content, parsed_data.doc_parts, parsed_data.chunks
+    )
+    data = _make_parsed_data(path).to_dict()
+    assert "content" not in data and "doc_parts" not in data
+
+    restored = ParsedDocumentData.from_dict(data)
+    assert restored.content == "# Title\n\ntext"
+    # Part types survive the round trip
+    assert isinstance(restored.doc_parts[0], AssetBinPart)
+    assert bytes(restored.doc_parts[0].data) == b"\x89PNG\x00\x01"
+    assert isinstance(restored.chunks[0], TitlePart) and restored.chunks[0].level == 1
+    assert restored.chunks[1].metadata == {"pdf_source_map": [{"page_idx": 0}]}
+
+
+def test_load_without_blobs_keeps_binary_parts_empty(object_store):
+    path = parsed_data_store.save_parsed_document(
+        "user-a/col1/doc1", "text", [AssetBinPart(asset_id="a.png", data=b"123")], [Part(content="text")]
+    )
+    content, doc_parts, chunks = parsed_data_store.load_parsed_document(path, load_blobs=False)
+    assert [part.asset_id for part in doc_parts] == ["a.png"]
+    assert doc_parts[0].data == b""
+    assert [chunk.content for chunk in chunks] == ["text"]
+
+
+def test_remote_blobs_are_read_by_range(tmp_path, monkeypatch):
+    class RemoteStore(Local):
+        def __init__(self, cfg):
+            super().__init__(cfg)
+            self.ranges = []
+
+        def local_path(self, path):
+            return None
+
+        def get(self, path):
+            assert not path.endswith("blobs.bin"), "blob file should not be downloaded whole"
+            return super().get(path)
+
+        def stream_range(self, path, start, end=None):
+            self.ranges.append((start, end))
+            return super().stream_range(path, start, end)
+
+    store = RemoteStore(LocalConfig(root_dir=str(tmp_path)))
+    monkeypatch.setattr(parsed_data_store, "get_object_store", lambda: store)
+    doc_parts = [AssetBinPart(asset_id="a.png", data=b"aaa"), AssetBinPart(asset_id="b.png", data=b"bbbb")]
+    path = parsed_data_store.save_parsed_document("user-a/col1/doc1", "text", doc_parts, [])
+
+    _, restored, _ = parsed_data_store.load_parsed_document(path)
+    assert [bytes(part.data) for part in restored] == [b"aaa", b"bbbb"]
+    assert store.ranges == [(0, 2), (3, 6)]
+
+
+def test_vision_assets_survive_the_round_trip(object_store, monkeypatch):
+    from aperag.index import document_parser, vision_index
+    from aperag.index.document_parser import DocumentParser
+
+    monkeypatch.setattr(document_parser, "get_object_store", lambda: object_store)
+    monkeypatch.setattr(vision_index, "get_object_store", lambda: object_store)
+
+    def parts():
+        yield Part(content="text")
+        yield AssetBinPart(
+            asset_id="page_0.png", data=b"\x89PNG-0", metadata={"vision_index": True}, mime_type="image/png"
+        )
+        yield AssetBinPart(
+            asset_id="page_1.png", data=b"\x89PNG-1", metadata={"vision_index": True}, mime_type="image/png"
+        )
+
+    base_path = "user-a/col1/doc1"
+    content, doc_parts = DocumentParser().save_processed_content_and_assets(parts(), base_path)
+    doc_parts = [part for part in doc_parts if not getattr(part, "content", None)]
+    path = parsed_data_store.save_parsed_document(base_path, content, doc_parts, [Part(content="text")])
+
+    restored = ParsedDocumentData.from_dict(_make_parsed_data(path).to_dict(), load_blobs=True)
+    image_parts = [
+        part
+        for part in restored.doc_parts
+        if isinstance(part, AssetBinPart) and (part.mime_type or "").startswith("image/")
+    ]
+    indexer = vision_index.VisionIndexer()
+    assert [part.asset_id for part in image_parts] == ["page_0.png", "page_1.png"]
+    assert [indexer._read_image_data(part) for part in image_parts] == [b"\x89PNG-0", b"\x89PNG-1"]
+
+
+def test_new_parse_keeps_output_of_queued_tasks(object_store):
+    first = parsed_data_store.save_parsed_document("user-a/col1/doc1", "v1", [], [])
+    second = parsed_data_store.save_parsed_document("user-a/col1/doc1", "v2", [], [])
+    # Index tasks queued from the first parse can still load their output
+    assert parsed_data_store.load_parsed_document(first)[0] == "v1"
+    assert parsed_data_store.load_parsed_document(second)[0] == "v2"
+
+    parsed_data_store.delete_parsed_document(first)
+    assert not object_store.obj_exists(f"{first}/parts.msgpack")
+    assert parsed_data_store.load_parsed_document(second)[0] == "v2"
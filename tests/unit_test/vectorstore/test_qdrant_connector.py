@@ -0,0 +1,87 @@
+"""
+Unit tests for Qdrant client pooling in QdrantVectorStoreConnector.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from aperag.query.query import QueryWithEmbedding
+from aperag.vectorstore import qdrant_connector
+from aperag.vectorstore.qdrant_connector import QdrantVectorStoreConnector
+
+
+def _patch_clients(monkeypatch):
+    sync_client_cls = Mock(side_effect=lambda **kwargs: Mock())
+    async_client_cls = Mock(side_effect=lambda **kwargs: Mock(query_points=AsyncMock(return_value=Mock(points=[]))))
+    monkeypatch.setattr(qdrant_connector.qdrant_client, "QdrantClient", sync_client_cls)
+    monkeypatch.setattr(qdrant_connector.qdrant_client, "AsyncQdrantClient", async_client_cls)
+    monkeypatch.setattr(qdrant_connector, "_client_pool", {})
+    monkeypatch.setattr(qdrant_connector, "_async_client_pool", qdrant_connector.weakref.WeakKeyDictionary())
+    return sync_client_cls, async_client_cls
+
+
+def test_connectors_share_client_per_endpoint(monkeypatch):
+    sync_client_cls, _ = _patch_clients(monkeypatch)
+
+    a = QdrantVectorStoreConnector({"url": "http://qdrant", "collection": "a"})
+    b = QdrantVectorStoreConnector({"url": "http://qdrant", "collection": "b"})
+    c = QdrantVectorStoreConnector({"url": "http://qdrant", "collection": "c", "prefer_grpc": True})
+
+    assert a.client is b.client
+    assert a.client is not c.client
+    assert sync_client_cls.call_count == 2
+    assert sync_client_cls.call_args.kwargs["prefer_grpc"] is True
+
+
+def test_asearch_uses_pooled_async_client(monkeypatch):
+    _, async_client_cls = _patch_clients(monkeypatch)
+    query = QueryWithEmbedding(query="hello", top_k=3, embedding=[0.1, 0.2])
+
+    async def _search_twice():
+        connector = QdrantVectorStoreConnector({"url": "http://qdrant", "collection": "a"})
+        await connector.asearch(query, score_threshold=0.5)
+        result = await QdrantVectorStoreConnector({"url": "http://qdrant", "collection": "b"}).asearch(query)
+        return connector, result
+
+    connector, result = asyncio.run(_search_twice())
+
+    assert result.results == []
+    assert async_client_cls.call_count == 1
+    connector.client.query_points.assert_not_called()
+
+
+def test_search_skips_vectors_unless_requested(monkeypatch):
+    _patch_clients(monkeypatch)
+    connector = QdrantVectorStoreConnector({"url": "http://qdrant", "collection": "a"})
+    connector.client.query_points.return_value = Mock(points=[])
+    query = QueryWithEmbedding(query="hello", top_k=3, embedding=[0.1, 0.2])
+
+    connector.search(query)
+    kwargs = connector.client.query_points.call_args.kwargs
+    assert kwargs["with_vectors"] is False
+    assert kwargs["with_payload"] == ["text", "metadata", "_node_content"]
+
+    connector.search(query, with_vectors=True)
+    assert connector.client.query_points.call_args.kwargs["with_vectors"] is True
+
+
+def test_asearch_batch_sends_one_request(monkeypatch):
+    _, async_client_cls = _patch_clients(monkeypatch)
+    aclient = Mock(query_batch_points=AsyncMock(return_value=[Mock(points=[]), Mock(points=[])]))
+    async_client_cls.side_effect = lambda **kwargs: aclient
+    query = QueryWithEmbedding(query="hello", top_k=3, embedding=[0.1, 0.2])
+    vector_filter = Filter(must=[FieldCondition(key="indexer", match=MatchValue(value="vector"))])
+    summary_filter = Filter(must=[FieldCondition(key="indexer", match=MatchValue(value="summary"))])
+
+    async def _search():
+        connector = QdrantVectorStoreConnector({"url": "http://qdrant", "collection": "a"})
+        return await connector.asearch_batch([(query, {"filter": vector_filter}), (query, {"filter": summary_filter})])
+
+    results = asyncio.run(_search())
+
+    assert len(results) == 2
+    aclient.query_batch_points.assert_awaited_once()
+    requests = aclient.query_batch_points.await_args.kwargs["requests"]
+    assert [request.filter for request in requests] == [vector_filter, summary_filter]